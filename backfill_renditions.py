@@ -0,0 +1,100 @@
+"""
+Generate thumbnail / medium renditions for complaint images stored before
+renditions existed.
+
+New uploads get their renditions at upload time. This walks the complaints
+that have an image but no renditions, oldest first, in batches, decodes each
+stored image once in the image process pool and writes its WebP/JPEG
+renditions (the stored image itself is left untouched). Safe to interrupt
+and re-run: finished complaints are skipped.
+
+Usage:
+    python backfill_renditions.py                  # complaints missing renditions
+    python backfill_renditions.py --all            # regenerate every rendition
+    python backfill_renditions.py --batch-size 20 --limit 500
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from src.database.connection import AsyncSessionLocal, engine
+from src.database.models import Complaint
+from src.repositories.image_rendition_repo import ImageRenditionRepository
+from src.storage.blob_store import blob_store
+from src.utils.file_upload import file_upload_handler
+from src.utils.image_pool import image_pool
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+async def backfill(batch_size: int, limit: int, regenerate: bool) -> None:
+    """Generate renditions batch by batch and print progress."""
+    done = failed = 0
+    after = None
+    started = time.perf_counter()
+
+    while not limit or done + failed < limit:
+        size = min(batch_size, limit - done - failed) if limit else batch_size
+        async with AsyncSessionLocal() as session:
+            repo = ImageRenditionRepository(session)
+            batch = await repo.get_backfill_batch(size, after=after, missing_only=not regenerate)
+            if not batch:
+                break
+            after = (batch[-1][1], batch[-1][0])
+
+            result = await session.execute(
+                select(Complaint.id, Complaint.image_hash, Complaint.image_data)
+                .where(Complaint.id.in_([complaint_id for complaint_id, _ in batch]))
+            )
+            images = {}
+            for row in result.all():
+                image_bytes = await blob_store.read_or_inline(row.image_hash, row.image_data)
+                if image_bytes:
+                    images[row.id] = image_bytes
+            todo = [complaint_id for complaint_id, _ in batch if complaint_id in images]
+
+            # The pool bounds how many images are decoded at once
+            outcomes = await asyncio.gather(*[
+                file_upload_handler.process_image_bytes(images[complaint_id], optimize=False)
+                for complaint_id in todo
+            ])
+
+            for complaint_id, (_, renditions) in zip(todo, outcomes):
+                if renditions:
+                    await repo.replace_for_complaint(complaint_id, renditions, commit=False)
+                    done += 1
+                else:
+                    failed += 1
+                    print(f"  ✗ {complaint_id}: image could not be decoded")
+            await session.commit()
+
+        rate = (done + failed) / max(time.perf_counter() - started, 1e-6)
+        print(f"  {done} done, {failed} failed ({rate:.1f} images/s)")
+
+    print(f"\nFinished: {done} complaints with new renditions, {failed} failed")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill complaint image renditions")
+    parser.add_argument("--batch-size", type=int, default=50, help="Complaints per batch/transaction")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many complaints (0 = all)")
+    parser.add_argument("--all", action="store_true", help="Regenerate renditions that already exist")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("IMAGE RENDITION BACKFILL")
+    print("=" * 80)
+
+    try:
+        await backfill(max(args.batch_size, 1), max(args.limit, 0), args.all)
+    finally:
+        image_pool.shutdown()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
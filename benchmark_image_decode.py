@@ -0,0 +1,198 @@
+"""
+Benchmark memory and time of upload image processing per photo size.
+
+Compares the image pool transform used on upload (make_renditions: stored
+JPEG plus thumbnail/medium renditions) against a full-resolution decode of
+the same photo - what the transform cost before JPEGs were decoded in draft
+mode. Every measurement runs in a fresh process and reports the growth of
+its peak RSS over the idle process, i.e. the memory one image needs.
+
+Synthetic photos (noise over gradients, JPEG q90) are generated for the
+requested megapixel sizes; --images measures real photos instead.
+
+Usage:
+    python benchmark_image_decode.py
+    python benchmark_image_decode.py --megapixels 12 48 --repeats 5
+    python benchmark_image_decode.py --images IMG_0001.jpg IMG_0002.jpg
+"""
+
+import argparse
+import math
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from multiprocessing import get_context
+from typing import Dict, List, Tuple
+
+from PIL import Image
+
+from src.config.settings import settings
+from src.utils.file_upload import file_upload_handler
+from src.utils.image_pool import make_renditions, _to_rgb
+
+
+def _args(image_bytes: bytes) -> tuple:
+    handler = file_upload_handler
+    return (
+        image_bytes,
+        (handler.max_width, handler.max_height),
+        handler.jpeg_quality,
+        tuple(handler.rendition_sizes.items()),
+        handler.rendition_quality,
+        handler.rendition_webp,
+    )
+
+
+def full_decode_renditions(
+    image_bytes: bytes,
+    max_size: Tuple[int, int],
+    quality: int,
+    variants: Tuple[Tuple[str, Tuple[int, int]], ...],
+    rendition_quality: int,
+    webp: bool
+) -> Dict:
+    """make_renditions with the image decoded at native resolution first"""
+    img = Image.open(BytesIO(image_bytes))
+    img.load()
+    original_size = img.size
+    img = _to_rgb(img)
+    img.thumbnail(max_size, Image.Resampling.LANCZOS)
+    output = BytesIO()
+    img.save(output, format="JPEG", optimize=True, quality=quality)
+    renditions = []
+    current = img
+    for name, box in sorted(variants, key=lambda v: v[1][0] * v[1][1], reverse=True):
+        current = current.copy()
+        current.thumbnail(box, Image.Resampling.LANCZOS)
+        for fmt in (["webp", "jpeg"] if webp else ["jpeg"]):
+            out = BytesIO()
+            if fmt == "webp":
+                current.save(out, format="WEBP", quality=rendition_quality, method=4)
+            else:
+                current.save(out, format="JPEG", optimize=True, quality=rendition_quality)
+            renditions.append({"variant": name, "format": fmt, "data": out.getvalue()})
+    return {
+        "image": output.getvalue(),
+        "original_size": original_size,
+        "size": img.size,
+        "renditions": renditions,
+    }
+
+
+MODES = {
+    "full decode": full_decode_renditions,
+    "draft decode": make_renditions,
+}
+
+
+def _peak_rss_kb() -> int:
+    """Peak RSS of this process (VmHWM on Linux, ru_maxrss elsewhere)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _reset_peak_rss() -> None:
+    """Reset VmHWM to the current RSS, so imports do not mask the peak (Linux)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _measure(mode: str, path: str, repeats: int) -> Tuple[float, float, Tuple[int, int]]:
+    """Runs in a fresh process: (seconds per image, peak RSS growth MB, output size)"""
+    with open(path, "rb") as f:
+        image_bytes = f.read()
+    func = MODES[mode]
+    func(*_args(_small_jpeg()))  # warm up codecs and imports
+    _reset_peak_rss()
+    baseline = _peak_rss_kb()
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        result = func(*_args(image_bytes))
+    elapsed = (time.perf_counter() - started) / repeats
+
+    return elapsed, (_peak_rss_kb() - baseline) / 1024, tuple(result["size"])
+
+
+def _small_jpeg() -> bytes:
+    output = BytesIO()
+    Image.new("RGB", (64, 64), (128, 128, 128)).save(output, format="JPEG")
+    return output.getvalue()
+
+
+def synthetic_photo(megapixels: float, path: str) -> Tuple[int, int]:
+    """Write a 4:3 photo-like JPEG (noise over gradients) of about megapixels"""
+    width = int(math.sqrt(megapixels * 1_000_000 * 4 / 3))
+    height = width * 3 // 4
+    small = (width // 8, height // 8)
+    noise = Image.effect_noise(small, 40).convert("L")
+    gradient = Image.linear_gradient("L").resize(small)
+    img = Image.merge("RGB", (noise, gradient, Image.blend(noise, gradient, 0.5)))
+    img = img.resize((width, height), Image.Resampling.BICUBIC)
+    img.save(path, format="JPEG", quality=90)
+    return width, height
+
+
+def run_case(label: str, path: str, repeats: int) -> List[Tuple]:
+    rows = []
+    for mode in MODES:
+        # A new process per measurement, so earlier images cannot raise the peak
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            elapsed, peak_mb, size = executor.submit(_measure, mode, path, repeats).result()
+        rows.append((label, mode, elapsed, peak_mb, size))
+        print(f"  {label:<22} {mode:<13} {elapsed * 1000:>9.0f} ms {peak_mb:>10.1f} MB   -> {size[0]}x{size[1]}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark upload image decoding")
+    parser.add_argument("--megapixels", type=float, nargs="+", default=[12, 24, 48],
+                        help="Synthetic photo sizes")
+    parser.add_argument("--images", nargs="+", help="Measure these photos instead")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"UPLOAD IMAGE DECODING (stored {file_upload_handler.max_width}px, "
+          f"IMAGE_MAX_PIXELS {settings.IMAGE_MAX_PIXELS:,})")
+    print("=" * 80)
+    print(f"  {'image':<22} {'mode':<13} {'time/image':>12} {'peak RSS':>13}")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.images:
+            cases = [(os.path.basename(path), path) for path in args.images]
+        else:
+            cases = []
+            for mp in args.megapixels:
+                path = os.path.join(tmp, f"photo_{mp:g}mp.jpg")
+                width, height = synthetic_photo(mp, path)
+                cases.append((f"{width}x{height} ({mp:g} MP)", path))
+
+        for label, path in cases:
+            rows.extend(run_case(label, path, max(args.repeats, 1)))
+
+    print("\n" + "=" * 80)
+    for i in range(0, len(rows), len(MODES)):
+        before, after = rows[i], rows[i + 1]
+        print(
+            f"  {before[0]:<22} time x{before[2] / max(after[2], 1e-9):.1f} faster, "
+            f"memory {before[3]:.0f} MB -> {after[3]:.0f} MB"
+        )
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
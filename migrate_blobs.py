@@ -0,0 +1,222 @@
+"""
+Move image bytes out of the complaints / image_renditions tables into the
+content-addressed blob store (src/storage), and garbage-collect blobs.
+
+Each complaint's image_data (and each rendition's data) is stored as a blob
+in the IMAGE_STORAGE_MODE backend, the row gets the blob's SHA-256 and the
+inline bytes are set to NULL. Identical images end up as one blob. Batches
+commit independently, so the command can be interrupted and re-run.
+
+A legacy thumbnail_data becomes the complaint's "thumbnail" rendition (a JPEG
+blob) unless backfill_renditions.py already produced one; either way the
+column is set to NULL. A thumbnail that cannot be decoded is dropped - the
+image endpoint then serves the full image until the backfill runs.
+
+Postgres only returns the freed TOAST space after a VACUUM (FULL, during a
+maintenance window, to shrink the files).
+
+Usage:
+    python migrate_blobs.py                # migrate inline images
+    python migrate_blobs.py --dry-run      # count what would be migrated
+    python migrate_blobs.py --gc           # also delete unreferenced blobs
+    python migrate_blobs.py --gc-only --grace 0
+"""
+
+import argparse
+import asyncio
+import time
+from io import BytesIO
+from typing import Optional
+
+from PIL import Image
+from sqlalchemy import select, func, or_
+from sqlalchemy.orm import undefer
+
+from src.config.settings import settings
+from src.database.connection import AsyncSessionLocal, engine
+from src.database.models import Complaint, ImageRendition
+from src.storage.blob_store import blob_store
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def _has_inline_bytes():
+    """Complaints that still carry an inline image or thumbnail"""
+    return or_(Complaint.image_data.isnot(None), Complaint.thumbnail_data.isnot(None))
+
+
+async def count_inline() -> tuple:
+    """Rows that still carry inline image bytes"""
+    async with AsyncSessionLocal() as session:
+        complaints = await session.scalar(
+            select(func.count(Complaint.id)).where(_has_inline_bytes())
+        )
+        renditions = await session.scalar(
+            select(func.count(ImageRendition.id)).where(ImageRendition.data.isnot(None))
+        )
+    return complaints or 0, renditions or 0
+
+
+def _thumbnail_rendition(complaint: Complaint) -> Optional[ImageRendition]:
+    """Rendition row for a legacy thumbnail (blob not stored yet), or None if undecodable"""
+    try:
+        with Image.open(BytesIO(complaint.thumbnail_data)) as img:
+            image_format, (width, height) = img.format, img.size
+    except Exception as e:
+        logger.warning(f"Legacy thumbnail of {complaint.id} could not be decoded: {e}")
+        return None
+    if image_format not in ("JPEG", "WEBP"):
+        logger.warning(f"Legacy thumbnail of {complaint.id} is {image_format}, not a rendition format")
+        return None
+    return ImageRendition(
+        complaint_id=complaint.id,
+        variant="thumbnail",
+        format=image_format.lower(),
+        size_bytes=len(complaint.thumbnail_data),
+        width=width,
+        height=height,
+    )
+
+
+async def migrate_thumbnails(session, complaints: list) -> None:
+    """Turn legacy thumbnail_data into "thumbnail" renditions and clear the column"""
+    with_thumbnail = [c for c in complaints if c.thumbnail_data is not None]
+    if not with_thumbnail:
+        return
+
+    # Renditions from the upload path or backfill_renditions.py take precedence
+    result = await session.execute(
+        select(ImageRendition.complaint_id).where(
+            ImageRendition.complaint_id.in_([c.id for c in with_thumbnail]),
+            ImageRendition.variant == "thumbnail",
+        )
+    )
+    has_rendition = set(result.scalars().all())
+
+    for complaint in with_thumbnail:
+        if complaint.id not in has_rendition:
+            rendition = _thumbnail_rendition(complaint)
+            if rendition is not None:
+                rendition.blob_hash = await blob_store.put(
+                    session, complaint.thumbnail_data, rendition.mimetype
+                )
+                session.add(rendition)
+        complaint.thumbnail_data = None
+        complaint.thumbnail_size = None
+
+
+async def migrate_complaints(batch_size: int) -> int:
+    """Move complaints.image_data / thumbnail_data into blobs; returns complaints migrated"""
+    migrated = 0
+    after = None
+    while True:
+        async with AsyncSessionLocal() as session:
+            query = (
+                select(Complaint)
+                .options(undefer(Complaint.image_data), undefer(Complaint.thumbnail_data))
+                .where(_has_inline_bytes())
+                .order_by(Complaint.id)
+                .limit(batch_size)
+            )
+            if after is not None:
+                query = query.where(Complaint.id > after)
+            complaints = list((await session.execute(query)).scalars().all())
+            if not complaints:
+                return migrated
+            after = complaints[-1].id
+
+            for complaint in complaints:
+                if complaint.image_data is None:
+                    continue
+                old_hash = complaint.image_hash
+                complaint.image_hash = await blob_store.put(
+                    session, complaint.image_data, complaint.image_mimetype
+                )
+                complaint.image_data = None
+                if old_hash and old_hash != complaint.image_hash:
+                    await blob_store.release(session, old_hash)
+            await migrate_thumbnails(session, complaints)
+            await session.commit()
+
+        migrated += len(complaints)
+        print(f"  complaints: {migrated} migrated")
+
+
+async def migrate_renditions(batch_size: int) -> int:
+    """Move image_renditions.data into blobs; returns renditions migrated"""
+    migrated = 0
+    after = None
+    while True:
+        async with AsyncSessionLocal() as session:
+            query = (
+                select(ImageRendition)
+                .options(undefer(ImageRendition.data))
+                .where(ImageRendition.data.isnot(None))
+                .order_by(ImageRendition.id)
+                .limit(batch_size)
+            )
+            if after is not None:
+                query = query.where(ImageRendition.id > after)
+            renditions = list((await session.execute(query)).scalars().all())
+            if not renditions:
+                return migrated
+            after = renditions[-1].id
+
+            for rendition in renditions:
+                old_hash = rendition.blob_hash
+                rendition.blob_hash = await blob_store.put(session, rendition.data, rendition.mimetype)
+                rendition.data = None
+                if old_hash and old_hash != rendition.blob_hash:
+                    await blob_store.release(session, old_hash)
+            await session.commit()
+
+        migrated += len(renditions)
+        print(f"  renditions: {migrated} migrated")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Move inline image bytes into the blob store")
+    parser.add_argument("--batch-size", type=int, default=50, help="Rows per batch/transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Only count rows with inline bytes")
+    parser.add_argument("--gc", action="store_true", help="Garbage-collect unreferenced blobs afterwards")
+    parser.add_argument("--gc-only", action="store_true", help="Only garbage-collect")
+    parser.add_argument("--grace", type=int, default=settings.BLOB_GC_GRACE_SECONDS,
+                        help="Keep unreferenced blobs younger than this many seconds")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"BLOB STORE MIGRATION (backend: {blob_store.backend.name})")
+    print("=" * 80)
+
+    try:
+        if not args.gc_only:
+            complaints, renditions = await count_inline()
+            print(f"Inline images: {complaints} complaints, {renditions} renditions")
+            if args.dry_run:
+                return
+
+            started = time.perf_counter()
+            migrated = await migrate_complaints(max(args.batch_size, 1))
+            migrated_renditions = await migrate_renditions(max(args.batch_size, 1))
+            stats = blob_store.get_stats()
+            print(
+                f"\nMigrated {migrated} complaint images and {migrated_renditions} renditions "
+                f"in {time.perf_counter() - started:.1f}s "
+                f"({stats['deduplicated']} duplicates, {stats['bytes_written']} bytes written)"
+            )
+            if migrated or migrated_renditions:
+                print("Run VACUUM on complaints and image_renditions to reclaim the space.")
+
+        if args.gc or args.gc_only:
+            result = await blob_store.collect_garbage(args.grace)
+            print(
+                f"\nGarbage collection: {result['recounted']} ref counts corrected, "
+                f"{result['deleted']} blobs deleted, {result['orphans']} orphans removed"
+            )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
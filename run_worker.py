@@ -0,0 +1,100 @@
+"""
+Complaint worker process.
+
+Claims queued complaint jobs from Postgres and runs AI processing
+(spam detection, categorization, rephrasing, routing, image verification)
+for complaints submitted in asynchronous mode, and verifies pending complaint
+images in batches when IMAGE_VERIFICATION_ASYNC is enabled.
+
+Run as many of these as needed, on any number of machines - jobs are claimed
+with FOR UPDATE SKIP LOCKED, so no job is handed to two workers. SIGTERM /
+SIGINT drain gracefully: in-flight jobs finish (up to JOB_DRAIN_TIMEOUT) and
+anything left is handed back to the queue.
+
+Usage:
+    python run_worker.py                  # JOB_WORKERS_IN_APP or 1 loop
+    python run_worker.py --concurrency 4
+    python run_worker.py --no-images      # complaint jobs only
+"""
+
+import argparse
+import asyncio
+import signal
+
+from src.config.settings import settings
+from src.database.connection import engine
+from src.services.groq_client import groq_client_manager
+from src.services.llm_cache import llm_cache
+from src.services.llm_telemetry import llm_telemetry
+from src.services.duplicate_index import duplicate_index
+from src.services.reference_data import reference_data
+from src.services.local_classifier import load_local_classifier
+from src.utils.image_pool import image_pool
+from src.workers import ComplaintWorker, ImageVerificationWorker
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+async def run(concurrency: int, images: bool = True):
+    """Run the worker until a shutdown signal arrives."""
+    load_local_classifier()
+    llm_telemetry.start()
+    await reference_data.load()
+    await duplicate_index.rebuild()
+    worker = ComplaintWorker(concurrency=concurrency)
+    image_worker = ImageVerificationWorker() if images and settings.IMAGE_VERIFICATION_ASYNC else None
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+
+    await worker.start()
+    print(f"Complaint worker {worker.worker_id} running with {concurrency} loop(s). Ctrl+C to stop.")
+    if image_worker is not None:
+        await image_worker.start()
+        print(
+            f"Image verification worker running "
+            f"(batch {image_worker.batch_size}, concurrency {image_worker.concurrency})."
+        )
+
+    try:
+        await stop_event.wait()
+    finally:
+        print(f"Draining (up to {settings.JOB_DRAIN_TIMEOUT}s)...")
+        await worker.stop(settings.JOB_DRAIN_TIMEOUT)
+        if image_worker is not None:
+            await image_worker.stop(settings.JOB_DRAIN_TIMEOUT)
+        await llm_cache.flush()
+        await llm_telemetry.stop()
+        image_pool.shutdown()
+        await groq_client_manager.close()
+        await engine.dispose()
+        print(f"Worker stopped. Stats: {worker.stats}")
+        if image_worker is not None:
+            print(f"Image verification stats: {image_worker.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CampusVoice complaint worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=max(settings.JOB_WORKERS_IN_APP, 1),
+        help="Jobs processed concurrently by this process"
+    )
+    parser.add_argument(
+        "--no-images",
+        action="store_true",
+        help="Do not run the image verification worker in this process"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, images=not args.no_images))
+
+
+if __name__ == "__main__":
+    main()
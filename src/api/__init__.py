@@ -47,11 +47,110 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ Database initialization failed: {e}")
         # Don't raise - let health checks handle it
     
+    # ✅ NEW: Drop cached LLM results from expired entries / outdated prompts or models
+    try:
+        from src.services.llm_service import llm_service  # noqa: F401 - registers prompt versions
+        from src.services.llm_cache import llm_cache
+        await llm_cache.purge_stale()
+    except Exception as e:
+        logger.error(f"❌ LLM cache purge failed: {e}")
+    
+    # ✅ NEW: Buffered LLM call telemetry (llm_processing_logs)
+    try:
+        from src.services.llm_telemetry import llm_telemetry
+        await llm_telemetry.purge_old()
+        llm_telemetry.start()
+    except Exception as e:
+        logger.error(f"❌ LLM telemetry start failed: {e}")
+    
+    # ✅ NEW: Submission velocity gate (shares counters across processes)
+    try:
+        from src.services.velocity_gate import velocity_gate
+        await velocity_gate.start()
+    except Exception as e:
+        logger.error(f"❌ Velocity gate start failed: {e}")
+    
+    # ✅ NEW: Categories, departments and authority roster held in memory
+    try:
+        from src.services.reference_data import reference_data
+        await reference_data.load()
+    except Exception as e:
+        logger.error(f"❌ Reference data load failed: {e}")
+    
+    # ✅ NEW: Near-duplicate index over open complaints
+    try:
+        from src.services.duplicate_index import duplicate_index
+        await duplicate_index.rebuild()
+    except Exception as e:
+        logger.error(f"❌ Duplicate index rebuild failed: {e}")
+    
+    # ✅ NEW: Local classifier consulted before the LLM for categorization
+    try:
+        from src.services.local_classifier import load_local_classifier
+        load_local_classifier()
+    except Exception as e:
+        logger.error(f"❌ Local classifier load failed: {e}")
+    
+    # ✅ NEW: Optional in-process complaint workers (async submission mode)
+    complaint_worker = None
+    if settings.JOB_WORKERS_IN_APP > 0:
+        from src.workers import ComplaintWorker
+        complaint_worker = ComplaintWorker(concurrency=settings.JOB_WORKERS_IN_APP)
+        await complaint_worker.start()
+    
+    # ✅ NEW: Optional in-process image verification worker
+    image_worker = None
+    if settings.IMAGE_VERIFICATION_ASYNC and settings.IMAGE_VERIFICATION_WORKER_IN_APP:
+        from src.workers import ImageVerificationWorker
+        image_worker = ImageVerificationWorker()
+        await image_worker.start()
+    
     yield  # Application runs here
     
     # Shutdown
     logger.info("🛑 Shutting down CampusVoice API")
     
+    # Drain in-flight complaint jobs before the DB pool goes away
+    if complaint_worker is not None:
+        try:
+            await complaint_worker.stop(settings.JOB_DRAIN_TIMEOUT)
+        except Exception as e:
+            logger.error(f"❌ Error draining complaint worker: {e}")
+    
+    if image_worker is not None:
+        try:
+            await image_worker.stop(settings.JOB_DRAIN_TIMEOUT)
+        except Exception as e:
+            logger.error(f"❌ Error draining image verification worker: {e}")
+    
+    # Finish background LLM cache writes while the DB pool is still open
+    try:
+        from src.services.llm_cache import llm_cache
+        await llm_cache.flush()
+    except Exception as e:
+        logger.error(f"❌ Error flushing LLM cache: {e}")
+    
+    # Write buffered LLM telemetry while the DB pool is still open
+    try:
+        from src.services.llm_telemetry import llm_telemetry
+        await llm_telemetry.stop()
+    except Exception as e:
+        logger.error(f"❌ Error flushing LLM telemetry: {e}")
+    
+    # Hand the last accepted submissions to the other processes
+    try:
+        from src.services.velocity_gate import velocity_gate
+        await velocity_gate.stop()
+    except Exception as e:
+        logger.error(f"❌ Error stopping velocity gate: {e}")
+    
+    # Stop the image process pool workers
+    try:
+        from src.utils.image_pool import image_pool
+        image_pool.shutdown()
+    except Exception as e:
+        logger.error(f"❌ Error stopping image process pool: {e}")
+    
     # Close database connections
     try:
         from src.database.connection import engine
@@ -59,6 +158,13 @@ async def lifespan(app: FastAPI):
         logger.info("✅ Database connections closed")
     except Exception as e:
         logger.error(f"❌ Error during shutdown: {e}")
+    
+    # Close the shared Groq HTTP connection pool
+    try:
+        from src.services.groq_client import groq_client_manager
+        await groq_client_manager.close()
+    except Exception as e:
+        logger.error(f"❌ Error closing Groq client: {e}")
 
 
 def create_app() -> FastAPI:
@@ -178,7 +284,8 @@ def setup_exception_handlers(app: FastAPI):
                 "error": exc.detail,
                 "error_code": f"HTTP_{exc.status_code}",
                 "request_id": request_id
-            }
+            },
+            headers=getattr(exc, "headers", None)  # e.g. Content-Range on 416
         )
     
     @app.exception_handler(RequestValidationError)
@@ -32,6 +32,8 @@ from src.repositories.authority_repo import AuthorityRepository
 from src.repositories.student_repo import StudentRepository
 from src.repositories.complaint_repo import ComplaintRepository
 from src.services.auth_service import auth_service
+from src.services.student_trust import student_trust
+from src.services.reference_data import reference_data
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +90,7 @@ async def create_authority(
         designation=data.designation,
         authority_level=data.authority_level
     )
+    reference_data.invalidate()
     
     logger.info(f"Authority created: {data.email} by admin {current_authority_id}")
     
@@ -182,6 +185,7 @@ async def toggle_authority_status(
     authority.updated_at = datetime.now(timezone.utc)
     
     await db.commit()
+    reference_data.invalidate()
     
     action = "activated" if activate else "deactivated"
     logger.info(f"Authority {authority_id} {action} by admin {current_authority_id}")
@@ -244,6 +248,7 @@ async def delete_authority(
     
     await db.delete(authority)
     await db.commit()
+    reference_data.invalidate()
     
     logger.info(f"Authority {authority_id} deleted by admin {current_authority_id}")
     
@@ -665,6 +670,7 @@ async def bulk_update_status(
         # Update complaint
         complaint.status = new_status
         complaint.updated_at = datetime.now(timezone.utc)
+        student_trust.record_status_change(complaint.student_roll_no, old_status, new_status)
         
         if new_status in ["Resolved", "Closed"] and not complaint.resolved_at:
             complaint.resolved_at = datetime.now(timezone.utc)
@@ -761,7 +767,7 @@ async def moderate_image(
             detail="Complaint not found"
         )
     
-    if not complaint.image_data:
+    if not complaint.has_image:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No image attached to this complaint"
@@ -960,4 +966,49 @@ async def get_health_metrics(
     }
 
 
+# ==================== LLM TELEMETRY ====================
+
+@router.get(
+    "/llm/telemetry",
+    summary="LLM call telemetry",
+    description="Latency percentiles, token spend and error rate per LLM operation and model (admin only)"
+)
+async def get_llm_telemetry(
+    hours: int = Query(24, ge=1, le=24 * 90, description="Look-back window in hours"),
+    operation: Optional[str] = Query(None, description="Only this operation type"),
+    current_authority_id: int = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ✅ NEW: Aggregate llm_processing_logs per operation and model.
+
+    Rows are written in batches every few seconds, so the most recent calls
+    may not be included yet.
+    """
+    from src.repositories.llm_log_repo import LLMLogRepository
+    from src.services.llm_telemetry import llm_telemetry
+
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    rows = await LLMLogRepository(db).aggregate(since, operation)
+
+    calls = sum(row["calls"] for row in rows)
+    errors = sum(row["errors"] for row in rows)
+    costs = [row["cost_usd"] for row in rows if row["cost_usd"] is not None]
+
+    return {
+        "window_hours": hours,
+        "since": since.isoformat(),
+        "totals": {
+            "calls": calls,
+            "errors": errors,
+            "error_rate": round(errors / calls, 4) if calls else 0.0,
+            "tokens": sum(row["tokens"] for row in rows),
+            "cost_usd": round(sum(costs), 6) if costs else None,
+        },
+        "operations": rows,
+        "writer": llm_telemetry.get_stats(),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+
 __all__ = ["router"]
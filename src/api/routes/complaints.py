@@ -13,10 +13,10 @@ CRUD operations, voting, filtering, image upload, verification, tracking.
 """
 
 import logging
-from typing import Optional
+from typing import Optional, Dict, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request, Header
+from fastapi.responses import Response, FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.dependencies import (
@@ -37,19 +37,41 @@ from src.schemas.complaint import (
     ComplaintFilter,
     SpamFlag,
     ImageUploadResponse,
+    ComplaintProcessingStatusResponse,
 )
 from src.schemas.vote import VoteCreate, VoteResponse
 from src.schemas.common import SuccessResponse
 from src.services.complaint_service import ComplaintService
 from src.services.vote_service import VoteService
 from src.services.image_verification import image_verification_service
-from src.utils.exceptions import ComplaintNotFoundError, to_http_exception, InvalidFileTypeError, FileTooLargeError, FileUploadError
+from src.services.student_trust import student_trust
+from src.services.reference_data import reference_data
+from src.storage.blob_store import blob_store, blob_hash, blob_version
+from src.config.settings import settings
+from src.utils.exceptions import ComplaintNotFoundError, to_http_exception, InvalidFileTypeError, FileTooLargeError, FileUploadError, RateLimitExceededError
+from src.utils.deadline import request_deadline
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/complaints", tags=["Complaints"])
 
 
+# ==================== REQUEST DEADLINE ====================
+
+def _request_budget(client_timeout: Optional[float]) -> float:
+    """
+    Time budget for the AI work of a synchronous request.
+
+    COMPLAINT_REQUEST_DEADLINE, shortened to the client's own timeout when it
+    sends one (X-Request-Timeout, seconds), so LLM calls switch to fallback
+    logic before the client gives up.
+    """
+    budget = settings.COMPLAINT_REQUEST_DEADLINE
+    if client_timeout and client_timeout > 0:
+        budget = min(budget, client_timeout) if budget > 0 else client_timeout
+    return budget
+
+
 # ==================== CREATE COMPLAINT ====================
 
 @router.post(
@@ -60,9 +82,20 @@ router = APIRouter(prefix="/complaints", tags=["Complaints"])
     description="Submit a new complaint - category and department are automatically determined by AI"
 )
 async def create_complaint(
+    request: Request,
+    response: Response,
     original_text: str = Form(..., min_length=10, max_length=2000, description="Complaint text"),
     visibility: str = Form(default="Public", description="Visibility level (Public or Private)"),
     image: Optional[UploadFile] = File(None, description="Optional complaint image"),
+    async_mode: Optional[bool] = Form(
+        default=None,
+        description="Queue AI processing and return immediately (defaults to server setting)"
+    ),
+    client_timeout: Optional[float] = Header(
+        default=None,
+        alias="X-Request-Timeout",
+        description="Client-side timeout in seconds; AI processing falls back to keyword logic before it"
+    ),
     roll_no: str = Depends(get_current_student),
     db: AsyncSession = Depends(get_db)
 ):
@@ -87,6 +120,24 @@ async def create_complaint(
     - If image is required but not provided, complaint is rejected (HTTP 400)
     - Visibility options: "Public" or "Private" only
 
+    **Asynchronous mode** (`async_mode=true`):
+    - Complaint is stored with status "Processing" and HTTP 202 is returned immediately
+    - AI processing runs in a background worker
+    - Poll `GET /complaints/{id}/processing-status` for the outcome; spam and
+      missing-image rejections are reported there (and via notification)
+
+    **Time budget** (synchronous mode): AI processing runs under a deadline of
+    `COMPLAINT_REQUEST_DEADLINE` seconds, or the `X-Request-Timeout` header if
+    shorter. LLM timeouts and retries shrink to fit it and keyword-based
+    fallbacks take over when it runs low.
+
+    **Flood protection**: more than `MAX_COMPLAINTS_PER_HOUR` submissions per
+    hour, or the same text over and over, is refused with HTTP 429 before any
+    AI processing.
+
+    **Image**: JPEG, PNG or WebP up to `MAX_FILE_SIZE`. A larger upload is
+    refused with HTTP 413 and a non-image with HTTP 415, before any AI processing.
+
     **Multipart form data required if image is uploaded**
     """
     try:
@@ -98,17 +149,45 @@ async def create_complaint(
             )
 
         service = ComplaintService(db)
+        client_ip = request.client.host if request.client else None
+
+        # ✅ NEW: Asynchronous submission - queue AI processing, return immediately
+        if settings.COMPLAINT_ASYNC_SUBMISSION if async_mode is None else async_mode:
+            result = await service.submit_complaint_async(
+                student_roll_no=roll_no,
+                original_text=original_text,
+                visibility=visibility,
+                image_file=image,
+                client_ip=client_ip
+            )
+            response.status_code = status.HTTP_202_ACCEPTED
+            return ComplaintSubmitResponse(**result)
 
         # ✅ UPDATED: No category_id parameter - fully AI-driven
-        result = await service.create_complaint(
-            student_roll_no=roll_no,
-            original_text=original_text,
-            visibility=visibility,
-            image_file=image
-        )
+        # ✅ NEW: Every LLM/vision call below shares this request's time budget
+        with request_deadline(_request_budget(client_timeout)):
+            result = await service.create_complaint(
+                student_roll_no=roll_no,
+                original_text=original_text,
+                visibility=visibility,
+                image_file=image,
+                client_ip=client_ip
+            )
 
         return ComplaintSubmitResponse(**result)
 
+    except RateLimitExceededError as e:
+        # ✅ NEW: Flood rejected by the velocity gate (no DB or LLM work done)
+        logger.warning(f"Complaint flood rejected for {roll_no}: {e.message}")
+        http_exc = to_http_exception(e)
+        http_exc.headers = {"Retry-After": str(e.details.get("retry_after", 60))}
+        raise http_exc
+
+    except (InvalidFileTypeError, FileTooLargeError, FileUploadError) as e:
+        # ✅ NEW: Rejected upload (413 too large, 415 not an image) - before any AI processing
+        logger.warning(f"Complaint image rejected for {roll_no}: {e.message}")
+        raise to_http_exception(e)
+
     except ValueError as e:
         # ✅ NEW: ValueError indicates spam rejection or missing required image
         error_message = str(e)
@@ -195,27 +274,17 @@ async def get_complaints(
     )
 
     # Count using same visibility logic (✅ UPDATED: Only Public)
-    from src.database.models import ComplaintCategory
     count_conditions = [
         Complaint.visibility == "Public",
-        Complaint.status != "Closed"
+        Complaint.status.notin_(["Closed", "Processing"])
     ]
 
-    # Get hostel category IDs for filtering
-    mens_hostel_query = select(ComplaintCategory.id).where(ComplaintCategory.name == "Men's Hostel")
-    womens_hostel_query = select(ComplaintCategory.id).where(ComplaintCategory.name == "Women's Hostel")
-    general_query = select(ComplaintCategory.id).where(ComplaintCategory.name == "General")
-    disciplinary_query = select(ComplaintCategory.id).where(ComplaintCategory.name == "Disciplinary Committee")
-
-    mens_hostel_result = await db.execute(mens_hostel_query)
-    womens_hostel_result = await db.execute(womens_hostel_query)
-    general_result = await db.execute(general_query)
-    disciplinary_result = await db.execute(disciplinary_query)
-
-    mens_hostel_id = mens_hostel_result.scalar()
-    womens_hostel_id = womens_hostel_result.scalar()
-    general_id = general_result.scalar()
-    disciplinary_id = disciplinary_result.scalar()
+    # Get hostel category IDs for filtering (in-memory registry)
+    refs = await reference_data.current()
+    mens_hostel_id = refs.category_id("Men's Hostel")
+    womens_hostel_id = refs.category_id("Women's Hostel")
+    general_id = refs.category_id("General")
+    disciplinary_id = refs.category_id("Disciplinary Committee")
 
     # Hide hostel complaints based on stay type and gender
     if student.stay_type == "Day Scholar":
@@ -303,6 +372,60 @@ async def get_complaint(
     return ComplaintDetailResponse(**data)
 
 
+@router.get(
+    "/{complaint_id}/processing-status",
+    response_model=ComplaintProcessingStatusResponse,
+    summary="Get asynchronous processing status",
+    description="Poll the outcome of a complaint submitted with async_mode=true"
+)
+async def get_complaint_processing_status(
+    complaint_id: UUID,
+    roll_no: str = Depends(get_current_student),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    ✅ NEW: Poll AI processing of an asynchronously submitted complaint.
+
+    Job statuses:
+    - **Queued / Running**: Still processing (complaint status is "Processing")
+    - **Succeeded**: Complaint raised; `result` holds the full submission result
+    - **Rejected**: Complaint discarded (spam, missing image); see `rejection_reason`
+    - **Failed**: Processing failed after all retries
+    """
+    from sqlalchemy import select
+    from src.database.models import Complaint
+    from src.repositories.complaint_job_repo import ComplaintJobRepository
+
+    job = await ComplaintJobRepository(db).get_latest_for_complaint(complaint_id)
+
+    # Only the submitting student can see the job (404 either way, no leaking)
+    if not job or job.student_roll_no != roll_no:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No processing job found for this complaint"
+        )
+
+    result = await db.execute(
+        select(Complaint.status).where(Complaint.id == complaint_id)
+    )
+    complaint_status = result.scalar_one_or_none()
+
+    return ComplaintProcessingStatusResponse(
+        complaint_id=job.complaint_id,
+        job_id=job.id,
+        job_status=job.status,
+        complaint_status=complaint_status,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        rejection_reason=job.last_error if job.status == "Rejected" else None,
+        last_error=job.last_error if job.status != "Rejected" else None,
+        result=job.result if job.status == "Succeeded" and job.result else None,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        completed_at=job.completed_at
+    )
+
+
 # ==================== VOTING ====================
 
 @router.post(
@@ -447,11 +570,12 @@ async def upload_complaint_image(
         service = ComplaintService(db)
         
         # ✅ FIXED: Use service method for binary storage
-        result = await service.upload_complaint_image(
-            complaint_id=complaint_id,
-            student_roll_no=complaint.student_roll_no,
-            image_file=file
-        )
+        with request_deadline(_request_budget(None)):
+            result = await service.upload_complaint_image(
+                complaint_id=complaint_id,
+                student_roll_no=complaint.student_roll_no,
+                image_file=file
+            )
         
         logger.info(f"Image uploaded for complaint {complaint_id}")
         
@@ -460,10 +584,7 @@ async def upload_complaint_image(
     except HTTPException:
         raise
     except (InvalidFileTypeError, FileTooLargeError, FileUploadError) as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
+        raise to_http_exception(e)
     except Exception as e:
         logger.error(f"Image upload error: {e}", exc_info=True)
         raise HTTPException(
@@ -517,56 +638,237 @@ async def get_complaint_for_image(
     return complaint
 
 
+def _accepts_webp(accept: str) -> bool:
+    """Whether an Accept header explicitly allows image/webp (q > 0)"""
+    for item in accept.split(","):
+        media_type, _, params = item.strip().partition(";")
+        if media_type.strip().lower() != "image/webp":
+            continue
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check with weak comparison (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == tag for candidate in if_none_match.split(","))
+
+
+def _byte_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header.
+    
+    Returns:
+        (start, end) with end exclusive, or None to send the whole image
+        (no/unsupported/multi-range header)
+    
+    Raises:
+        HTTPException: 416 if the range is unsatisfiable
+    """
+    units, _, spec = range_header.partition("=")
+    if units.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last) + 1, size) if last else size
+        else:
+            start, end = max(size - int(last), 0), size
+    except ValueError:
+        return None
+    if start >= size or start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+def _image_cache_control(complaint, versioned: bool) -> str:
+    """
+    Cache-Control of a complaint image.
+    
+    Only images of Public complaints may be stored by shared caches (any
+    authenticated user can see them); Department and Private images are
+    private to the requesting browser. Versioned URLs (?v=image_version)
+    never change content and are immutable; unversioned ones are
+    revalidated with the ETag on every use.
+    """
+    scope = "public" if settings.IMAGE_CACHE_SHARED and complaint.visibility == "Public" else "private"
+    if versioned and settings.IMAGE_CACHE_MAX_AGE:
+        return f"{scope}, max-age={settings.IMAGE_CACHE_MAX_AGE}, immutable"
+    return f"{scope}, no-cache"
+
+
+async def _image_response(
+    request: Request,
+    sha256: Optional[str],
+    inline: Optional[bytes],
+    media_type: str,
+    headers: Dict[str, str],
+    allow_range: bool = False
+) -> Response:
+    """
+    Response for an image stored as a blob or in a legacy bytes column.
+    
+    The ETag is the content hash, so If-None-Match on a blob is answered
+    with 304 before any bytes are read. Blobs on local disk are sent as
+    files (sendfile / pathsend where the server supports it, with Range
+    handled by FileResponse) without loading them into memory.
+    
+    Args:
+        request: Incoming request (conditional and Range headers)
+        sha256: Blob reference (preferred when set)
+        inline: Legacy bytes column value
+        media_type: Content type of the image
+        headers: Extra response headers (Cache-Control, Vary, ...)
+        allow_range: Answer Range requests with 206 (originals)
+    """
+    if not sha256 and not inline:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+    
+    etag = f'"{sha256 or blob_hash(inline)}"'
+    headers = {**headers, "ETag": etag}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        headers.pop("Content-Disposition", None)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if sha256:
+        path = blob_store.local_path(sha256)
+        if path is not None:
+            return FileResponse(path, media_type=media_type, headers=headers)
+        inline = await blob_store.read(sha256)
+        if not inline:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Image not found"
+            )
+    
+    if allow_range:
+        headers["Accept-Ranges"] = "bytes"
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if range_header and (if_range is None or if_range.strip() == etag):
+            byte_range = _byte_range(range_header, len(inline))
+            if byte_range is not None:
+                start, end = byte_range
+                headers["Content-Range"] = f"bytes {start}-{end - 1}/{len(inline)}"
+                return Response(
+                    content=inline[start:end],
+                    status_code=status.HTTP_206_PARTIAL_CONTENT,
+                    media_type=media_type,
+                    headers=headers
+                )
+    return Response(content=inline, media_type=media_type, headers=headers)
+
+
 @router.get(
     "/{complaint_id}/image",
     summary="Get complaint image",
     description="Retrieve complaint image (binary data)",
     responses={
         200: {
-            "content": {"image/jpeg": {}, "image/png": {}},
+            "content": {"image/jpeg": {}, "image/webp": {}, "image/png": {}},
             "description": "Returns the image file"
-        }
+        },
+        206: {"description": "Requested byte range of the original image"},
+        304: {"description": "Not modified (If-None-Match matched the ETag)"}
     }
 )
 async def get_complaint_image(
     complaint_id: UUID,
-    thumbnail: bool = Query(False, description="Return thumbnail (200x200) instead of full image"),
+    request: Request,
+    thumbnail: bool = Query(False, description="Return thumbnail instead of full image"),
+    size: Optional[str] = Query(
+        None,
+        pattern="^(thumbnail|medium|original)$",
+        description="Rendition: thumbnail, medium or original (overrides thumbnail)"
+    ),
+    v: Optional[str] = Query(
+        None,
+        max_length=64,
+        description="Image version (image_version from the complaint); makes the response immutable"
+    ),
     complaint = Depends(get_complaint_for_image),
     db: AsyncSession = Depends(get_db)
 ):
     """
     ✅ NEW: Get complaint image as binary data.
     
-    - **thumbnail**: If true, returns optimized 200x200 thumbnail
+    - **thumbnail**: If true, returns the thumbnail (THUMBNAIL_WIDTH x THUMBNAIL_HEIGHT)
+    - **size**: thumbnail, medium or original
+    - **v**: image_version of the complaint, for long-lived caching
     
-    Returns image with appropriate MIME type.
+    Thumbnail and medium renditions are served as WebP when the Accept header
+    allows it, JPEG otherwise. Responses carry a content-hash ETag
+    (If-None-Match → 304) and originals support Range requests.
     """
+    from src.repositories.complaint_repo import ComplaintRepository
+    
     # Check if complaint has image
-    if not complaint.image_data and not complaint.thumbnail_data:
+    if not complaint.has_image:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No image attached to this complaint"
         )
     
-    # Return thumbnail or full image
-    if thumbnail and complaint.thumbnail_data:
-        image_data = complaint.thumbnail_data
-        mime_type = complaint.image_mimetype or "image/jpeg"
-    elif complaint.image_data:
-        image_data = complaint.image_data
-        mime_type = complaint.image_mimetype or "image/jpeg"
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Image not found"
-        )
+    versioned = v is not None and v == blob_version(complaint.image_hash)
+    cache_control = _image_cache_control(complaint, versioned)
     
-    return Response(
-        content=image_data,
-        media_type=mime_type,
-        headers={
-            "Content-Disposition": f'inline; filename="{complaint.image_filename or "image.jpg"}"'
-        }
+    variant = size or ("thumbnail" if thumbnail else "original")
+    if variant != "original":
+        from src.repositories.image_rendition_repo import ImageRenditionRepository
+        
+        formats = ["webp", "jpeg"] if _accepts_webp(request.headers.get("accept", "")) else ["jpeg"]
+        rendition = await ImageRenditionRepository(db).get_best(complaint_id, variant, formats)
+        if rendition is not None:
+            return await _image_response(
+                request,
+                rendition.blob_hash,
+                rendition.data,
+                rendition.mimetype,
+                {
+                    "Content-Disposition": f'inline; filename="{variant}.{"jpg" if rendition.format == "jpeg" else rendition.format}"',
+                    "Cache-Control": cache_control,
+                    "Vary": "Accept"
+                }
+            )
+    
+    headers = {
+        "Content-Disposition": f'inline; filename="{complaint.image_filename or "image.jpg"}"',
+        "Cache-Control": cache_control
+    }
+    mime_type = complaint.image_mimetype or "image/jpeg"
+    complaint_repo = ComplaintRepository(db)
+    
+    # Images uploaded before renditions existed: legacy thumbnail
+    if variant == "thumbnail" and complaint.thumbnail_size:
+        thumbnail_bytes = await complaint_repo.get_image_bytes(complaint, thumbnail=True)
+        if thumbnail_bytes:
+            return await _image_response(request, None, thumbnail_bytes, mime_type, headers)
+    
+    # Blob references are served by _image_response; only legacy rows read the column
+    inline = None if complaint.image_hash else await complaint_repo.get_image_bytes(complaint)
+    return await _image_response(
+        request, complaint.image_hash, inline, mime_type, headers, allow_range=variant == "original"
     )
 
 
@@ -587,8 +889,10 @@ async def verify_complaint_image(
     Uses LLM to verify if image is relevant to the complaint.
     Only complaint owner can trigger verification.
     """
+    from src.repositories.complaint_repo import ComplaintRepository
+    
     # Check if complaint has image
-    if not complaint.image_data:
+    if not complaint.has_image:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No image attached to this complaint"
@@ -606,13 +910,15 @@ async def verify_complaint_image(
 
     try:
         # Trigger verification using binary image data from the complaint
-        result = await image_verification_service.verify_image_from_bytes(
-            db=db,
-            complaint_id=complaint_id,
-            complaint_text=complaint.rephrased_text or complaint.original_text,
-            image_bytes=complaint.image_data,
-            mimetype=complaint.image_mimetype or "image/jpeg"
-        )
+        with request_deadline(_request_budget(None)):
+            result = await image_verification_service.verify_image_from_bytes(
+                db=db,
+                complaint_id=complaint_id,
+                complaint_text=complaint.rephrased_text or complaint.original_text,
+                image_bytes=await ComplaintRepository(db).get_image_bytes(complaint),
+                mimetype=complaint.image_mimetype or "image/jpeg",
+                category_id=complaint.category_id
+            )
 
         # Update complaint with verification results
         complaint.image_verified = result["is_relevant"]
@@ -808,10 +1114,12 @@ async def flag_as_spam(
     complaint.spam_reason = reason
     complaint.spam_flagged_by = authority_id
     complaint.spam_flagged_at = datetime.now(timezone.utc)
+    old_status = complaint.status
     complaint.status = "Spam"
     complaint.updated_at = datetime.now(timezone.utc)
 
     await db.commit()
+    student_trust.record_status_change(complaint.student_roll_no, old_status, "Spam")
 
     # Notify the student that their complaint was flagged as spam
     try:
@@ -866,10 +1174,12 @@ async def unflag_spam(
     complaint.spam_reason = None
     complaint.spam_flagged_by = None
     complaint.spam_flagged_at = None
+    old_status = complaint.status
     complaint.status = "Raised"
     complaint.updated_at = datetime.now(timezone.utc)
     
     await db.commit()
+    student_trust.record_status_change(complaint.student_roll_no, old_status, "Raised")
     
     logger.info(f"Spam flag removed from complaint {complaint_id} by authority {authority_id}")
     
@@ -924,7 +1234,7 @@ async def filter_complaints(
     
     # Visibility base conditions
     conditions.append(Complaint.visibility.in_(["Public", "Department"]))
-    conditions.append(Complaint.status != "Closed")
+    conditions.append(Complaint.status.notin_(["Closed", "Processing"]))
     
     if student.stay_type == "Day Scholar":
         conditions.append(Complaint.category_id != 1)
@@ -938,9 +1248,9 @@ async def filter_complaints(
         conditions.append(Complaint.category_id == filter_dict["category_id"])
     if filter_dict.get("has_image") is not None:
         if filter_dict["has_image"]:
-            conditions.append(Complaint.image_data.isnot(None))
+            conditions.append(Complaint.has_image)
         else:
-            conditions.append(Complaint.image_data.is_(None))
+            conditions.append(~Complaint.has_image)
     if filter_dict.get("is_verified") is not None:
         conditions.append(Complaint.image_verified == filter_dict["is_verified"])
     
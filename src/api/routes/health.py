@@ -8,6 +8,8 @@ No authentication required - these are public endpoints for monitoring.
 ✅ ADDED: Database pool statistics
 ✅ ADDED: Service dependencies check
 ✅ ADDED: Metrics endpoint for monitoring
+✅ ADDED: Groq client pool / in-flight gauges
+✅ ADDED: Duplicate index, student trust and velocity gate stats
 ✅ NO AUTHENTICATION: All endpoints are public
 """
 
@@ -19,6 +21,16 @@ from sqlalchemy import text, func, select
 
 from src.database.connection import get_db, engine  # ✅ FIXED IMPORT
 from src.config.settings import settings
+from src.services.groq_client import groq_client_manager
+from src.services.llm_cache import llm_cache
+from src.services.duplicate_index import duplicate_index
+from src.services.reference_data import reference_data
+from src.services.student_trust import student_trust
+from src.services.velocity_gate import velocity_gate
+from src.services.image_verification import image_verification_service
+from src.utils.image_pool import image_pool
+from src.storage.blob_store import blob_store
+from src.repositories.complaint_job_repo import ComplaintJobRepository
 
 logger = logging.getLogger(__name__)
 
@@ -117,6 +129,20 @@ async def detailed_health_check(db: AsyncSession = Depends(get_db)):
             "message": str(e)
         }
     
+    # ✅ NEW: Groq client pool / in-flight gauges
+    llm_pool = groq_client_manager.get_pool_stats()
+    health_status["checks"]["llm_client"] = {
+        "status": "healthy" if llm_pool["configured"] else "fallback_mode",
+        **llm_pool
+    }
+    
+    # ✅ NEW: Circuit breakers / adaptive concurrency (open circuit = fallback logic in use)
+    llm_resilience = groq_client_manager.get_resilience_stats()
+    health_status["checks"]["llm_circuit_breakers"] = {
+        "status": "degraded" if llm_resilience["open_circuits"] else "healthy",
+        **llm_resilience
+    }
+    
     return health_status
 
 
@@ -293,7 +319,18 @@ async def metrics(db: AsyncSession = Depends(get_db)):
                 "in_progress_complaints": in_progress_complaints,
                 "resolved_complaints": resolved_complaints
             },
-            "database_pool": pool_stats
+            "database_pool": pool_stats,
+            "llm_client": groq_client_manager.get_pool_stats(),
+            "llm_resilience": groq_client_manager.get_resilience_stats(),
+            "llm_cache": llm_cache.get_stats(),
+            "duplicate_index": duplicate_index.get_stats(),
+            "reference_data": reference_data.get_stats(),
+            "student_trust": student_trust.get_stats(),
+            "velocity_gate": velocity_gate.get_stats(),
+            "image_pool": image_pool.get_stats(),
+            "image_verification": image_verification_service.get_stats(),
+            "blob_store": blob_store.get_stats(),
+            "job_queue": await ComplaintJobRepository(db).count_by_status()
         }
         
     except Exception as e:
@@ -3,7 +3,7 @@ Fixed constants for CampusVoice application.
 Department codes, categories, authority levels, status transitions, etc.
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 from enum import Enum
 import re
 
@@ -118,6 +118,7 @@ LEVEL_TO_AUTHORITY: Dict[int, str] = {v: k for k, v in AUTHORITY_LEVELS.items()}
 
 class ComplaintStatus(str, Enum):
     """Complaint status enums"""
+    PROCESSING = "Processing"  # ✅ NEW: Queued for AI processing (async submission)
     RAISED = "Raised"
     IN_PROGRESS = "In Progress"
     RESOLVED = "Resolved"
@@ -126,6 +127,7 @@ class ComplaintStatus(str, Enum):
 
 
 VALID_STATUS_TRANSITIONS: Dict[str, List[str]] = {
+    "Processing": [],  # Left only by the complaint worker
     "Raised": ["In Progress", "Resolved", "Spam"],
     "In Progress": ["Resolved", "Spam"],
     "Resolved": ["Closed"],
@@ -222,6 +224,20 @@ class LLMOperationType(str, Enum):
     REPHRASING = "rephrasing"
     IMAGE_VERIFICATION = "image_verification"
     SPAM_DETECTION = "spam_detection"
+    IMAGE_REQUIREMENT = "image_requirement"
+    ANALYSIS = "analysis"
+    BATCH_CATEGORIZATION = "batch_categorization"
+    CONNECTION_TEST = "connection_test"
+
+
+# ✅ NEW: Groq list prices in USD per million tokens (input, output), for LLM telemetry cost.
+# Models missing here are logged with cost NULL.
+LLM_MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "meta-llama/llama-4-scout-17b-16e-instruct": (0.11, 0.34),
+    "meta-llama/llama-4-maverick-17b-128e-instruct": (0.20, 0.60),
+}
 
 
 # ==================== IMAGE VERIFICATION STATUS ====================
@@ -345,6 +361,99 @@ SPAM_DETECTION_THRESHOLDS: Dict[str, int | float] = {
     "word_repetition": 5,
 }
 
+# Short complaints containing these are treated as test/dummy content
+TEST_CONTENT_KEYWORDS: List[str] = ["test", "testing", "asdf", "qwerty", "dummy", "sample"]
+
+
+# ==================== KEYWORD MATCHING ====================
+# Compiled once into src.utils.keyword_matcher.keyword_matcher. All keywords
+# are plain lowercase substrings (leading/trailing spaces are significant).
+
+# Keyword categorization used when the LLM is unavailable
+FALLBACK_CATEGORY_KEYWORDS: Dict[str, List[str]] = {
+    "Hostel": ["hostel", "hostel room", "mess food", "mess hall", "warden", "dorm", "hostel bathroom", "hostel water", "hostel block", "hostel corridor", "hostel gate"],
+    "Department": ["lab", "classroom", "department", "academic", "faculty", "professor", "teacher", "lecture", "course", "exam", "lab equipment"],
+    "Disciplinary Committee": ["ragging", "harassment", "bullying", "threat", "abuse", "assault", "violence", "discrimination", "disturbing class", "misbehaving", "indiscipline"],
+    "General": ["canteen", "library", "playground", "ground", "parking", "transport", "bus", "wifi", "internet", "campus", "infrastructure", "tree", "road", "drainage", "streetlight", "gate"],
+}
+
+# Target department detection (first department with a match wins)
+FALLBACK_DEPARTMENT_KEYWORDS: Dict[str, List[str]] = {
+    "CSE": ["cse", "computer science", "computer lab", "cs department"],
+    "ECE": ["ece", "electronics", "communication", "ec department"],
+    "MECH": ["mech", "mechanical", "workshop", "machine"],
+    "CIVIL": ["civil", "construction", "surveying"],
+    "EEE": ["eee", "electrical", "power", "circuits"],
+    "IT": ["it", "information technology", "it lab"],
+    "BIO": ["bio", "biomedical", "biomed"],
+    "AERO": ["aero", "aeronautical", "aerospace"],
+    "RAA": ["raa", "robotics", "automation"],
+    "EIE": ["eie", "instrumentation"],
+    "MBA": ["mba", "management"],
+    "AIDS": ["aids", "ai", "data science", "artificial intelligence"],
+    "MTECH_CSE": ["mtech", "m.tech"],
+}
+
+# Priority detection (first priority with a match wins)
+FALLBACK_URGENCY_KEYWORDS: Dict[str, List[str]] = {
+    "Critical": ["emergency", "urgent", "immediate", "critical", "dangerous", "unsafe"],
+    "High": ["broken", "not working", "damaged", "leaking", "problem"],
+    "Medium": ["issue", "concern", "needs", "improve"],
+    "Low": ["suggestion", "request", "minor"],
+}
+
+AUTHORITY_REFERENCE_KEYWORDS: List[str] = ["faculty", "teacher", "professor", "staff", "warden", "hod"]
+VISIBLE_DAMAGE_KEYWORDS: List[str] = ["broken", "damaged", "leaking", "dirty"]
+
+# Keywords that unambiguously indicate an academic/department issue.
+# If the LLM returns a hostel category but the text contains any of these,
+# the category is overridden to "Department" — this is deterministic and safe
+# because these phrases never appear in genuine hostel complaints.
+ACADEMIC_OVERRIDE_KEYWORDS: List[str] = [
+    "lab ",       " lab",        "labs ",       "laboratory",
+    "computer lab","cse lab",     "ece lab",     "it lab",
+    "eee lab",    "mech lab",    "bio lab",     "aero lab",
+    "seminar hall","lecture hall","classroom",
+    "department office", "dept office",
+    "faculty",    "professor",   " hod ",       "head of department",
+    "lab record", "observation book", "lab observation",
+    "project report", "project submission",
+    "timetable",  "exam schedule", "course",    "curriculum",
+    "software license", "software licence", "ide software",
+    "av system",  "av technician", "projector",
+    "server room","computing cluster", "lab in-charge",
+    "oscilloscope","pcb ",        "fabrication lab", "workshop",
+    "practicals", "practical exam",
+    "printer" ,   "printing",
+]
+
+# Keywords that typically require visual evidence (fallback image requirement;
+# two or more distinct matches mean an image is required)
+IMAGE_EVIDENCE_KEYWORDS: List[str] = [
+    "broken", "damaged", "leaking", "leak", "dirty", "filthy", "stain",
+    "crack", "torn", "not working", "malfunctioning", "defective",
+    "unhygienic", "unclean", "blocked", "clogged", "rusty", "peeling",
+    "exposed wire", "hanging", "falling", "detached", "missing",
+    "visible", "see", "look", "show", "picture", "photo",
+]
+
+# Hostel-related text from a hostel student that the LLM did not categorize as hostel
+HOSTEL_CONTEXT_KEYWORDS: List[str] = [
+    "hostel", "mess", "warden", "dorm", "bunk",
+    "hostel room", "my room", "our room", "the room",
+    "bathroom", "water supply", "electricity in",
+    "air conditioning", "ceiling fan", "hostel fan",
+    "toilet", "shower", "dining hall", "laundry",
+    "curfew", "common room",
+]
+
+# Cross-gender hostel pre-check. "women's hostel" contains "men's hostel", so
+# matches inside the opposite gender's own phrases are ignored.
+MENS_HOSTEL_KEYWORDS: List[str] = ["men's hostel", "mens hostel", "boys hostel", "male hostel", "men hostel"]
+WOMENS_HOSTEL_KEYWORDS: List[str] = ["women's hostel", "womens hostel", "girls hostel", "female hostel", "ladies hostel"]
+MENS_HOSTEL_PHRASES: List[str] = ["men's hostel", "mens hostel"]
+WOMENS_HOSTEL_PHRASES: List[str] = ["women's hostel", "womens hostel"]
+
 
 # ==================== FILE UPLOAD ====================
 
@@ -636,6 +745,16 @@ __all__ = [
     "DEPARTMENTS",
     "CATEGORIES",
     "SPAM_KEYWORDS",
+    "TEST_CONTENT_KEYWORDS",
+    "AUTHORITY_REFERENCE_KEYWORDS",
+    "VISIBLE_DAMAGE_KEYWORDS",
+    "ACADEMIC_OVERRIDE_KEYWORDS",
+    "IMAGE_EVIDENCE_KEYWORDS",
+    "HOSTEL_CONTEXT_KEYWORDS",
+    "MENS_HOSTEL_KEYWORDS",
+    "WOMENS_HOSTEL_KEYWORDS",
+    "MENS_HOSTEL_PHRASES",
+    "WOMENS_HOSTEL_PHRASES",
     "VALID_YEARS",
     "ALLOWED_IMAGE_MIMETYPES",
     # Dicts
@@ -656,7 +775,11 @@ __all__ = [
     "DATE_FORMATS",
     "RATE_LIMIT_KEYS",
     "SPAM_DETECTION_THRESHOLDS",
+    "FALLBACK_CATEGORY_KEYWORDS",
+    "FALLBACK_DEPARTMENT_KEYWORDS",
+    "FALLBACK_URGENCY_KEYWORDS",
     "THUMBNAIL_SIZES",
+    "LLM_MODEL_PRICING",
     # Constants
     "VOTE_IMPACT_MULTIPLIER",
     "PRIORITY_AUTO_ESCALATE_THRESHOLD",
@@ -38,15 +38,121 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str = Field(default="", description="Groq API key (optional; LLM features use fallback logic when empty)")
     LLM_MODEL: str = Field(default="llama-3.1-8b-instant", description="Primary LLM model")
     LLM_FALLBACK_MODEL: Optional[str] = Field(
-        default="mixtral-8x7b-32768",
-        description="Fallback LLM model"
+        default="llama-3.3-70b-versatile",
+        description="Fallback LLM model (hedged requests, and failover while the primary's circuit is open)"
     )
     OPENAI_API_KEY: Optional[str] = Field(default=None, description="OpenAI fallback key")
     LLM_TEMPERATURE: float = Field(default=0.3, ge=0.0, le=2.0, description="LLM temperature")
     LLM_MAX_TOKENS: int = Field(default=500, ge=50, le=4000, description="Max tokens")
     LLM_TIMEOUT: int = Field(default=30, ge=5, description="LLM timeout (seconds)")
     LLM_MAX_RETRIES: int = Field(default=3, ge=1, le=10, description="Max retry attempts")
-    
+    # ✅ NEW: Shared async HTTP client (connection pool + per-operation timeouts)
+    LLM_POOL_MAX_CONNECTIONS: int = Field(default=20, ge=1, description="Max open connections to Groq per process")
+    LLM_POOL_MAX_KEEPALIVE: int = Field(default=10, ge=0, description="Idle keep-alive connections kept per process")
+    LLM_POOL_KEEPALIVE_EXPIRY: float = Field(default=60.0, ge=1.0, description="Idle connection expiry (seconds)")
+    LLM_HTTP2: bool = Field(default=True, description="Use HTTP/2 to Groq when the h2 package is installed")
+    LLM_CONNECT_TIMEOUT: float = Field(default=5.0, ge=0.5, description="Connect timeout (seconds)")
+    LLM_SPAM_TIMEOUT: int = Field(default=10, ge=1, description="Spam detection timeout (seconds)")
+    LLM_CATEGORIZATION_TIMEOUT: int = Field(default=20, ge=1, description="Categorization timeout (seconds)")
+    LLM_REPHRASING_TIMEOUT: int = Field(default=15, ge=1, description="Rephrasing timeout (seconds)")
+    LLM_IMAGE_REQUIREMENT_TIMEOUT: int = Field(default=15, ge=1, description="Image requirement timeout (seconds)")
+    LLM_ANALYSIS_TIMEOUT: int = Field(default=30, ge=1, description="Fused analysis timeout (seconds)")
+    LLM_VISION_TIMEOUT: int = Field(default=45, ge=1, description="Image verification (vision) timeout (seconds)")
+    LLM_FUSED_ANALYSIS: bool = Field(
+        default=True,
+        description="Run spam/categorize/rephrase/image-requirement as one LLM call at submission"
+    )
+    # ✅ NEW: Micro-batching of concurrent categorize_complaint() calls into one prompt
+    LLM_BATCH_ENABLED: bool = Field(default=False, description="Pack concurrent categorizations into one LLM request")
+    LLM_BATCH_WINDOW_MS: int = Field(default=30, ge=1, le=1000, description="How long a categorization waits for others to batch with")
+    LLM_BATCH_MAX_SIZE: int = Field(default=8, ge=2, le=20, description="Complaints per batched categorization prompt")
+    # ✅ NEW: Circuit breaker per operation + model (fail fast to fallback logic while Groq is unhealthy)
+    LLM_BREAKER_ENABLED: bool = Field(default=True, description="Trip per-operation circuit breakers on Groq errors/latency")
+    LLM_BREAKER_WINDOW: int = Field(default=20, ge=2, description="Recent calls evaluated by each breaker")
+    LLM_BREAKER_MIN_CALLS: int = Field(default=5, ge=1, description="Calls needed in the window before a breaker can trip")
+    LLM_BREAKER_ERROR_RATE: float = Field(default=0.5, gt=0.0, le=1.0, description="Failed-call fraction that trips a breaker")
+    LLM_BREAKER_SLOW_CALL_RATE: float = Field(default=0.8, gt=0.0, le=1.0, description="Slow-call fraction that trips a breaker")
+    LLM_BREAKER_SLOW_CALL_RATIO: float = Field(
+        default=0.5,
+        gt=0.0,
+        le=1.0,
+        description="A call is slow when it takes this fraction of its operation timeout"
+    )
+    LLM_BREAKER_OPEN_SECONDS: float = Field(default=30.0, ge=1.0, description="Time a breaker stays open before probing")
+    # ✅ NEW: AIMD concurrency limit per model
+    LLM_CONCURRENCY_ENABLED: bool = Field(default=True, description="Adapt the number of in-flight Groq calls to latency")
+    LLM_CONCURRENCY_INITIAL: int = Field(default=8, ge=1, description="Initial in-flight Groq calls per model per process")
+    LLM_CONCURRENCY_MIN: int = Field(default=1, ge=1, description="Lowest in-flight limit")
+    LLM_CONCURRENCY_MAX: int = Field(default=20, ge=1, description="Highest in-flight limit")
+    LLM_CONCURRENCY_LATENCY_FACTOR: float = Field(
+        default=2.0,
+        gt=1.0,
+        description="Latency above this multiple of the operation's baseline shrinks the limit"
+    )
+    LLM_CONCURRENCY_BACKOFF: float = Field(default=0.7, gt=0.0, lt=1.0, description="Multiplicative decrease factor")
+    LLM_CONCURRENCY_QUEUE_TIMEOUT: float = Field(default=5.0, ge=0.0, description="Max wait for a free slot (seconds)")
+    # ✅ NEW: Request deadlines (see src/utils/deadline.py)
+    LLM_DEADLINE_RESERVE: float = Field(
+        default=2.0,
+        ge=0.0,
+        description="Seconds of a request deadline kept for work after the LLM calls (DB writes, response)"
+    )
+    LLM_MIN_CALL_BUDGET: float = Field(
+        default=1.0,
+        ge=0.1,
+        description="Below this many seconds of remaining budget, LLM calls are skipped for fallback logic"
+    )
+    # ✅ NEW: Model tiering + hedged requests
+    LLM_FAST_MODEL: Optional[str] = Field(
+        default="llama-3.1-8b-instant",
+        description="Cheapest/fastest model, used for the LLM_FAST_OPERATIONS (empty: use LLM_MODEL)"
+    )
+    LLM_FAST_OPERATIONS: List[str] = Field(
+        default=["spam_detection", "image_requirement"],
+        description="Short, simple operations routed to LLM_FAST_MODEL"
+    )
+    LLM_HEDGING_ENABLED: bool = Field(
+        default=True,
+        description="Resend slow calls to LLM_FALLBACK_MODEL and take whichever answers first"
+    )
+    LLM_HEDGE_PERCENTILE: float = Field(
+        default=0.9,
+        gt=0.5,
+        lt=1.0,
+        description="Hedge once a call runs longer than this latency percentile of its operation + model"
+    )
+    LLM_HEDGE_MIN_SAMPLES: int = Field(default=20, ge=1, description="Latency samples needed before hedging")
+    LLM_HEDGE_MIN_DELAY: float = Field(default=0.5, ge=0.0, description="Never hedge earlier than this (seconds)")
+    LLM_HEDGE_MAX_FRACTION: float = Field(
+        default=0.1,
+        ge=0.0,
+        le=1.0,
+        description="Hedge at most this fraction of calls (extra load on Groq under a latency spike)"
+    )
+    LLM_LATENCY_WINDOW: int = Field(default=200, ge=10, description="Recent latencies kept per operation + model")
+    # ✅ NEW: LLM result cache (in-process LRU + Postgres)
+    LLM_CACHE_ENABLED: bool = Field(default=True, description="Cache LLM results for identical complaint texts")
+    LLM_CACHE_TTL: int = Field(default=604800, ge=60, description="Cached LLM result lifetime (seconds)")
+    LLM_CACHE_MEMORY_MAX_ENTRIES: int = Field(default=2048, ge=0, description="In-process LRU size per process")
+    LLM_CACHE_PERSISTENT: bool = Field(default=True, description="Share cached results across processes via Postgres")
+    LLM_CACHE_DB_MAX_ROWS: int = Field(default=50000, ge=100, description="Max rows kept in llm_result_cache")
+    # ✅ NEW: Per-call LLM telemetry in llm_processing_logs (buffered, bulk-inserted)
+    LLM_TELEMETRY_ENABLED: bool = Field(default=True, description="Record every Groq call in llm_processing_logs")
+    LLM_TELEMETRY_FLUSH_INTERVAL: float = Field(default=5.0, ge=0.5, description="Seconds between telemetry flushes")
+    LLM_TELEMETRY_BATCH_SIZE: int = Field(default=200, ge=1, description="Buffered calls that trigger an early flush")
+    LLM_TELEMETRY_MAX_BUFFER: int = Field(default=10000, ge=100, description="Calls buffered while the database is unreachable")
+    LLM_TELEMETRY_RETENTION_DAYS: int = Field(default=30, ge=0, description="Telemetry rows older than this are purged on startup (0: keep)")
+    # ✅ NEW: Local hashed n-gram classifier consulted before the LLM (train with train_classifier.py)
+    LOCAL_CLASSIFIER_ENABLED: bool = Field(default=True, description="Categorize locally when the trained model is confident")
+    LOCAL_CLASSIFIER_PATH: str = Field(default="models/complaint_classifier.npz", description="Trained local classifier file")
+    LOCAL_CLASSIFIER_THRESHOLD: float = Field(
+        default=0.9,
+        ge=0.0,
+        le=1.0,
+        description="Minimum local classifier confidence to skip the LLM"
+    )
+    LOCAL_CLASSIFIER_HASH_BITS: int = Field(default=17, ge=10, le=22, description="Feature hash space is 2**bits")
+
     # ==================== CORS ====================
     CORS_ORIGINS: List[str] = Field(default=["http://localhost:3000"], description="CORS origins")
     CORS_ALLOW_CREDENTIALS: bool = Field(default=True, description="Allow credentials")
@@ -89,6 +195,8 @@ class Settings(BaseSettings):
     # ==================== FILE UPLOAD & STORAGE ====================
     UPLOAD_DIR: str = Field(default="./uploads", description="Upload directory")
     MAX_FILE_SIZE: int = Field(default=5242880, ge=1024, description="Max file size (bytes)")
+    UPLOAD_CHUNK_SIZE: int = Field(default=65536, ge=4096, description="Read size when streaming an uploaded image (bytes)")
+    UPLOAD_SPOOL_THRESHOLD: int = Field(default=1048576, ge=0, description="Uploaded images larger than this are spooled to a temp file instead of memory (bytes)")
     ALLOWED_IMAGE_EXTENSIONS: List[str] = Field(
         default=["jpg", "jpeg", "png", "gif", "webp"],
         description="Allowed extensions"
@@ -97,8 +205,10 @@ class Settings(BaseSettings):
     # ✅ NEW: Image storage configuration
     IMAGE_STORAGE_MODE: str = Field(
         default="database",
-        description="Storage mode: database, filesystem, or s3"
+        description="Blob backend for images: database (blob_contents table), filesystem (BLOB_STORAGE_DIR) or s3 (not implemented, uses database)"
     )
+    BLOB_STORAGE_DIR: str = Field(default="./uploads/blobs", description="Root directory of the filesystem blob backend")
+    BLOB_GC_GRACE_SECONDS: int = Field(default=3600, ge=0, description="Unreferenced blobs younger than this are kept by the garbage collector")
     IMAGE_ENCODING: str = Field(default="base64", description="Image encoding for DB storage")
     STORE_ORIGINAL_AND_THUMBNAIL: bool = Field(
         default=True,
@@ -109,6 +219,45 @@ class Settings(BaseSettings):
     IMAGE_QUALITY: int = Field(default=85, ge=1, le=100, description="JPEG quality")
     THUMBNAIL_WIDTH: int = Field(default=300, ge=50, description="Thumbnail width")
     THUMBNAIL_HEIGHT: int = Field(default=300, ge=50, description="Thumbnail height")
+    MEDIUM_IMAGE_WIDTH: int = Field(default=800, ge=100, description="Medium rendition width (px)")
+    MEDIUM_IMAGE_HEIGHT: int = Field(default=800, ge=100, description="Medium rendition height (px)")
+    RENDITION_QUALITY: int = Field(default=75, ge=1, le=100, description="WebP/JPEG quality of thumbnail and medium renditions")
+    RENDITION_WEBP_ENABLED: bool = Field(default=True, description="Also encode renditions as WebP (served when the client accepts it)")
+    IMAGE_CACHE_MAX_AGE: int = Field(default=31536000, ge=0, description="Cache lifetime of versioned image URLs (?v=image_version), served as immutable")
+    IMAGE_CACHE_SHARED: bool = Field(default=True, description="Let shared caches (CDN) store images of Public complaints; others are always private")
+    IMAGE_MAX_PIXELS: int = Field(default=64_000_000, ge=1_000_000, description="Images with more pixels are rejected before decoding (decompression bomb guard)")
+    IMAGE_POOL_ENABLED: bool = Field(default=True, description="Run Pillow decoding/resizing in a process pool")
+    IMAGE_POOL_WORKERS: int = Field(default=0, ge=0, description="Image pool processes (0 = derive from CPU count)")
+    IMAGE_POOL_MAX_PENDING: int = Field(default=0, ge=0, description="Max images queued or running in the pool (0 = 4 per worker)")
+    VISION_IMAGE_MAX_SIDE: int = Field(default=672, ge=112, le=4096, description="Longest side (px) of images sent to the vision model (2 x 336px Llama 4 tiles)")
+    VISION_IMAGE_QUALITY: int = Field(default=80, ge=1, le=100, description="JPEG quality of images sent to the vision model")
+    VISION_CACHE_ENABLED: bool = Field(default=True, description="Reuse verification results for perceptually identical images of the same category")
+    VISION_HASH_MAX_DISTANCE: int = Field(default=4, ge=0, le=16, description="Max dHash Hamming distance (of 64 bits) for two images to count as near-identical")
+
+    # ==================== BACKGROUND JOBS ====================
+    COMPLAINT_ASYNC_SUBMISSION: bool = Field(
+        default=False,
+        description="Queue AI processing of new complaints by default (clients can override per request)"
+    )
+    JOB_WORKERS_IN_APP: int = Field(
+        default=0, ge=0, le=32,
+        description="Complaint worker loops started inside each API process (0 = run run_worker.py separately)"
+    )
+    JOB_MAX_ATTEMPTS: int = Field(default=3, ge=1, le=10, description="Attempts per job before it is marked Failed")
+    JOB_VISIBILITY_TIMEOUT: int = Field(default=180, ge=30, description="Job lease duration (seconds)")
+    JOB_POLL_INTERVAL: float = Field(default=1.0, ge=0.1, description="Idle queue poll interval (seconds)")
+    JOB_RETRY_BACKOFF: int = Field(default=10, ge=1, description="Base retry delay, doubled per attempt (seconds)")
+    JOB_DRAIN_TIMEOUT: int = Field(default=30, ge=1, description="Max wait for in-flight jobs on shutdown (seconds)")
+    IMAGE_VERIFICATION_ASYNC: bool = Field(
+        default=True,
+        description="Submissions and uploads only mark images Pending; the image verification worker verifies them"
+    )
+    IMAGE_VERIFICATION_WORKER_IN_APP: bool = Field(default=True, description="Run an image verification worker inside each API process")
+    IMAGE_VERIFICATION_BATCH_SIZE: int = Field(default=8, ge=1, le=100, description="Pending images claimed per batch")
+    IMAGE_VERIFICATION_CONCURRENCY: int = Field(default=4, ge=1, le=32, description="Vision calls in flight per worker")
+    IMAGE_VERIFICATION_LEASE_SECONDS: int = Field(default=300, ge=30, description="Claim lease of a pending image (seconds)")
+    IMAGE_VERIFICATION_MAX_ATTEMPTS: int = Field(default=3, ge=1, le=10, description="Attempts before an image without a vision verdict is marked Error")
+    IMAGE_VERIFICATION_RETRY_BACKOFF: int = Field(default=60, ge=1, description="Base retry delay when the vision model is unavailable, doubled per attempt (seconds)")
     
     # ==================== LOGGING ====================
     LOG_LEVEL: str = Field(default="INFO", description="Logging level")
@@ -152,6 +301,19 @@ class Settings(BaseSettings):
     MIN_COMPLAINT_LENGTH: int = Field(default=10, ge=5, description="Min complaint length")
     MAX_COMPLAINT_LENGTH: int = Field(default=2000, ge=100, description="Max complaint length")
     ESCALATION_THRESHOLD_HOURS: int = Field(default=48, ge=1, description="Auto-escalation hours")
+    COMPLAINT_REQUEST_DEADLINE: float = Field(
+        default=25.0,
+        ge=0.0,
+        description="Time budget (seconds) for synchronous submit/image requests; 0 disables"
+    )
+    # ✅ NEW: Near-duplicate detection (MinHash/LSH over open complaints)
+    DUPLICATE_DETECTION_ENABLED: bool = Field(default=True, description="Link near-duplicate submissions to open complaints")
+    DUPLICATE_SIMILARITY_THRESHOLD: float = Field(default=0.7, ge=0.1, le=1.0, description="Min estimated Jaccard similarity for a duplicate")
+    DUPLICATE_MINHASH_PERMUTATIONS: int = Field(default=128, ge=16, le=512, description="MinHash signature length")
+    DUPLICATE_LSH_BANDS: int = Field(default=32, ge=1, le=512, description="LSH bands (signature split into equal rows)")
+    DUPLICATE_INDEX_REFRESH_SECONDS: float = Field(default=30.0, ge=0.0, description="Min gap between duplicate index top-ups from the DB")
+    # ✅ NEW: In-memory reference data (categories, departments, authority roster)
+    REFERENCE_DATA_REFRESH_SECONDS: float = Field(default=30.0, ge=0.0, description="Min gap between checks for reference data changed by other processes")
     
     # ==================== SPAM DETECTION ====================
     SPAM_KEYWORDS: List[str] = Field(
@@ -160,6 +322,17 @@ class Settings(BaseSettings):
     )
     MAX_COMPLAINTS_PER_HOUR: int = Field(default=5, ge=1, description="Max complaints/hour")
     SPAM_THRESHOLD_SCORE: float = Field(default=0.7, ge=0.0, le=1.0, description="Spam threshold")
+    # ✅ NEW: Sliding-window flood gate (MAX_COMPLAINTS_PER_HOUR, SPAM_THRESHOLD_SCORE; see src/services/velocity_gate.py)
+    VELOCITY_GATE_ENABLED: bool = Field(default=True, description="Reject submission floods before DB/LLM work")
+    VELOCITY_IP_LIMIT_MULTIPLIER: int = Field(default=10, ge=1, description="Per-IP hourly limit as a multiple of MAX_COMPLAINTS_PER_HOUR")
+    VELOCITY_SYNC_ENABLED: bool = Field(default=True, description="Share velocity counters across processes via the database")
+    VELOCITY_SYNC_INTERVAL: float = Field(default=2.0, ge=0.1, description="Seconds between velocity counter syncs")
+    # ✅ NEW: Trusted students skip the LLM spam check (see src/services/student_trust.py)
+    TRUST_FAST_PATH_ENABLED: bool = Field(default=True, description="Let trusted students skip LLM spam detection")
+    TRUST_SCORE_THRESHOLD: float = Field(default=0.75, ge=0.0, le=1.0, description="Min trust score for the fast path")
+    TRUST_AUDIT_SAMPLE_RATE: float = Field(default=0.05, ge=0.0, le=1.0, description="Share of trusted submissions still LLM-checked")
+    TRUST_CACHE_TTL_SECONDS: float = Field(default=600.0, ge=0.0, description="Cached trust score lifetime (seconds)")
+    TRUST_CACHE_MAX_ENTRIES: int = Field(default=10000, ge=100, description="Students kept in the trust cache")
     
     # ==================== PUBLIC FEED SETTINGS ====================
     PUBLIC_FEED_PAGE_SIZE: int = Field(default=20, ge=10, le=100, description="Feed page size")
@@ -184,7 +357,7 @@ class Settings(BaseSettings):
     # ==================== FIELD VALIDATORS ====================
     
     @field_validator('CORS_ORIGINS', 'CORS_ALLOW_METHODS', 'CORS_ALLOW_HEADERS', 
-                     'ALLOWED_IMAGE_EXTENSIONS', 'SPAM_KEYWORDS', mode='before')
+                     'ALLOWED_IMAGE_EXTENSIONS', 'SPAM_KEYWORDS', 'LLM_FAST_OPERATIONS', mode='before')
     @classmethod
     def parse_list_from_string(cls, v):
         """Parse list from JSON string or comma-separated string"""
@@ -357,6 +530,13 @@ class Settings(BaseSettings):
             "max_tokens": self.LLM_MAX_TOKENS,
             "timeout": self.LLM_TIMEOUT,
             "max_retries": self.LLM_MAX_RETRIES,
+            "fast_model": self.LLM_FAST_MODEL,
+            "fast_operations": self.LLM_FAST_OPERATIONS,
+            "hedging_enabled": self.LLM_HEDGING_ENABLED,
+            "fused_analysis": self.LLM_FUSED_ANALYSIS,
+            "batch_enabled": self.LLM_BATCH_ENABLED,
+            "cache_enabled": self.LLM_CACHE_ENABLED,
+            "local_classifier_enabled": self.LOCAL_CLASSIFIER_ENABLED,
         }
     
     @computed_field
@@ -418,6 +598,14 @@ class Settings(BaseSettings):
             "quality": self.IMAGE_QUALITY,
             "thumbnail_width": self.THUMBNAIL_WIDTH,
             "thumbnail_height": self.THUMBNAIL_HEIGHT,
+            "medium_width": self.MEDIUM_IMAGE_WIDTH,
+            "medium_height": self.MEDIUM_IMAGE_HEIGHT,
+            "rendition_quality": self.RENDITION_QUALITY,
+            "rendition_webp": self.RENDITION_WEBP_ENABLED,
+            "max_upload_size": self.MAX_FILE_SIZE,
+            "upload_spool_threshold": self.UPLOAD_SPOOL_THRESHOLD,
+            "cache_max_age": self.IMAGE_CACHE_MAX_AGE,
+            "cache_shared": self.IMAGE_CACHE_SHARED,
         }
     
     @computed_field
@@ -33,10 +33,16 @@ from .models import (
     StatusUpdate,
     AuthorityRoutingRule,
     ImageVerificationLog,
+    ImageRendition,
+    Blob,
+    BlobContent,
     SpamBlacklist,
     LLMProcessingLog,
     Notification,
     Comment,
+    ComplaintJob,
+    LLMResultCache,
+    SubmissionEvent,
     AdminAuditLog,
 )
 
@@ -80,9 +86,15 @@ __all__ = [
     "StatusUpdate",
     "AuthorityRoutingRule",
     "ImageVerificationLog",
+    "ImageRendition",
+    "Blob",
+    "BlobContent",
     "SpamBlacklist",
     "LLMProcessingLog",
     "Notification",
     "Comment",
+    "ComplaintJob",
+    "LLMResultCache",
+    "SubmissionEvent",
     "AdminAuditLog",
 ]
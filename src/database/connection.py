@@ -205,6 +205,101 @@ async def init_db(retry_attempts: int = 3, retry_delay: int = 5):
                 except Exception as me:
                     logger.debug(f"Migration note (target_gender): {me}")
 
+                # ✅ NEW: 'Processing' status for asynchronously submitted complaints
+                try:
+                    await conn.execute(text(
+                        "ALTER TABLE complaints DROP CONSTRAINT IF EXISTS check_status"
+                    ))
+                    await conn.execute(text(
+                        "ALTER TABLE complaints ADD CONSTRAINT check_status CHECK "
+                        "(status IN ('Processing', 'Raised', 'In Progress', 'Resolved', 'Closed', 'Spam'))"
+                    ))
+                    logger.info("✅ Migration: complaints.check_status allows 'Processing'")
+                except Exception as me:
+                    logger.debug(f"Migration note (check_status): {me}")
+
+                # ✅ NEW: LLM telemetry rows are written per Groq call, not per complaint
+                try:
+                    await conn.execute(text(
+                        "ALTER TABLE llm_processing_logs ALTER COLUMN complaint_id DROP NOT NULL"
+                    ))
+                    await conn.execute(text(
+                        "ALTER TABLE llm_processing_logs ADD COLUMN IF NOT EXISTS model VARCHAR(100) NULL"
+                    ))
+                    logger.info("✅ Migration: llm_processing_logs.model ensured, complaint_id nullable")
+                except Exception as me:
+                    logger.debug(f"Migration note (llm_processing_logs): {me}")
+
+                # ✅ NEW: Duplicate index picks up changed complaints by updated_at
+                try:
+                    await conn.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_complaints_updated_at ON complaints (updated_at)"
+                    ))
+                    logger.info("✅ Migration: complaints.updated_at index ensured")
+                except Exception as me:
+                    logger.debug(f"Migration note (updated_at index): {me}")
+
+                # ✅ NEW: Images reference content-addressed blobs (src/storage)
+                try:
+                    await conn.execute(text(
+                        "ALTER TABLE complaints ADD COLUMN IF NOT EXISTS image_hash VARCHAR(64) NULL "
+                        "REFERENCES blobs(sha256) ON DELETE RESTRICT"
+                    ))
+                    await conn.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_complaints_image_hash ON complaints (image_hash)"
+                    ))
+                    await conn.execute(text(
+                        "ALTER TABLE image_renditions ADD COLUMN IF NOT EXISTS blob_hash VARCHAR(64) NULL "
+                        "REFERENCES blobs(sha256) ON DELETE RESTRICT"
+                    ))
+                    await conn.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_image_renditions_blob_hash ON image_renditions (blob_hash)"
+                    ))
+                    await conn.execute(text(
+                        "ALTER TABLE image_renditions ALTER COLUMN data DROP NOT NULL"
+                    ))
+                    logger.info("✅ Migration: complaints.image_hash / image_renditions.blob_hash ensured")
+                except Exception as me:
+                    logger.debug(f"Migration note (blob references): {me}")
+
+                # ✅ NEW: has_image is a stored flag, so listings never touch the
+                # deferred byte columns; backfilled once when the column is added
+                try:
+                    exists = await conn.scalar(text(
+                        "SELECT 1 FROM information_schema.columns "
+                        "WHERE table_name = 'complaints' AND column_name = 'has_image'"
+                    ))
+                    if not exists:
+                        await conn.execute(text(
+                            "ALTER TABLE complaints ADD COLUMN has_image BOOLEAN NOT NULL DEFAULT FALSE"
+                        ))
+                        await conn.execute(text(
+                            "UPDATE complaints SET has_image = TRUE "
+                            "WHERE image_hash IS NOT NULL OR image_data IS NOT NULL"
+                        ))
+                        await conn.execute(text("DROP INDEX IF EXISTS idx_complaint_has_image"))
+                        await conn.execute(text(
+                            "CREATE INDEX idx_complaint_has_image ON complaints (image_verified) "
+                            "WHERE has_image = true"
+                        ))
+                        logger.info("✅ Migration: complaints.has_image added and backfilled")
+                except Exception as me:
+                    logger.debug(f"Migration note (has_image): {me}")
+
+                # ✅ NEW: Claim columns of the image verification worker
+                try:
+                    await conn.execute(text(
+                        "ALTER TABLE complaints ADD COLUMN IF NOT EXISTS "
+                        "image_verification_next_at TIMESTAMPTZ NULL"
+                    ))
+                    await conn.execute(text(
+                        "ALTER TABLE complaints ADD COLUMN IF NOT EXISTS "
+                        "image_verification_attempts INTEGER NOT NULL DEFAULT 0"
+                    ))
+                    logger.info("✅ Migration: complaints.image_verification_next_at / attempts ensured")
+                except Exception as me:
+                    logger.debug(f"Migration note (image verification claims): {me}")
+
             async with AsyncSessionLocal() as session:
                 from src.database.models import Department
                 
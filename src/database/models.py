@@ -15,7 +15,7 @@ from sqlalchemy import (
     LargeBinary
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import declarative_base, relationship, deferred
 from sqlalchemy.sql import func
 
 
@@ -179,20 +179,28 @@ class Complaint(Base):
     spam_flagged_by = Column(BigInteger, ForeignKey("authorities.id", ondelete="SET NULL"), nullable=True)
     spam_flagged_at = Column(DateTime(timezone=True), nullable=True)
     
-    # ✅ IMAGE STORAGE - Binary columns for database storage
-    image_data = Column(LargeBinary, nullable=True)  # Original image binary
+    # ✅ IMAGE STORAGE - Content-addressed blob (see src/storage)
+    # Byte columns are deferred with raiseload: a plain select(Complaint) never
+    # fetches them, and reading one without undefer() raises instead of
+    # silently issuing a per-row query.
+    has_image = Column(Boolean, default=False, nullable=False)  # Set on every image write
+    image_hash = Column(String(64), ForeignKey("blobs.sha256", ondelete="RESTRICT"), nullable=True, index=True)
+    image_data = deferred(Column(LargeBinary, nullable=True), raiseload=True)  # Legacy inline binary (moved to blobs by migrate_blobs.py)
     image_filename = Column(String(255), nullable=True)  # Original filename
     image_mimetype = Column(String(100), nullable=True)  # MIME type (image/jpeg, image/png)
     image_size = Column(Integer, nullable=True)  # Size in bytes
     
     # ✅ THUMBNAIL - Optimized smaller version
-    thumbnail_data = Column(LargeBinary, nullable=True)  # Thumbnail binary (200x200)
+    thumbnail_data = deferred(Column(LargeBinary, nullable=True), raiseload=True)  # Legacy thumbnail binary (200x200)
     thumbnail_size = Column(Integer, nullable=True)  # Thumbnail size in bytes
     
     # ✅ IMAGE VERIFICATION - Status tracking
     image_verified = Column(Boolean, default=False, nullable=False, index=True)
     image_verification_status = Column(String(50), nullable=True, index=True)
     # Status values: 'Pending', 'Verified', 'Rejected', 'Error'
+    # ✅ NEW: Image verification worker claims (lease / retry-not-before) and attempts
+    image_verification_next_at = Column(DateTime(timezone=True), nullable=True)
+    image_verification_attempts = Column(Integer, default=0, nullable=False)
     
     # Cross-department tracking
     complaint_department_id = Column(Integer, ForeignKey("departments.id", ondelete="SET NULL"), nullable=True, index=True)
@@ -200,7 +208,7 @@ class Complaint(Base):
     
     # Timestamps
     submitted_at = Column(DateTime(timezone=True), nullable=False, default=func.now(), index=True)
-    updated_at = Column(DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now(), index=True)
     resolved_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
@@ -212,13 +220,14 @@ class Complaint(Base):
     votes = relationship("Vote", back_populates="complaint", cascade="all, delete-orphan")
     status_updates = relationship("StatusUpdate", back_populates="complaint", cascade="all, delete-orphan")
     image_verification_logs = relationship("ImageVerificationLog", back_populates="complaint", cascade="all, delete-orphan")
+    image_renditions = relationship("ImageRendition", back_populates="complaint", cascade="all, delete-orphan", passive_deletes=True)
     llm_logs = relationship("LLMProcessingLog", back_populates="complaint", cascade="all, delete-orphan")
     notifications = relationship("Notification", back_populates="complaint", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="complaint", cascade="all, delete-orphan")
     
     __table_args__ = (
         CheckConstraint("visibility IN ('Private', 'Department', 'Public')", name="check_visibility"),
-        CheckConstraint("status IN ('Raised', 'In Progress', 'Resolved', 'Closed', 'Spam')", name="check_status"),
+        CheckConstraint("status IN ('Processing', 'Raised', 'In Progress', 'Resolved', 'Closed', 'Spam')", name="check_status"),
         CheckConstraint("priority IN ('Low', 'Medium', 'High', 'Critical')", name="check_priority"),
         CheckConstraint("upvotes >= 0", name="check_upvotes"),
         CheckConstraint("downvotes >= 0", name="check_downvotes"),
@@ -233,17 +242,12 @@ class Complaint(Base):
         Index("idx_complaint_student_status", "student_roll_no", "status"),
         Index("idx_complaint_visibility_status", "visibility", "status", "submitted_at"),
         # ✅ NEW: Image-specific indexes
-        Index("idx_complaint_has_image", "image_verified", postgresql_where=(Column("image_data").isnot(None))),
+        Index("idx_complaint_has_image", "image_verified", postgresql_where=(Column("has_image") == True)),
         Index("idx_complaint_image_pending", "image_verification_status", postgresql_where=(Column("image_verification_status") == "Pending")),
     )
     
     def __repr__(self):
         return f"<Complaint(id={str(self.id)[:8]}, status={self.status}, priority={self.priority})>"
-    
-    @property
-    def has_image(self) -> bool:
-        """Check if complaint has an image attached"""
-        return self.image_data is not None
 
 
 class AuthorityUpdate(Base):
@@ -403,6 +407,88 @@ class ImageVerificationLog(Base):
         return f"<ImageVerificationLog(relevant={self.is_relevant}, confidence={self.confidence_score})>"
 
 
+class Blob(Base):
+    """Content-addressed binary (images, renditions)
+
+    ✅ NEW: Keyed by SHA-256, so identical uploads are stored once.
+    ref_count counts complaints/renditions pointing at it; unreferenced blobs
+    are deleted by the garbage collector (python migrate_blobs.py --gc).
+    The bytes live in the backend named by backend (blob_contents table or
+    the filesystem), not in this row.
+    """
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size_bytes = Column(BigInteger, nullable=False)
+    mimetype = Column(String(100), nullable=True)
+    backend = Column(String(20), nullable=False)  # database, filesystem
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        CheckConstraint("ref_count >= 0", name="check_blob_ref_count"),
+        Index("idx_blob_unreferenced", "updated_at", postgresql_where=(Column("ref_count") == 0)),
+    )
+
+    def __repr__(self):
+        return f"<Blob(sha256={self.sha256[:12]}, size={self.size_bytes}, refs={self.ref_count})>"
+
+
+class BlobContent(Base):
+    """Bytes of a blob stored by the database backend
+
+    ✅ NEW: Separate from blobs so reference counting never touches the
+    TOASTed data.
+    """
+    __tablename__ = "blob_contents"
+
+    sha256 = Column(String(64), primary_key=True)
+    data = deferred(Column(LargeBinary, nullable=False), raiseload=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=func.now())
+
+    def __repr__(self):
+        return f"<BlobContent(sha256={self.sha256[:12]})>"
+
+
+class ImageRendition(Base):
+    """Downscaled copy of a complaint image (thumbnail / medium) in one format
+
+    ✅ NEW: Generated at upload time from the same decode as the stored image,
+    in WebP and JPEG so the image endpoint can negotiate on Accept. Kept out of
+    the complaints table so feed thumbnails never load the full image.
+    """
+    __tablename__ = "image_renditions"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    complaint_id = Column(UUID(as_uuid=True), ForeignKey("complaints.id", ondelete="CASCADE"), nullable=False)
+    variant = Column(String(20), nullable=False)  # thumbnail, medium
+    format = Column(String(10), nullable=False)  # webp, jpeg
+    blob_hash = Column(String(64), ForeignKey("blobs.sha256", ondelete="RESTRICT"), nullable=True, index=True)
+    data = deferred(Column(LargeBinary, nullable=True), raiseload=True)  # Legacy inline binary (moved to blobs by migrate_blobs.py)
+    size_bytes = Column(Integer, nullable=False)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=func.now())
+
+    # Relationships
+    complaint = relationship("Complaint", back_populates="image_renditions")
+
+    __table_args__ = (
+        UniqueConstraint("complaint_id", "variant", "format", name="uq_image_rendition"),
+        CheckConstraint("variant IN ('thumbnail', 'medium')", name="check_rendition_variant"),
+        CheckConstraint("format IN ('webp', 'jpeg')", name="check_rendition_format"),
+    )
+
+    @property
+    def mimetype(self) -> str:
+        """MIME type of the encoded data"""
+        return f"image/{self.format}"
+
+    def __repr__(self):
+        return f"<ImageRendition(complaint={str(self.complaint_id)[:8]}, {self.variant}/{self.format}, {self.width}x{self.height})>"
+
+
 class SpamBlacklist(Base):
     """Spam blacklist - tracks students flagged for spam"""
     __tablename__ = "spam_blacklist"
@@ -433,8 +519,10 @@ class LLMProcessingLog(Base):
     __tablename__ = "llm_processing_logs"
     
     id = Column(BigInteger, primary_key=True, autoincrement=True)
-    complaint_id = Column(UUID(as_uuid=True), ForeignKey("complaints.id", ondelete="CASCADE"), nullable=False, index=True)
+    # ✅ NEW: Nullable - most calls run before the complaint row exists (written by llm_telemetry)
+    complaint_id = Column(UUID(as_uuid=True), ForeignKey("complaints.id", ondelete="CASCADE"), nullable=True, index=True)
     operation_type = Column(String(100), nullable=False, index=True)
+    model = Column(String(100), nullable=True)
     prompt_used = Column(Text, nullable=True)
     llm_response = Column(Text, nullable=True)
     tokens_used = Column(Integer, nullable=True)
@@ -507,6 +595,94 @@ class Comment(Base):
         return f"<Comment(author={self.author_id}, anonymous={self.is_anonymous})>"
 
 
+class ComplaintJob(Base):
+    """Background processing job for asynchronously submitted complaints
+
+    ✅ NEW: Postgres-backed work queue claimed with FOR UPDATE SKIP LOCKED.
+    complaint_id deliberately has no FK: a rejected complaint is deleted, but
+    its job row stays behind so the student can still poll the outcome.
+    """
+    __tablename__ = "complaint_jobs"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    complaint_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    student_roll_no = Column(String(20), nullable=False, index=True)
+    job_type = Column(String(50), default="process_complaint", nullable=False)
+    status = Column(String(20), default="Queued", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    available_at = Column(DateTime(timezone=True), nullable=False, default=func.now())
+    locked_by = Column(String(100), nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('Queued', 'Running', 'Succeeded', 'Failed', 'Rejected')",
+            name="check_complaint_job_status"
+        ),
+        CheckConstraint("attempts >= 0", name="check_complaint_job_attempts"),
+        # Claim query: queued jobs that are visible, plus running jobs whose lease expired
+        Index("idx_complaint_job_claim", "status", "available_at"),
+        Index("idx_complaint_job_lease", "locked_until", postgresql_where=(Column("status") == "Running")),
+    )
+    
+    def __repr__(self):
+        return f"<ComplaintJob(id={self.id}, complaint={str(self.complaint_id)[:8]}, status={self.status})>"
+
+
+class LLMResultCache(Base):
+    """Persistent tier of the LLM result cache
+
+    ✅ NEW: Keyed by a SHA-256 of operation, prompt version, normalized
+    complaint text and the context the prompt uses. prompt_version hashes the
+    model and prompt template, so rows from an old model/prompt never match
+    and are purged on startup.
+    """
+    __tablename__ = "llm_result_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    operation = Column(String(50), nullable=False)
+    prompt_version = Column(String(16), nullable=False)
+    result = Column(JSONB, nullable=False)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=func.now())
+    last_used_at = Column(DateTime(timezone=True), nullable=False, default=func.now(), index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (
+        Index("idx_llm_cache_operation_version", "operation", "prompt_version"),
+    )
+
+    def __repr__(self):
+        return f"<LLMResultCache(operation={self.operation}, key={self.cache_key[:12]}, hits={self.hit_count})>"
+
+
+class SubmissionEvent(Base):
+    """Complaint submission seen by the velocity gate
+
+    ✅ NEW: Lets API processes share their sliding-window submission counters.
+    Each process inserts the submissions it accepted and reads those of the
+    others; rows older than the window are purged. No FK on student_roll_no
+    so inserts stay cheap.
+    """
+    __tablename__ = "submission_events"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    source = Column(String(100), nullable=False)  # host:pid of the process that saw it
+    student_roll_no = Column(String(20), nullable=False)
+    client_ip = Column(String(45), nullable=True)
+    fingerprint = Column(String(16), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<SubmissionEvent(student={self.student_roll_no}, source={self.source})>"
+
+
 class AdminAuditLog(Base):
     """Admin audit log - tracks all admin actions"""
     __tablename__ = "admin_audit_log"
@@ -540,9 +716,15 @@ __all__ = [
     "StatusUpdate",
     "AuthorityRoutingRule",
     "ImageVerificationLog",
+    "ImageRendition",
+    "Blob",
+    "BlobContent",
     "SpamBlacklist",
     "LLMProcessingLog",
     "Notification",
     "Comment",
+    "ComplaintJob",
+    "LLMResultCache",
+    "SubmissionEvent",
     "AdminAuditLog",
 ]
@@ -11,6 +11,11 @@ from .vote_repo import VoteRepository
 from .notification_repo import NotificationRepository
 from .comment_repo import CommentRepository
 from .authority_update_repo import AuthorityUpdateRepository
+from .complaint_job_repo import ComplaintJobRepository
+from .llm_cache_repo import LLMCacheRepository
+from .llm_log_repo import LLMLogRepository
+from .submission_event_repo import SubmissionEventRepository
+from .image_rendition_repo import ImageRenditionRepository
 
 
 __all__ = [
@@ -22,4 +27,9 @@ __all__ = [
     "NotificationRepository",
     "CommentRepository",
     "AuthorityUpdateRepository",
+    "ComplaintJobRepository",
+    "LLMCacheRepository",
+    "LLMLogRepository",
+    "SubmissionEventRepository",
+    "ImageRenditionRepository",
 ]
@@ -0,0 +1,303 @@
+"""
+Complaint job repository - Postgres-backed work queue.
+
+Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED so any number of
+worker processes (on any number of nodes) can poll the same table without
+handing the same job out twice. A claimed job is leased until
+``locked_until``; if the worker dies, the lease expires and the job becomes
+claimable again (visibility timeout). All timestamps use the database clock.
+"""
+
+from typing import Optional, Dict, Any
+from uuid import UUID
+from datetime import timedelta
+from sqlalchemy import select, update, func, and_, or_, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.models import ComplaintJob
+from src.repositories.base import BaseRepository
+
+
+class ComplaintJobRepository(BaseRepository[ComplaintJob]):
+    """Repository for ComplaintJob queue operations"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, ComplaintJob)
+
+    # ==================== ENQUEUE ====================
+
+    async def enqueue(
+        self,
+        complaint_id: UUID,
+        student_roll_no: str,
+        max_attempts: int = 3,
+        job_type: str = "process_complaint"
+    ) -> ComplaintJob:
+        """
+        Add a job to the queue.
+
+        Commits the session, so anything else pending on it (e.g. the
+        complaint row) is committed atomically with the job.
+
+        Args:
+            complaint_id: Complaint to process
+            student_roll_no: Owner of the complaint (for status polling)
+            max_attempts: Attempts before the job is marked Failed
+            job_type: Job type
+
+        Returns:
+            Created job
+        """
+        return await self.create(
+            complaint_id=complaint_id,
+            student_roll_no=student_roll_no,
+            job_type=job_type,
+            status="Queued",
+            attempts=0,
+            max_attempts=max_attempts
+        )
+
+    # ==================== CLAIM / LEASE ====================
+
+    async def claim_next(
+        self,
+        worker_id: str,
+        visibility_timeout: int
+    ) -> Optional[ComplaintJob]:
+        """
+        Atomically claim the next visible job.
+
+        Picks queued jobs whose available_at has passed and running jobs whose
+        lease expired (their worker died), skipping rows locked by other
+        workers.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            visibility_timeout: Lease duration in seconds
+
+        Returns:
+            Claimed job or None if the queue is empty
+        """
+        now = func.now()
+        next_job = (
+            select(ComplaintJob.id)
+            .where(
+                or_(
+                    and_(ComplaintJob.status == "Queued", ComplaintJob.available_at <= now),
+                    and_(
+                        ComplaintJob.status == "Running",
+                        ComplaintJob.locked_until < now,
+                        ComplaintJob.attempts < ComplaintJob.max_attempts
+                    )
+                )
+            )
+            .order_by(ComplaintJob.available_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+
+        query = (
+            update(ComplaintJob)
+            .where(ComplaintJob.id == next_job)
+            .values(
+                status="Running",
+                attempts=ComplaintJob.attempts + 1,
+                locked_by=worker_id,
+                locked_until=now + timedelta(seconds=visibility_timeout),
+                updated_at=now
+            )
+            .returning(ComplaintJob)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        job = result.scalars().first()
+        await self.session.commit()
+        return job
+
+    async def extend_lease(
+        self,
+        job_id: int,
+        worker_id: str,
+        visibility_timeout: int
+    ) -> bool:
+        """
+        Heartbeat: push the lease of a running job forward.
+
+        Returns:
+            False if the job is no longer leased by this worker
+        """
+        query = (
+            update(ComplaintJob)
+            .where(
+                ComplaintJob.id == job_id,
+                ComplaintJob.status == "Running",
+                ComplaintJob.locked_by == worker_id
+            )
+            .values(locked_until=func.now() + timedelta(seconds=visibility_timeout))
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        await self.session.commit()
+        return result.rowcount > 0
+
+    # ==================== COMPLETION ====================
+
+    async def mark_succeeded(
+        self,
+        job_id: int,
+        worker_id: str,
+        result: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Mark a leased job as done"""
+        return await self._finish(job_id, worker_id, status="Succeeded", result=result, last_error=None)
+
+    async def mark_rejected(self, job_id: int, worker_id: str, reason: str) -> bool:
+        """Mark a leased job as rejected (spam, missing image, validation) - never retried"""
+        return await self._finish(job_id, worker_id, status="Rejected", result=None, last_error=reason)
+
+    async def mark_failed(
+        self,
+        job: ComplaintJob,
+        worker_id: str,
+        error: str,
+        retry_delay: int
+    ) -> str:
+        """
+        Record a failed attempt; requeue with a delay unless attempts are exhausted.
+
+        Args:
+            job: Job as returned by claim_next()
+            worker_id: Identifier of the worker holding the lease
+            error: Error message
+            retry_delay: Seconds before the job becomes visible again
+
+        Returns:
+            New job status ("Queued" or "Failed")
+        """
+        if job.attempts >= job.max_attempts:
+            await self._finish(job.id, worker_id, status="Failed", result=None, last_error=error)
+            return "Failed"
+
+        query = (
+            update(ComplaintJob)
+            .where(ComplaintJob.id == job.id, ComplaintJob.locked_by == worker_id)
+            .values(
+                status="Queued",
+                locked_by=None,
+                locked_until=None,
+                last_error=error,
+                available_at=func.now() + timedelta(seconds=retry_delay),
+                updated_at=func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(query)
+        await self.session.commit()
+        return "Queued"
+
+    async def release(self, job_id: int, worker_id: str) -> bool:
+        """
+        Give a leased job back to the queue immediately (graceful shutdown).
+
+        The attempt is not counted against the job.
+        """
+        query = (
+            update(ComplaintJob)
+            .where(
+                ComplaintJob.id == job_id,
+                ComplaintJob.status == "Running",
+                ComplaintJob.locked_by == worker_id
+            )
+            .values(
+                status="Queued",
+                attempts=ComplaintJob.attempts - 1,
+                locked_by=None,
+                locked_until=None,
+                available_at=func.now(),
+                updated_at=func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        await self.session.commit()
+        return result.rowcount > 0
+
+    async def fail_expired_exhausted(self) -> int:
+        """
+        Fail running jobs whose lease expired after their last allowed attempt.
+
+        These can't be reclaimed by claim_next(), so without this they'd stay
+        'Running' forever.
+
+        Returns:
+            Number of jobs marked Failed
+        """
+        query = (
+            update(ComplaintJob)
+            .where(
+                ComplaintJob.status == "Running",
+                ComplaintJob.locked_until < func.now(),
+                ComplaintJob.attempts >= ComplaintJob.max_attempts
+            )
+            .values(
+                status="Failed",
+                last_error="Visibility timeout expired on final attempt",
+                locked_by=None,
+                locked_until=None,
+                completed_at=func.now(),
+                updated_at=func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        await self.session.commit()
+        return result.rowcount
+
+    async def _finish(
+        self,
+        job_id: int,
+        worker_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]],
+        last_error: Optional[str]
+    ) -> bool:
+        """Move a job this worker still leases into a terminal state"""
+        query = (
+            update(ComplaintJob)
+            .where(ComplaintJob.id == job_id, ComplaintJob.locked_by == worker_id)
+            .values(
+                status=status,
+                result=result,
+                last_error=last_error,
+                locked_by=None,
+                locked_until=None,
+                completed_at=func.now(),
+                updated_at=func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        update_result = await self.session.execute(query)
+        await self.session.commit()
+        return update_result.rowcount > 0
+
+    # ==================== QUERIES ====================
+
+    async def get_latest_for_complaint(self, complaint_id: UUID) -> Optional[ComplaintJob]:
+        """Get the most recent job for a complaint"""
+        query = (
+            select(ComplaintJob)
+            .where(ComplaintJob.complaint_id == complaint_id)
+            .order_by(desc(ComplaintJob.created_at))
+            .limit(1)
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def count_by_status(self) -> Dict[str, int]:
+        """Get job counts grouped by status (queue depth monitoring)"""
+        query = select(ComplaintJob.status, func.count()).group_by(ComplaintJob.status)
+        result = await self.session.execute(query)
+        return {status: count for status, count in result.all()}
+
+
+__all__ = ["ComplaintJobRepository"]
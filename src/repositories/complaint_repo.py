@@ -9,10 +9,10 @@ Complaint repository with specialized queries.
 from typing import Optional, List, Dict, Any
 from uuid import UUID
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import select, func, and_, or_, desc
+from sqlalchemy import select, func, and_, or_, desc, update, insert, bindparam, values, column
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from src.database.models import Complaint, Student, Authority, ComplaintCategory
+from src.database.models import Complaint, Student, Authority, ComplaintCategory, ImageVerificationLog
 from src.repositories.base import BaseRepository
 
 
@@ -38,6 +38,7 @@ class ComplaintRepository(BaseRepository[Complaint]):
         spam_reason: Optional[str] = None,
         complaint_department_id: Optional[int] = None,
         # ✅ NEW: Image binary parameters
+        image_hash: Optional[str] = None,
         image_data: Optional[bytes] = None,
         image_filename: Optional[str] = None,
         image_mimetype: Optional[str] = None,
@@ -62,7 +63,8 @@ class ComplaintRepository(BaseRepository[Complaint]):
             is_marked_as_spam: Whether complaint is spam
             spam_reason: Reason if marked as spam
             complaint_department_id: Department ID
-            image_data: Image binary data
+            image_hash: Blob digest of the image (src/storage)
+            image_data: Legacy inline image binary data
             image_filename: Original filename
             image_mimetype: MIME type (image/jpeg, image/png)
             image_size: Size in bytes
@@ -92,6 +94,8 @@ class ComplaintRepository(BaseRepository[Complaint]):
             submitted_at=current_time,
             updated_at=current_time,
             # ✅ NEW: Image fields
+            has_image=image_hash is not None or image_data is not None,
+            image_hash=image_hash,
             image_data=image_data,
             image_filename=image_filename,
             image_mimetype=image_mimetype,
@@ -308,27 +312,19 @@ class ComplaintRepository(BaseRepository[Complaint]):
             List of complaints
         """
         from src.database.models import Student
+        from src.services.reference_data import reference_data
 
-        # Get category IDs for hostel categories
-        mens_hostel_query = select(ComplaintCategory.id).where(ComplaintCategory.name == "Men's Hostel")
-        womens_hostel_query = select(ComplaintCategory.id).where(ComplaintCategory.name == "Women's Hostel")
-        mens_hostel_result = await self.session.execute(mens_hostel_query)
-        womens_hostel_result = await self.session.execute(womens_hostel_query)
-        mens_hostel_id = mens_hostel_result.scalar()
-        womens_hostel_id = womens_hostel_result.scalar()
-
-        # Get General and Disciplinary Committee category IDs
-        general_query = select(ComplaintCategory.id).where(ComplaintCategory.name == "General")
-        disciplinary_query = select(ComplaintCategory.id).where(ComplaintCategory.name == "Disciplinary Committee")
-        general_result = await self.session.execute(general_query)
-        disciplinary_result = await self.session.execute(disciplinary_query)
-        general_id = general_result.scalar()
-        disciplinary_id = disciplinary_result.scalar()
+        # ✅ UPDATED: Category IDs from the in-memory registry (no queries)
+        refs = await reference_data.current()
+        mens_hostel_id = refs.category_id("Men's Hostel")
+        womens_hostel_id = refs.category_id("Women's Hostel")
+        general_id = refs.category_id("General")
+        disciplinary_id = refs.category_id("Disciplinary Committee")
 
         # ✅ UPDATED: Only Public visibility (Department removed)
         conditions = [
             Complaint.visibility == "Public",
-            Complaint.status != "Closed"
+            Complaint.status.notin_(["Closed", "Processing"])
         ]
 
         # Collect hostel category IDs
@@ -470,7 +466,7 @@ class ComplaintRepository(BaseRepository[Complaint]):
         Returns:
             List of complaints with images
         """
-        conditions = [Complaint.image_data.isnot(None)]
+        conditions = [Complaint.has_image]
         
         if verified_only:
             conditions.append(Complaint.image_verified == True)
@@ -503,7 +499,7 @@ class ComplaintRepository(BaseRepository[Complaint]):
             .options(selectinload(Complaint.category))
             .where(
                 and_(
-                    Complaint.image_data.isnot(None),
+                    Complaint.has_image,
                     Complaint.image_verification_status == "Pending"
                 )
             )
@@ -513,6 +509,165 @@ class ComplaintRepository(BaseRepository[Complaint]):
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def claim_pending_images(self, limit: int, lease_seconds: int) -> List[Any]:
+        """
+        ✅ NEW: Claim a batch of Pending images for the image verification worker.
+        
+        Rows are locked with FOR UPDATE SKIP LOCKED and leased by pushing
+        image_verification_next_at into the future, so concurrent workers
+        never claim the same image and a crashed worker's claims come back
+        after the lease. Complaints still in 'Processing' are skipped (their
+        text is not final yet). Commits.
+        
+        Args:
+            limit: Maximum images to claim
+            lease_seconds: Lease duration
+        
+        Returns:
+            Rows with id, image_hash, image_mimetype, category_id, text and
+            image_verification_attempts (after the increment)
+        """
+        now = datetime.now(timezone.utc)
+        claimable = (
+            select(Complaint.id)
+            .where(
+                Complaint.image_verification_status == "Pending",
+                Complaint.has_image,
+                Complaint.status != "Processing",
+                or_(
+                    Complaint.image_verification_next_at.is_(None),
+                    Complaint.image_verification_next_at <= now
+                )
+            )
+            .order_by(Complaint.submitted_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            update(Complaint)
+            .where(Complaint.id.in_(claimable.scalar_subquery()))
+            .values(
+                image_verification_next_at=now + timedelta(seconds=lease_seconds),
+                image_verification_attempts=Complaint.image_verification_attempts + 1,
+                updated_at=Complaint.updated_at  # a claim is not a complaint update
+            )
+            .returning(
+                Complaint.id,
+                Complaint.image_hash,
+                Complaint.image_mimetype,
+                Complaint.category_id,
+                func.coalesce(Complaint.rephrased_text, Complaint.original_text).label("text"),
+                Complaint.image_verification_attempts
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        await self.session.commit()
+        return rows
+
+    async def apply_image_verifications(
+        self,
+        verdicts: List[Dict[str, Any]],
+        retries: List[Dict[str, Any]]
+    ) -> int:
+        """
+        ✅ NEW: Store a batch of image verification outcomes in one transaction.
+        
+        Verdicts set image_verified / image_verification_status in one
+        statement; an update only applies if the complaint still has the
+        verified image (image_hash unchanged) and is still Pending, so a
+        re-upload during verification is not overwritten. ImageVerificationLog
+        rows are inserted in bulk for the verdicts that were applied. Retries
+        only move image_verification_next_at.
+        
+        Args:
+            verdicts: Dicts with complaint_id, image_hash, is_relevant,
+                confidence_score, explanation, status
+            retries: Dicts with complaint_id and next_at
+        
+        Returns:
+            Number of complaints updated with a verdict
+        """
+        updated = 0
+        if verdicts:
+            # One UPDATE ... FROM (VALUES ...) RETURNING id - executemany
+            # rowcounts are not reported by asyncpg
+            table = Complaint.__table__
+            batch = values(
+                column("id", table.c.id.type),
+                column("image_hash", table.c.image_hash.type),
+                column("verified", table.c.image_verified.type),
+                column("status", table.c.image_verification_status.type),
+                name="verdicts"
+            ).data([
+                (v["complaint_id"], v["image_hash"], v["is_relevant"], v["status"])
+                for v in verdicts
+            ])
+            result = await self.session.execute(
+                update(table)
+                .where(
+                    table.c.id == batch.c.id,
+                    table.c.image_hash.is_not_distinct_from(batch.c.image_hash),
+                    table.c.image_verification_status == "Pending"
+                )
+                .values(
+                    image_verified=batch.c.verified,
+                    image_verification_status=batch.c.status,
+                    image_verification_next_at=None
+                )
+                .returning(table.c.id)
+            )
+            stored = set(result.scalars().all())
+            updated = len(stored)
+
+            # Logs only for verdicts that were applied (not stale ones)
+            logs = [
+                {
+                    "complaint_id": v["complaint_id"],
+                    "is_relevant": v["is_relevant"],
+                    "confidence_score": v["confidence_score"],
+                    "rejection_reason": v["explanation"] if not v["is_relevant"] else None,
+                }
+                for v in verdicts
+                if v["complaint_id"] in stored
+            ]
+            if logs:
+                await self.session.execute(insert(ImageVerificationLog), logs)
+        if retries:
+            table = Complaint.__table__
+            await self.session.execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(image_verification_next_at=bindparam("b_next_at"), updated_at=table.c.updated_at),
+                [{"b_id": r["complaint_id"], "b_next_at": r["next_at"]} for r in retries]
+            )
+        await self.session.commit()
+        return updated
+
+    async def release_image_claims(self, complaint_ids: List[UUID]) -> None:
+        """
+        ✅ NEW: Hand claimed images back immediately (worker shutdown).
+        
+        Args:
+            complaint_ids: Claimed complaint UUIDs
+        """
+        if not complaint_ids:
+            return
+        await self.session.execute(
+            update(Complaint)
+            .where(
+                Complaint.id.in_(complaint_ids),
+                Complaint.image_verification_status == "Pending"
+            )
+            .values(
+                image_verification_next_at=None,
+                image_verification_attempts=func.greatest(Complaint.image_verification_attempts - 1, 0),
+                updated_at=Complaint.updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+
     async def get_rejected_images(
         self,
         skip: int = 0,
@@ -532,7 +687,7 @@ class ComplaintRepository(BaseRepository[Complaint]):
             select(Complaint)
             .where(
                 and_(
-                    Complaint.image_data.isnot(None),
+                    Complaint.has_image,
                     Complaint.image_verification_status == "Rejected"
                 )
             )
@@ -552,7 +707,7 @@ class ComplaintRepository(BaseRepository[Complaint]):
         """
         # Total with images
         total_query = select(func.count(Complaint.id)).where(
-            Complaint.image_data.isnot(None)
+            Complaint.has_image
         )
         total_result = await self.session.execute(total_query)
         total_images = total_result.scalar() or 0
@@ -563,7 +718,7 @@ class ComplaintRepository(BaseRepository[Complaint]):
                 Complaint.image_verification_status,
                 func.count(Complaint.id)
             )
-            .where(Complaint.image_data.isnot(None))
+            .where(Complaint.has_image)
             .group_by(Complaint.image_verification_status)
         )
         status_result = await self.session.execute(status_query)
@@ -576,7 +731,33 @@ class ComplaintRepository(BaseRepository[Complaint]):
             "rejected": status_counts.get("Rejected", 0),
             "error": status_counts.get("Error", 0)
         }
-    
+
+    async def get_image_bytes(self, complaint: Complaint, thumbnail: bool = False) -> Optional[bytes]:
+        """
+        Load image bytes of a complaint.
+
+        The byte columns are deferred, so this is the only place complaint
+        image bytes are read: from the blob store when the image is a blob
+        reference, otherwise from the legacy inline column in a targeted query.
+
+        Args:
+            complaint: Complaint (loaded without its byte columns), or any
+                row with id and image_hash
+            thumbnail: Read the legacy thumbnail_data column instead of the image
+
+        Returns:
+            Image bytes or None
+        """
+        if not thumbnail and complaint.image_hash:
+            from src.storage.blob_store import blob_store
+            return await blob_store.read(complaint.image_hash)
+
+        column = Complaint.thumbnail_data if thumbnail else Complaint.image_data
+        result = await self.session.execute(
+            select(column).where(Complaint.id == complaint.id)
+        )
+        return result.scalar_one_or_none()
+
     # ==================== UPDATE OPERATIONS ====================
     
     async def update_image_verification(
@@ -597,7 +778,7 @@ class ComplaintRepository(BaseRepository[Complaint]):
             True if successful
         """
         complaint = await self.get(complaint_id)
-        if complaint and complaint.image_data:
+        if complaint and complaint.has_image:
             complaint.image_verified = is_verified
             complaint.image_verification_status = verification_status
             complaint.updated_at = datetime.now(timezone.utc)
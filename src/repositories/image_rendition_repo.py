@@ -0,0 +1,144 @@
+"""
+Image rendition repository - thumbnail / medium copies of complaint images.
+
+Rendition bytes are blobs (src/storage); rows reference them by hash.
+Rows created before the blob store keep their bytes in the data column
+until migrate_blobs.py moves them.
+"""
+
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from datetime import datetime
+from uuid import UUID
+from sqlalchemy import select, delete, insert, exists, case, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+from src.database.models import ImageRendition, Complaint
+from src.repositories.base import BaseRepository
+
+
+class ImageRenditionRepository(BaseRepository[ImageRendition]):
+    """Repository for ImageRendition operations"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, ImageRendition)
+
+    async def replace_for_complaint(
+        self,
+        complaint_id: UUID,
+        renditions: List[Dict[str, Any]],
+        commit: bool = True
+    ) -> int:
+        """
+        Replace all renditions of a complaint (new or re-uploaded image).
+
+        Rendition bytes go to the blob store; the blobs of the replaced
+        renditions are released.
+
+        Args:
+            complaint_id: Complaint UUID
+            renditions: Dicts with variant, format, data, width, height
+            commit: Commit the transaction (False to commit with other changes)
+
+        Returns:
+            Number of renditions stored
+        """
+        from src.storage.blob_store import blob_store
+
+        old = await self.session.execute(
+            delete(ImageRendition)
+            .where(ImageRendition.complaint_id == complaint_id)
+            .returning(ImageRendition.blob_hash)
+            .execution_options(synchronize_session=False)
+        )
+        for sha256 in old.scalars().all():
+            await blob_store.release(self.session, sha256)
+
+        rows = []
+        for r in renditions:
+            rows.append({
+                "complaint_id": complaint_id,
+                "variant": r["variant"],
+                "format": r["format"],
+                "blob_hash": await blob_store.put(self.session, r["data"], f"image/{r['format']}"),
+                "size_bytes": len(r["data"]),
+                "width": r["width"],
+                "height": r["height"],
+            })
+        if rows:
+            await self.session.execute(insert(ImageRendition), rows)
+        if commit:
+            await self.session.commit()
+        return len(rows)
+
+    async def get_best(
+        self,
+        complaint_id: UUID,
+        variant: str,
+        formats: Sequence[str]
+    ) -> Optional[ImageRendition]:
+        """
+        Rendition of a complaint in the most preferred available format.
+
+        Used by the image-serving path, so the (legacy) data column is loaded.
+
+        Args:
+            complaint_id: Complaint UUID
+            variant: thumbnail or medium
+            formats: Acceptable formats, most preferred first
+
+        Returns:
+            Rendition or None
+        """
+        if not formats:
+            return None
+        preference = case(
+            {fmt: rank for rank, fmt in enumerate(formats)},
+            value=ImageRendition.format
+        )
+        query = (
+            select(ImageRendition)
+            .options(undefer(ImageRendition.data))
+            .where(
+                ImageRendition.complaint_id == complaint_id,
+                ImageRendition.variant == variant,
+                ImageRendition.format.in_(list(formats))
+            )
+            .order_by(preference)
+            .limit(1)
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_backfill_batch(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        missing_only: bool = True
+    ) -> List[Tuple[UUID, datetime]]:
+        """
+        Next complaints with an image to (re)generate renditions for.
+
+        Keyset-paginated on (submitted_at, id), so images that fail to
+        process are not returned again.
+
+        Args:
+            limit: Maximum complaints to return
+            after: (submitted_at, id) of the last complaint of the previous batch
+            missing_only: Skip complaints that already have renditions
+
+        Returns:
+            (id, submitted_at) pairs, oldest first
+        """
+        query = select(Complaint.id, Complaint.submitted_at).where(Complaint.has_image)
+        if missing_only:
+            query = query.where(
+                ~exists().where(ImageRendition.complaint_id == Complaint.id)
+            )
+        if after is not None:
+            query = query.where(tuple_(Complaint.submitted_at, Complaint.id) > tuple_(*after))
+        query = query.order_by(Complaint.submitted_at, Complaint.id).limit(limit)
+        result = await self.session.execute(query)
+        return [(row.id, row.submitted_at) for row in result.all()]
+
+
+__all__ = ["ImageRenditionRepository"]
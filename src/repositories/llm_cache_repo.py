@@ -0,0 +1,145 @@
+"""
+LLM result cache repository - persistent tier of the LLM result cache.
+
+Rows are keyed by a content hash (see src/services/llm_cache.py). Lookups
+only return rows that have not expired; eviction removes expired rows, rows
+written under an outdated prompt/model version, and the least recently used
+rows beyond the configured size bound.
+"""
+
+from typing import Optional, Dict, Any
+from datetime import timedelta
+from sqlalchemy import select, update, delete, func, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.models import LLMResultCache
+from src.repositories.base import BaseRepository
+
+
+class LLMCacheRepository(BaseRepository[LLMResultCache]):
+    """Repository for LLMResultCache operations"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, LLMResultCache)
+
+    async def get_result(self, cache_key: str) -> Optional[Any]:
+        """
+        Get a cached result and record the hit (one round trip).
+
+        Args:
+            cache_key: Content hash
+
+        Returns:
+            Cached result or None if missing/expired
+        """
+        now = func.now()
+        query = (
+            update(LLMResultCache)
+            .where(LLMResultCache.cache_key == cache_key, LLMResultCache.expires_at > now)
+            .values(hit_count=LLMResultCache.hit_count + 1, last_used_at=now)
+            .returning(LLMResultCache.result)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        value = result.scalar_one_or_none()
+        await self.session.commit()
+        return value
+
+    async def upsert(
+        self,
+        cache_key: str,
+        operation: str,
+        prompt_version: str,
+        result: Any,
+        ttl_seconds: int
+    ) -> None:
+        """
+        Insert or refresh a cached result.
+
+        Args:
+            cache_key: Content hash
+            operation: LLM operation type
+            prompt_version: Model/prompt version hash
+            result: JSON-serializable result
+            ttl_seconds: Time to live
+        """
+        now = func.now()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        query = insert(LLMResultCache).values(
+            cache_key=cache_key,
+            operation=operation,
+            prompt_version=prompt_version,
+            result=result,
+            hit_count=0,
+            created_at=now,
+            last_used_at=now,
+            expires_at=expires_at
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[LLMResultCache.cache_key],
+            set_={
+                "result": query.excluded.result,
+                "prompt_version": query.excluded.prompt_version,
+                "last_used_at": now,
+                "expires_at": expires_at,
+            }
+        )
+        await self.session.execute(query)
+        await self.session.commit()
+
+    async def purge_stale(self, current_versions: Dict[str, str]) -> int:
+        """
+        Delete expired rows and rows from outdated prompt/model versions.
+
+        Args:
+            current_versions: Operation -> current prompt version
+
+        Returns:
+            Number of rows deleted
+        """
+        stale = LLMResultCache.expires_at <= func.now()
+        for operation, version in current_versions.items():
+            stale = stale | and_(
+                LLMResultCache.operation == operation,
+                LLMResultCache.prompt_version != version
+            )
+
+        result = await self.session.execute(
+            delete(LLMResultCache).where(stale).execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def evict_least_recently_used(self, max_rows: int) -> int:
+        """
+        Trim the table to max_rows, dropping the least recently used rows.
+
+        Returns:
+            Number of rows deleted
+        """
+        total = await self.session.scalar(select(func.count()).select_from(LLMResultCache))
+        excess = (total or 0) - max_rows
+        if excess <= 0:
+            return 0
+
+        oldest = (
+            select(LLMResultCache.cache_key)
+            .order_by(LLMResultCache.last_used_at)
+            .limit(excess)
+        )
+        result = await self.session.execute(
+            delete(LLMResultCache)
+            .where(LLMResultCache.cache_key.in_(oldest))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def count_by_operation(self) -> Dict[str, int]:
+        """Get cached row counts grouped by operation"""
+        query = select(LLMResultCache.operation, func.count()).group_by(LLMResultCache.operation)
+        result = await self.session.execute(query)
+        return {operation: count for operation, count in result.all()}
+
+
+__all__ = ["LLMCacheRepository"]
@@ -0,0 +1,125 @@
+"""
+LLM processing log repository - Groq call telemetry.
+
+Rows are written in bulk by the telemetry writer (src/services/llm_telemetry.py),
+one per Groq call, and aggregated per operation and model for the admin
+telemetry endpoint.
+"""
+
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from sqlalchemy import select, delete, func, insert, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.models import LLMProcessingLog
+from src.repositories.base import BaseRepository
+
+
+class LLMLogRepository(BaseRepository[LLMProcessingLog]):
+    """Repository for LLMProcessingLog operations"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, LLMProcessingLog)
+
+    async def bulk_insert(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert telemetry rows in one executemany round trip.
+
+        Args:
+            rows: Column values per row
+
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+        await self.session.execute(insert(LLMProcessingLog), rows)
+        await self.session.commit()
+        return len(rows)
+
+    async def aggregate(
+        self,
+        since: datetime,
+        operation: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate calls per operation and model.
+
+        Latency percentiles cover every call (failed and timed-out calls
+        included), so they show the latency callers actually waited.
+
+        Args:
+            since: Only calls processed at or after this time
+            operation: Restrict to one operation type
+
+        Returns:
+            One dict per (operation, model), busiest first
+        """
+        log = LLMProcessingLog
+        latency = log.processing_time_ms
+        calls = func.count()
+
+        query = (
+            select(
+                log.operation_type,
+                log.model,
+                calls.label("calls"),
+                func.sum(case((log.status != "Success", 1), else_=0)).label("errors"),
+                func.sum(case((log.status == "Timeout", 1), else_=0)).label("timeouts"),
+                func.avg(latency).label("avg_ms"),
+                func.percentile_cont(0.5).within_group(latency).label("p50_ms"),
+                func.percentile_cont(0.9).within_group(latency).label("p90_ms"),
+                func.percentile_cont(0.99).within_group(latency).label("p99_ms"),
+                func.max(latency).label("max_ms"),
+                func.coalesce(func.sum(log.tokens_used), 0).label("tokens"),
+                func.sum(log.cost).label("cost"),
+            )
+            .where(log.processed_at >= since)
+            .group_by(log.operation_type, log.model)
+            .order_by(calls.desc())
+        )
+        if operation:
+            query = query.where(log.operation_type == operation)
+
+        result = await self.session.execute(query)
+        rows = []
+        for row in result.all():
+            rows.append({
+                "operation": row.operation_type,
+                "model": row.model,
+                "calls": row.calls,
+                "errors": row.errors,
+                "timeouts": row.timeouts,
+                "error_rate": round(row.errors / row.calls, 4) if row.calls else 0.0,
+                "avg_ms": _round(row.avg_ms),
+                "p50_ms": _round(row.p50_ms),
+                "p90_ms": _round(row.p90_ms),
+                "p99_ms": _round(row.p99_ms),
+                "max_ms": row.max_ms,
+                "tokens": int(row.tokens),
+                "avg_tokens": round(row.tokens / row.calls, 1) if row.calls else 0.0,
+                "cost_usd": round(row.cost, 6) if row.cost is not None else None,
+            })
+        return rows
+
+    async def purge_older_than(self, cutoff: datetime) -> int:
+        """
+        Delete telemetry rows processed before cutoff.
+
+        Returns:
+            Number of rows deleted
+        """
+        result = await self.session.execute(
+            delete(LLMProcessingLog)
+            .where(LLMProcessingLog.processed_at < cutoff)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    """Round an aggregate to 0.1 ms (None stays None)"""
+    return round(float(value), 1) if value is not None else None
+
+
+__all__ = ["LLMLogRepository"]
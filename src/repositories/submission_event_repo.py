@@ -0,0 +1,77 @@
+"""
+Submission event repository - shared state of the submission velocity gate.
+
+Each API process bulk-inserts the submissions its gate accepted and reads
+the ones other processes accepted, so per-student / per-IP counters hold
+across workers (see src/services/velocity_gate.py).
+"""
+
+from typing import List, Dict, Any
+from datetime import datetime
+from sqlalchemy import select, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.models import SubmissionEvent
+from src.repositories.base import BaseRepository
+
+
+class SubmissionEventRepository(BaseRepository[SubmissionEvent]):
+    """Repository for SubmissionEvent operations"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, SubmissionEvent)
+
+    async def bulk_insert(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert events in one executemany round trip.
+
+        Args:
+            rows: Column values per event
+
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+        await self.session.execute(insert(SubmissionEvent), rows)
+        await self.session.commit()
+        return len(rows)
+
+    async def get_since(self, since: datetime, exclude_source: str) -> List[SubmissionEvent]:
+        """
+        Events recorded by other processes at or after since.
+
+        Args:
+            since: Lower bound on created_at
+            exclude_source: This process's source id
+
+        Returns:
+            Events, oldest first
+        """
+        query = (
+            select(SubmissionEvent)
+            .where(
+                SubmissionEvent.created_at >= since,
+                SubmissionEvent.source != exclude_source
+            )
+            .order_by(SubmissionEvent.created_at)
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def purge_older_than(self, cutoff: datetime) -> int:
+        """
+        Delete events created before cutoff.
+
+        Returns:
+            Number of rows deleted
+        """
+        result = await self.session.execute(
+            delete(SubmissionEvent)
+            .where(SubmissionEvent.created_at < cutoff)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+
+__all__ = ["SubmissionEventRepository"]
@@ -22,12 +22,14 @@ from .complaint import (
     ComplaintResponse,
     ComplaintDetailResponse,
     ComplaintSubmitResponse,
+    DuplicateComplaintLink,  # ✅ NEW
     ComplaintListResponse,
     ComplaintFilter,
     SpamFlag,
     ImageVerificationResult,  # ✅ NEW
     ImageUploadResponse,
     ComplaintImageResponse,  # ✅ NEW
+    ComplaintProcessingStatusResponse,  # ✅ NEW
     CommentCreate,
     CommentResponse,
     CommentListResponse,
@@ -95,12 +97,14 @@ __all__ = [
     "ComplaintResponse",
     "ComplaintDetailResponse",
     "ComplaintSubmitResponse",
+    "DuplicateComplaintLink",
     "ComplaintListResponse",
     "ComplaintFilter",
     "SpamFlag",
     "ImageVerificationResult",  # ✅ NEW
     "ImageUploadResponse",
     "ComplaintImageResponse",  # ✅ NEW
+    "ComplaintProcessingStatusResponse",  # ✅ NEW
     "CommentCreate",
     "CommentResponse",
     "CommentListResponse",
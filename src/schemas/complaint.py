@@ -127,6 +127,10 @@ class ComplaintResponse(BaseModel):
         default=False,
         description="Whether complaint has an attached image"
     )
+    image_version: Optional[str] = Field(
+        default=None,
+        description="Image content version; pass as ?v= to GET /image for an immutable, long-cached URL"
+    )
     image_verified: bool = Field(
         default=False,
         description="Whether image has been verified by AI"
@@ -243,6 +247,18 @@ class ComplaintDetailResponse(ComplaintResponse):
     }
 
 
+class DuplicateComplaintLink(BaseModel):
+    """✅ NEW: Open complaint that a submission duplicates"""
+
+    id: UUID
+    status: str
+    rephrased_text: Optional[str] = None
+    upvotes: int = 0
+    similarity: float = Field(..., ge=0.0, le=1.0, description="Estimated text similarity (0.0-1.0)")
+    url: str = Field(..., description="API path of the existing complaint")
+    vote_url: str = Field(..., description="Upvote the existing complaint here instead")
+
+
 class ComplaintSubmitResponse(BaseModel):
     """Schema for complaint submission response (✅ UPDATED: AI-driven fields)"""
 
@@ -297,6 +313,18 @@ class ComplaintSubmitResponse(BaseModel):
         description="LLM reasoning for image requirement decision"
     )
 
+    # ✅ NEW: Asynchronous submission
+    job_id: Optional[int] = Field(
+        default=None,
+        description="Processing job ID (asynchronous submission only; poll /processing-status)"
+    )
+
+    # ✅ NEW: Near-duplicate of an open complaint (categorization and routing reused)
+    duplicate_of: Optional[DuplicateComplaintLink] = Field(
+        default=None,
+        description="Existing open complaint about the same issue - consider upvoting it"
+    )
+
     model_config = {
         "json_schema_extra": {
             "example": {
@@ -548,6 +576,49 @@ class ComplaintImageResponse(BaseModel):
     }
 
 
+# ✅ NEW: Status of an asynchronously submitted complaint
+class ComplaintProcessingStatusResponse(BaseModel):
+    """Schema for polling the processing job of an asynchronously submitted complaint"""
+    
+    complaint_id: UUID
+    job_id: int
+    job_status: str = Field(..., description="Queued, Running, Succeeded, Failed or Rejected")
+    complaint_status: Optional[str] = Field(
+        None,
+        description="Current complaint status (None once a rejected complaint is discarded)"
+    )
+    attempts: int
+    max_attempts: int
+    rejection_reason: Optional[str] = None
+    last_error: Optional[str] = None
+    result: Optional[ComplaintSubmitResponse] = Field(
+        None,
+        description="Submission result once processing succeeded"
+    )
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime] = None
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "complaint_id": "123e4567-e89b-12d3-a456-426614174000",
+                "job_id": 42,
+                "job_status": "Running",
+                "complaint_status": "Processing",
+                "attempts": 1,
+                "max_attempts": 3,
+                "rejection_reason": None,
+                "last_error": None,
+                "result": None,
+                "created_at": "2024-01-15T10:30:00Z",
+                "updated_at": "2024-01-15T10:30:02Z",
+                "completed_at": None
+            }
+        }
+    }
+
+
 class CommentCreate(BaseModel):
     """Schema for creating a comment on a complaint"""
     
@@ -633,6 +704,7 @@ __all__ = [
     "ImageVerificationResult",
     "ImageUploadResponse",
     "ComplaintImageResponse",
+    "ComplaintProcessingStatusResponse",
     "CommentCreate",
     "CommentResponse",
     "CommentListResponse",
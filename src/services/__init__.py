@@ -4,6 +4,14 @@ All business logic services.
 """
 
 from .auth_service import AuthService, auth_service
+from .groq_client import GroqClientManager, groq_client_manager
+from .llm_cache import LLMResultCache, llm_cache
+from .llm_telemetry import LLMTelemetryWriter, llm_telemetry
+from .local_classifier import LocalClassifier, local_classifier
+from .duplicate_index import DuplicateIndex, duplicate_index
+from .reference_data import ReferenceDataRegistry, reference_data
+from .student_trust import StudentTrustCache, student_trust
+from .velocity_gate import SubmissionVelocityGate, velocity_gate
 from .llm_service import LLMService, llm_service
 from .complaint_service import ComplaintService
 from .authority_service import AuthorityService, authority_service
@@ -18,6 +26,30 @@ __all__ = [
     "AuthService",
     "auth_service",
     
+    # Shared Groq Client
+    "GroqClientManager",
+    "groq_client_manager",
+    
+    # LLM Result Cache
+    "LLMResultCache",
+    "llm_cache",
+    
+    # LLM Telemetry
+    "LLMTelemetryWriter",
+    "llm_telemetry",
+    
+    # Local Classifier
+    "LocalClassifier",
+    "local_classifier",
+    
+    # Duplicate Index
+    "DuplicateIndex",
+    "duplicate_index",
+    
+    # Reference Data
+    "ReferenceDataRegistry",
+    "reference_data",
+    
     # LLM Service
     "LLMService",
     "llm_service",
@@ -40,6 +72,10 @@ __all__ = [
     # Spam Detection Service
     "SpamDetectionService",
     "spam_detection_service",
+    "StudentTrustCache",
+    "student_trust",
+    "SubmissionVelocityGate",
+    "velocity_gate",
     
     # Image Verification Service
     "ImageVerificationService",
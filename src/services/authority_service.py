@@ -3,14 +3,15 @@ Authority service for routing and escalation logic.
 """
 
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime, timezone, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import Authority, Complaint
 from src.repositories.authority_repo import AuthorityRepository
 from src.repositories.complaint_repo import ComplaintRepository
-from src.config.constants import ESCALATION_RULES, ESCALATION_THRESHOLD_DAYS
+from src.services.reference_data import reference_data, AuthorityRef
+from src.config.constants import ESCALATION_RULES, ESCALATION_THRESHOLD_DAYS, DEFAULT_CATEGORY_ROUTING
 
 logger = logging.getLogger(__name__)
 
@@ -41,40 +42,27 @@ class AuthorityService:
         Returns:
             Authority or None
         """
-        authority_repo = AuthorityRepository(db)
+        # ✅ UPDATED: Category and roster lookups use the in-memory registry;
+        # only the chosen authority is loaded from the database
+        refs = await reference_data.current()
 
         # Get category name
-        from src.database.models import ComplaintCategory
-        category = await db.get(ComplaintCategory, category_id)
-        if not category:
+        category_name = refs.category_name(category_id)
+        if not category_name:
             logger.error(f"Category {category_id} not found for routing")
             return None
 
-        category_name = category.name
         logger.info(f"Routing complaint: Category={category_name}, Department={department_id}, Against Authority={is_against_authority}")
 
-        # Route based on category
-        authority = None
-
-        if category_name == "Men's Hostel":
-            authority = await authority_repo.get_default_for_category("Men's Hostel", None)
-            logger.debug(f"Men's Hostel category: Routed to {authority.name if authority else 'None'}")
-
-        elif category_name == "Women's Hostel":
-            authority = await authority_repo.get_default_for_category("Women's Hostel", None)
-            logger.debug(f"Women's Hostel category: Routed to {authority.name if authority else 'None'}")
-
-        elif category_name == "Department":
-            authority = await authority_repo.get_default_for_category("Department", department_id)
-            logger.debug(f"Department category: Routed to {authority.name if authority else 'None'}")
-
-        elif category_name == "Disciplinary Committee":
-            authority = await authority_repo.get_default_for_category("Disciplinary Committee", None)
-            logger.debug(f"Disciplinary category: Routed to {authority.name if authority else 'None'}")
-
-        else:  # General or other categories
-            authority = await authority_repo.get_default_for_category("General", None)
-            logger.debug(f"General/Other category: Routed to {authority.name if authority else 'None'}")
+        # Route based on category (General or other categories -> General)
+        routing_category = category_name if category_name in DEFAULT_CATEGORY_ROUTING else "General"
+        authority_type = DEFAULT_CATEGORY_ROUTING[routing_category]
+        ref = refs.first_of_type(
+            authority_type,
+            department_id if authority_type == "HOD" else None  # Department complaints go to their HOD
+        )
+        authority = await self._load(db, ref)
+        logger.debug(f"{routing_category} category: Routed to {authority.name if authority else 'None'}")
 
         # If no authority found, try fallback routing
         if not authority:
@@ -89,9 +77,8 @@ class AuthorityService:
             # Check if complaint is about a warden - bypass all wardens of same level
             if complaint_about_authority_type and "Warden" in complaint_about_authority_type:
                 # Bypass all same-level wardens, go directly to deputy warden
-                escalated_authority = await authority_repo.get_higher_authority_excluding_same_level(
-                    authority.authority_level,
-                    authority.authority_type
+                escalated_authority = await self._load(
+                    db, refs.higher_authority(authority.authority_level)
                 )
                 if escalated_authority:
                     logger.info(f"Bypassing same-level wardens, escalated to {escalated_authority.name}")
@@ -131,7 +118,7 @@ class AuthorityService:
         Returns:
             Fallback authority or None
         """
-        authority_repo = AuthorityRepository(db)
+        refs = await reference_data.current()
 
         # Try to get any active authority of appropriate type
         fallback_types = {
@@ -145,10 +132,10 @@ class AuthorityService:
         types_to_try = fallback_types.get(category_name, ["Admin"])
 
         for authority_type in types_to_try:
-            authorities = await authority_repo.get_by_type(authority_type)
-            if authorities:
+            ref = refs.first_of_type(authority_type)
+            if ref:
                 logger.info(f"Fallback routing: Found {authority_type}")
-                return authorities[0]
+                return await self._load(db, ref)
 
         logger.error("Fallback routing failed - no authorities available")
         return None
@@ -174,7 +161,7 @@ class AuthorityService:
         Returns:
             Higher authority or None
         """
-        authority_repo = AuthorityRepository(db)
+        refs = await reference_data.current()
 
         # Get current authority type from level
         from src.config.constants import LEVEL_TO_AUTHORITY
@@ -183,23 +170,15 @@ class AuthorityService:
         if current_type:
             next_type = ESCALATION_RULES.get(current_type)
             if next_type and next_type != current_type:
-                authorities = await authority_repo.get_by_type(next_type)
-                if authorities:
-                    # Prefer same department if applicable
-                    if department_id:
-                        dept_authorities = [
-                            a for a in authorities if a.department_id == department_id
-                        ]
-                        if dept_authorities:
-                            return dept_authorities[0]
-                    return authorities[0]
+                # Prefer same department if applicable
+                ref = (
+                    department_id and refs.first_of_type(next_type, department_id)
+                ) or refs.first_of_type(next_type)
+                if ref:
+                    return await self._load(db, ref)
 
         # Fallback: find any authority with a higher level
-        higher_authority = await authority_repo.get_higher_authority(
-            current_level=current_level,
-            department_id=department_id
-        )
-        return higher_authority
+        return await self._load(db, refs.higher_authority(current_level, department_id))
 
     async def get_escalated_authority(
         self,
@@ -216,9 +195,12 @@ class AuthorityService:
         Returns:
             Higher authority or None
         """
-        authority_repo = AuthorityRepository(db)
-        
-        current_authority = await authority_repo.get(current_authority_id)
+        refs = await reference_data.current()
+
+        current_authority = refs.authority(current_authority_id)
+        if not current_authority:
+            # Not in the snapshot yet (e.g. created by another process)
+            current_authority = await AuthorityRepository(db).get(current_authority_id)
         if not current_authority:
             logger.error(f"Current authority {current_authority_id} not found for escalation")
             return None
@@ -234,27 +216,26 @@ class AuthorityService:
             return await self._escalate_by_level(db, current_authority)
         
         # Get authorities of next type
-        authorities = await authority_repo.get_by_type(next_type)
-        
-        if not authorities:
+        if not refs.authorities_of_type(next_type):
             logger.warning(f"No authorities found of type {next_type}")
             return None
         
         # If current authority has department, try to match department first
         if current_authority.department_id:
-            dept_authorities = [a for a in authorities if a.department_id == current_authority.department_id]
-            if dept_authorities:
-                logger.info(f"Escalated to same department: {dept_authorities[0].name}")
-                return dept_authorities[0]
+            ref = refs.first_of_type(next_type, current_authority.department_id)
+            if ref:
+                logger.info(f"Escalated to same department: {ref.name}")
+                return await self._load(db, ref)
         
         # Otherwise, return first available authority of next type
-        logger.info(f"Escalated to: {authorities[0].name}")
-        return authorities[0]
+        ref = refs.first_of_type(next_type)
+        logger.info(f"Escalated to: {ref.name}")
+        return await self._load(db, ref)
     
     async def _escalate_by_level(
         self,
         db: AsyncSession,
-        current_authority: Authority
+        current_authority: Union[Authority, AuthorityRef]
     ) -> Optional[Authority]:
         """
         Escalate by authority level when no type-based rule exists.
@@ -266,13 +247,13 @@ class AuthorityService:
         Returns:
             Higher level authority or None
         """
-        authority_repo = AuthorityRepository(db)
+        refs = await reference_data.current()
         
         # Get authority with higher level
-        higher_authority = await authority_repo.get_higher_authority(
+        higher_authority = await self._load(db, refs.higher_authority(
             current_level=current_authority.authority_level,
             department_id=current_authority.department_id
-        )
+        ))
         
         if higher_authority:
             logger.info(f"Level-based escalation: {current_authority.name} (L{current_authority.authority_level}) → {higher_authority.name} (L{higher_authority.authority_level})")
@@ -281,6 +262,13 @@ class AuthorityService:
         
         return higher_authority
     
+    @staticmethod
+    async def _load(db: AsyncSession, ref: Optional[AuthorityRef]) -> Optional[Authority]:
+        """Load the authority chosen from the registry snapshot"""
+        if ref is None:
+            return None
+        return await db.get(Authority, ref.id)
+    
     async def check_and_escalate_pending_complaints(
         self,
         db: AsyncSession,
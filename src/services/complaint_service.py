@@ -4,30 +4,59 @@ Complaint service with main business logic.
 ✅ UPDATED: Binary image storage support
 ✅ UPDATED: Image verification integration
 ✅ UPDATED: No image_url field usage
+✅ NEW: Near-duplicate submissions reuse an open complaint's categorization and routing
+✅ NEW: Trusted students skip the LLM spam check (local checks + audit sampling)
+✅ NEW: Submission floods are rejected by the in-memory velocity gate first
 """
 
+import asyncio
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from uuid import UUID
 from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from fastapi import UploadFile
 
-from src.database.models import Complaint, Student, ComplaintCategory, StatusUpdate
+from src.database.models import Complaint, Student, StatusUpdate
 from src.repositories.complaint_repo import ComplaintRepository
 from src.repositories.student_repo import StudentRepository
+from src.repositories.image_rendition_repo import ImageRenditionRepository
 from src.services.llm_service import llm_service
 from src.services.authority_service import authority_service
 from src.services.notification_service import notification_service
 from src.services.spam_detection import spam_detection_service
 from src.services.image_verification import image_verification_service
+from src.services.duplicate_index import duplicate_index, OPEN_STATUSES
+from src.services.student_trust import student_trust
+from src.services.velocity_gate import velocity_gate
+from src.services.reference_data import reference_data
+from src.storage.blob_store import blob_store, blob_version
 from src.utils.file_upload import file_upload_handler
 from src.utils.exceptions import InvalidFileTypeError, FileTooLargeError, FileUploadError
+from src.utils.keyword_matcher import match_keywords
 from src.config.constants import PRIORITY_SCORES
+from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Exceptions that reject a submission itself (spam, validation, refused upload)
+_SUBMISSION_REJECTIONS = (ValueError, FileUploadError)
+
+
+def _cancel_pending(tasks: List[asyncio.Task]) -> None:
+    """Cancel any tasks that have not finished yet.
+
+    Finished tasks have their exception retrieved so an abandoned speculative
+    call doesn't log "Task exception was never retrieved".
+    """
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
+
 
 class ComplaintService:
     """Service for complaint operations"""
@@ -42,7 +71,8 @@ class ComplaintService:
         student_roll_no: str,
         original_text: str,
         visibility: str = "Public",
-        image_file: Optional[UploadFile] = None  # ✅ Accept UploadFile
+        image_file: Optional[UploadFile] = None,  # ✅ Accept UploadFile
+        client_ip: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Create a new complaint with FULL AI-DRIVEN processing (no category_id required).
@@ -51,19 +81,366 @@ class ComplaintService:
         ✅ UPDATED: target_department_id is determined by LLM analysis
         ✅ UPDATED: Implements spam rejection (doesn't create complaint if spam)
         ✅ UPDATED: Enforces image requirement via LLM
+        ✅ NEW: Runs under the caller's request deadline (src/utils/deadline.py) -
+        the speculative LLM tasks and image verification inherit it, so each
+        stage only gets the time that is left and falls back when it runs out
+        ✅ NEW: A near-duplicate of an open complaint skips categorization and
+        reuses that complaint's category, department, priority and authority;
+        the result links to it (duplicate_of) so the student can upvote it
 
         Args:
             student_roll_no: Student roll number
             original_text: Original complaint text
             visibility: Visibility level (Public or Private)
             image_file: Optional uploaded image file
+            client_ip: Client address for the per-IP velocity limit
 
         Returns:
             Dictionary with complaint details, AI analysis results, and image verification
 
         Raises:
             ValueError: If spam detected or required image missing
+            RateLimitExceededError: If the student or IP is flooding submissions
+        """
+        # Created and rejected (spam, validation, bad upload) submissions count
+        # against the limit; a server-side failure is refunded
+        with velocity_gate.admit(student_roll_no, client_ip, original_text, rejections=_SUBMISSION_REJECTIONS):
+            return await self._create_complaint(student_roll_no, original_text, visibility, image_file)
+
+    async def _create_complaint(
+        self,
+        student_roll_no: str,
+        original_text: str,
+        visibility: str,
+        image_file: Optional[UploadFile]
+    ) -> Dict[str, Any]:
+        """Synchronous submission pipeline behind create_complaint()"""
+        student = await self._get_submitting_student(student_roll_no)
+        self._precheck_hostel_text(student, original_text)
+        context = self._build_llm_context(student)
+
+        # ✅ NEW: Read and validate the image first - an oversized or non-image
+        # upload is rejected before any LLM work
+        image_bytes, image_mimetype, image_size, image_filename, renditions = await self._read_uploaded_image(image_file)
+
+        # ✅ NEW: Same issue already open? Reuse its analysis instead of the LLM
+        duplicate, analysis = await self._analyze_as_duplicate(student, original_text)
+
+        # LLM Processing
+        if analysis is None:
+            logger.info(f"Processing complaint for {student_roll_no}")
+            analysis = await self._analyze_complaint_text(
+                student, original_text, context, has_image=image_bytes is not None
+            )
+        categorization = analysis["categorization"]
+        rephrased_text = analysis["rephrased_text"]
+
+        category_id, target_department_id, target_department_code = (
+            await self._resolve_category_and_department(categorization, context, student)
+        )
+
+        # Calculate initial priority score
+        priority = categorization.get("priority", "Medium")
+        priority_score = PRIORITY_SCORES.get(priority, 50.0)
+
+        # ✅ UPDATED: Spam is rejected before reaching this point, so status is always "Raised"
+        initial_status = "Raised"
+
+        # ✅ FIXED: Use timezone-aware datetime
+        current_time = datetime.now(timezone.utc)
+        
+        # ✅ NEW: Store the image read above
+        image_hash = await blob_store.put(self.db, image_bytes, image_mimetype) if image_bytes else None
+        
+        # ✅ UPDATED: Create complaint with AI-determined category and target department
+        complaint = await self.complaint_repo.create(
+            student_roll_no=student_roll_no,
+            category_id=category_id,
+            original_text=original_text,
+            rephrased_text=rephrased_text,
+            visibility=visibility,
+            priority=priority,
+            priority_score=priority_score,
+            status=initial_status,
+            is_marked_as_spam=False,  # Spam complaints are rejected, never created
+            spam_reason=None,
+            complaint_department_id=target_department_id,  # ✅ CHANGED: Use AI-detected department
+            # ✅ NEW: Image blob reference
+            image_hash=image_hash,
+            image_mimetype=image_mimetype,
+            image_size=image_size,
+            image_filename=image_filename,
+            image_verified=False,
+            image_verification_status="Pending" if image_bytes else None
+        )
+        if renditions:
+            await ImageRenditionRepository(self.db).replace_for_complaint(complaint.id, renditions)
+        
+        # ✅ NEW: Verify image if provided
+        image_verification = await self._verify_new_complaint_image(
+            complaint, rephrased_text, image_bytes, image_mimetype
+        )
+        
+        # ✅ UPDATED: Route to appropriate authority using target department
+        authority = await self._route_new_complaint(
+            complaint, category_id, target_department_id, categorization, rephrased_text, current_time,
+            reuse_authority=duplicate.assigned_authority if duplicate else None
+        )
+        self._index_open_complaint(complaint, categorization)
+
+        logger.info(
+            f"Complaint {complaint.id} created successfully - "
+            f"Status: {initial_status}, Priority: {priority}, "
+            f"Category: {categorization.get('category')}, "
+            f"Target Dept: {target_department_code}, "
+            f"Has Image: {image_bytes is not None}, "
+            f"Image Required: {analysis['image_requirement'].get('image_required', False)}, "
+            f"LLM Failed: {analysis['llm_failed']}, "
+            f"Duplicate Of: {duplicate.id if duplicate else None}"
+        )
+
+        return self._build_submission_result(
+            complaint=complaint,
+            student=student,
+            analysis=analysis,
+            priority=priority,
+            priority_score=priority_score,
+            target_department_id=target_department_id,
+            target_department_code=target_department_code,
+            authority=authority,
+            image_verification=image_verification,
+            created_at=current_time
+        )
+
+    # ==================== ASYNCHRONOUS SUBMISSION ====================
+
+    async def submit_complaint_async(
+        self,
+        student_roll_no: str,
+        original_text: str,
+        visibility: str = "Public",
+        image_file: Optional[UploadFile] = None,
+        client_ip: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
+        ✅ NEW: Persist a complaint in 'Processing' state and queue its AI processing.
+
+        Only the cheap, deterministic checks (student status, blacklist,
+        cross-gender hostel keywords) run inline. Spam detection,
+        categorization, rephrasing, routing and image verification run in a
+        complaint worker (see src/workers); the client polls
+        GET /complaints/{id}/processing-status for the outcome.
+
+        Args:
+            student_roll_no: Student roll number
+            original_text: Original complaint text
+            visibility: Visibility level (Public or Private)
+            image_file: Optional uploaded image file
+            client_ip: Client address for the per-IP velocity limit
+
+        Returns:
+            Dictionary with complaint id, 'Processing' status and job id
+
+        Raises:
+            ValueError: If the student can't submit or the text fails pre-checks
+            RateLimitExceededError: If the student or IP is flooding submissions
+        """
+        # Queued and rejected submissions count against the limit (spam found
+        # by the worker later stays counted); a server-side failure is refunded
+        with velocity_gate.admit(student_roll_no, client_ip, original_text, rejections=_SUBMISSION_REJECTIONS):
+            return await self._submit_complaint_async(student_roll_no, original_text, visibility, image_file)
+
+    async def _submit_complaint_async(
+        self,
+        student_roll_no: str,
+        original_text: str,
+        visibility: str,
+        image_file: Optional[UploadFile]
+    ) -> Dict[str, Any]:
+        """Persist and queue a complaint - body of submit_complaint_async()"""
+        from src.repositories.complaint_job_repo import ComplaintJobRepository
+
+        student = await self._get_submitting_student(student_roll_no)
+        self._precheck_hostel_text(student, original_text)
+
+        # The upload must be read now - the UploadFile is gone once we return
+        image_bytes, image_mimetype, image_size, image_filename, renditions = await self._read_uploaded_image(image_file)
+
+        image_hash = await blob_store.put(self.db, image_bytes, image_mimetype) if image_bytes else None
+
+        # Placeholder category/department until the worker categorizes it
+        category_id = await self._get_category_id("General")
+        current_time = datetime.now(timezone.utc)
+
+        complaint = Complaint(
+            student_roll_no=student_roll_no,
+            category_id=category_id,
+            original_text=original_text,
+            rephrased_text=None,
+            visibility=visibility,
+            priority="Medium",
+            priority_score=PRIORITY_SCORES.get("Medium", 50.0),
+            status="Processing",
+            is_marked_as_spam=False,
+            complaint_department_id=student.department_id,
+            has_image=image_hash is not None,
+            image_hash=image_hash,
+            image_mimetype=image_mimetype,
+            image_size=image_size,
+            image_filename=image_filename,
+            image_verified=False,
+            image_verification_status="Pending" if image_bytes else None,
+            submitted_at=current_time
+        )
+        self.db.add(complaint)
+        await self.db.flush()
+        if renditions:
+            await ImageRenditionRepository(self.db).replace_for_complaint(complaint.id, renditions, commit=False)
+
+        # Commits the complaint, its renditions and its job together
+        job = await ComplaintJobRepository(self.db).enqueue(
+            complaint_id=complaint.id,
+            student_roll_no=student_roll_no,
+            max_attempts=settings.JOB_MAX_ATTEMPTS
+        )
+
+        logger.info(f"Complaint {complaint.id} queued for processing (job {job.id})")
+
+        return {
+            "id": str(complaint.id),
+            "status": "Processing",
+            "message": "Complaint received and is being processed",
+            "original_text": original_text,
+            "priority": "Medium",
+            "created_at": current_time.isoformat(),
+            "job_id": job.id,
+            "has_image": image_bytes is not None,
+            "image_filename": image_filename,
+            "image_size": image_size,
+            "image_verification_status": "Pending" if image_bytes else None,
+        }
+
+    async def process_queued_complaint(self, complaint_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        ✅ NEW: Run the AI pipeline for a complaint submitted asynchronously.
+
+        Called by the complaint worker. Safe to re-run: a complaint that has
+        already left 'Processing' is not processed again.
+
+        Args:
+            complaint_id: Complaint UUID
+
+        Returns:
+            Same result dictionary as create_complaint(), or None if the
+            complaint was already processed
+
+        Raises:
+            ValueError: If the complaint is rejected (spam, missing image, validation)
+        """
+        complaint = await self.complaint_repo.get(complaint_id)
+        if not complaint:
+            raise ValueError("Complaint not found")
+
+        if complaint.status != "Processing":
+            logger.info(f"Complaint {complaint_id} already processed (status: {complaint.status})")
+            return None
+
+        student = await self._get_submitting_student(complaint.student_roll_no)
+        context = self._build_llm_context(student)
+
+        duplicate, analysis = await self._analyze_as_duplicate(
+            student, complaint.original_text, exclude=complaint.id
+        )
+        if analysis is None:
+            analysis = await self._analyze_complaint_text(
+                student, complaint.original_text, context, has_image=complaint.has_image
+            )
+        categorization = analysis["categorization"]
+        rephrased_text = analysis["rephrased_text"]
+
+        category_id, target_department_id, target_department_code = (
+            await self._resolve_category_and_department(categorization, context, student)
+        )
+        priority = categorization.get("priority", "Medium")
+        priority_score = PRIORITY_SCORES.get(priority, 50.0)
+        current_time = datetime.now(timezone.utc)
+
+        complaint.category_id = category_id
+        complaint.rephrased_text = rephrased_text
+        complaint.priority = priority
+        complaint.priority_score = priority_score
+        complaint.complaint_department_id = target_department_id
+        await self.db.commit()
+
+        image_verification = await self._verify_new_complaint_image(
+            complaint, rephrased_text, None, complaint.image_mimetype
+        )
+        authority = await self._route_new_complaint(
+            complaint, category_id, target_department_id, categorization, rephrased_text, current_time,
+            reuse_authority=duplicate.assigned_authority if duplicate else None
+        )
+
+        # Flip the status last so a crash mid-way leaves the job retryable
+        complaint.status = "Raised"
+        await self.db.commit()
+        self._index_open_complaint(complaint, categorization)
+
+        logger.info(
+            f"Queued complaint {complaint.id} processed - "
+            f"Priority: {priority}, Category: {categorization.get('category')}, "
+            f"Target Dept: {target_department_code}, LLM Failed: {analysis['llm_failed']}"
+        )
+
+        return self._build_submission_result(
+            complaint=complaint,
+            student=student,
+            analysis=analysis,
+            priority=priority,
+            priority_score=priority_score,
+            target_department_id=target_department_id,
+            target_department_code=target_department_code,
+            authority=authority,
+            image_verification=image_verification,
+            created_at=complaint.submitted_at
+        )
+
+    async def reject_queued_complaint(self, complaint_id: UUID, reason: str) -> None:
+        """
+        ✅ NEW: Discard an asynchronously submitted complaint that failed AI checks.
+
+        Mirrors the synchronous path, where rejected complaints are never
+        created. The student is notified because nobody is waiting on the
+        HTTP response any more.
+
+        Args:
+            complaint_id: Complaint UUID
+            reason: Rejection reason shown to the student
+        """
+        complaint = await self.complaint_repo.get(complaint_id)
+        if not complaint or complaint.status != "Processing":
+            return
+
+        student_roll_no = complaint.student_roll_no
+        # Drop the references of its image and renditions in the same transaction
+        await ImageRenditionRepository(self.db).replace_for_complaint(complaint.id, [], commit=False)
+        await blob_store.release(self.db, complaint.image_hash)
+        await self.db.delete(complaint)
+        await self.db.commit()
+
+        await notification_service.create_notification(
+            self.db,
+            recipient_type="Student",
+            recipient_id=student_roll_no,
+            complaint_id=None,
+            notification_type="complaint_rejected",
+            message=f"Your complaint was not accepted: {reason}"
+        )
+        logger.info(f"Queued complaint {complaint_id} rejected: {reason}")
+
+    # ==================== SUBMISSION PIPELINE STAGES ====================
+
+    async def _get_submitting_student(self, student_roll_no: str) -> Student:
+        """Load the submitting student, enforcing active status and the spam blacklist"""
         # Get student with department
         student = await self.student_repo.get_with_department(student_roll_no)
         if not student:
@@ -86,54 +463,81 @@ class ComplaintService:
             logger.warning(f"Blacklisted user {student_roll_no} attempted to create complaint")
             raise ValueError(error_msg)
 
-        # ✅ REMOVED: Category validation - now done by LLM
-        # Category and department are determined via AI analysis below
+        return student
+
+    def _precheck_hostel_text(self, student: Student, original_text: str) -> None:
+        """
+        ✅ FIX: Pre-check for cross-gender hostel complaints BEFORE LLM call.
 
-        # ✅ FIX: Pre-check for cross-gender hostel complaints BEFORE LLM call.
-        # The LLM re-categorizes based on student gender, so a Female student's
-        # complaint about "men's hostel" would silently become a Women's Hostel
-        # complaint. We must reject these explicitly.
-        original_lower = original_text.lower()
+        The LLM re-categorizes based on student gender, so a Female student's
+        complaint about "men's hostel" would silently become a Women's Hostel
+        complaint. We must reject these explicitly.
+        """
         if student.stay_type == "Day Scholar":
-            # Day scholars cannot report hostel complaints at all
-            mens_kw = ["men's hostel", "mens hostel", "boys hostel", "male hostel",
-                       "women's hostel", "womens hostel", "girls hostel", "female hostel"]
-            if any(kw in original_lower for kw in mens_kw):
-                # Hostel-related text for a day scholar - let LLM categorize; validation will reject
-                pass  # handled by post-LLM validation
-        elif student.gender == "Female":
+            # Day scholars cannot report hostel complaints at all - hostel-related
+            # text is left to the LLM; post-LLM validation rejects it
+            return
+
+        matches = match_keywords(original_text)
+        if student.gender == "Female":
             # Female hostel student should not report about men's hostel.
-            # Strip out "women's hostel" mentions first to avoid false substring matches
-            # ("women's hostel" contains "men's hostel" as a substring).
-            check_text = original_lower.replace("women's hostel", "__womens__").replace("womens hostel", "__womens__")
-            mens_hostel_kw = ["men's hostel", "mens hostel", "boys hostel", "male hostel", "men hostel"]
-            if any(kw in check_text for kw in mens_hostel_kw):
+            # Ignore matches inside "women's hostel" mentions to avoid false substring
+            # matches ("women's hostel" contains "men's hostel" as a substring).
+            if matches.has_outside("mens_hostel", "womens_hostel_phrase"):
                 raise ValueError(
                     "Female students cannot submit complaints about men's hostel facilities"
                 )
         elif student.gender == "Male":
             # Male hostel student should not report about women's hostel.
-            # Strip out "men's hostel" mentions first to avoid false matches.
-            check_text = original_lower.replace("men's hostel", "__mens__").replace("mens hostel", "__mens__")
-            womens_hostel_kw = ["women's hostel", "womens hostel", "girls hostel", "female hostel", "ladies hostel"]
-            if any(kw in check_text for kw in womens_hostel_kw):
+            # Ignore matches overlapping "men's hostel" mentions to avoid false matches.
+            if matches.has_outside("womens_hostel", "mens_hostel_phrase"):
                 raise ValueError(
                     "Male students cannot submit complaints about women's hostel facilities"
                 )
 
-        # Build context for LLM
-        context = {
+    def _mentions_hostel(self, text: str) -> bool:
+        """Whether complaint text refers to hostel facilities (HOSTEL_CONTEXT_KEYWORDS)"""
+        return match_keywords(text).has("hostel_context")
+
+    def _build_llm_context(self, student: Student) -> Dict[str, str]:
+        """Build student context for LLM prompts"""
+        return {
             "gender": student.gender or "Unknown",
             "stay_type": student.stay_type or "Unknown",
             "department": student.department.code if (student.department and hasattr(student.department, 'code')) else "Unknown"
         }
 
-        # LLM Processing
-        logger.info(f"Processing complaint for {student_roll_no}")
+    async def _analyze_complaint_text(
+        self,
+        student: Student,
+        original_text: str,
+        context: Dict[str, str],
+        has_image: bool
+    ) -> Dict[str, Any]:
+        """
+        Run spam detection, categorization, rephrasing and the image-requirement check.
+
+        Returns:
+            Dictionary with categorization, rephrased_text, image_requirement, llm_failed
+
+        Raises:
+            ValueError: If spam detected, hostel validation fails or required image missing
+        """
+        student_roll_no = student.roll_no
+
+        # ✅ NEW: Students with a clean history get the local spam checks only
+        trusted = await student_trust.skip_llm_spam_check(self.db, student_roll_no)
+
+        # ✅ NEW: Staged pipeline - spam detection gates the submission, but
+        # categorization, rephrasing and the image-requirement check don't depend
+        # on its outcome, so they start speculatively alongside it and are
+        # cancelled if the text turns out to be spam.
+        llm_tasks = self._start_llm_stages(original_text, context, trusted=trusted)
+        spam_task, categorize_task, rephrase_task, image_requirement_task = llm_tasks
 
         try:
-            # 1. Check for spam FIRST (before processing)
-            spam_check = await llm_service.detect_spam(original_text)
+            # 1. Check for spam FIRST (before using any other result)
+            spam_check = await spam_task
 
             # ✅ NEW: REJECT spam complaints outright (don't create)
             # Only reject if confidence is high enough (>= 0.85) to avoid blocking
@@ -141,10 +545,14 @@ class ComplaintService:
             SPAM_CONFIDENCE_THRESHOLD = 0.85
             spam_confident = spam_check.get("confidence", 1.0) >= SPAM_CONFIDENCE_THRESHOLD
             if spam_check.get("is_spam") and spam_confident:
+                # Speculative work is wasted - stop it before touching the DB
+                _cancel_pending(llm_tasks)
+
                 spam_reason = spam_check.get("reason", "Content flagged as spam or abusive")
                 logger.warning(
                     f"Spam complaint rejected for {student_roll_no}: {spam_reason}"
                 )
+                student_trust.record_spam(student_roll_no)
 
                 # Log spam attempt for monitoring (optional)
                 spam_count = await spam_detection_service.get_spam_count(
@@ -168,24 +576,17 @@ class ComplaintService:
                 raise ValueError(error_msg)
 
             # 2. Categorize and get priority (✅ NOW INCLUDES department detection)
-            categorization = await llm_service.categorize_complaint(original_text, context)
+            categorization = await categorize_task
             llm_failed = False
+            llm_category = categorization.get("category")
 
             # ✅ FIX: If hostel student submits hostel-related complaint but LLM
             # miscategorized it (e.g., as "General"), force-correct the category.
             # This prevents day scholars from seeing hostel complaints in public feed.
             ai_category = categorization.get("category")
-            HOSTEL_KEYWORDS = [
-                "hostel", "mess", "warden", "dorm", "bunk",
-                "hostel room", "my room", "our room", "the room",
-                "bathroom", "water supply", "electricity in",
-                "air conditioning", "ceiling fan", "hostel fan",
-                "toilet", "shower", "dining hall", "laundry",
-                "curfew", "common room",
-            ]
             if (student.stay_type == "Hostel" and
                     ai_category not in ("Men's Hostel", "Women's Hostel") and
-                    any(kw in original_text.lower() for kw in HOSTEL_KEYWORDS)):
+                    self._mentions_hostel(original_text)):
                 corrected = "Women's Hostel" if student.gender == "Female" else "Men's Hostel"
                 logger.info(
                     f"LLM miscategorized hostel complaint as '{ai_category}' for hostel "
@@ -217,16 +618,21 @@ class ComplaintService:
                     )
 
             # 3. Rephrase for professionalism
-            rephrased_text = await llm_service.rephrase_complaint(original_text)
+            rephrased_text = await rephrase_task
 
             # ✅ NEW: 4. Check if image is REQUIRED for this complaint
-            image_requirement = await llm_service.check_image_requirement(
-                complaint_text=original_text,
-                category=categorization.get("category")
-            )
+            image_requirement = await image_requirement_task
+
+            # The speculative check ran without a category hint; only pay for a
+            # second call when our own corrections changed the LLM's category.
+            if ai_category != llm_category:
+                image_requirement = await llm_service.check_image_requirement(
+                    complaint_text=original_text,
+                    category=ai_category
+                )
 
             # ✅ NEW: Enforce image requirement
-            if image_requirement.get("image_required") and not image_file:
+            if image_requirement.get("image_required") and not has_image:
                 reason = image_requirement.get("reasoning", "Visual evidence required")
                 suggested = image_requirement.get("suggested_evidence", "relevant photo")
                 error_msg = (
@@ -252,135 +658,188 @@ class ComplaintService:
             rephrased_text = original_text
             image_requirement = {"image_required": False}
             llm_failed = True
+        finally:
+            # Never leave speculative LLM calls running past this point
+            _cancel_pending(llm_tasks)
+
+        return {
+            "categorization": categorization,
+            "rephrased_text": rephrased_text,
+            "image_requirement": image_requirement,
+            "llm_failed": llm_failed,
+        }
+
+    async def _get_category_id(self, category_name: str) -> int:
+        """Map a category name to its ID, falling back to General"""
+        refs = await reference_data.current()
+        category_id = refs.category_id(category_name)
+        if category_id is not None:
+            return category_id
 
+        # Fallback to General category
+        logger.warning(f"Category '{category_name}' not found, using General")
+        general_id = refs.category_id("General")
+        return general_id if general_id is not None else 3  # Fallback to ID 3
+
+    async def _resolve_category_and_department(
+        self,
+        categorization: Dict[str, Any],
+        context: Dict[str, str],
+        student: Student
+    ) -> Tuple[Optional[int], int, str]:
+        """
+        Map the AI categorization to (category_id, target_department_id, target_department_code).
+        """
         # ✅ UPDATED: Map category name to ID
         category_id = None
         if "category" in categorization:
-            category_query = select(ComplaintCategory.id).where(
-                ComplaintCategory.name == categorization['category']
-            )
-            category_result = await self.db.execute(category_query)
-            category_row = category_result.first()
-            if category_row:
-                category_id = category_row[0]
-            else:
-                # Fallback to General category
-                logger.warning(f"Category '{categorization['category']}' not found, using General")
-                general_query = select(ComplaintCategory.id).where(
-                    ComplaintCategory.name == "General"
-                )
-                general_result = await self.db.execute(general_query)
-                general_row = general_result.first()
-                category_id = general_row[0] if general_row else 3  # Fallback to ID 3
+            category_id = await self._get_category_id(categorization["category"])
 
         # ✅ NEW: Map department code to department ID
-        from src.database.models import Department
         target_department_code = categorization.get("target_department", context.get("department", "CSE"))
-        dept_query = select(Department.id).where(
-            Department.code == target_department_code
-        )
-        dept_result = await self.db.execute(dept_query)
-        dept_row = dept_result.first()
-        target_department_id = dept_row[0] if dept_row else student.department_id  # Fallback to student's department
+        refs = await reference_data.current()
+        target_department_id = refs.department_id(target_department_code)
+        if target_department_id is None:
+            target_department_id = student.department_id  # Fallback to student's department
 
-        # Calculate initial priority score
-        priority = categorization.get("priority", "Medium")
-        priority_score = PRIORITY_SCORES.get(priority, 50.0)
+        return category_id, target_department_id, target_department_code
 
-        # ✅ UPDATED: Spam is rejected before reaching this point, so status is always "Raised"
-        initial_status = "Raised"
+    async def _read_uploaded_image(
+        self,
+        image_file: Optional[UploadFile]
+    ) -> Tuple[Optional[bytes], Optional[str], Optional[int], Optional[str], List[Dict[str, Any]]]:
+        """
+        Read, validate and optimize an uploaded image and create its renditions.
+
+        Returns:
+            (image_bytes, mimetype, size, filename, renditions) - None and an
+            empty list if no image was uploaded or it could not be processed
+
+        Raises:
+            FileTooLargeError: Upload exceeds MAX_FILE_SIZE
+            InvalidFileTypeError: Upload is not a supported image type
+            FileUploadError: Upload is empty or not a valid image
+        """
+        # An empty file field (no filename, no content) is no image
+        if not image_file or (not image_file.filename and not image_file.size):
+            return None, None, None, None, []
 
-        # ✅ FIXED: Use timezone-aware datetime
-        current_time = datetime.now(timezone.utc)
-        
-        # ✅ NEW: Process image if provided
-        image_bytes = None
-        image_mimetype = None
-        image_size = None
-        image_filename = None
-        image_verified = False
-        image_verification_status = "Pending"
-        image_verification_message = None
-        
-        if image_file:
-            try:
-                # Read image bytes
-                image_bytes, image_mimetype, image_size, image_filename = await file_upload_handler.read_image_bytes(
-                    image_file, validate=True
-                )
-                
-                # Optimize image
-                image_bytes, image_size = await file_upload_handler.optimize_image_bytes(
-                    image_bytes, image_mimetype
-                )
-                
-                logger.info(f"Image uploaded: {image_filename} ({image_size} bytes)")
-                
-            except Exception as e:
-                logger.error(f"Image upload error: {e}")
-                # Continue without image
-                image_bytes = None
-        
-        # ✅ UPDATED: Create complaint with AI-determined category and target department
-        complaint = await self.complaint_repo.create(
-            student_roll_no=student_roll_no,
-            category_id=category_id,
-            original_text=original_text,
-            rephrased_text=rephrased_text,
-            visibility=visibility,
-            priority=priority,
-            priority_score=priority_score,
-            status=initial_status,
-            is_marked_as_spam=False,  # Spam complaints are rejected, never created
-            spam_reason=None,
-            complaint_department_id=target_department_id,  # ✅ CHANGED: Use AI-detected department
-            # ✅ NEW: Binary image fields
-            image_data=image_bytes,
-            image_mimetype=image_mimetype,
-            image_size=image_size,
-            image_filename=image_filename,
-            image_verified=False,
-            image_verification_status="Pending" if image_bytes else None
-        )
-        
-        # ✅ NEW: Verify image if provided
-        if image_bytes:
-            try:
-                verification_result = await image_verification_service.verify_image_from_bytes(
-                    db=self.db,
-                    complaint_id=complaint.id,
-                    complaint_text=rephrased_text,
-                    image_bytes=image_bytes,
-                    mimetype=image_mimetype
-                )
-                
-                # Update complaint with verification results
-                complaint.image_verified = verification_result["is_relevant"]
-                complaint.image_verification_status = verification_result["status"]
-                await self.db.commit()
-                
-                image_verified = verification_result["is_relevant"]
-                image_verification_status = verification_result["status"]
-                image_verification_message = verification_result["explanation"]
-                
-                logger.info(
-                    f"Image verification for {complaint.id}: "
-                    f"Verified={image_verified}, Status={image_verification_status}"
-                )
-                
-            except Exception as e:
-                logger.error(f"Image verification error: {e}")
-                image_verification_message = f"Verification error: {str(e)}"
-        
-        # ✅ UPDATED: Route to appropriate authority using target department
-        authority = None
         try:
-            authority = await authority_service.route_complaint(
-                self.db,
-                category_id,
-                target_department_id,  # ✅ CHANGED: Use AI-detected target department
-                categorization.get("is_against_authority", False)
+            # Stream the upload (size-capped, type-sniffed, spooled if large),
+            # then optimize it and create thumbnail/medium renditions (one decode)
+            with await file_upload_handler.read_image_upload(image_file) as upload:
+                image_mimetype, image_filename = upload.mimetype, upload.filename
+                image_bytes, renditions = await file_upload_handler.process_image_bytes(upload)
+            image_size = len(image_bytes)
+            if renditions:
+                image_mimetype = "image/jpeg"  # Re-encoded as JPEG
+            
+            logger.info(f"Image uploaded: {image_filename} ({image_size} bytes, {len(renditions)} renditions)")
+            return image_bytes, image_mimetype, image_size, image_filename, renditions
+            
+        except (InvalidFileTypeError, FileTooLargeError, FileUploadError):
+            raise  # Rejected upload - the route returns 413/415/400
+        except Exception as e:
+            logger.error(f"Image upload error: {e}")
+            # Continue without image
+            return None, None, None, None, []
+
+    async def _verify_new_complaint_image(
+        self,
+        complaint: Complaint,
+        rephrased_text: str,
+        image_bytes: Optional[bytes],
+        image_mimetype: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Verify a newly submitted complaint image and store the outcome.
+
+        ✅ NEW: With IMAGE_VERIFICATION_ASYNC the image is left Pending for the
+        image verification worker instead of calling the vision model here.
+
+        Args:
+            complaint: Complaint with the stored image
+            rephrased_text: Complaint text the image is checked against
+            image_bytes: Image bytes (fetched from storage when None)
+            image_mimetype: Image MIME type
+
+        Returns:
+            Dictionary with verified, status, message
+        """
+        image_verification = {
+            "verified": False,
+            "status": "Pending",
+            "message": None,
+        }
+        if not complaint.has_image:
+            return image_verification
+        if settings.IMAGE_VERIFICATION_ASYNC:
+            image_verification["message"] = "Image queued for verification"
+            return image_verification
+        if image_bytes is None:
+            image_bytes = await self.complaint_repo.get_image_bytes(complaint)
+        if not image_bytes:
+            return image_verification
+
+        try:
+            verification_result = await image_verification_service.verify_image_from_bytes(
+                db=self.db,
+                complaint_id=complaint.id,
+                complaint_text=rephrased_text,
+                image_bytes=image_bytes,
+                mimetype=image_mimetype,
+                category_id=complaint.category_id
             )
+            
+            # Update complaint with verification results
+            complaint.image_verified = verification_result["is_relevant"]
+            complaint.image_verification_status = verification_result["status"]
+            await self.db.commit()
+            
+            image_verification["verified"] = verification_result["is_relevant"]
+            image_verification["status"] = verification_result["status"]
+            image_verification["message"] = verification_result["explanation"]
+            
+            logger.info(
+                f"Image verification for {complaint.id}: "
+                f"Verified={image_verification['verified']}, Status={image_verification['status']}"
+            )
+            
+        except Exception as e:
+            logger.error(f"Image verification error: {e}")
+            image_verification["message"] = f"Verification error: {str(e)}"
+
+        return image_verification
+
+    async def _route_new_complaint(
+        self,
+        complaint: Complaint,
+        category_id: Optional[int],
+        target_department_id: int,
+        categorization: Dict[str, Any],
+        rephrased_text: str,
+        current_time: datetime,
+        reuse_authority=None
+    ):
+        """
+        Route a new complaint to an authority and notify them.
+
+        Args:
+            reuse_authority: Authority of the open complaint this one duplicates;
+                assigned directly instead of routing again
+
+        Returns:
+            Assigned Authority or None
+        """
+        authority = reuse_authority
+        try:
+            if authority is None:
+                authority = await authority_service.route_complaint(
+                    self.db,
+                    category_id,
+                    target_department_id,  # ✅ CHANGED: Use AI-detected target department
+                    categorization.get("is_against_authority", False)
+                )
 
             if authority:
                 complaint.assigned_authority_id = authority.id
@@ -405,46 +864,253 @@ class ComplaintService:
             logger.error(f"Authority routing error: {e}")
             # Continue without authority assignment
 
-        logger.info(
-            f"Complaint {complaint.id} created successfully - "
-            f"Status: {initial_status}, Priority: {priority}, "
-            f"Category: {categorization.get('category')}, "
-            f"Target Dept: {target_department_code}, "
-            f"Has Image: {image_bytes is not None}, "
-            f"Image Required: {image_requirement.get('image_required', False)}, "
-            f"LLM Failed: {llm_failed}"
-        )
+        return authority
+
+    def _build_submission_result(
+        self,
+        complaint: Complaint,
+        student: Student,
+        analysis: Dict[str, Any],
+        priority: str,
+        priority_score: float,
+        target_department_id: int,
+        target_department_code: str,
+        authority,
+        image_verification: Dict[str, Any],
+        created_at: datetime
+    ) -> Dict[str, Any]:
+        """Build the submission response dictionary"""
+        categorization = analysis["categorization"]
+        image_requirement = analysis["image_requirement"]
+        duplicate_of = analysis.get("duplicate_of")
 
         return {
             "id": str(complaint.id),
             "status": "Submitted",
-            "rephrased_text": rephrased_text,
-            "original_text": original_text,
+            "rephrased_text": analysis["rephrased_text"],
+            "original_text": complaint.original_text,
             "priority": priority,
             "priority_score": priority_score,
             "assigned_authority": authority.name if authority else None,
             "assigned_authority_id": authority.id if authority else None,
-            "created_at": current_time.isoformat(),
-            "message": "Complaint submitted successfully",
+            "created_at": created_at.isoformat(),
+            "message": (
+                "Complaint submitted. A similar open complaint already exists - consider upvoting it"
+                if duplicate_of else "Complaint submitted successfully"
+            ),
             # ✅ NEW: AI-driven categorization information
             "category": categorization.get("category"),
             "target_department_id": target_department_id,
             "target_department_code": target_department_code,
             "cross_department": target_department_id != student.department_id,
-            "llm_failed": llm_failed,
+            "llm_failed": analysis["llm_failed"],
             "confidence_score": categorization.get("confidence", 0.8),
             # ✅ Image information
-            "has_image": image_bytes is not None,
-            "image_verified": image_verified,
-            "image_verification_status": image_verification_status,
-            "image_verification_message": image_verification_message,
-            "image_filename": image_filename,
-            "image_size": image_size,
+            "has_image": complaint.has_image,
+            "image_version": blob_version(complaint.image_hash),
+            "image_verified": image_verification["verified"],
+            "image_verification_status": image_verification["status"],
+            "image_verification_message": image_verification["message"],
+            "image_filename": complaint.image_filename,
+            "image_size": complaint.image_size,
             # ✅ Image requirement information
             "image_was_required": image_requirement.get("image_required", False),
-            "image_requirement_reasoning": image_requirement.get("reasoning")
+            "image_requirement_reasoning": image_requirement.get("reasoning"),
+            # ✅ NEW: Open complaint about the same issue
+            "duplicate_of": duplicate_of
         }
-    
+
+    # ==================== DUPLICATE DETECTION ====================
+
+    async def _analyze_as_duplicate(
+        self,
+        student: Student,
+        original_text: str,
+        exclude: Optional[UUID] = None
+    ) -> Tuple[Optional[Complaint], Optional[Dict[str, Any]]]:
+        """
+        Build the analysis of a near-duplicate from the open complaint it repeats.
+
+        Categorization, spam detection and the image-requirement check are
+        skipped - the open complaint already passed them with nearly the same
+        text. Only the rephrasing runs (the feed shows the student's own
+        wording). Text failing the cheap spam checks always takes the full
+        pipeline.
+
+        Args:
+            student: Submitting student (scopes the search)
+            original_text: Text of the new complaint
+            exclude: Complaint being processed (asynchronous submissions)
+
+        Returns:
+            (duplicate complaint, analysis) or (None, None) when there is no duplicate
+        """
+        if not settings.DUPLICATE_DETECTION_ENABLED:
+            return None, None
+        if llm_service._quick_spam_check(original_text):
+            return None, None
+
+        match = await self._find_open_duplicate(student, original_text, exclude)
+        if match is None:
+            return None, None
+        duplicate, similarity = match
+
+        department = duplicate.complaint_department or student.department
+        categorization = {
+            "category": duplicate.category.name if duplicate.category else "General",
+            "target_department": department.code if department else "CSE",
+            "priority": duplicate.priority,
+            "confidence": similarity,
+            "is_against_authority": False,
+        }
+        logger.info(
+            f"Complaint from {student.roll_no} duplicates open complaint {duplicate.id} "
+            f"(similarity {similarity}) - reusing its categorization and routing"
+        )
+
+        return duplicate, {
+            "categorization": categorization,
+            "rephrased_text": await llm_service.rephrase_complaint(original_text),
+            "image_requirement": {"image_required": False},
+            "llm_failed": False,
+            "duplicate_of": {
+                "id": str(duplicate.id),
+                "status": duplicate.status,
+                "rephrased_text": duplicate.rephrased_text,
+                "upvotes": duplicate.upvotes or 0,
+                "similarity": similarity,
+                "url": f"/api/complaints/{duplicate.id}",
+                "vote_url": f"/api/complaints/{duplicate.id}/vote",
+            },
+        }
+
+    async def _find_open_duplicate(
+        self,
+        student: Student,
+        original_text: str,
+        exclude: Optional[UUID] = None
+    ) -> Optional[Tuple[Complaint, float]]:
+        """
+        Find an open public complaint the student could have filed that says the same thing.
+
+        Hostel complaints only match students of that hostel, Department
+        complaints only students of that department.
+
+        Returns:
+            (complaint with category/department/authority loaded, similarity) or None
+        """
+        def in_scope(category: Optional[str], department_id: Optional[int]) -> bool:
+            if category == "Men's Hostel":
+                return student.stay_type == "Hostel" and student.gender == "Male"
+            if category == "Women's Hostel":
+                return student.stay_type == "Hostel" and student.gender == "Female"
+            if category == "Department":
+                return department_id == student.department_id
+            return True
+
+        try:
+            matches = await duplicate_index.find(original_text, accept=in_scope, exclude=exclude)
+        except Exception as e:
+            logger.error(f"Duplicate lookup failed: {e}")
+            return None
+
+        for match in matches:
+            query = (
+                select(Complaint)
+                .options(
+                    selectinload(Complaint.category),
+                    selectinload(Complaint.complaint_department),
+                    selectinload(Complaint.assigned_authority)
+                )
+                .where(Complaint.id == match.complaint_id)
+            )
+            complaint = (await self.db.execute(query)).scalar_one_or_none()
+
+            # The index may lag behind changes made by other workers
+            if (
+                complaint is None
+                or complaint.status not in OPEN_STATUSES
+                or complaint.visibility != "Public"
+                or complaint.is_marked_as_spam
+            ):
+                duplicate_index.remove(match.complaint_id)
+                continue
+            return complaint, match.similarity
+
+        return None
+
+    def _index_open_complaint(self, complaint: Complaint, categorization: Dict[str, Any]) -> None:
+        """Make a new public complaint findable as a duplicate"""
+        if complaint.visibility != "Public":
+            return
+        try:
+            duplicate_index.add(
+                complaint.id,
+                complaint.original_text,
+                categorization.get("category"),
+                complaint.complaint_department_id
+            )
+        except Exception as e:
+            logger.error(f"Duplicate index update failed for {complaint.id}: {e}")
+
+    def _start_llm_stages(
+        self,
+        original_text: str,
+        context: Dict[str, str],
+        trusted: bool = False
+    ) -> List[asyncio.Task]:
+        """
+        Start the submission-time LLM stages as tasks.
+
+        With LLM_FUSED_ANALYSIS the four stages are views over a single
+        analyze_complaint() call; otherwise each stage is its own LLM call.
+        For trusted students the separate spam call is replaced by the local
+        checks (the fused call answers the spam question at no extra cost).
+
+        Returns:
+            [spam, categorization, rephrased_text, image_requirement] tasks
+        """
+        if not settings.LLM_FUSED_ANALYSIS:
+            spam_check = (
+                self._local_spam_check(original_text) if trusted
+                else llm_service.detect_spam(original_text)
+            )
+            return [
+                asyncio.create_task(spam_check),
+                asyncio.create_task(llm_service.categorize_complaint(original_text, context)),
+                asyncio.create_task(llm_service.rephrase_complaint(original_text)),
+                asyncio.create_task(
+                    llm_service.check_image_requirement(complaint_text=original_text)
+                ),
+            ]
+
+        analysis_task = asyncio.create_task(
+            llm_service.analyze_complaint(original_text, context)
+        )
+
+        async def analysis_field(field: str) -> Any:
+            return (await analysis_task)[field]
+
+        return [
+            asyncio.create_task(analysis_field(field))
+            for field in llm_service.ANALYSIS_FIELDS
+        ]
+
+    async def _local_spam_check(self, text: str) -> Dict[str, Any]:
+        """
+        Spam verdict for trusted students from the local checks.
+
+        Text hitting a spam keyword ("test", "fake", ...) still goes to the
+        LLM - the keywords also occur in genuine complaints, so they only
+        decide whether the full check is needed.
+        """
+        quick_result = llm_service._quick_spam_check(text)
+        if quick_result:
+            return quick_result
+        if spam_detection_service.contains_spam_keywords(text):
+            return await llm_service.detect_spam(text)
+        return {"is_spam": False, "confidence": 0.9, "reason": "Trusted student (local checks only)"}
+
     async def upload_complaint_image(
         self,
         complaint_id: UUID,
@@ -471,31 +1137,57 @@ class ComplaintService:
             raise PermissionError("Not authorized to upload image for this complaint")
         
         try:
-            # Read and optimize image
-            image_bytes, image_mimetype, image_size, image_filename = await file_upload_handler.read_image_bytes(
-                image_file, validate=True
-            )
+            # Stream and optimize image
+            with await file_upload_handler.read_image_upload(image_file) as upload:
+                image_mimetype, image_filename = upload.mimetype, upload.filename
+                image_bytes, renditions = await file_upload_handler.process_image_bytes(upload)
+            image_size = len(image_bytes)
+            if renditions:
+                image_mimetype = "image/jpeg"  # Re-encoded as JPEG
             
-            image_bytes, image_size = await file_upload_handler.optimize_image_bytes(
-                image_bytes, image_mimetype
-            )
-            
-            # Update complaint with image (has_image is a computed property based on image_data)
-            complaint.image_data = image_bytes
+            # Update complaint with image (legacy inline bytes are dropped)
+            old_image_hash = complaint.image_hash
+            complaint.has_image = True
+            complaint.image_hash = await blob_store.put(self.db, image_bytes, image_mimetype)
+            complaint.image_data = None
+            complaint.thumbnail_data = None
+            complaint.thumbnail_size = None
             complaint.image_mimetype = image_mimetype
             complaint.image_size = image_size
             complaint.image_filename = image_filename
             complaint.image_verified = False
             complaint.image_verification_status = "Pending"
+            complaint.image_verification_attempts = 0
+            complaint.image_verification_next_at = None
+            # Old image and renditions belong to the replaced upload
+            await blob_store.release(self.db, old_image_hash)
+            await ImageRenditionRepository(self.db).replace_for_complaint(
+                complaint.id, renditions, commit=False
+            )
             await self.db.commit()
             
+            if settings.IMAGE_VERIFICATION_ASYNC:
+                # ✅ NEW: Verified by the image verification worker
+                logger.info(f"Image uploaded for complaint {complaint_id}: queued for verification")
+                return {
+                    "complaint_id": str(complaint_id),
+                    "has_image": True,
+                    "image_verified": False,
+                    "verification_status": "Pending",
+                    "verification_message": "Image queued for verification",
+                    "image_filename": image_filename,
+                    "image_size": image_size,
+                    "confidence_score": 0.0
+                }
+            
             # Verify image
             verification_result = await image_verification_service.verify_image_from_bytes(
                 db=self.db,
                 complaint_id=complaint.id,
                 complaint_text=complaint.rephrased_text or complaint.original_text,
                 image_bytes=image_bytes,
-                mimetype=image_mimetype
+                mimetype=image_mimetype,
+                category_id=complaint.category_id
             )
             
             # Update verification results
@@ -550,12 +1242,13 @@ class ComplaintService:
             if not requester_roll_no or complaint.student_roll_no != requester_roll_no:
                 raise PermissionError("Not authorized to view this complaint's image")
         
-        if not complaint.has_image or not complaint.image_data:
+        image_bytes = await self.complaint_repo.get_image_bytes(complaint) if complaint.has_image else None
+        if not image_bytes:
             raise ValueError("Complaint has no image")
         
         return {
             "complaint_id": str(complaint_id),
-            "image_bytes": complaint.image_data,
+            "image_bytes": image_bytes,
             "mimetype": complaint.image_mimetype,
             "filename": complaint.image_filename,
             "size": complaint.image_size,
@@ -614,6 +1307,11 @@ class ComplaintService:
             complaint.resolved_at = None
         
         await self.db.commit()
+
+        # ✅ NEW: Only open complaints are offered as duplicates
+        if new_status not in OPEN_STATUSES:
+            duplicate_index.remove(complaint_id)
+        student_trust.record_status_change(complaint.student_roll_no, old_status, new_status)
         
         # Create status update record
         status_update = StatusUpdate(
@@ -698,6 +1396,7 @@ class ComplaintService:
                 "is_own_complaint": complaint.student_roll_no == student_roll_no,
                 # ✅ NEW: Image fields
                 "has_image": complaint.has_image,
+                "image_version": blob_version(complaint.image_hash),
                 "image_verified": complaint.image_verified,
                 "image_verification_status": complaint.image_verification_status
             })
@@ -747,6 +1446,7 @@ class ComplaintService:
             "is_spam": complaint.is_marked_as_spam,
             # ✅ NEW: Image fields (no image_url)
             "has_image": complaint.has_image,
+            "image_version": blob_version(complaint.image_hash),
             "image_verified": complaint.image_verified,
             "image_verification_status": complaint.image_verification_status,
             "image_filename": complaint.image_filename,
@@ -791,6 +1491,7 @@ class ComplaintService:
                 "visibility": complaint.visibility,
                 # ✅ NEW: Image fields
                 "has_image": complaint.has_image,
+                "image_version": blob_version(complaint.image_hash),
                 "image_verified": complaint.image_verified
             })
         
@@ -926,6 +1627,7 @@ class ComplaintService:
             "spam_reason": complaint.spam_reason,
             # Image fields
             "has_image": complaint.has_image,
+            "image_version": blob_version(complaint.image_hash),
             "image_verified": complaint.image_verified,
             "image_verification_status": complaint.image_verification_status,
             "image_filename": complaint.image_filename,
@@ -0,0 +1,415 @@
+"""
+Near-duplicate detection over open complaints (MinHash + LSH).
+
+Outages are reported many times in slightly different words ("no water in
+block C", "block C has no water since morning"). The index keeps a MinHash
+signature of every open public complaint's original_text, bucketed by
+locality-sensitive hashing, so a new submission is compared only against
+the handful of complaints that share a band with it - no LLM call, no
+database scan.
+
+A match needs:
+- estimated Jaccard similarity of the word sets >= threshold (filler
+  words dropped, plurals folded), so reordered sentences still match
+- compatible identifiers: numbers and single letters ("block C", "room 204")
+  of one text must be a subset of the other's, so "no water in block C"
+  never matches "no water in block D"
+- a scope accepted by the caller (category / department filter)
+
+The index is per process. It is rebuilt from the database at startup,
+updated on insert, and at most every refresh_seconds picks up complaints
+other workers created or closed (updated_at watermark). Callers still
+re-check the status of a match in the database before reusing it.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, FrozenSet, List, Optional, Set
+from uuid import UUID
+
+import numpy as np
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses a complaint can be linked to as a duplicate
+OPEN_STATUSES = ("Raised", "In Progress")
+
+# Hash family h(x) = (a*x + b) mod p over 32-bit shingle hashes.
+# a, b < 2^31 keep a*x + b below 2^64, so uint64 arithmetic never overflows.
+_PRIME = 4294967291  # Largest prime below 2^32
+_SEED = 20240611
+
+_WATERMARK_OVERLAP = timedelta(seconds=5)
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+# Words that carry no identity even though they are one letter long
+_COMMON_LETTERS = frozenset({"a", "i"})
+# Filler words left out of the shingles ("no", "not" are kept - they carry meaning)
+_STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "am", "in", "on", "at",
+    "of", "to", "for", "from", "with", "and", "or", "it", "its", "this", "that", "my",
+    "our", "we", "i", "me", "there", "here", "has", "have", "had", "very", "please",
+    "also", "so", "since", "still", "all", "any", "some", "by", "as", "do", "does",
+})
+
+
+@dataclass
+class _Entry:
+    """Indexed complaint"""
+    signature: np.ndarray
+    identifiers: FrozenSet[str]
+    category: Optional[str]
+    department_id: Optional[int]
+
+
+@dataclass
+class DuplicateMatch:
+    """Candidate duplicate returned by DuplicateIndex.find()"""
+    complaint_id: UUID
+    similarity: float
+    category: Optional[str]
+    department_id: Optional[int]
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse everything but letters and digits to single spaces"""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def _shingles(normalized: str) -> Set[str]:
+    """Content words of a normalized text, plurals folded ("taps" -> "tap")"""
+    words = set()
+    for token in normalized.split():
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        words.add(token)
+    return words
+
+
+def _identifiers(normalized: str) -> FrozenSet[str]:
+    """Tokens that name a specific place or thing: numbers and lone letters"""
+    return frozenset(
+        token for token in normalized.split()
+        if any(ch.isdigit() for ch in token)
+        or (len(token) == 1 and token not in _COMMON_LETTERS)
+    )
+
+
+class DuplicateIndex:
+    """In-memory MinHash/LSH index of open complaints"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        threshold: float = 0.7,
+        num_perm: int = 128,
+        bands: int = 32,
+        refresh_seconds: float = 30.0
+    ):
+        """
+        Args:
+            enabled: Master switch; when False find() returns nothing
+            threshold: Minimum estimated Jaccard similarity for a match
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm // bands rows each)
+            refresh_seconds: Minimum gap between top-ups from the database
+        """
+        self.enabled = enabled
+        self.threshold = threshold
+        self.bands = max(1, min(bands, num_perm))
+        self.rows = max(1, num_perm // self.bands)
+        self.num_perm = self.bands * self.rows
+        self.refresh_seconds = refresh_seconds
+
+        rng = np.random.default_rng(_SEED)
+        self._a = rng.integers(1, 1 << 31, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=self.num_perm, dtype=np.uint64)
+
+        self._entries: Dict[UUID, _Entry] = {}
+        self._buckets: List[Dict[bytes, Set[UUID]]] = [{} for _ in range(self.bands)]
+        self._watermark: Optional[datetime] = None
+        self._last_refresh = 0.0
+        self._refresh_lock: Optional[asyncio.Lock] = None
+
+        # Counters
+        self._lookups = 0
+        self._candidates = 0
+        self._matches = 0
+        self._rebuilds = 0
+        self._db_errors = 0
+
+    # ==================== MINHASH ====================
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        MinHash signature of a text's content words.
+
+        Returns:
+            uint64 array of num_perm values, or None for text without content words
+        """
+        shingles = _shingles(_normalize(text))
+        if not shingles:
+            return None
+
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode()) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        permuted = (hashes[:, None] * self._a + self._b) % _PRIME
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        """One bucket key per band"""
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    # ==================== INDEX MAINTENANCE ====================
+
+    def add(
+        self,
+        complaint_id: UUID,
+        text: str,
+        category: Optional[str],
+        department_id: Optional[int]
+    ) -> None:
+        """
+        Index (or re-index) an open complaint.
+
+        Args:
+            complaint_id: Complaint UUID
+            text: Complaint original_text
+            category: Category name
+            department_id: Complaint department ID
+        """
+        if not self.enabled:
+            return
+
+        signature = self.signature(text)
+        if signature is None:
+            return
+
+        self.remove(complaint_id)
+        self._entries[complaint_id] = _Entry(
+            signature=signature,
+            identifiers=_identifiers(_normalize(text)),
+            category=category,
+            department_id=department_id,
+        )
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(key, set()).add(complaint_id)
+
+    def remove(self, complaint_id: UUID) -> None:
+        """Drop a complaint (closed, resolved, spam or deleted)"""
+        entry = self._entries.pop(complaint_id, None)
+        if entry is None:
+            return
+
+        for bucket, key in zip(self._buckets, self._band_keys(entry.signature)):
+            members = bucket.get(key)
+            if members is not None:
+                members.discard(complaint_id)
+                if not members:
+                    del bucket[key]
+
+    async def rebuild(self) -> int:
+        """
+        Reload every open public complaint from the database (startup).
+
+        Returns:
+            Number of complaints indexed
+        """
+        if not self.enabled:
+            return 0
+
+        self._entries.clear()
+        self._buckets = [{} for _ in range(self.bands)]
+        self._watermark = None
+
+        loaded = await self._load_since(None)
+        self._rebuilds += 1
+        logger.info(f"Duplicate index rebuilt with {loaded} open complaint(s)")
+        return loaded
+
+    async def refresh(self, force: bool = False) -> int:
+        """
+        Apply complaints created or changed (by any worker) since the last load.
+
+        Runs at most once per refresh_seconds unless forced.
+
+        Returns:
+            Number of complaints added
+        """
+        if not self.enabled:
+            return 0
+        if not force and time.monotonic() - self._last_refresh < self.refresh_seconds:
+            return 0
+
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+
+        async with self._refresh_lock:
+            if not force and time.monotonic() - self._last_refresh < self.refresh_seconds:
+                return 0  # Another request refreshed while we waited
+            return await self._load_since(self._watermark)
+
+    async def _load_since(self, since: Optional[datetime]) -> int:
+        """
+        Sync the index with complaints changed after since (None: full load).
+
+        A full load reads open complaints only; an incremental one reads every
+        complaint updated since the watermark, indexing those still open and
+        dropping the rest (closed or flagged by another worker).
+        """
+        from sqlalchemy import select
+        from src.database.connection import AsyncSessionLocal
+        from src.database.models import Complaint, ComplaintCategory
+
+        query = (
+            select(
+                Complaint.id,
+                Complaint.original_text,
+                Complaint.complaint_department_id,
+                Complaint.status,
+                Complaint.visibility,
+                Complaint.is_marked_as_spam,
+                Complaint.updated_at,
+                ComplaintCategory.name,
+            )
+            .outerjoin(ComplaintCategory, Complaint.category_id == ComplaintCategory.id)
+        )
+        if since is None:
+            query = query.where(
+                Complaint.status.in_(OPEN_STATUSES),
+                Complaint.visibility == "Public",
+                Complaint.is_marked_as_spam.is_(False),
+            )
+        else:
+            # Overlap absorbs clock differences between app servers and Postgres
+            query = query.where(Complaint.updated_at > since - _WATERMARK_OVERLAP)
+
+        self._last_refresh = time.monotonic()
+        try:
+            async with AsyncSessionLocal() as session:
+                rows = (await session.execute(query)).all()
+        except Exception as e:
+            self._db_errors += 1
+            logger.warning(f"Duplicate index load failed: {e}")
+            return 0
+
+        added = 0
+        for row in rows:
+            if row.status in OPEN_STATUSES and row.visibility == "Public" and not row.is_marked_as_spam:
+                if row.id not in self._entries:
+                    added += 1
+                self.add(row.id, row.original_text, row.name, row.complaint_department_id)
+            else:
+                self.remove(row.id)
+            if row.updated_at and (self._watermark is None or row.updated_at > self._watermark):
+                self._watermark = row.updated_at
+        return added
+
+    # ==================== LOOKUP ====================
+
+    async def find(
+        self,
+        text: str,
+        accept: Optional[Callable[[Optional[str], Optional[int]], bool]] = None,
+        exclude: Optional[UUID] = None,
+        limit: int = 3
+    ) -> List[DuplicateMatch]:
+        """
+        Find open complaints that say (nearly) the same thing.
+
+        Args:
+            text: Text of the new complaint
+            accept: Scope filter called with (category, department_id)
+            exclude: Complaint to ignore (the complaint being processed)
+            limit: Maximum matches returned
+
+        Returns:
+            Matches above the threshold, most similar first
+        """
+        if not self.enabled:
+            return []
+
+        await self.refresh()
+
+        signature = self.signature(text)
+        if signature is None:
+            return []
+
+        self._lookups += 1
+        candidates: Set[UUID] = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates |= bucket.get(key, set())
+        candidates.discard(exclude)
+        self._candidates += len(candidates)
+
+        identifiers = _identifiers(_normalize(text))
+        matches: List[DuplicateMatch] = []
+        for complaint_id in candidates:
+            entry = self._entries[complaint_id]
+            similarity = float(np.mean(entry.signature == signature))
+            if similarity < self.threshold:
+                continue
+            if not (identifiers <= entry.identifiers or entry.identifiers <= identifiers):
+                continue
+            if accept is not None and not accept(entry.category, entry.department_id):
+                continue
+            matches.append(DuplicateMatch(
+                complaint_id=complaint_id,
+                similarity=round(similarity, 3),
+                category=entry.category,
+                department_id=entry.department_id,
+            ))
+
+        matches.sort(key=lambda match: match.similarity, reverse=True)
+        if matches:
+            self._matches += 1
+        return matches[:limit]
+
+    # ==================== STATS ====================
+
+    def get_stats(self) -> Dict[str, object]:
+        """
+        Get index counters.
+
+        Returns:
+            Duplicate index statistics dictionary
+        """
+        return {
+            "enabled": self.enabled,
+            "indexed": len(self._entries),
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "lookups": self._lookups,
+            "avg_candidates": round(self._candidates / self._lookups, 2) if self._lookups else 0.0,
+            "lookups_with_match": self._matches,
+            "rebuilds": self._rebuilds,
+            "db_errors": self._db_errors,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+        }
+
+
+# Create global instance
+duplicate_index = DuplicateIndex(
+    enabled=settings.DUPLICATE_DETECTION_ENABLED,
+    threshold=settings.DUPLICATE_SIMILARITY_THRESHOLD,
+    num_perm=settings.DUPLICATE_MINHASH_PERMUTATIONS,
+    bands=settings.DUPLICATE_LSH_BANDS,
+    refresh_seconds=settings.DUPLICATE_INDEX_REFRESH_SECONDS,
+)
+
+__all__ = ["DuplicateIndex", "DuplicateMatch", "OPEN_STATUSES", "duplicate_index"]
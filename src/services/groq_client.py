@@ -0,0 +1,535 @@
+"""
+Shared async Groq client.
+
+One AsyncGroq instance per process, backed by a tuned httpx keep-alive pool
+(HTTP/2 when the h2 package is installed). LLMService and
+ImageVerificationService both call Groq through this module instead of
+running the synchronous client in worker threads.
+
+✅ NEW: Every call passes a circuit breaker (per operation + model) and an
+AIMD concurrency limiter (per model) - see src/services/llm_resilience.py.
+✅ NEW: Inside a request deadline (src/utils/deadline.py) timeouts and slot
+waits shrink to the remaining budget, and calls are refused once it is spent.
+✅ NEW: hedged_completion() resends calls that outlive the primary model's
+rolling p90 latency to LLM_FALLBACK_MODEL and returns whichever answers first
+(and fails over to it while the primary's circuit is open).
+✅ NEW: Every call that reaches Groq is recorded by the telemetry writer
+(src/services/llm_telemetry.py) into llm_processing_logs.
+"""
+
+import asyncio
+import logging
+import importlib.util
+import time
+from collections import defaultdict
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+from groq import AsyncGroq, APITimeoutError
+
+from src.config.settings import settings
+from src.config.constants import LLMOperationType
+from src.services.llm_resilience import (
+    AIMDLimiter,
+    CircuitBreaker,
+    LatencyWindow,
+    is_overload_error,
+    llm_time_budget,
+)
+from src.services.llm_telemetry import llm_telemetry
+from src.utils.exceptions import LLMCircuitOpenError, LLMDeadlineExceededError
+
+logger = logging.getLogger(__name__)
+
+# Hedges that can be spent back to back after a quiet period
+_HEDGE_BURST = 5.0
+
+
+class GroqClientManager:
+    """Process-wide AsyncGroq client with per-operation timeouts and usage gauges"""
+
+    def __init__(self):
+        """Create the shared client.
+
+        Gracefully handles missing GROQ_API_KEY by leaving the client as None;
+        callers check `available` and use their keyword-based fallbacks.
+        """
+        self.client: Optional[AsyncGroq] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self.http2 = settings.LLM_HTTP2 and importlib.util.find_spec("h2") is not None
+
+        # Gauges / counters, keyed by operation type
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._errors: Dict[str, int] = defaultdict(int)
+
+        # Created on first use
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._limiters: Dict[str, AIMDLimiter] = {}
+        self._deadline_skips: Dict[str, int] = defaultdict(int)
+
+        # Successful call latency per (operation, model) - drives the hedge delay
+        self._latencies: Dict[Tuple[str, str], LatencyWindow] = {}
+        # Latency as callers see it (hedging included) per (operation, tier)
+        self._end_to_end: Dict[Tuple[str, str], LatencyWindow] = {}
+        self._hedges: Dict[str, int] = defaultdict(int)
+        self._hedge_wins: Dict[str, int] = defaultdict(int)
+        self._failovers: Dict[str, int] = defaultdict(int)
+        # Token bucket: every hedgeable call earns LLM_HEDGE_MAX_FRACTION, a hedge costs 1
+        self._hedge_tokens = 1.0
+        self._hedges_skipped = 0
+
+        self._timeouts: Dict[str, float] = {
+            LLMOperationType.SPAM_DETECTION.value: settings.LLM_SPAM_TIMEOUT,
+            LLMOperationType.CATEGORIZATION.value: settings.LLM_CATEGORIZATION_TIMEOUT,
+            LLMOperationType.BATCH_CATEGORIZATION.value: settings.LLM_CATEGORIZATION_TIMEOUT,
+            LLMOperationType.REPHRASING.value: settings.LLM_REPHRASING_TIMEOUT,
+            LLMOperationType.IMAGE_REQUIREMENT.value: settings.LLM_IMAGE_REQUIREMENT_TIMEOUT,
+            LLMOperationType.ANALYSIS.value: settings.LLM_ANALYSIS_TIMEOUT,
+            LLMOperationType.IMAGE_VERIFICATION.value: settings.LLM_VISION_TIMEOUT,
+            LLMOperationType.CONNECTION_TEST.value: 5,
+        }
+
+        api_key = settings.GROQ_API_KEY
+        if not (api_key and api_key.strip()):
+            return
+
+        try:
+            self._http_client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(settings.LLM_TIMEOUT, connect=settings.LLM_CONNECT_TIMEOUT),
+            )
+            self.client = AsyncGroq(api_key=api_key, http_client=self._http_client)
+            logger.info(
+                f"Shared Groq client initialized (HTTP/2: {self.http2}, "
+                f"max connections: {settings.LLM_POOL_MAX_CONNECTIONS})"
+            )
+        except Exception as e:
+            logger.warning(f"Failed to initialize shared Groq client: {e}")
+            self.client = None
+
+    @property
+    def available(self) -> bool:
+        """Whether Groq calls can be made"""
+        return self.client is not None
+
+    def get_timeout(self, operation: str) -> httpx.Timeout:
+        """Get the request timeout for an operation type (clamped to the request deadline)"""
+        read_timeout = self._timeouts.get(operation, settings.LLM_TIMEOUT)
+        connect_timeout = settings.LLM_CONNECT_TIMEOUT
+        budget = llm_time_budget()
+        if budget is not None:
+            read_timeout = min(read_timeout, budget)
+            connect_timeout = min(connect_timeout, budget)
+        return httpx.Timeout(read_timeout, connect=connect_timeout)
+
+    def _has_budget(self, operation: str) -> bool:
+        """Whether the request deadline leaves room for an LLM call"""
+        budget = llm_time_budget()
+        if budget is None or budget >= settings.LLM_MIN_CALL_BUDGET:
+            return True
+        self._deadline_skips[operation] += 1
+        return False
+
+    # ==================== CIRCUIT BREAKERS / CONCURRENCY ====================
+
+    def _breaker(self, operation: str, model: str) -> Optional[CircuitBreaker]:
+        """Get the circuit breaker of an operation + model (None when disabled)"""
+        if not settings.LLM_BREAKER_ENABLED:
+            return None
+        key = (operation, model)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            timeout = self._timeouts.get(operation, settings.LLM_TIMEOUT)
+            breaker = CircuitBreaker(
+                name=f"{operation}:{model}",
+                window=settings.LLM_BREAKER_WINDOW,
+                min_calls=settings.LLM_BREAKER_MIN_CALLS,
+                error_rate=settings.LLM_BREAKER_ERROR_RATE,
+                slow_call_rate=settings.LLM_BREAKER_SLOW_CALL_RATE,
+                slow_call_seconds=timeout * settings.LLM_BREAKER_SLOW_CALL_RATIO,
+                open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+            )
+            self._breakers[key] = breaker
+        return breaker
+
+    def _limiter(self, model: str) -> Optional[AIMDLimiter]:
+        """Get the concurrency limiter of a model (None when disabled)"""
+        if not settings.LLM_CONCURRENCY_ENABLED:
+            return None
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            limiter = AIMDLimiter(
+                name=model,
+                initial_limit=settings.LLM_CONCURRENCY_INITIAL,
+                min_limit=settings.LLM_CONCURRENCY_MIN,
+                max_limit=settings.LLM_CONCURRENCY_MAX,
+                latency_factor=settings.LLM_CONCURRENCY_LATENCY_FACTOR,
+                backoff=settings.LLM_CONCURRENCY_BACKOFF,
+                queue_timeout=settings.LLM_CONCURRENCY_QUEUE_TIMEOUT,
+            )
+            self._limiters[model] = limiter
+        return limiter
+
+    def allows(self, operation: str, model: str) -> bool:
+        """
+        Whether a call for this operation + model would be attempted right now.
+
+        False when the client is not configured, the circuit breaker is open
+        or the request deadline is nearly spent; callers then go straight to
+        their fallback logic.
+        """
+        if not self.client or not self._has_budget(operation):
+            return False
+        breaker = self._breaker(operation, model)
+        if breaker is None or breaker.can_attempt():
+            return True
+        breaker.note_rejected()
+        return False
+
+    async def chat_completion(self, operation: str, **kwargs: Any) -> Any:
+        """
+        Create a chat completion on the shared client.
+
+        Args:
+            operation: Operation type (LLMOperationType value), used for the
+                default timeout, the circuit breaker and the in-flight gauges
+            **kwargs: Arguments for chat.completions.create (model, messages, ...)
+
+        Returns:
+            Groq ChatCompletion response
+
+        Raises:
+            RuntimeError: If the client is not configured
+            LLMCircuitOpenError: If the operation's circuit breaker is open
+            LLMOverloadedError: If no concurrency slot frees up in time
+            LLMDeadlineExceededError: If the request deadline leaves no time for the call
+        """
+        if not self.client:
+            raise RuntimeError("Groq client is not configured")
+        if not self._has_budget(operation):
+            raise LLMDeadlineExceededError(f"No time left for {operation}")
+
+        model = kwargs.get("model", "")
+
+        breaker = self._breaker(operation, model)
+        if breaker is not None and not breaker.can_attempt():
+            breaker.note_rejected()
+            raise LLMCircuitOpenError(f"Circuit open for {operation} on {model}")
+
+        limiter = self._limiter(model)
+        if limiter is not None:
+            budget = llm_time_budget()
+            await limiter.acquire(
+                max_wait=None if budget is None else max(budget - settings.LLM_MIN_CALL_BUDGET, 0.0)
+            )
+
+        # Admit after queueing: the breaker may have opened while this call waited
+        if breaker is not None and not breaker.allow_request():
+            if limiter is not None:
+                limiter.release()
+            raise LLMCircuitOpenError(f"Circuit open for {operation} on {model}")
+
+        # Timeouts are computed after queueing, from what is left of the deadline
+        kwargs.setdefault("timeout", self.get_timeout(operation))
+        budget = llm_time_budget()
+
+        self._in_flight[operation] += 1
+        self._requests[operation] += 1
+        started_at = time.monotonic()
+        latency: Optional[float] = None
+        overloaded = False
+        try:
+            # wait_for bounds the whole call, including the SDK's own retries
+            response = await asyncio.wait_for(self.client.chat.completions.create(**kwargs), budget)
+            latency = time.monotonic() - started_at
+            self._latency_window(self._latencies, (operation, model)).add(latency)
+            self._record_call(operation, model, "Success", latency, usage=getattr(response, "usage", None))
+            return response
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError as e:
+            # Our deadline, not necessarily Groq's fault: counts as slow, not failed
+            latency = time.monotonic() - started_at
+            self._errors[operation] += 1
+            self._deadline_skips[operation] += 1
+            self._record_call(operation, model, "Timeout", latency, error="Request deadline reached")
+            raise LLMDeadlineExceededError(
+                f"{operation} cut off after {latency:.1f}s by the request deadline"
+            ) from e
+        except Exception as e:
+            latency = time.monotonic() - started_at
+            overloaded = is_overload_error(e)
+            self._errors[operation] += 1
+            status = "Timeout" if isinstance(e, (httpx.TimeoutException, APITimeoutError)) else "Failed"
+            self._record_call(operation, model, status, latency, error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            self._in_flight[operation] -= 1
+            if limiter is not None:
+                limiter.release(operation, started_at, latency, overloaded)
+            if breaker is not None:
+                if latency is None:
+                    breaker.release_probe()  # Cancelled: no verdict on Groq's health
+                else:
+                    breaker.record(latency, failed=overloaded)
+
+    def _record_call(
+        self,
+        operation: str,
+        model: str,
+        status: str,
+        latency: float,
+        usage: Any = None,
+        error: Optional[str] = None
+    ) -> None:
+        """Hand one finished Groq call to the telemetry writer (buffer append only)"""
+        llm_telemetry.record(
+            operation=operation,
+            model=model,
+            status=status,
+            processing_time_ms=int(latency * 1000),
+            tokens_used=getattr(usage, "total_tokens", None),
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            error_message=error,
+        )
+
+    # ==================== HEDGING / TIERING ====================
+
+    def _latency_window(
+        self,
+        windows: Dict[Tuple[str, str], LatencyWindow],
+        key: Tuple[str, str]
+    ) -> LatencyWindow:
+        """Get (or create) a latency window"""
+        window = windows.get(key)
+        if window is None:
+            window = windows[key] = LatencyWindow(settings.LLM_LATENCY_WINDOW)
+        return window
+
+    def hedge_delay(self, operation: str, model: str) -> Optional[float]:
+        """
+        How long a call may run before it is hedged.
+
+        Returns:
+            The LLM_HEDGE_PERCENTILE latency of this operation + model (at
+            least LLM_HEDGE_MIN_DELAY), or None while there are too few samples
+        """
+        window = self._latencies.get((operation, model))
+        if window is None or len(window) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return max(window.percentile(settings.LLM_HEDGE_PERCENTILE), settings.LLM_HEDGE_MIN_DELAY)
+
+    def _can_hedge(self, operation: str, model: str) -> bool:
+        """Whether a hedge call to model could start now (client, budget, breaker)"""
+        if not self.client:
+            return False
+        budget = llm_time_budget()
+        if budget is not None and budget < settings.LLM_MIN_CALL_BUDGET:
+            return False
+        breaker = self._breaker(operation, model)
+        return breaker is None or breaker.can_attempt()
+
+    async def hedged_completion(
+        self,
+        operation: str,
+        hedge_model: Optional[str] = None,
+        tier: str = "default",
+        **kwargs: Any
+    ) -> Any:
+        """
+        Chat completion with tail-latency hedging.
+
+        The call goes to kwargs["model"]. If it has not answered within
+        hedge_delay(), the same request is also sent to hedge_model and the
+        first successful response wins (the other call is cancelled). While
+        the primary model's circuit is open the call goes to hedge_model
+        directly. Every call logs its tier, model, hedge decision and latency.
+
+        Args:
+            operation: Operation type (LLMOperationType value)
+            hedge_model: Model to hedge/fail over to (None or same model: no hedging)
+            tier: Model tier the caller picked (for logs and latency stats)
+            **kwargs: Arguments for chat.completions.create (model, messages, ...)
+
+        Returns:
+            Groq ChatCompletion response
+
+        Raises:
+            Same as chat_completion() (the primary's error when both calls fail)
+        """
+        model = kwargs.get("model", "")
+        if not settings.LLM_HEDGING_ENABLED or hedge_model == model:
+            hedge_model = None
+
+        started_at = time.monotonic()
+        decision = "none"
+        answered_by = model
+        try:
+            primary_breaker = self._breaker(operation, model)
+            if (hedge_model and primary_breaker is not None and not primary_breaker.can_attempt()
+                    and self._can_hedge(operation, hedge_model)):
+                decision = "failover"
+                answered_by = hedge_model
+                self._failovers[operation] += 1
+                return await self.chat_completion(operation, **{**kwargs, "model": hedge_model})
+
+            delay = None
+            if hedge_model:
+                self._hedge_tokens = min(self._hedge_tokens + settings.LLM_HEDGE_MAX_FRACTION, _HEDGE_BURST)
+                delay = self.hedge_delay(operation, model)
+            budget = llm_time_budget()
+            if delay is None or (budget is not None and budget - delay < settings.LLM_MIN_CALL_BUDGET):
+                return await self.chat_completion(operation, **kwargs)
+
+            decision, answered_by, response = await self._race(operation, model, hedge_model, delay, kwargs)
+            return response
+        finally:
+            latency = time.monotonic() - started_at
+            self._latency_window(self._end_to_end, (operation, tier)).add(latency)
+            logger.info(
+                f"LLM call: op={operation} tier={tier} model={model} hedge={decision} "
+                f"answered_by={answered_by} latency_ms={int(latency * 1000)}"
+            )
+
+    async def _race(
+        self,
+        operation: str,
+        model: str,
+        hedge_model: str,
+        delay: float,
+        kwargs: Dict[str, Any]
+    ) -> Tuple[str, str, Any]:
+        """
+        Run the primary call, hedging it after delay seconds.
+
+        Returns:
+            (hedge decision, model that answered, response)
+        """
+        started_at = time.monotonic()
+        primary = asyncio.create_task(self.chat_completion(operation, **kwargs))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return "none", model, await primary
+            if self._hedge_tokens < 1.0 or not self._can_hedge(operation, hedge_model):
+                self._hedges_skipped += 1
+                return "skipped", model, await primary
+
+            self._hedge_tokens -= 1.0
+            self._hedges[operation] += 1
+            logger.info(
+                f"Hedging {operation}: {model} exceeded p{int(settings.LLM_HEDGE_PERCENTILE * 100)} "
+                f"({delay:.2f}s), also sending to {hedge_model}"
+            )
+            hedge = asyncio.create_task(self.chat_completion(operation, **{**kwargs, "model": hedge_model}))
+            tasks.append(hedge)
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the primary when both finished in the same loop iteration
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._hedge_wins[operation] += 1
+                            return "hedged_won", hedge_model, task.result()
+                        return "hedged_lost", model, task.result()
+            raise primary.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    if task is primary:
+                        # The slow tail would otherwise never reach the window and
+                        # the hedge delay would drift down; record the lower bound
+                        self._latency_window(self._latencies, (operation, model)).add(
+                            time.monotonic() - started_at
+                        )
+                elif not task.cancelled():
+                    task.exception()  # Mark the loser's error as retrieved
+
+    def get_resilience_stats(self) -> Dict[str, Any]:
+        """
+        Get circuit breaker states and concurrency limiter windows.
+
+        Returns:
+            {"circuit_breakers": {"operation:model": ...}, "concurrency": {model: ...}, "open_circuits": [...]}
+        """
+        breakers = {breaker.name: breaker.get_stats() for breaker in self._breakers.values()}
+        return {
+            "breaker_enabled": settings.LLM_BREAKER_ENABLED,
+            "concurrency_enabled": settings.LLM_CONCURRENCY_ENABLED,
+            "open_circuits": sorted(
+                name for name, stats in breakers.items() if stats["state"] != CircuitBreaker.CLOSED
+            ),
+            "circuit_breakers": breakers,
+            "concurrency": {model: limiter.get_stats() for model, limiter in self._limiters.items()},
+            "deadline_skips": dict(self._deadline_skips),
+            "hedging": {
+                "enabled": settings.LLM_HEDGING_ENABLED,
+                "hedged": dict(self._hedges),
+                "hedge_wins": dict(self._hedge_wins),
+                "failovers": dict(self._failovers),
+                "skipped": self._hedges_skipped,
+                "hedge_delay_ms": {
+                    f"{operation}:{model}": int(self.hedge_delay(operation, model) * 1000)
+                    for (operation, model), window in self._latencies.items()
+                    if len(window) >= settings.LLM_HEDGE_MIN_SAMPLES
+                },
+            },
+            "latency": {
+                f"{operation}:{model}": window.get_stats()
+                for (operation, model), window in self._latencies.items()
+            },
+            "end_to_end_latency": {
+                f"{operation}:{tier}": window.get_stats()
+                for (operation, tier), window in self._end_to_end.items()
+            },
+        }
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool and in-flight request gauges.
+
+        Returns:
+            Pool statistics dictionary
+        """
+        stats: Dict[str, Any] = {
+            "configured": self.available,
+            "http2": self.http2,
+            "max_connections": settings.LLM_POOL_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.LLM_POOL_MAX_KEEPALIVE,
+            "in_flight_total": sum(self._in_flight.values()),
+            "in_flight": {op: count for op, count in self._in_flight.items() if count},
+            "requests": dict(self._requests),
+            "errors": dict(self._errors),
+        }
+
+        # httpx doesn't expose pool occupancy publicly; read it from httpcore when present
+        pool = getattr(getattr(self._http_client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            stats["open_connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for conn in connections if conn.is_idle())
+
+        return stats
+
+    async def close(self) -> None:
+        """Close the underlying HTTP connection pool"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            logger.info("Shared Groq client closed")
+
+
+# Create global instance
+groq_client_manager = GroqClientManager()
+
+__all__ = ["GroqClientManager", "groq_client_manager"]
@@ -4,48 +4,68 @@ Image verification service using Groq Vision API.
 ✅ UPDATED: Uses data URIs from database (binary storage)
 ✅ UPDATED: Returns ImageVerificationResult schema format
 ✅ UPDATED: No file path dependencies
+✅ NEW: Images are downscaled to VISION_IMAGE_MAX_SIDE before the vision
+call, and results are cached by (dHash, category) through the LLM result
+cache, so re-uploads and near-identical photos skip the vision call.
 """
 
 import logging
 import base64
-import asyncio
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Tuple
 from uuid import UUID
-import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
-from groq import Groq
 from src.config.settings import settings
+from src.config.constants import LLMOperationType
+from src.services.groq_client import groq_client_manager
+from src.services.llm_cache import llm_cache
+from src.services.llm_resilience import llm_retry
+from src.utils.image_pool import image_pool, prepare_vision_image
 
 logger = logging.getLogger(__name__)
 
+# Recently verified dHashes kept in-process for near-duplicate lookups
+_MAX_RECENT_HASHES = 4096
+
 
 class ImageVerificationService:
     """Service for image verification using Groq Vision API"""
 
     def __init__(self):
-        """Initialize with Groq client.
+        """Initialize with the shared async Groq client.
 
-        Gracefully handles missing GROQ_API_KEY by setting client to None.
+        Gracefully handles missing GROQ_API_KEY (client is None).
         Verification falls back to keyword matching when the client is
         unavailable.
         """
-        self.groq_client = None
+        self.groq_client = groq_client_manager.client
         # Use latest Llama 4 Scout vision model (2026)
         self.vision_model = "meta-llama/llama-4-scout-17b-16e-instruct"
         self.temperature = 0.2  # Lower for consistent results
         self.max_tokens = 1000
 
-        api_key = settings.GROQ_API_KEY
-        if api_key and api_key.strip():
-            try:
-                self.groq_client = Groq(api_key=api_key)
-                logger.info("Image verification service initialized with Groq Vision API")
-            except Exception as e:
-                logger.warning(f"Failed to initialize Groq client for image verification: {e}")
+        # Cached results depend on the model, prompt and input resolution
+        llm_cache.register_version(
+            LLMOperationType.IMAGE_VERIFICATION.value,
+            self.vision_model,
+            f"{self._build_verification_prompt('{text}', None)}\n{settings.VISION_IMAGE_MAX_SIDE}"
+        )
+
+        # (category_id, dhash) of recently cached results, most recent last;
+        # lets a near-identical photo reuse the entry of an earlier one
+        self._recent_hashes: "OrderedDict[Tuple[int, str], None]" = OrderedDict()
+
+        # Counters
+        self._vision_calls = 0
+        self._cache_hits = 0
+        self._bytes_received = 0
+        self._bytes_sent = 0
+
+        if self.groq_client:
+            logger.info("Image verification service initialized with Groq Vision API")
         else:
-            logger.warning("GROQ_API_KEY not set. Image verification will use fallback logic.")
+            logger.warning("Groq client unavailable. Image verification will use fallback logic.")
     
     async def verify_image_from_bytes(
         self,
@@ -54,12 +74,14 @@ class ImageVerificationService:
         complaint_text: str,
         image_bytes: bytes,
         mimetype: str,
-        image_description: Optional[str] = None
+        image_description: Optional[str] = None,
+        category_id: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Verify if image is relevant to complaint using Groq Vision API.
         
         ✅ NEW: Accepts image_bytes instead of image_url
+        ✅ NEW: Sends a downscaled copy; reuses cached results by (dHash, category)
         
         Args:
             db: Database session
@@ -68,6 +90,7 @@ class ImageVerificationService:
             image_bytes: Image bytes from database
             mimetype: Image MIME type (e.g., "image/jpeg")
             image_description: Optional image description
+            category_id: Complaint category (enables the result cache)
         
         Returns:
             Verification result matching ImageVerificationResult schema:
@@ -79,14 +102,8 @@ class ImageVerificationService:
             }
         """
         try:
-            # Convert bytes to data URI
-            data_uri = self.encode_bytes_to_data_uri(image_bytes, mimetype)
-            
-            # Use LLM Vision to verify relevance
-            result = await self.verify_image_relevance(
-                complaint_text=complaint_text,
-                image_data_uri=data_uri,
-                image_description=image_description
+            result, _ = await self.evaluate_image(
+                complaint_text, image_bytes, mimetype, image_description, category_id
             )
             
             # Log verification to database
@@ -116,12 +133,111 @@ class ImageVerificationService:
                 "explanation": f"Verification error, accepted by default: {str(e)}",
                 "status": "Pending"
             }
+
+    async def evaluate_image(
+        self,
+        complaint_text: str,
+        image_bytes: bytes,
+        mimetype: str,
+        image_description: Optional[str] = None,
+        category_id: Optional[int] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        ✅ NEW: Verification verdict for an image, without writing anything.
+        
+        Sends a downscaled copy to the vision model unless a cached verdict
+        exists for the same (or a near-identical) dHash in the category.
+        
+        Args:
+            complaint_text: Complaint text
+            image_bytes: Image bytes
+            mimetype: Image MIME type
+            image_description: Optional image description
+            category_id: Complaint category (enables the result cache)
+        
+        Returns:
+            Tuple of (result in ImageVerificationResult format, from_model) -
+            from_model is False when the keyword fallback produced the result
+        """
+        operation = LLMOperationType.IMAGE_VERIFICATION.value
+        image_bytes, mimetype, phash = await self.prepare_image(image_bytes, mimetype)
+
+        cache_key = None
+        if settings.VISION_CACHE_ENABLED and phash and category_id is not None:
+            cache_key = llm_cache.make_key(operation, phash, {"category_id": category_id})
+            result = await llm_cache.get(operation, cache_key)
+            if result is None:
+                similar = self._find_similar_hash(category_id, phash)
+                if similar is not None:
+                    result = await llm_cache.get(
+                        operation, llm_cache.make_key(operation, similar, {"category_id": category_id})
+                    )
+            if result is not None:
+                self._cache_hits += 1
+                logger.info(f"Image verification: cached result for dHash {phash}")
+                return result, True
+
+        # Convert bytes to data URI
+        data_uri = self.encode_bytes_to_data_uri(image_bytes, mimetype)
+
+        # Use LLM Vision to verify relevance (only genuine results are cached)
+        result = await self._vision_verification(complaint_text, data_uri, image_description)
+        if result is None:
+            return self._fallback_verification(complaint_text, image_description), False
+        if cache_key:
+            llm_cache.put(operation, cache_key, result)
+            self._remember_hash(category_id, phash)
+        return result, True
+
+    def _find_similar_hash(self, category_id: int, phash: str) -> Optional[str]:
+        """Closest recently cached dHash of the category within VISION_HASH_MAX_DISTANCE"""
+        max_distance = settings.VISION_HASH_MAX_DISTANCE
+        if max_distance <= 0:
+            return None
+        value = int(phash, 16)
+        best, best_distance = None, max_distance + 1
+        for cached_category, cached_hash in reversed(self._recent_hashes):
+            if cached_category != category_id:
+                continue
+            distance = (value ^ int(cached_hash, 16)).bit_count()
+            if distance < best_distance:
+                best, best_distance = cached_hash, distance
+        return best
+
+    def _remember_hash(self, category_id: int, phash: str) -> None:
+        key = (category_id, phash)
+        self._recent_hashes[key] = None
+        self._recent_hashes.move_to_end(key)
+        while len(self._recent_hashes) > _MAX_RECENT_HASHES:
+            self._recent_hashes.popitem(last=False)
+
+    async def prepare_image(self, image_bytes: bytes, mimetype: str) -> Tuple[bytes, str, Optional[str]]:
+        """
+        ✅ NEW: Downscale an image to the vision model input size and hash it.
+        
+        Args:
+            image_bytes: Stored image bytes
+            mimetype: Their MIME type
+        
+        Returns:
+            Tuple of (image_bytes, mimetype, dhash) - the original bytes and
+            no hash if the image could not be decoded
+        """
+        try:
+            prepared, phash = await image_pool.run(
+                prepare_vision_image,
+                image_bytes,
+                settings.VISION_IMAGE_MAX_SIDE,
+                settings.VISION_IMAGE_QUALITY
+            )
+        except Exception as e:
+            logger.warning(f"Vision preprocessing failed, sending original image: {e}")
+            return image_bytes, mimetype, None
+
+        self._bytes_received += len(image_bytes)
+        self._bytes_sent += len(prepared)
+        return prepared, "image/jpeg", phash
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=30),
-        retry=retry_if_exception_type((httpx.HTTPError, TimeoutError))
-    )
     async def verify_image_relevance(
         self,
         complaint_text: str,
@@ -147,23 +263,43 @@ class ImageVerificationService:
                 "status": str
             }
         """
+        result = await self._vision_verification(complaint_text, image_data_uri, image_description)
+        if result is None:
+            return self._fallback_verification(complaint_text, image_description)
+        return result
+
+    @llm_retry(max_attempts=3, min_wait=2, max_wait=30)
+    async def _vision_verification(
+        self,
+        complaint_text: str,
+        image_data_uri: str,
+        image_description: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Groq Vision API call.
+        
+        Returns:
+            Result in ImageVerificationResult format, or None when the
+            vision model is unavailable or failed (caller falls back)
+        """
         try:
             # Validate data URI
             if not image_data_uri.startswith("data:"):
                 logger.error(f"Invalid data URI format: {image_data_uri[:50]}...")
-                return self._fallback_verification(complaint_text, image_description)
+                return None
 
             # If Groq client is not available, use fallback
-            if not self.groq_client:
-                logger.info("Groq client unavailable, using fallback image verification")
-                return self._fallback_verification(complaint_text, image_description)
+            if not groq_client_manager.allows(LLMOperationType.IMAGE_VERIFICATION.value, self.vision_model):
+                logger.info("Groq unavailable, circuit open or deadline near - using fallback image verification")
+                return None
 
             # Build verification prompt
             prompt = self._build_verification_prompt(complaint_text, image_description)
 
             # Call Groq Vision API
-            response = await asyncio.to_thread(
-                self.groq_client.chat.completions.create,
+            self._vision_calls += 1
+            response = await groq_client_manager.chat_completion(
+                LLMOperationType.IMAGE_VERIFICATION.value,
                 model=self.vision_model,
                 messages=[
                     {
@@ -209,7 +345,7 @@ class ImageVerificationService:
             
         except Exception as e:
             logger.error(f"Groq Vision API error: {e}")
-            return self._fallback_verification(complaint_text, image_description)
+            return None
     
     def _build_verification_prompt(
         self,
@@ -434,6 +570,21 @@ Analyze the provided image and respond with JSON:"""
             logger.error(f"Failed to decode data URI: {e}")
             raise ValueError(f"Invalid data URI format: {str(e)}")
 
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get image verification counters.
+        
+        Returns:
+            Vision calls, cache hits and image bytes before/after downscaling
+        """
+        return {
+            "vision_calls": self._vision_calls,
+            "cache_hits": self._cache_hits,
+            "bytes_received": self._bytes_received,
+            "bytes_sent": self._bytes_sent,
+            "max_side": settings.VISION_IMAGE_MAX_SIDE,
+        }
+
 
 # Create global instance
 image_verification_service = ImageVerificationService()
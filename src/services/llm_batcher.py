@@ -0,0 +1,163 @@
+"""
+Micro-batching of concurrent LLM requests.
+
+During submission bursts many coroutines ask for the same kind of LLM work
+within milliseconds of each other. MicroBatcher collects those requests for
+a short window (or until max_size is reached), hands them to one batch
+function - one prompt, one Groq request - and resolves every caller with its
+own result. This trades a few tens of milliseconds of latency for far fewer
+requests against Groq's per-minute request caps.
+
+A caller gets None back when its request was not batched (it was alone in
+the window) or its item failed in the batch; it then makes its usual single
+call. The batch call runs in a copy of the context of the request that
+opened the window - whether the timer or a full window dispatches it - so it
+inherits that request's deadline and telemetry scope, never a later
+submitter's.
+
+Usage:
+    batcher = MicroBatcher("categorization", process_batch, window_seconds=0.03, max_size=8)
+    result = await batcher.submit((text, context))
+    if result is None:
+        result = await single_call(text, context)
+"""
+
+import asyncio
+import contextvars
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# process_batch(items) -> one result (or None) per item, in order
+BatchFunction = Callable[[Sequence[Any]], Awaitable[List[Optional[Any]]]]
+
+
+class MicroBatcher:
+    """Collects concurrent requests for a short window and runs them as one batch"""
+
+    def __init__(
+        self,
+        name: str,
+        process_batch: BatchFunction,
+        window_seconds: float = 0.03,
+        max_size: int = 8,
+        enabled: bool = True
+    ):
+        """
+        Args:
+            name: Name used in logs and stats
+            process_batch: Coroutine function taking the items of a batch
+            window_seconds: How long the first request waits for company
+            max_size: Batch is dispatched immediately at this size
+            enabled: When False, submit() always returns None
+        """
+        self.name = name
+        self.process_batch = process_batch
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self.enabled = enabled and max_size >= 2
+
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._context: Optional[contextvars.Context] = None  # Of the request that opened the window
+        self._running: Set[asyncio.Task] = set()
+
+        # Counters
+        self._batches = 0
+        self._batched_items = 0
+        self._failed_items = 0
+        self._singles = 0
+
+    async def submit(self, item: Any) -> Optional[Any]:
+        """
+        Add a request to the current batch and wait for its result.
+
+        Args:
+            item: Request payload passed to process_batch
+
+        Returns:
+            The item's result, or None when the caller should make a single call
+        """
+        if not self.enabled:
+            return None
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            self._context = contextvars.copy_context()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._dispatch)
+
+        return await future
+
+    def _dispatch(self) -> None:
+        """Close the current window and start its batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = [(item, future) for item, future in self._pending if not future.done()]
+        context, self._context = self._context, None
+        self._pending = []
+        if not batch:
+            return
+        if len(batch) == 1:
+            # Nobody to share the call with - the caller makes its own single call
+            self._singles += 1
+            batch[0][1].set_result(None)
+            return
+
+        # A full window dispatches from the last submitter's submit(); the batch
+        # still runs in the opener's context
+        task = context.run(asyncio.create_task, self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Run one batch and resolve its callers"""
+        results: List[Optional[Any]] = [None] * len(batch)
+        try:
+            returned = await self.process_batch([item for item, _ in batch])
+            if len(returned) == len(batch):
+                results = list(returned)
+            else:
+                logger.warning(
+                    f"{self.name} batch returned {len(returned)} results for {len(batch)} items"
+                )
+        except Exception as e:
+            logger.error(f"{self.name} batch of {len(batch)} failed: {e}")
+
+        self._batches += 1
+        self._batched_items += len(batch)
+        self._failed_items += sum(1 for result in results if result is None)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batching counters.
+
+        Returns:
+            Batcher statistics dictionary
+        """
+        return {
+            "enabled": self.enabled,
+            "window_ms": int(self.window_seconds * 1000),
+            "max_size": self.max_size,
+            "batches": self._batches,
+            "batched_items": self._batched_items,
+            "failed_items": self._failed_items,
+            "singles": self._singles,
+            "avg_batch_size": round(self._batched_items / self._batches, 2) if self._batches else 0.0,
+            "requests_saved": self._batched_items - self._failed_items - self._batches,
+        }
+
+
+__all__ = ["MicroBatcher"]
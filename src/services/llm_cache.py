@@ -0,0 +1,336 @@
+"""
+Two-tier cache for LLM results.
+
+Tier 1 is an in-process LRU (per worker process); tier 2 is the
+llm_result_cache Postgres table, shared by every API and worker process.
+Lookups go memory -> Postgres -> LLM; tier 2 hits are promoted to tier 1 and
+new results are written to Postgres in the background so the request never
+waits on the insert.
+
+Keys hash the operation, its prompt version, the normalized complaint text
+and whatever student context the prompt actually uses. The prompt version
+hashes the model name and prompt template, so changing LLM_MODEL or editing
+a prompt invalidates old entries automatically (purge_stale() removes them
+from Postgres on startup).
+
+Only genuine LLM results are cached - keyword fallbacks are never stored.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, Optional, Set, Tuple
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Trim the Postgres tier to LLM_CACHE_DB_MAX_ROWS after this many writes
+_DB_EVICTION_INTERVAL = 200
+
+
+class LLMResultCache:
+    """In-process LRU in front of a Postgres-backed LLM result cache"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        persistent: bool = True,
+        ttl_seconds: int = 604800,
+        max_memory_entries: int = 2048,
+        max_db_rows: int = 50000
+    ):
+        """
+        Args:
+            enabled: Master switch; when False every lookup is a miss
+            persistent: Use the Postgres tier
+            ttl_seconds: Lifetime of a cached result in both tiers
+            max_memory_entries: In-process LRU size (0 disables tier 1)
+            max_db_rows: Size bound of the Postgres tier
+        """
+        self.enabled = enabled
+        self.persistent = persistent
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_db_rows = max_db_rows
+
+        # key -> (monotonic expiry, result)
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[str, str] = {}
+        self._pending_writes: Set[asyncio.Task] = set()
+        self._writes_since_eviction = 0
+
+        # Counters, keyed by operation type
+        self._memory_hits: Dict[str, int] = defaultdict(int)
+        self._db_hits: Dict[str, int] = defaultdict(int)
+        self._misses: Dict[str, int] = defaultdict(int)
+        self._writes: Dict[str, int] = defaultdict(int)
+        self._memory_evictions = 0
+        self._db_errors = 0
+
+    # ==================== KEYS ====================
+
+    def register_version(self, operation: str, model: str, prompt_template: str) -> str:
+        """
+        Register the current prompt version of an operation.
+
+        Args:
+            operation: Operation type (LLMOperationType value)
+            model: LLM model name
+            prompt_template: Prompt rendered with placeholder inputs
+
+        Returns:
+            Version hash used in cache keys
+        """
+        fingerprint = f"{model}\n{prompt_template}".encode("utf-8")
+        version = hashlib.sha256(fingerprint).hexdigest()[:16]
+        self._versions[operation] = version
+        return version
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize complaint text so trivially different submissions share a key"""
+        text = unicodedata.normalize("NFKC", text or "").casefold()
+        text = " ".join(text.split())
+        return text.rstrip(" .!?")
+
+    def make_key(
+        self,
+        operation: str,
+        text: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Build the cache key for an operation input.
+
+        Args:
+            operation: Operation type (LLMOperationType value)
+            text: Complaint text
+            context: Only the context values the prompt uses
+
+        Returns:
+            SHA-256 hex digest
+        """
+        payload = json.dumps(
+            [
+                operation,
+                self._versions.get(operation, ""),
+                self.normalize_text(text),
+                context or {},
+            ],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ==================== LOOKUP / STORE ====================
+
+    async def get(self, operation: str, key: str) -> Optional[Any]:
+        """
+        Look a result up in memory, then in Postgres.
+
+        Returns:
+            A copy of the cached result (callers may mutate it), or None
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._memory.move_to_end(key)
+                self._memory_hits[operation] += 1
+                logger.debug(f"LLM cache memory hit ({operation})")
+                return copy.deepcopy(value)
+            del self._memory[key]
+
+        if self.persistent:
+            value = await self._db_get(key)
+            if value is not None:
+                self._remember(key, value)
+                self._db_hits[operation] += 1
+                logger.debug(f"LLM cache database hit ({operation})")
+                return copy.deepcopy(value)
+
+        self._misses[operation] += 1
+        return None
+
+    def put(self, operation: str, key: str, value: Any) -> None:
+        """
+        Store an LLM result in both tiers.
+
+        The Postgres write runs in the background.
+
+        Args:
+            operation: Operation type (LLMOperationType value)
+            key: Key from make_key()
+            value: JSON-serializable result
+        """
+        if not self.enabled or value is None:
+            return
+
+        try:
+            # Round-trip through JSON: guarantees the Postgres tier can store it
+            # and detaches the cached copy from the caller's object
+            value = json.loads(json.dumps(value, default=str))
+        except (TypeError, ValueError) as e:
+            logger.warning(f"LLM result for {operation} is not cacheable: {e}")
+            return
+
+        self._remember(key, value)
+        self._writes[operation] += 1
+
+        if self.persistent:
+            self._schedule(self._db_put(operation, key, value))
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Insert into the in-process LRU, evicting the least recently used entries"""
+        if self.max_memory_entries <= 0:
+            return
+
+        self._memory[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._memory_evictions += 1
+
+    def clear_memory(self) -> None:
+        """Drop every in-process entry"""
+        self._memory.clear()
+
+    # ==================== POSTGRES TIER ====================
+
+    async def _db_get(self, key: str) -> Optional[Any]:
+        """Fetch from Postgres; errors count as a miss"""
+        from src.database.connection import AsyncSessionLocal
+        from src.repositories.llm_cache_repo import LLMCacheRepository
+
+        try:
+            async with AsyncSessionLocal() as session:
+                return await LLMCacheRepository(session).get_result(key)
+        except Exception as e:
+            self._db_errors += 1
+            logger.warning(f"LLM cache database lookup failed: {e}")
+            return None
+
+    async def _db_put(self, operation: str, key: str, value: Any) -> None:
+        """Write to Postgres, trimming the table every few hundred writes"""
+        from src.database.connection import AsyncSessionLocal
+        from src.repositories.llm_cache_repo import LLMCacheRepository
+
+        try:
+            async with AsyncSessionLocal() as session:
+                repo = LLMCacheRepository(session)
+                await repo.upsert(
+                    key, operation, self._versions.get(operation, ""), value, self.ttl_seconds
+                )
+
+                self._writes_since_eviction += 1
+                if self._writes_since_eviction >= _DB_EVICTION_INTERVAL:
+                    self._writes_since_eviction = 0
+                    evicted = await repo.evict_least_recently_used(self.max_db_rows)
+                    if evicted:
+                        logger.info(f"LLM cache evicted {evicted} least recently used row(s)")
+        except Exception as e:
+            self._db_errors += 1
+            logger.warning(f"LLM cache database write failed: {e}")
+
+    def _schedule(self, coro) -> None:
+        """Run a coroutine in the background, keeping a reference until it finishes"""
+        task = asyncio.create_task(coro)
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    async def purge_stale(self) -> int:
+        """
+        Remove expired rows and rows from outdated prompt/model versions.
+
+        Called once on startup, after the prompt versions are registered.
+
+        Returns:
+            Number of rows deleted
+        """
+        if not (self.enabled and self.persistent):
+            return 0
+
+        from src.database.connection import AsyncSessionLocal
+        from src.repositories.llm_cache_repo import LLMCacheRepository
+
+        try:
+            async with AsyncSessionLocal() as session:
+                repo = LLMCacheRepository(session)
+                deleted = await repo.purge_stale(dict(self._versions))
+                deleted += await repo.evict_least_recently_used(self.max_db_rows)
+        except Exception as e:
+            self._db_errors += 1
+            logger.warning(f"LLM cache purge failed: {e}")
+            return 0
+
+        if deleted:
+            logger.info(f"LLM cache purged {deleted} stale row(s)")
+        return deleted
+
+    async def flush(self) -> None:
+        """Wait for background Postgres writes (shutdown)"""
+        if self._pending_writes:
+            await asyncio.gather(*list(self._pending_writes), return_exceptions=True)
+
+    # ==================== STATS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters per operation.
+
+        Returns:
+            Cache statistics dictionary
+        """
+        operations = (
+            set(self._memory_hits) | set(self._db_hits) | set(self._misses) | set(self._writes)
+        )
+        per_operation = {}
+        for operation in sorted(operations):
+            hits = self._memory_hits[operation] + self._db_hits[operation]
+            lookups = hits + self._misses[operation]
+            per_operation[operation] = {
+                "memory_hits": self._memory_hits[operation],
+                "db_hits": self._db_hits[operation],
+                "misses": self._misses[operation],
+                "writes": self._writes[operation],
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            }
+
+        total_hits = sum(self._memory_hits.values()) + sum(self._db_hits.values())
+        total_lookups = total_hits + sum(self._misses.values())
+        return {
+            "enabled": self.enabled,
+            "persistent": self.persistent,
+            "ttl_seconds": self.ttl_seconds,
+            "memory_entries": len(self._memory),
+            "memory_max_entries": self.max_memory_entries,
+            "memory_evictions": self._memory_evictions,
+            "db_errors": self._db_errors,
+            "pending_writes": len(self._pending_writes),
+            "hits": total_hits,
+            "lookups": total_lookups,
+            "hit_rate": round(total_hits / total_lookups, 3) if total_lookups else 0.0,
+            "operations": per_operation,
+            "versions": dict(self._versions),
+        }
+
+
+# Create global instance
+llm_cache = LLMResultCache(
+    enabled=settings.LLM_CACHE_ENABLED,
+    persistent=settings.LLM_CACHE_PERSISTENT,
+    ttl_seconds=settings.LLM_CACHE_TTL,
+    max_memory_entries=settings.LLM_CACHE_MEMORY_MAX_ENTRIES,
+    max_db_rows=settings.LLM_CACHE_DB_MAX_ROWS,
+)
+
+__all__ = ["LLMResultCache", "llm_cache"]
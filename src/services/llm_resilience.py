@@ -0,0 +1,478 @@
+"""
+Circuit breakers and adaptive concurrency limiting for Groq calls.
+
+CircuitBreaker (one per operation + model):
+    Tracks the outcome of the last LLM_BREAKER_WINDOW calls. When enough of
+    them failed (timeouts, connection errors, 429, 5xx) or were slow
+    (latency >= LLM_BREAKER_SLOW_CALL_RATIO x the operation timeout), the
+    breaker opens and calls fail fast, so LLMService serves its keyword
+    fallbacks immediately instead of waiting on Groq. After
+    LLM_BREAKER_OPEN_SECONDS one probe call is let through (half-open); its
+    outcome closes the breaker or opens it again.
+
+AIMDLimiter (one per model):
+    Caps in-flight Groq calls per process. Every call that completes at
+    normal latency raises the limit additively (+1 per window of calls);
+    a call that is overloaded (429/5xx/timeout) or much slower than the
+    operation's baseline latency cuts it multiplicatively - at most once
+    per round trip, so one burst of slow responses only counts once. Calls
+    over the limit queue for up to LLM_CONCURRENCY_QUEUE_TIMEOUT and then
+    fail fast.
+
+Request deadlines (src/utils/deadline.py):
+    llm_time_budget() is what is left of the request's deadline minus
+    LLM_DEADLINE_RESERVE. The client manager clamps call timeouts and slot
+    waits to it, and llm_retry() cuts retry waits to it and stops retrying
+    once a further attempt could not get LLM_MIN_CALL_BUDGET.
+
+LatencyWindow:
+    Rolling window of recent latencies with percentiles. The client manager
+    keeps one per operation + model (the hedging delay is its p90) and one per
+    operation + tier for end-to-end latency as callers see it.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Dict, Any, Deque, Optional, Tuple
+
+import httpx
+from tenacity import (
+    retry,
+    stop_after_attempt,
+    stop_any,
+    wait_exponential,
+    retry_if_exception_type
+)
+
+from src.config.settings import settings
+from src.utils.deadline import remaining_time
+from src.utils.exceptions import LLMOverloadedError
+
+logger = logging.getLogger(__name__)
+
+# How fast an operation's baseline latency follows slower observations
+_BASELINE_DRIFT = 0.02
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """
+    Whether an error means Groq is unhealthy or overloaded (vs. a bad request).
+
+    Timeouts, connection errors, 429 and 5xx count; 4xx request errors don't.
+    """
+    from groq import APIConnectionError, APIStatusError
+
+    if isinstance(error, (APIConnectionError, httpx.TimeoutException, httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def llm_time_budget() -> Optional[float]:
+    """
+    Seconds an LLM call may still take under the current request deadline.
+
+    Returns:
+        Remaining budget minus LLM_DEADLINE_RESERVE (never negative), or None
+        outside a deadline scope
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return None
+    return max(remaining - settings.LLM_DEADLINE_RESERVE, 0.0)
+
+
+def llm_retry(
+    max_attempts: Optional[int] = None,
+    min_wait: float = 1,
+    max_wait: float = 60
+):
+    """
+    Retry decorator for LLM methods (httpx errors and timeouts).
+
+    Outside a request deadline this is the usual exponential backoff. Inside
+    one, every wait is cut to what the budget allows and retrying stops once
+    another attempt could not get LLM_MIN_CALL_BUDGET seconds.
+
+    Args:
+        max_attempts: Attempts including the first (default LLM_MAX_RETRIES)
+        min_wait: Minimum backoff (seconds)
+        max_wait: Maximum backoff (seconds)
+    """
+    backoff = wait_exponential(multiplier=1, min=min_wait, max=max_wait)
+
+    def wait_within_deadline(retry_state) -> float:
+        wait = backoff(retry_state)
+        budget = llm_time_budget()
+        if budget is None:
+            return wait
+        return min(wait, max(budget - settings.LLM_MIN_CALL_BUDGET, 0.0))
+
+    def stop_near_deadline(retry_state) -> bool:
+        budget = llm_time_budget()
+        return budget is not None and budget < settings.LLM_MIN_CALL_BUDGET
+
+    return retry(
+        stop=stop_any(stop_after_attempt(max_attempts or settings.LLM_MAX_RETRIES), stop_near_deadline),
+        wait=wait_within_deadline,
+        retry=retry_if_exception_type((httpx.HTTPError, TimeoutError))
+    )
+
+
+class CircuitBreaker:
+    """Error-rate / slow-call-rate circuit breaker with a single half-open probe"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        error_rate: float = 0.5,
+        slow_call_rate: float = 0.8,
+        slow_call_seconds: float = 10.0,
+        open_seconds: float = 30.0
+    ):
+        """
+        Args:
+            name: Label for logs/stats (operation:model)
+            window: Number of recent calls evaluated
+            min_calls: Calls needed in the window before the breaker can trip
+            error_rate: Failed fraction that trips the breaker
+            slow_call_rate: Slow fraction that trips the breaker
+            slow_call_seconds: Latency at which a call counts as slow
+            open_seconds: Time spent open before a probe is allowed
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+
+        self._state = self.CLOSED
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._last_trip_reason: Optional[str] = None
+
+        # Counters
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Current state (an open breaker turns half-open once open_seconds have passed)"""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"Circuit {self.name} half-open, allowing a probe call")
+        return self._state
+
+    def can_attempt(self) -> bool:
+        """Whether allow_request() would let a call through (does not claim the probe)"""
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN and not self._probe_in_flight)
+
+    def allow_request(self) -> bool:
+        """
+        Admit a call.
+
+        In half-open state only one probe call is admitted at a time.
+
+        Returns:
+            False if the call must fail fast
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self._rejected += 1
+        return False
+
+    def note_rejected(self) -> None:
+        """Count a call that was sent to fallback logic without being attempted"""
+        self._rejected += 1
+
+    def record(self, latency: float, failed: bool) -> None:
+        """
+        Record the outcome of an admitted call.
+
+        Args:
+            latency: Call duration in seconds
+            failed: Whether the call failed with an overload error
+        """
+        slow = latency >= self.slow_call_seconds
+
+        if self._state == self.HALF_OPEN:
+            self._probe_in_flight = False
+            if failed or slow:
+                self._trip("probe call failed" if failed else f"probe call took {latency:.1f}s")
+            else:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+                logger.info(f"Circuit {self.name} closed (probe call succeeded)")
+            return
+
+        if self._state == self.OPEN:
+            return  # Call admitted before the breaker opened
+
+        self._outcomes.append((failed, slow))
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+
+        failures = sum(1 for failed_call, _ in self._outcomes if failed_call)
+        slow_calls = sum(1 for _, slow_call in self._outcomes if slow_call)
+        if failures / calls >= self.error_rate:
+            self._trip(f"{failures}/{calls} recent calls failed")
+        elif slow_calls / calls >= self.slow_call_rate:
+            self._trip(f"{slow_calls}/{calls} recent calls slower than {self.slow_call_seconds:.1f}s")
+
+    def release_probe(self) -> None:
+        """Give the half-open probe slot back (admitted call was cancelled before completing)"""
+        self._probe_in_flight = False
+
+    def _trip(self, reason: str) -> None:
+        """Open the breaker"""
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self._outcomes.clear()
+        self._times_opened += 1
+        self._last_trip_reason = reason
+        logger.warning(
+            f"Circuit {self.name} OPEN for {self.open_seconds:.0f}s: {reason}. Using fallback logic."
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state and counters"""
+        state = self.state
+        calls = len(self._outcomes)
+        stats = {
+            "state": state,
+            "window_calls": calls,
+            "window_error_rate": round(sum(1 for f, _ in self._outcomes if f) / calls, 3) if calls else 0.0,
+            "window_slow_rate": round(sum(1 for _, s in self._outcomes if s) / calls, 3) if calls else 0.0,
+            "slow_call_seconds": self.slow_call_seconds,
+            "times_opened": self._times_opened,
+            "rejected": self._rejected,
+            "last_trip_reason": self._last_trip_reason,
+        }
+        if state == self.OPEN:
+            stats["retry_in_seconds"] = round(
+                max(self.open_seconds - (time.monotonic() - self._opened_at), 0.0), 1
+            )
+        return stats
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease cap on concurrent calls"""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 20,
+        latency_factor: float = 2.0,
+        backoff: float = 0.7,
+        queue_timeout: float = 5.0
+    ):
+        """
+        Args:
+            name: Label for logs/stats (model name)
+            initial_limit: Starting concurrency
+            min_limit: Floor of the limit
+            max_limit: Ceiling of the limit
+            latency_factor: A call slower than factor x baseline latency signals congestion
+            backoff: Multiplier applied to the limit on congestion
+            queue_timeout: Max seconds a call waits for a slot before failing fast
+        """
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.latency_factor = latency_factor
+        self.backoff = backoff
+        self.queue_timeout = queue_timeout
+
+        self.limit = float(min(max(initial_limit, min_limit), self.max_limit))
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._baselines: Dict[str, float] = {}
+        self._last_decrease = 0.0
+
+        # Counters
+        self._decreases = 0
+        self._rejected = 0
+        self._queued = 0
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        """
+        Take a concurrency slot, queueing while the limit is reached.
+
+        Args:
+            max_wait: Shorter wait limit than queue_timeout (request deadline)
+
+        Raises:
+            LLMOverloadedError: If no slot frees up in time
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+
+        timeout = self.queue_timeout if max_wait is None else min(self.queue_timeout, max_wait)
+        self._queued += 1
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            slot_granted = waiter.done() and not waiter.cancelled()
+            if not slot_granted:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.CancelledError):
+                if slot_granted:
+                    self.release()
+                raise
+            if slot_granted:
+                return  # Slot handed over just as the wait timed out
+            self._rejected += 1
+            raise LLMOverloadedError(
+                f"{self.name}: no concurrency slot within {timeout:.1f}s "
+                f"(limit {int(self.limit)})"
+            )
+
+    def release(
+        self,
+        operation: Optional[str] = None,
+        started_at: float = 0.0,
+        latency: Optional[float] = None,
+        overloaded: bool = False
+    ) -> None:
+        """
+        Free a slot and adapt the limit to the call's outcome.
+
+        Args:
+            operation: Operation type; latency baselines are kept per operation
+            started_at: time.monotonic() when the call started
+            latency: Call duration in seconds (None = cancelled, no signal)
+            overloaded: The call failed with an overload error
+        """
+        self.in_flight -= 1
+        if latency is not None and operation is not None:
+            self._adapt(operation, started_at, latency, overloaded)
+        self._wake()
+
+    def _adapt(self, operation: str, started_at: float, latency: float, overloaded: bool) -> None:
+        """AIMD step"""
+        baseline = self._baselines.get(operation)
+        congested = overloaded or (baseline is not None and latency > baseline * self.latency_factor)
+
+        if not overloaded:
+            # Fast calls set the baseline; slower ones drag it up slowly, so a
+            # lasting slowdown eventually becomes the new normal
+            if baseline is None or latency < baseline:
+                self._baselines[operation] = latency
+            else:
+                self._baselines[operation] = baseline + (latency - baseline) * _BASELINE_DRIFT
+
+        if congested:
+            # Only calls started after the last cut may cut again (once per round trip)
+            if started_at >= self._last_decrease:
+                previous = int(self.limit)
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = time.monotonic()
+                self._decreases += 1
+                if int(self.limit) != previous:
+                    logger.info(
+                        f"LLM concurrency for {self.name} reduced {previous} -> {int(self.limit)} "
+                        f"({'overload error' if overloaded else f'{operation} took {latency:.1f}s'})"
+                    )
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def _wake(self) -> None:
+        """Hand free slots to queued calls in FIFO order"""
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current window and counters"""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued_now": len(self._waiters),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "decreases": self._decreases,
+            "queued_total": self._queued,
+            "rejected": self._rejected,
+            "baseline_latency_ms": {
+                operation: int(baseline * 1000) for operation, baseline in self._baselines.items()
+            },
+        }
+
+
+class LatencyWindow:
+    """Last N latencies (seconds) with nearest-rank percentiles"""
+
+    def __init__(self, size: int):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, latency: float) -> None:
+        """Record one latency"""
+        self._samples.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Get a percentile of the window.
+
+        Args:
+            q: Fraction between 0 and 1 (0.9 = p90)
+
+        Returns:
+            Latency in seconds, or None while the window is empty
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(max(math.ceil(q * len(ordered)) - 1, 0), len(ordered) - 1)
+        return ordered[index]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sample count and p50/p90/p99 in milliseconds"""
+        stats: Dict[str, Any] = {"samples": len(self._samples)}
+        for name, q in (("p50_ms", 0.5), ("p90_ms", 0.9), ("p99_ms", 0.99)):
+            value = self.percentile(q)
+            stats[name] = None if value is None else int(value * 1000)
+        return stats
+
+
+__all__ = [
+    "CircuitBreaker",
+    "AIMDLimiter",
+    "LatencyWindow",
+    "is_overload_error",
+    "llm_time_budget",
+    "llm_retry",
+]
@@ -1,24 +1,36 @@
 """
 LLM service for Groq API integration.
 Handles complaint categorization, rephrasing, spam detection, etc.
+
+✅ NEW: analyze_complaint() fuses all submission-time operations into one call
+✅ NEW: LLM results are cached (src/services/llm_cache.py)
+✅ NEW: Confident local classifier predictions skip the LLM (src/services/local_classifier.py)
+✅ NEW: Simple operations run on LLM_FAST_MODEL; slow calls are hedged to LLM_FALLBACK_MODEL
+✅ NEW: Concurrent categorizations can share one batched prompt (LLM_BATCH_ENABLED)
 """
 
 import logging
 import json
 import asyncio
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timezone
-import httpx
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type
-)
 
-from groq import Groq
 from src.config.settings import settings
-from src.config.constants import CATEGORIES, MIN_COMPLAINT_LENGTH
+from src.config.constants import (
+    CATEGORIES,
+    MIN_COMPLAINT_LENGTH,
+    LLMOperationType,
+    FALLBACK_CATEGORY_KEYWORDS,
+    FALLBACK_DEPARTMENT_KEYWORDS,
+    FALLBACK_URGENCY_KEYWORDS,
+)
+from src.services.groq_client import groq_client_manager
+from src.services.llm_resilience import llm_retry
+from src.services.llm_batcher import MicroBatcher
+from src.services.llm_cache import llm_cache
+from src.services.llm_telemetry import llm_telemetry
+from src.services.local_classifier import local_classifier
+from src.utils.keyword_matcher import match_keywords
 
 logger = logging.getLogger(__name__)
 
@@ -27,35 +39,86 @@ class LLMService:
     """Service for LLM operations using Groq API"""
 
     def __init__(self):
-        """Initialize LLM service with Groq client.
+        """Initialize LLM service with the shared async Groq client.
 
-        Gracefully handles missing GROQ_API_KEY by setting client to None.
+        Gracefully handles missing GROQ_API_KEY (client is None).
         All LLM methods fall back to keyword-based logic when the client
         is unavailable.
         """
-        self.groq_client = None
+        self.groq_client = groq_client_manager.client
         self.model = settings.LLM_MODEL
+        self.fallback_model = settings.LLM_FALLBACK_MODEL
         self.temperature = settings.LLM_TEMPERATURE
         self.max_tokens = settings.LLM_MAX_TOKENS
         self.timeout = settings.LLM_TIMEOUT
+        self._register_cache_versions()
+        self._categorization_batcher = MicroBatcher(
+            LLMOperationType.BATCH_CATEGORIZATION.value,
+            self._categorize_batch,
+            window_seconds=settings.LLM_BATCH_WINDOW_MS / 1000,
+            max_size=settings.LLM_BATCH_MAX_SIZE,
+            enabled=settings.LLM_BATCH_ENABLED,
+        )
 
-        api_key = settings.GROQ_API_KEY
-        if api_key and api_key.strip():
-            try:
-                self.groq_client = Groq(api_key=api_key)
-                logger.info(f"LLM Service initialized with model: {self.model}")
-            except Exception as e:
-                logger.warning(f"Failed to initialize Groq client: {e}. LLM features will use fallback logic.")
+        if self.groq_client:
+            logger.info(
+                f"LLM Service initialized with model: {self.model} "
+                f"(fast tier: {settings.LLM_FAST_MODEL or self.model}, fallback: {self.fallback_model})"
+            )
+        elif settings.GROQ_API_KEY and settings.GROQ_API_KEY.strip():
+            logger.warning("Groq client failed to initialize. LLM features will use fallback logic.")
         else:
             logger.warning("GROQ_API_KEY is not set. LLM features will use keyword-based fallback logic.")
     
+    # ==================== PROMPT FRAGMENTS ====================
+
+    # Shared between the single-purpose prompts and the fused analysis prompt so
+    # both paths judge a complaint by exactly the same rules.
+    _SPAM_GUIDELINES = """Spam Indicators:
+- Abusive, profane, or offensive language
+- No actual issue or concern described
+- Joke, prank, or sarcastic complaint
+- Repeated gibberish or random characters
+- Personal attack targeting specific individuals by name
+- Test or dummy content (e.g., "test", "asdf")
+- Advertisement or promotional content
+- Completely irrelevant to campus issues
+
+NOT Spam:
+- Valid concerns expressed with emotion or frustration
+- Complaints mentioning authorities in professional context
+- Legitimate issues with informal language
+- Constructive criticism"""
+
+    _REPHRASE_RULES = """- Output 1-2 concise sentences ONLY (max 50 words)
+- Preserve the core issue and key details
+- Fix grammar and spelling
+- Keep it natural and professional
+- Do NOT add new information
+- Do NOT use bullet points or structured format
+- Do NOT start with "The student" or "I would like to"
+"""
+
+    _IMAGE_REQUIREMENT_GUIDELINES = """Image IS REQUIRED only for:
+- Something physically broken or structurally damaged (broken furniture, cracked walls, burst pipes)
+- Exposed electrical hazards (dangling wires, sparking sockets)
+- Visible facility damage (broken doors/windows, large stains, visible mould, water leaking)
+
+Image is NOT REQUIRED for:
+- Pest/hygiene reports (rats sighted, cockroaches present, insects seen) — these are service requests; you cannot photograph pests on demand
+- Absent or insufficient staff (no cleaning staff, guard absent, night duty not performed)
+- Schedule or policy violations (timings changed, rules not followed, no notice given)
+- Service failures (repairs not done despite reports, no response from management, equipment non-functional)
+- Academic or interpersonal issues (faculty problems, exams, harassment, bullying, ragging)
+- Complaints about waiting for action (already reported but not resolved)
+- Any complaint describing a service failure, scheduling issue, or lack of action
+
+DEFAULT: image_required = false unless the complaint explicitly describes visible structural damage that a photo would prove.
+When uncertain, ALWAYS choose false — never block a legitimate complaint over an image."""
+
     # ==================== CATEGORIZATION ====================
     
-    @retry(
-        stop=stop_after_attempt(settings.LLM_MAX_RETRIES),
-        wait=wait_exponential(multiplier=1, min=1, max=60),
-        retry=retry_if_exception_type((httpx.HTTPError, TimeoutError))
-    )
+    @llm_retry()
     async def categorize_complaint(
         self,
         text: str,
@@ -75,24 +138,54 @@ class LLMService:
             logger.warning("Text too short for categorization")
             return self._fallback_categorization(text, context)
 
-        if not self.groq_client:
-            logger.info("Groq client unavailable, using fallback categorization")
+        # ✅ NEW: Routine complaints are categorized by the local classifier
+        # (sub-millisecond); only uncertain ones reach the cache/LLM
+        local_result = local_classifier.categorize(text, context)
+        if local_result is not None:
+            local_result = self._apply_academic_override(text, local_result)
+            logger.info(
+                f"Local categorization: {local_result['category']} "
+                f"(Priority: {local_result['priority']}, Target Dept: {local_result['target_department']}, "
+                f"Confidence: {local_result['confidence']})"
+            )
+            return local_result
+
+        cache_key = llm_cache.make_key(
+            LLMOperationType.CATEGORIZATION.value, text, self._prompt_context(context)
+        )
+        cached = await llm_cache.get(LLMOperationType.CATEGORIZATION.value, cache_key)
+        if cached is not None:
+            logger.info(f"Categorization cache hit: {cached.get('category')}")
+            return cached
+
+        if not self._llm_available(LLMOperationType.CATEGORIZATION):
+            logger.info("Groq unavailable, circuit open or deadline near - using fallback categorization")
             return self._fallback_categorization(text, context)
 
+        # ✅ NEW: Requests arriving within LLM_BATCH_WINDOW_MS share one prompt;
+        # a request left alone in its window or failing validation goes on to a single call
+        batched = await self._categorization_batcher.submit((text, context))
+        if batched is not None:
+            logger.info(
+                f"Batched categorization successful: {batched['category']} "
+                f"(Priority: {batched['priority']}, Target Dept: {batched['target_department']}, "
+                f"Confidence: {batched.get('confidence', 'N/A')})"
+            )
+            llm_cache.put(LLMOperationType.CATEGORIZATION.value, cache_key, batched)
+            return batched
+
         prompt = self._build_categorization_prompt(text, context)
 
         try:
             # ✅ FIXED: Use timezone-aware datetime
             start_time = datetime.now(timezone.utc)
             
-            # Call Groq API (synchronous, so wrap in asyncio.to_thread)
-            response = await asyncio.to_thread(
-                self.groq_client.chat.completions.create,
-                model=self.model,
+            # Call Groq API (shared async client)
+            response = await self._chat_completion(
+                LLMOperationType.CATEGORIZATION,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                timeout=self.timeout
+                max_tokens=self.max_tokens
             )
             
             processing_time = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
@@ -112,29 +205,19 @@ class LLMService:
                 logger.warning("Invalid categorization result, using fallback")
                 return self._fallback_categorization(text, context)
 
-            # Ensure target_department is present (fallback to student's department)
-            if "target_department" not in result or not result["target_department"]:
-                result["target_department"] = context.get("department", "CSE")
-                logger.info(f"No target_department in LLM response, using student's department: {result['target_department']}")
-
-            # Ensure confidence is present
-            if "confidence" not in result:
-                result["confidence"] = 0.8  # Default confidence for successful LLM response
-
-            # Add metadata
-            result["tokens_used"] = response.usage.total_tokens
-            result["processing_time_ms"] = int(processing_time)
-            result["model"] = self.model
-            result["status"] = "Success"
-
-            # Deterministic override: hostel → Department if academic content detected
-            result = self._apply_academic_override(text, result)
+            result = self._complete_categorization_result(
+                text, context, result,
+                tokens_used=response.usage.total_tokens,
+                processing_time_ms=int(processing_time),
+                model=getattr(response, "model", None)
+            )
 
             logger.info(
                 f"Categorization successful: {result['category']} "
                 f"(Priority: {result['priority']}, Target Dept: {result['target_department']}, "
                 f"Confidence: {result.get('confidence', 'N/A')}, Tokens: {result['tokens_used']})"
             )
+            llm_cache.put(LLMOperationType.CATEGORIZATION.value, cache_key, result)
             return result
             
         except json.JSONDecodeError as e:
@@ -144,6 +227,34 @@ class LLMService:
             logger.error(f"LLM categorization error: {e}")
             return self._fallback_categorization(text, context)
     
+    def _complete_categorization_result(
+        self,
+        text: str,
+        context: Dict[str, str],
+        result: Dict[str, Any],
+        tokens_used: Optional[int],
+        processing_time_ms: int,
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Fill defaults and metadata on a validated LLM categorization result"""
+        # Ensure target_department is present (fallback to student's department)
+        if "target_department" not in result or not result["target_department"]:
+            result["target_department"] = context.get("department", "CSE")
+            logger.info(f"No target_department in LLM response, using student's department: {result['target_department']}")
+
+        # Ensure confidence is present
+        if "confidence" not in result:
+            result["confidence"] = 0.8  # Default confidence for successful LLM response
+
+        # Add metadata
+        result["tokens_used"] = tokens_used
+        result["processing_time_ms"] = processing_time_ms
+        result["model"] = model or self.model  # The model that answered (hedged calls)
+        result["status"] = "Success"
+
+        # Deterministic override: hostel → Department if academic content detected
+        return self._apply_academic_override(text, result)
+
     def _build_categorization_prompt(self, text: str, context: Dict[str, str]) -> str:
         """Build prompt for categorization with department detection"""
         gender = context.get('gender', 'Unknown')
@@ -160,7 +271,113 @@ Student context (Gender used ONLY for Men's vs Women's Hostel choice):
 Complaint:
 "{text}"
 
-ROUTING DECISION — follow steps in order, stop at first match:
+{self._build_routing_rules(department)}Respond ONLY with valid JSON (no markdown, no code blocks):
+{{
+  "category": "Men's Hostel|Women's Hostel|General|Department|Disciplinary Committee",
+  "target_department": "CSE|ECE|MECH|CIVIL|EEE|IT|BIO|AERO|RAA|EIE|MBA|AIDS|MTECH_CSE",
+  "priority": "Low|Medium|High|Critical",
+  "reasoning": "Max 40 words",
+  "confidence": 0.0-1.0,
+  "is_against_authority": false,
+  "requires_image": false
+}}
+
+JSON:"""
+    
+    async def _categorize_batch(
+        self,
+        items: List[Tuple[str, Dict[str, str]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Categorize several complaints with one LLM call (MicroBatcher callback).
+
+        Args:
+            items: (text, context) per complaint
+
+        Returns:
+            Completed categorization per item, None where the response for
+            that item is missing or invalid (the caller then makes a single call)
+        """
+        if not self._llm_available(LLMOperationType.BATCH_CATEGORIZATION):
+            return [None] * len(items)
+
+        start_time = datetime.now(timezone.utc)
+        response = await self._chat_completion(
+            LLMOperationType.BATCH_CATEGORIZATION,
+            messages=[{"role": "user", "content": self._build_batch_categorization_prompt(items)}],
+            temperature=self.temperature,
+            max_tokens=min(160 * len(items) + 100, 4000),
+            response_format={"type": "json_object"}
+        )
+        processing_time = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
+
+        parsed = self._extract_json_from_response(response.choices[0].message.content)
+        entries = parsed.get("results") if isinstance(parsed, dict) else None
+        if not isinstance(entries, list):
+            logger.warning("Batched categorization response has no results list")
+            return [None] * len(items)
+
+        by_index: Dict[int, Dict[str, Any]] = {}
+        for entry in entries:
+            if isinstance(entry, dict) and isinstance(entry.get("index"), int):
+                by_index.setdefault(entry.pop("index"), entry)
+
+        tokens_per_item = response.usage.total_tokens // len(items)
+        results: List[Optional[Dict[str, Any]]] = []
+        for number, (text, context) in enumerate(items, start=1):
+            entry = by_index.get(number)
+            if entry is None or not self._validate_categorization_result(entry):
+                logger.warning(f"Batched categorization item {number}/{len(items)} invalid, retrying singly")
+                results.append(None)
+                continue
+            results.append(self._complete_categorization_result(
+                text, context, entry,
+                tokens_used=tokens_per_item,
+                processing_time_ms=int(processing_time),
+                model=getattr(response, "model", None)
+            ))
+
+        logger.info(
+            f"Batched categorization: {sum(r is not None for r in results)}/{len(items)} valid "
+            f"in one call (Tokens: {response.usage.total_tokens})"
+        )
+        return results
+
+    def _build_batch_categorization_prompt(self, items: List[Tuple[str, Dict[str, str]]]) -> str:
+        """Build one prompt categorizing several complaints, each with its own student context"""
+        complaints = "\n\n".join(
+            f"[{number}] Gender: {context.get('gender', 'Unknown')} | "
+            f"Stay Type: {context.get('stay_type', 'Unknown')} | "
+            f"Home Department: {context.get('department', 'Unknown')}\n\"{text}\""
+            for number, (text, context) in enumerate(items, start=1)
+        )
+
+        return f"""You are a complaint routing system at SREC engineering college. Categorize EACH of the {len(items)} complaints below independently.
+
+Each complaint is listed with its student's context (Gender used ONLY for Men's vs Women's Hostel choice).
+
+{complaints}
+
+{self._build_routing_rules("the Home Department listed with that complaint")}Respond ONLY with a single valid JSON object (no markdown), one entry per complaint using its number as "index":
+{{
+  "results": [
+    {{
+      "index": 1,
+      "category": "Men's Hostel|Women's Hostel|General|Department|Disciplinary Committee",
+      "target_department": "CSE|ECE|MECH|CIVIL|EEE|IT|BIO|AERO|RAA|EIE|MBA|AIDS|MTECH_CSE",
+      "priority": "Low|Medium|High|Critical",
+      "reasoning": "Max 40 words",
+      "confidence": 0.0-1.0,
+      "is_against_authority": false
+    }}
+  ]
+}}
+
+JSON:"""
+
+    def _build_routing_rules(self, department: str) -> str:
+        """Routing/priority rules shared by the categorization and analysis prompts"""
+        return f"""ROUTING DECISION — follow steps in order, stop at first match:
 
 STEP 1 — Check for STUDENT BEHAVIORAL MISCONDUCT → "Disciplinary Committee":
 Does the complaint describe ANY of:
@@ -200,19 +417,8 @@ PRIORITY:
 - Medium: moderate disruption to a subset of students or repeated behavioral issue
 - Low: minor inconvenience or first-time minor behavioural issue
 
-Respond ONLY with valid JSON (no markdown, no code blocks):
-{{
-  "category": "Men's Hostel|Women's Hostel|General|Department|Disciplinary Committee",
-  "target_department": "CSE|ECE|MECH|CIVIL|EEE|IT|BIO|AERO|RAA|EIE|MBA|AIDS|MTECH_CSE",
-  "priority": "Low|Medium|High|Critical",
-  "reasoning": "Max 40 words",
-  "confidence": 0.0-1.0,
-  "is_against_authority": false,
-  "requires_image": false
-}}
+"""
 
-JSON:"""
-    
     def _extract_json_from_response(self, content: str) -> Optional[Dict[str, Any]]:
         """Extract JSON from LLM response (handles markdown code blocks)"""
         try:
@@ -262,28 +468,6 @@ JSON:"""
         
         return True
     
-    # Keywords that unambiguously indicate an academic/department issue.
-    # If the LLM returns a hostel category but the text contains any of these,
-    # we override to "Department" — this is deterministic and safe because these
-    # phrases never appear in genuine hostel complaints.
-    _ACADEMIC_OVERRIDE_KEYWORDS = [
-        "lab ",       " lab",        "labs ",       "laboratory",
-        "computer lab","cse lab",     "ece lab",     "it lab",
-        "eee lab",    "mech lab",    "bio lab",     "aero lab",
-        "seminar hall","lecture hall","classroom",
-        "department office", "dept office",
-        "faculty",    "professor",   " hod ",       "head of department",
-        "lab record", "observation book", "lab observation",
-        "project report", "project submission",
-        "timetable",  "exam schedule", "course",    "curriculum",
-        "software license", "software licence", "ide software",
-        "av system",  "av technician", "projector",
-        "server room","computing cluster", "lab in-charge",
-        "oscilloscope","pcb ",        "fabrication lab", "workshop",
-        "practicals", "practical exam",
-        "printer" ,   "printing",
-    ]
-
     def _apply_academic_override(self, text: str, result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Deterministic post-processing override.
@@ -295,34 +479,26 @@ JSON:"""
         if result.get("category") not in ("Men's Hostel", "Women's Hostel"):
             return result   # Only override hostel mis-classifications
 
-        text_lower = text.lower()
-        for kw in self._ACADEMIC_OVERRIDE_KEYWORDS:
-            if kw in text_lower:
-                original = result["category"]
-                result["category"] = "Department"
-                logger.info(
-                    f"Academic override: '{original}' → 'Department' "
-                    f"(triggered by keyword '{kw.strip()}')"
-                )
-                break
+        # ACADEMIC_OVERRIDE_KEYWORDS never appear in genuine hostel complaints
+        kw = match_keywords(text).first("academic_override")
+        if kw:
+            original = result["category"]
+            result["category"] = "Department"
+            logger.info(
+                f"Academic override: '{original}' → 'Department' "
+                f"(triggered by keyword '{kw.strip()}')"
+            )
         return result
 
     def _fallback_categorization(self, text: str, context: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Fallback categorization using keyword matching with student context and department detection"""
-        text_lower = text.lower()
-
-        # Keyword-based categorization
-        category_keywords = {
-            "Hostel": ["hostel", "hostel room", "mess food", "mess hall", "warden", "dorm", "hostel bathroom", "hostel water", "hostel block", "hostel corridor", "hostel gate"],
-            "Department": ["lab", "classroom", "department", "academic", "faculty", "professor", "teacher", "lecture", "course", "exam", "lab equipment"],
-            "Disciplinary Committee": ["ragging", "harassment", "bullying", "threat", "abuse", "assault", "violence", "discrimination", "disturbing class", "misbehaving", "indiscipline"],
-            "General": ["canteen", "library", "playground", "ground", "parking", "transport", "bus", "wifi", "internet", "campus", "infrastructure", "tree", "road", "drainage", "streetlight", "gate"]
-        }
+        # ✅ One pass over the text for every keyword table (see src/utils/keyword_matcher.py)
+        matches = match_keywords(text)
 
         # Count keyword matches for each category
         category_scores = {}
-        for category, keywords in category_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
+        for category in FALLBACK_CATEGORY_KEYWORDS:
+            score = matches.count(f"category:{category}")
             if score > 0:
                 category_scores[category] = score
 
@@ -347,26 +523,9 @@ JSON:"""
                 selected_category = "Men's Hostel"
 
         # ✅ NEW: Department detection using keywords
-        department_keywords = {
-            "CSE": ["cse", "computer science", "computer lab", "cs department"],
-            "ECE": ["ece", "electronics", "communication", "ec department"],
-            "MECH": ["mech", "mechanical", "workshop", "machine"],
-            "CIVIL": ["civil", "construction", "surveying"],
-            "EEE": ["eee", "electrical", "power", "circuits"],
-            "IT": ["it", "information technology", "it lab"],
-            "BIO": ["bio", "biomedical", "biomed"],
-            "AERO": ["aero", "aeronautical", "aerospace"],
-            "RAA": ["raa", "robotics", "automation"],
-            "EIE": ["eie", "instrumentation"],
-            "MBA": ["mba", "management"],
-            "AIDS": ["aids", "ai", "data science", "artificial intelligence"],
-            "MTECH_CSE": ["mtech", "m.tech"]
-        }
-
-        # Detect target department from complaint text
         detected_department = None
-        for dept_code, keywords in department_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
+        for dept_code in FALLBACK_DEPARTMENT_KEYWORDS:
+            if matches.has(f"department:{dept_code}"):
                 detected_department = dept_code
                 break
 
@@ -374,16 +533,9 @@ JSON:"""
         target_department = detected_department or (context.get("department", "CSE") if context else "CSE")
 
         # Determine priority based on urgency keywords
-        urgency_keywords = {
-            "Critical": ["emergency", "urgent", "immediate", "critical", "dangerous", "unsafe"],
-            "High": ["broken", "not working", "damaged", "leaking", "problem"],
-            "Medium": ["issue", "concern", "needs", "improve"],
-            "Low": ["suggestion", "request", "minor"]
-        }
-
         selected_priority = "Medium"
-        for priority, keywords in urgency_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
+        for priority in FALLBACK_URGENCY_KEYWORDS:
+            if matches.has(f"urgency:{priority}"):
                 selected_priority = priority
                 break
 
@@ -393,8 +545,8 @@ JSON:"""
             "priority": selected_priority,
             "reasoning": "Keyword-based categorization (LLM fallback)",
             "confidence": 0.5,  # Lower confidence for fallback
-            "is_against_authority": any(word in text_lower for word in ["faculty", "teacher", "professor", "staff", "warden", "hod"]),
-            "requires_image": any(word in text_lower for word in ["broken", "damaged", "leaking", "dirty"]),
+            "is_against_authority": matches.has("authority_reference"),
+            "requires_image": matches.has("visible_damage"),
             "status": "Fallback"
         }
 
@@ -409,11 +561,7 @@ JSON:"""
     
     # ==================== REPHRASING ====================
     
-    @retry(
-        stop=stop_after_attempt(settings.LLM_MAX_RETRIES),
-        wait=wait_exponential(multiplier=1, min=1, max=60),
-        retry=retry_if_exception_type((httpx.HTTPError, TimeoutError))
-    )
+    @llm_retry()
     async def rephrase_complaint(self, text: str) -> str:
         """
         Rephrase complaint to be professional and clear.
@@ -428,39 +576,52 @@ JSON:"""
             logger.warning("Text too short for rephrasing, returning original")
             return text
 
-        if not self.groq_client:
-            logger.info("Groq client unavailable, skipping rephrasing")
+        cache_key = llm_cache.make_key(LLMOperationType.REPHRASING.value, text)
+        cached = await llm_cache.get(LLMOperationType.REPHRASING.value, cache_key)
+        if cached is not None:
+            return cached
+
+        if not self._llm_available(LLMOperationType.REPHRASING):
+            logger.info("Groq unavailable, circuit open or deadline near - skipping rephrasing")
             return text
 
         prompt = self._build_rephrasing_prompt(text)
         
         try:
-            response = await asyncio.to_thread(
-                self.groq_client.chat.completions.create,
-                model=self.model,
+            response = await self._chat_completion(
+                LLMOperationType.REPHRASING,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,  # Lower for more consistent rephrasing
-                max_tokens=200,
-                timeout=self.timeout
+                max_tokens=200
             )
             
-            rephrased = response.choices[0].message.content.strip()
-            
-            # Remove any markdown formatting
-            rephrased = rephrased.replace("**", "").replace("*", "")
+            rephrased = self._clean_rephrased_text(response.choices[0].message.content)
             
             # If rephrased text is too short or looks invalid, return original
-            if len(rephrased) < 20 or rephrased.startswith("Error"):
+            if not rephrased:
                 logger.warning("Rephrased text looks invalid, returning original")
                 return text
             
             logger.info(f"Rephrasing successful (Original: {len(text)} chars → Rephrased: {len(rephrased)} chars)")
+            llm_cache.put(LLMOperationType.REPHRASING.value, cache_key, rephrased)
             return rephrased
             
         except Exception as e:
             logger.error(f"LLM rephrasing error: {e}")
             return text  # Return original if rephrasing fails
     
+    def _clean_rephrased_text(self, rephrased: Any) -> Optional[str]:
+        """Strip markdown from rephrased text; None if it looks invalid"""
+        if not isinstance(rephrased, str):
+            return None
+        
+        # Remove any markdown formatting
+        rephrased = rephrased.strip().replace("**", "").replace("*", "")
+        
+        if len(rephrased) < 20 or rephrased.startswith("Error"):
+            return None
+        return rephrased
+    
     def _build_rephrasing_prompt(self, text: str) -> str:
         """Build prompt for rephrasing"""
         return f"""Rephrase this student complaint into 1-2 short, clear sentences. Keep the original meaning intact.
@@ -469,23 +630,12 @@ Original:
 "{text}"
 
 Rules:
-- Output 1-2 concise sentences ONLY (max 50 words)
-- Preserve the core issue and key details
-- Fix grammar and spelling
-- Keep it natural and professional
-- Do NOT add new information
-- Do NOT use bullet points or structured format
-- Do NOT start with "The student" or "I would like to"
-
+{self._REPHRASE_RULES}
 Provide ONLY the rephrased text:"""
     
     # ==================== SPAM DETECTION ====================
     
-    @retry(
-        stop=stop_after_attempt(settings.LLM_MAX_RETRIES),
-        wait=wait_exponential(multiplier=1, min=1, max=60),
-        retry=retry_if_exception_type((httpx.HTTPError, TimeoutError))
-    )
+    @llm_retry()
     async def detect_spam(self, text: str) -> Dict[str, Any]:
         """
         Detect if complaint is spam or abusive.
@@ -497,24 +647,17 @@ Provide ONLY the rephrased text:"""
             Dictionary with is_spam, confidence, reason
         """
         # Quick checks first
-        if len(text.strip()) < MIN_COMPLAINT_LENGTH:
-            return {
-                "is_spam": True,
-                "confidence": 1.0,
-                "reason": f"Complaint too short (minimum {MIN_COMPLAINT_LENGTH} characters required)"
-            }
-        
-        # Check for test/dummy content
-        test_phrases = ["test", "testing", "asdf", "qwerty", "dummy", "sample"]
-        if any(phrase in text.lower() for phrase in test_phrases) and len(text) < 50:
-            return {
-                "is_spam": True,
-                "confidence": 0.9,
-                "reason": "Appears to be test/dummy content"
-            }
+        quick_result = self._quick_spam_check(text)
+        if quick_result:
+            return quick_result
+
+        cache_key = llm_cache.make_key(LLMOperationType.SPAM_DETECTION.value, text)
+        cached = await llm_cache.get(LLMOperationType.SPAM_DETECTION.value, cache_key)
+        if cached is not None:
+            return cached
         
-        if not self.groq_client:
-            logger.info("Groq client unavailable, skipping LLM spam detection (assuming not spam)")
+        if not self._llm_available(LLMOperationType.SPAM_DETECTION):
+            logger.info("Groq unavailable, circuit open or deadline near - skipping LLM spam detection (assuming not spam)")
             return {
                 "is_spam": False,
                 "confidence": 0.5,
@@ -524,13 +667,11 @@ Provide ONLY the rephrased text:"""
         prompt = self._build_spam_detection_prompt(text)
 
         try:
-            response = await asyncio.to_thread(
-                self.groq_client.chat.completions.create,
-                model=self.model,
+            response = await self._chat_completion(
+                LLMOperationType.SPAM_DETECTION,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,  # Lower for more consistent detection
-                max_tokens=200,
-                timeout=self.timeout
+                max_tokens=200
             )
             
             content = response.choices[0].message.content
@@ -545,6 +686,7 @@ Provide ONLY the rephrased text:"""
                 }
             
             logger.info(f"Spam detection: {result['is_spam']} (Confidence: {result.get('confidence', 'N/A')})")
+            llm_cache.put(LLMOperationType.SPAM_DETECTION.value, cache_key, result)
             return result
             
         except Exception as e:
@@ -556,6 +698,25 @@ Provide ONLY the rephrased text:"""
                 "reason": "Unable to determine (API error)"
             }
     
+    def _quick_spam_check(self, text: str) -> Optional[Dict[str, Any]]:
+        """Cheap pre-LLM spam checks; returns a spam result or None"""
+        if len(text.strip()) < MIN_COMPLAINT_LENGTH:
+            return {
+                "is_spam": True,
+                "confidence": 1.0,
+                "reason": f"Complaint too short (minimum {MIN_COMPLAINT_LENGTH} characters required)"
+            }
+        
+        # Check for test/dummy content
+        if len(text) < 50 and match_keywords(text).has("test_content"):
+            return {
+                "is_spam": True,
+                "confidence": 0.9,
+                "reason": "Appears to be test/dummy content"
+            }
+        
+        return None
+    
     def _build_spam_detection_prompt(self, text: str) -> str:
         """Build prompt for spam detection"""
         return f"""Detect if this complaint is spam, abusive, or not genuine.
@@ -563,21 +724,7 @@ Provide ONLY the rephrased text:"""
 Complaint Text:
 "{text}"
 
-Spam Indicators:
-- Abusive, profane, or offensive language
-- No actual issue or concern described
-- Joke, prank, or sarcastic complaint
-- Repeated gibberish or random characters
-- Personal attack targeting specific individuals by name
-- Test or dummy content (e.g., "test", "asdf")
-- Advertisement or promotional content
-- Completely irrelevant to campus issues
-
-NOT Spam:
-- Valid concerns expressed with emotion or frustration
-- Complaints mentioning authorities in professional context
-- Legitimate issues with informal language
-- Constructive criticism
+{self._SPAM_GUIDELINES}
 
 Respond ONLY with valid JSON (no markdown):
 {{
@@ -649,11 +796,7 @@ JSON Response:"""
     
     # ==================== IMAGE REQUIREMENT DETECTION ====================
 
-    @retry(
-        stop=stop_after_attempt(settings.LLM_MAX_RETRIES),
-        wait=wait_exponential(multiplier=1, min=1, max=60),
-        retry=retry_if_exception_type((httpx.HTTPError, TimeoutError))
-    )
+    @llm_retry()
     async def check_image_requirement(
         self,
         complaint_text: str,
@@ -677,20 +820,25 @@ JSON Response:"""
                 "confidence": 0.5
             }
 
-        if not self.groq_client:
-            logger.info("Groq client unavailable, using fallback image requirement check")
+        cache_key = llm_cache.make_key(
+            LLMOperationType.IMAGE_REQUIREMENT.value, complaint_text, {"category": category}
+        )
+        cached = await llm_cache.get(LLMOperationType.IMAGE_REQUIREMENT.value, cache_key)
+        if cached is not None:
+            return cached
+
+        if not self._llm_available(LLMOperationType.IMAGE_REQUIREMENT):
+            logger.info("Groq unavailable, circuit open or deadline near - using fallback image requirement check")
             return self._fallback_image_requirement(complaint_text)
 
         prompt = self._build_image_requirement_prompt(complaint_text, category)
 
         try:
-            response = await asyncio.to_thread(
-                self.groq_client.chat.completions.create,
-                model=self.model,
+            response = await self._chat_completion(
+                LLMOperationType.IMAGE_REQUIREMENT,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,  # Lower for more consistent decisions
-                max_tokens=300,
-                timeout=self.timeout
+                max_tokens=300
             )
 
             content = response.choices[0].message.content
@@ -704,6 +852,7 @@ JSON Response:"""
                 f"Image requirement check: {result['image_required']} "
                 f"(Confidence: {result.get('confidence', 'N/A')})"
             )
+            llm_cache.put(LLMOperationType.IMAGE_REQUIREMENT.value, cache_key, result)
             return result
 
         except Exception as e:
@@ -719,22 +868,7 @@ JSON Response:"""
 Complaint:
 "{text}"{category_hint}
 
-Image IS REQUIRED only for:
-- Something physically broken or structurally damaged (broken furniture, cracked walls, burst pipes)
-- Exposed electrical hazards (dangling wires, sparking sockets)
-- Visible facility damage (broken doors/windows, large stains, visible mould, water leaking)
-
-Image is NOT REQUIRED for:
-- Pest/hygiene reports (rats sighted, cockroaches present, insects seen) — these are service requests; you cannot photograph pests on demand
-- Absent or insufficient staff (no cleaning staff, guard absent, night duty not performed)
-- Schedule or policy violations (timings changed, rules not followed, no notice given)
-- Service failures (repairs not done despite reports, no response from management, equipment non-functional)
-- Academic or interpersonal issues (faculty problems, exams, harassment, bullying, ragging)
-- Complaints about waiting for action (already reported but not resolved)
-- Any complaint describing a service failure, scheduling issue, or lack of action
-
-DEFAULT: image_required = false unless the complaint explicitly describes visible structural damage that a photo would prove.
-When uncertain, ALWAYS choose false — never block a legitimate complaint over an image.
+{self._IMAGE_REQUIREMENT_GUIDELINES}
 
 Respond ONLY with valid JSON (no markdown):
 {{
@@ -748,19 +882,8 @@ JSON:"""
 
     def _fallback_image_requirement(self, text: str) -> Dict[str, Any]:
         """Fallback logic for image requirement detection"""
-        text_lower = text.lower()
-
-        # Keywords that typically require visual evidence
-        requires_image_keywords = [
-            "broken", "damaged", "leaking", "leak", "dirty", "filthy", "stain",
-            "crack", "torn", "not working", "malfunctioning", "defective",
-            "unhygienic", "unclean", "blocked", "clogged", "rusty", "peeling",
-            "exposed wire", "hanging", "falling", "detached", "missing",
-            "visible", "see", "look", "show", "picture", "photo"
-        ]
-
-        # Count matches
-        matches = sum(1 for keyword in requires_image_keywords if keyword in text_lower)
+        # Count distinct IMAGE_EVIDENCE_KEYWORDS (keywords that typically require visual evidence)
+        matches = match_keywords(text).count("image_evidence")
 
         # Determine if image is required
         image_required = matches >= 2  # At least 2 strong indicators
@@ -778,6 +901,283 @@ JSON:"""
             "suggested_evidence": "Photo showing the issue clearly" if image_required else None
         }
 
+    # ==================== FUSED ANALYSIS ====================
+
+    # Fields returned by analyze_complaint(), in the order the submission path uses them
+    ANALYSIS_FIELDS = ("spam", "categorization", "rephrased_text", "image_requirement")
+
+    @llm_retry()
+    async def analyze_complaint(
+        self,
+        text: str,
+        context: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """
+        Spam check, categorize, rephrase and check image requirement in ONE LLM call.
+
+        Each field of the JSON response is validated on its own. Only fields
+        that fail validation are recomputed with the individual operations
+        (detect_spam, categorize_complaint, rephrase_complaint,
+        check_image_requirement), so a partially bad response still saves calls.
+
+        Args:
+            text: Complaint text
+            context: Student context (gender, stay_type, department)
+
+        Returns:
+            Dictionary with spam, categorization, rephrased_text and
+            image_requirement (same shapes as the individual operations) plus
+            fallback_fields listing the fields that were recomputed
+        """
+        # Quick checks first - obvious spam never needs the LLM
+        quick_spam = self._quick_spam_check(text)
+        if quick_spam:
+            return {
+                "spam": quick_spam,
+                "categorization": self._fallback_categorization(text, context),
+                "rephrased_text": text,
+                "image_requirement": {
+                    "image_required": False,
+                    "reasoning": "Not analyzed (rejected as spam)",
+                    "confidence": 0.5
+                },
+                "fallback_fields": []
+            }
+
+        cache_key = llm_cache.make_key(
+            LLMOperationType.ANALYSIS.value, text, self._prompt_context(context)
+        )
+        cached = await llm_cache.get(LLMOperationType.ANALYSIS.value, cache_key)
+        if cached is not None:
+            logger.info(f"Fused analysis cache hit: {cached['categorization'].get('category')}")
+            return cached
+
+        if not self._llm_available(LLMOperationType.ANALYSIS):
+            logger.info("Groq unavailable, circuit open or deadline near - using individual fallback operations")
+            analysis = await self._analyze_individually(text, context, list(self.ANALYSIS_FIELDS))
+            analysis["fallback_fields"] = list(self.ANALYSIS_FIELDS)
+            return analysis
+
+        prompt = self._build_analysis_prompt(text, context)
+        parsed = None
+        tokens_used = None
+        answered_by = None
+        processing_time = 0.0
+
+        try:
+            start_time = datetime.now(timezone.utc)
+
+            response = await self._chat_completion(
+                LLMOperationType.ANALYSIS,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+                max_tokens=700,  # Room for all four sections
+                response_format={"type": "json_object"}
+            )
+
+            processing_time = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
+            parsed = self._extract_json_from_response(response.choices[0].message.content)
+            tokens_used = response.usage.total_tokens
+            answered_by = getattr(response, "model", None)
+
+        except Exception as e:
+            logger.error(f"Fused analysis error: {e}")
+
+        analysis: Dict[str, Any] = {}
+        if isinstance(parsed, dict):
+            analysis["spam"] = self._validate_spam_field(parsed.get("spam"))
+
+            categorization = parsed.get("categorization")
+            if isinstance(categorization, dict) and self._validate_categorization_result(categorization):
+                analysis["categorization"] = self._complete_categorization_result(
+                    text, context, categorization,
+                    tokens_used=tokens_used,
+                    processing_time_ms=int(processing_time),
+                    model=answered_by
+                )
+
+            analysis["rephrased_text"] = self._clean_rephrased_text(parsed.get("rephrased_text"))
+            analysis["image_requirement"] = self._validate_image_requirement_field(
+                parsed.get("image_requirement")
+            )
+
+        failed_fields = [field for field in self.ANALYSIS_FIELDS if analysis.get(field) is None]
+        if failed_fields:
+            logger.warning(f"Fused analysis fields failed validation, recomputing: {failed_fields}")
+            category_hint = (analysis.get("categorization") or {}).get("category")
+            analysis.update(
+                await self._analyze_individually(text, context, failed_fields, category_hint)
+            )
+        else:
+            logger.info(
+                f"Fused analysis successful: {analysis['categorization']['category']} "
+                f"(Spam: {analysis['spam']['is_spam']}, "
+                f"Image Required: {analysis['image_requirement']['image_required']}, "
+                f"Tokens: {tokens_used})"
+            )
+
+        analysis["fallback_fields"] = failed_fields
+        if not failed_fields:
+            # Partially recomputed results are cached per operation instead
+            llm_cache.put(LLMOperationType.ANALYSIS.value, cache_key, analysis)
+        return analysis
+
+    async def _analyze_individually(
+        self,
+        text: str,
+        context: Dict[str, str],
+        fields: List[str],
+        category: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Run the single-purpose operation for each requested analysis field concurrently"""
+        operations = {
+            "spam": lambda: self.detect_spam(text),
+            "categorization": lambda: self.categorize_complaint(text, context),
+            "rephrased_text": lambda: self.rephrase_complaint(text),
+            "image_requirement": lambda: self.check_image_requirement(
+                complaint_text=text, category=category
+            ),
+        }
+        results = await asyncio.gather(*(operations[field]() for field in fields))
+        return dict(zip(fields, results))
+
+    def _validate_spam_field(self, value: Any) -> Optional[Dict[str, Any]]:
+        """Validate the spam section of a fused analysis response"""
+        if not isinstance(value, dict) or not isinstance(value.get("is_spam"), bool):
+            return None
+
+        confidence = value.get("confidence")
+        if confidence is not None and (
+            not isinstance(confidence, (int, float)) or not 0.0 <= confidence <= 1.0
+        ):
+            return None
+
+        return value
+
+    def _validate_image_requirement_field(self, value: Any) -> Optional[Dict[str, Any]]:
+        """Validate the image requirement section of a fused analysis response"""
+        if not isinstance(value, dict) or not isinstance(value.get("image_required"), bool):
+            return None
+        return value
+
+    def _build_analysis_prompt(self, text: str, context: Dict[str, str]) -> str:
+        """Build the fused prompt covering spam, routing, rephrasing and image requirement"""
+        gender = context.get('gender', 'Unknown')
+        stay_type = context.get('stay_type', 'Unknown')
+        department = context.get('department', 'Unknown')
+
+        return f"""You are the complaint intake system at SREC engineering college. Complete ALL FOUR tasks for the complaint below.
+
+Student context (Gender used ONLY for Men's vs Women's Hostel choice):
+- Gender: {gender}
+- Stay Type: {stay_type}
+- Home Department: {department}
+
+Complaint:
+"{text}"
+
+TASK 1 — SPAM: Is this complaint spam, abusive, or not genuine?
+{self._SPAM_GUIDELINES}
+
+TASK 2 — CATEGORIZATION:
+{self._build_routing_rules(department)}
+TASK 3 — REPHRASING: Rephrase the complaint into 1-2 short, clear sentences. Keep the original meaning intact.
+{self._REPHRASE_RULES}
+TASK 4 — IMAGE REQUIREMENT: Does this complaint require a photo/image for proper verification?
+{self._IMAGE_REQUIREMENT_GUIDELINES}
+
+Respond ONLY with a single valid JSON object (no markdown):
+{{
+  "spam": {{
+    "is_spam": true|false,
+    "confidence": 0.0-1.0,
+    "reason": "Brief explanation (max 30 words)"
+  }},
+  "categorization": {{
+    "category": "Men's Hostel|Women's Hostel|General|Department|Disciplinary Committee",
+    "target_department": "CSE|ECE|MECH|CIVIL|EEE|IT|BIO|AERO|RAA|EIE|MBA|AIDS|MTECH_CSE",
+    "priority": "Low|Medium|High|Critical",
+    "reasoning": "Max 40 words",
+    "confidence": 0.0-1.0,
+    "is_against_authority": false
+  }},
+  "rephrased_text": "The rephrased complaint",
+  "image_requirement": {{
+    "image_required": true|false,
+    "reasoning": "Max 40 words",
+    "confidence": 0.0-1.0,
+    "suggested_evidence": "What to photograph (only if true, else null)"
+  }}
+}}
+
+JSON:"""
+
+    # ==================== MODEL TIERING / HEDGING ====================
+
+    def _model_for(self, operation: LLMOperationType) -> Tuple[str, str]:
+        """
+        Pick the model an operation runs on.
+
+        Returns:
+            (model, tier) - "fast" for LLM_FAST_OPERATIONS when LLM_FAST_MODEL
+            is set, otherwise "primary" (LLM_MODEL)
+        """
+        if settings.LLM_FAST_MODEL and operation.value in settings.LLM_FAST_OPERATIONS:
+            return settings.LLM_FAST_MODEL, "fast"
+        return self.model, "primary"
+
+    def _llm_available(self, operation: LLMOperationType) -> bool:
+        """Whether the operation's model (or the failover model) can be called right now"""
+        model, _ = self._model_for(operation)
+        if groq_client_manager.allows(operation.value, model):
+            return True
+        return bool(
+            settings.LLM_HEDGING_ENABLED
+            and self.fallback_model
+            and self.fallback_model != model
+            and groq_client_manager.allows(operation.value, self.fallback_model)
+        )
+
+    async def _chat_completion(self, operation: LLMOperationType, **kwargs: Any) -> Any:
+        """Call Groq on the operation's tier model, hedged to the fallback model"""
+        model, tier = self._model_for(operation)
+        return await groq_client_manager.hedged_completion(
+            operation.value,
+            hedge_model=self.fallback_model,
+            tier=tier,
+            model=model,
+            **kwargs
+        )
+
+    # ==================== RESULT CACHE ====================
+
+    def _prompt_context(self, context: Dict[str, str]) -> Dict[str, str]:
+        """The student context values the categorization/analysis prompts use (cache key input)"""
+        return {
+            "gender": context.get("gender", "Unknown"),
+            "stay_type": context.get("stay_type", "Unknown"),
+            "department": context.get("department", "Unknown"),
+        }
+
+    def _register_cache_versions(self) -> None:
+        """Register the model + prompt template of each cached operation with the LLM cache.
+
+        Templates are rendered with placeholder inputs, so editing a prompt or
+        changing LLM_MODEL changes the version and invalidates cached results.
+        """
+        text = "{text}"
+        context = {"gender": "{gender}", "stay_type": "{stay_type}", "department": "{department}"}
+        templates = {
+            LLMOperationType.CATEGORIZATION: self._build_categorization_prompt(text, context),
+            LLMOperationType.REPHRASING: self._build_rephrasing_prompt(text),
+            LLMOperationType.SPAM_DETECTION: self._build_spam_detection_prompt(text),
+            LLMOperationType.IMAGE_REQUIREMENT: self._build_image_requirement_prompt(text, "{category}"),
+            LLMOperationType.ANALYSIS: self._build_analysis_prompt(text, context),
+        }
+        for operation, template in templates.items():
+            model, _ = self._model_for(operation)
+            llm_cache.register_version(operation.value, model, template)
+
     # ==================== UTILITY METHODS ====================
 
     def get_service_stats(self) -> Dict[str, Any]:
@@ -789,11 +1189,20 @@ JSON:"""
         """
         return {
             "model": self.model,
+            "fallback_model": self.fallback_model,
+            "fast_model": settings.LLM_FAST_MODEL,
+            "fast_operations": settings.LLM_FAST_OPERATIONS,
             "temperature": self.temperature,
             "max_tokens": self.max_tokens,
             "timeout": self.timeout,
             "max_retries": settings.LLM_MAX_RETRIES,
-            "status": "operational" if self.groq_client else "fallback_mode"
+            "status": "operational" if self.groq_client else "fallback_mode",
+            "client_pool": groq_client_manager.get_pool_stats(),
+            "resilience": groq_client_manager.get_resilience_stats(),
+            "cache": llm_cache.get_stats(),
+            "telemetry": llm_telemetry.get_stats(),
+            "batching": self._categorization_batcher.get_stats(),
+            "local_classifier": local_classifier.get_stats()
         }
     
     async def test_connection(self) -> Dict[str, Any]:
@@ -814,13 +1223,12 @@ JSON:"""
             # Use timezone-aware datetime
             start_time = datetime.now(timezone.utc)
 
-            response = await asyncio.to_thread(
-                self.groq_client.chat.completions.create,
+            response = await groq_client_manager.chat_completion(
+                LLMOperationType.CONNECTION_TEST.value,
                 model=self.model,
                 messages=[{"role": "user", "content": "Reply with: OK"}],
                 temperature=0,
-                max_tokens=10,
-                timeout=5
+                max_tokens=10
             )
             
             response_time = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
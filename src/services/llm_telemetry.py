@@ -0,0 +1,353 @@
+"""
+LLM call telemetry, written to llm_processing_logs in batches.
+
+The Groq client manager records one entry per Groq call (operation, model,
+status, latency, tokens, cost) from both LLMService and
+ImageVerificationService. record() only appends to an in-memory buffer; a
+background task bulk-inserts the buffer every LLM_TELEMETRY_FLUSH_INTERVAL
+seconds (sooner once LLM_TELEMETRY_BATCH_SIZE entries are waiting), so
+telemetry never adds a database round trip to the request path.
+
+The buffer is bounded (LLM_TELEMETRY_MAX_BUFFER); while the database is
+unreachable the oldest entries are dropped and counted rather than growing
+memory without limit. Calls cancelled mid-flight (the losing side of a
+hedged request) are not recorded.
+
+Calls made while processing a known complaint (the complaint worker) are
+linked to it through complaint_scope(). Their entries are held by the scope
+and only enter the buffer when it exits, so a complaint that is deleted
+because processing rejected it (unlink_on) is never referenced: those
+entries are written with complaint_id NULL. A batch that still hits the
+foreign key (complaint deleted elsewhere) is retried unlinked instead of
+being dropped.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Deque, Iterator, List, Optional, Tuple, Type
+from uuid import UUID
+
+from sqlalchemy.exc import IntegrityError
+
+from src.config.settings import settings
+from src.config.constants import LLM_MODEL_PRICING
+
+logger = logging.getLogger(__name__)
+
+
+class _ComplaintScope:
+    """Entries recorded inside one complaint_scope() block"""
+
+    def __init__(self, complaint_id: Optional[UUID]):
+        self.complaint_id = complaint_id
+        self.entries: List[Dict[str, Any]] = []
+        self.closed = False
+
+
+# Scope the current task's LLM calls belong to (None outside complaint_scope)
+_scope: ContextVar[Optional[_ComplaintScope]] = ContextVar("llm_telemetry_scope", default=None)
+
+# Column sizes of llm_processing_logs
+_MAX_ERROR_LENGTH = 1000
+
+
+class LLMTelemetryWriter:
+    """Buffers LLM call records and bulk-inserts them in the background"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        flush_interval: float = 5.0,
+        batch_size: int = 200,
+        max_buffer: int = 10000,
+        retention_days: int = 30
+    ):
+        """
+        Args:
+            enabled: Master switch; when False record() is a no-op
+            flush_interval: Seconds between background flushes
+            batch_size: Buffered entries that trigger an early flush
+            max_buffer: Entries kept while the database is unreachable
+            retention_days: Rows older than this are purged on startup (0 keeps all)
+        """
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.retention_days = retention_days
+
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+        # Counters
+        self._recorded = 0
+        self._written = 0
+        self._dropped = 0
+        self._flushes = 0
+        self._db_errors = 0
+        self._last_flush_ms = 0.0
+
+    # ==================== RECORDING ====================
+
+    @contextmanager
+    def complaint_scope(
+        self,
+        complaint_id: Optional[UUID],
+        unlink_on: Tuple[Type[BaseException], ...] = ()
+    ) -> Iterator[None]:
+        """
+        Link LLM calls made inside the block (and tasks it starts) to a complaint.
+
+        Entries are buffered when the block exits.
+
+        Args:
+            complaint_id: Complaint the calls belong to
+            unlink_on: Exceptions after which the complaint is deleted; if the
+                block raises one, the entries are written without complaint_id
+        """
+        scope = _ComplaintScope(complaint_id)
+        token = _scope.set(scope)
+        linked = True
+        try:
+            yield
+        except unlink_on:
+            linked = False
+            raise
+        finally:
+            _scope.reset(token)
+            scope.closed = True
+            for entry in scope.entries:
+                entry["complaint_id"] = complaint_id if linked else None
+                self._append(entry)
+
+    def record(
+        self,
+        operation: str,
+        model: str,
+        status: str,
+        processing_time_ms: int,
+        tokens_used: Optional[int] = None,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        error_message: Optional[str] = None
+    ) -> None:
+        """
+        Buffer one Groq call. Never blocks and never raises.
+
+        Args:
+            operation: Operation type (LLMOperationType value)
+            model: Model the call went to
+            status: "Success", "Failed" or "Timeout"
+            processing_time_ms: Call latency
+            tokens_used: Total tokens (successful calls)
+            prompt_tokens: Input tokens (for cost)
+            completion_tokens: Output tokens (for cost)
+            error_message: Error of a failed call
+        """
+        if not self.enabled:
+            return
+
+        scope = _scope.get()
+        entry = {
+            "complaint_id": scope.complaint_id if scope is not None else None,
+            "operation_type": operation,
+            "model": model,
+            "status": status,
+            "processing_time_ms": processing_time_ms,
+            "tokens_used": tokens_used,
+            "cost": estimate_cost(model, prompt_tokens, completion_tokens),
+            "error_message": error_message[:_MAX_ERROR_LENGTH] if error_message else None,
+            "processed_at": datetime.now(timezone.utc),
+        }
+        self._recorded += 1
+
+        if scope is not None and not scope.closed:
+            scope.entries.append(entry)
+        else:
+            self._append(entry)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        """Add an entry to the bounded buffer"""
+        if len(self._buffer) >= self.max_buffer:
+            self._buffer.popleft()
+            self._dropped += 1
+
+        self._buffer.append(entry)
+
+        if len(self._buffer) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+
+    # ==================== BACKGROUND FLUSH ====================
+
+    def start(self) -> None:
+        """Start the background flush loop (call from a running event loop)"""
+        if not self.enabled or self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run(), name="llm-telemetry-flush")
+        logger.info(
+            f"LLM telemetry writer started (flush every {self.flush_interval}s "
+            f"or {self.batch_size} entries)"
+        )
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write what is still buffered (shutdown)"""
+        if self._task is not None:
+            async with self._flush_lock:  # Let a running flush finish its batch
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        """Flush on a timer, or early when the buffer reaches batch_size"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Bulk-insert every buffered entry.
+
+        Returns:
+            Number of rows written
+        """
+        if not self._buffer:
+            return 0
+
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            written = 0
+            while self._buffer:
+                batch: List[Dict[str, Any]] = []
+                while self._buffer and len(batch) < self.batch_size:
+                    batch.append(self._buffer.popleft())
+                if not await self._write(batch):
+                    break
+                written += len(batch)
+            return written
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        """
+        Insert one batch; on failure the batch is dropped and counted.
+
+        A foreign key violation (an entry's complaint was deleted) retries
+        the batch with complaint_id NULL rather than losing it.
+        """
+        from src.database.connection import AsyncSessionLocal
+        from src.repositories.llm_log_repo import LLMLogRepository
+
+        started = time.perf_counter()
+        try:
+            try:
+                async with AsyncSessionLocal() as session:
+                    await LLMLogRepository(session).bulk_insert(batch)
+            except IntegrityError as e:
+                logger.warning(f"LLM telemetry batch references a deleted complaint, writing it unlinked: {e.orig}")
+                batch = [{**entry, "complaint_id": None} for entry in batch]
+                async with AsyncSessionLocal() as session:
+                    await LLMLogRepository(session).bulk_insert(batch)
+        except Exception as e:
+            self._db_errors += 1
+            self._dropped += len(batch)
+            logger.warning(f"LLM telemetry flush failed, dropped {len(batch)} entries: {e}")
+            return False
+
+        self._written += len(batch)
+        self._flushes += 1
+        self._last_flush_ms = (time.perf_counter() - started) * 1000
+        return True
+
+    async def purge_old(self) -> int:
+        """
+        Delete rows older than retention_days (startup).
+
+        Returns:
+            Number of rows deleted
+        """
+        if not self.enabled or self.retention_days <= 0:
+            return 0
+
+        from src.database.connection import AsyncSessionLocal
+        from src.repositories.llm_log_repo import LLMLogRepository
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        try:
+            async with AsyncSessionLocal() as session:
+                deleted = await LLMLogRepository(session).purge_older_than(cutoff)
+        except Exception as e:
+            self._db_errors += 1
+            logger.warning(f"LLM telemetry purge failed: {e}")
+            return 0
+
+        if deleted:
+            logger.info(f"LLM telemetry purged {deleted} row(s) older than {self.retention_days} days")
+        return deleted
+
+    # ==================== STATS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get writer counters.
+
+        Returns:
+            Telemetry writer statistics dictionary
+        """
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None and not self._task.done(),
+            "buffered": len(self._buffer),
+            "recorded": self._recorded,
+            "written": self._written,
+            "dropped": self._dropped,
+            "flushes": self._flushes,
+            "db_errors": self._db_errors,
+            "last_flush_ms": round(self._last_flush_ms, 1),
+        }
+
+
+def estimate_cost(
+    model: str,
+    prompt_tokens: Optional[int],
+    completion_tokens: Optional[int]
+) -> Optional[float]:
+    """
+    Estimate the USD cost of a call from LLM_MODEL_PRICING.
+
+    Returns:
+        Cost in USD, or None for unknown models / calls without usage
+    """
+    pricing = LLM_MODEL_PRICING.get(model)
+    if pricing is None or (prompt_tokens is None and completion_tokens is None):
+        return None
+    input_price, output_price = pricing
+    return ((prompt_tokens or 0) * input_price + (completion_tokens or 0) * output_price) / 1_000_000
+
+
+# Create global instance
+llm_telemetry = LLMTelemetryWriter(
+    enabled=settings.LLM_TELEMETRY_ENABLED,
+    flush_interval=settings.LLM_TELEMETRY_FLUSH_INTERVAL,
+    batch_size=settings.LLM_TELEMETRY_BATCH_SIZE,
+    max_buffer=settings.LLM_TELEMETRY_MAX_BUFFER,
+    retention_days=settings.LLM_TELEMETRY_RETENTION_DAYS,
+)
+
+__all__ = ["LLMTelemetryWriter", "estimate_cost", "llm_telemetry"]
@@ -0,0 +1,436 @@
+"""
+Local complaint classifier (NumPy only).
+
+A small linear model over hashed n-gram features predicts category, target
+department and priority from the complaint text plus student context. It is
+trained offline from historical complaints (python train_classifier.py) and
+loaded on startup; LLMService.categorize_complaint() consults it first and
+only calls Groq when the prediction is below LOCAL_CLASSIFIER_THRESHOLD.
+
+Features:
+    w:<word>, b:<word word>     word unigrams and bigrams
+    c:<4 chars>                 character 4-grams of longer words (typos, plurals)
+    ctx:gender/stay/dept        student context (Men's vs Women's Hostel, home dept)
+Each feature is hashed into 2**hash_bits buckets (CRC32, stable across
+processes); a text becomes a binary vector scaled to unit length.
+
+Model: one softmax regression head per output, trained with full-batch Adam
+and L2 regularization. Prediction is a sum over ~100-300 weight rows, well
+under a millisecond.
+"""
+
+import logging
+import os
+import re
+import time
+import unicodedata
+import zlib
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.keyword_matcher import match_keywords
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Words at least this long also contribute character 4-grams
+_CHAR_NGRAM_MIN_WORD = 5
+
+
+def extract_features(text: str, context: Optional[Dict[str, str]] = None) -> List[str]:
+    """
+    Turn complaint text and student context into feature strings.
+
+    Args:
+        text: Complaint text
+        context: Student context (gender, stay_type, department)
+
+    Returns:
+        Feature strings (duplicates allowed)
+    """
+    normalized = unicodedata.normalize("NFKC", text or "").casefold().replace("’", "'")
+    words = _WORD_RE.findall(normalized)
+
+    features = [f"w:{word}" for word in words]
+    features.extend(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+    for word in words:
+        if len(word) >= _CHAR_NGRAM_MIN_WORD:
+            padded = f"<{word}>"
+            features.extend(f"c:{padded[i:i + 4]}" for i in range(len(padded) - 3))
+
+    context = context or {}
+    features.append(f"ctx:gender={context.get('gender', 'Unknown')}")
+    features.append(f"ctx:stay={context.get('stay_type', 'Unknown')}")
+    features.append(f"ctx:dept={context.get('department', 'Unknown')}")
+    return features
+
+
+def hash_features(features: Sequence[str], dim: int) -> np.ndarray:
+    """Hash feature strings into sorted, distinct bucket indices"""
+    mask = dim - 1
+    return np.unique(np.fromiter(
+        (zlib.crc32(feature.encode("utf-8")) & mask for feature in features),
+        dtype=np.int64,
+        count=len(features)
+    ))
+
+
+class LocalClassifier:
+    """Hashed n-gram softmax regression with one head per predicted field"""
+
+    HEADS = ("category", "target_department", "priority")
+
+    def __init__(self, hash_bits: int = 17):
+        """
+        Args:
+            hash_bits: Feature space size is 2**hash_bits
+        """
+        self.dim = 1 << hash_bits
+        # head -> (weights [dim, classes] float32, bias [classes], class labels)
+        self._heads: Dict[str, Tuple[np.ndarray, np.ndarray, List[str]]] = {}
+        self.metadata: Dict[str, Any] = {}
+        self.path: Optional[str] = None
+
+        # Counters
+        self._predictions = 0
+        self._confident = 0
+        self._total_predict_ms = 0.0
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether every head has a trained model"""
+        return all(head in self._heads for head in self.HEADS)
+
+    # ==================== TRAINING ====================
+
+    def fit(
+        self,
+        texts: Sequence[str],
+        contexts: Sequence[Dict[str, str]],
+        labels: Dict[str, Sequence[Optional[str]]],
+        epochs: int = 150,
+        learning_rate: float = 0.05,
+        l2: float = 1e-5
+    ) -> "LocalClassifier":
+        """
+        Train every head on the same feature matrix.
+
+        Args:
+            texts: Complaint texts
+            contexts: Student context per text
+            labels: Head name -> label per text (None = not labelled for this head)
+            epochs: Full-batch optimization steps
+            learning_rate: Adam step size
+            l2: L2 regularization strength
+
+        Returns:
+            self
+        """
+        indices, indptr, scale = self._vectorize_many(texts, contexts)
+
+        for head in self.HEADS:
+            head_labels = labels.get(head) or [None] * len(texts)
+            classes = sorted({label for label in head_labels if label})
+            if len(classes) < 2:
+                raise ValueError(f"Need at least two classes to train '{head}', got {classes}")
+
+            class_index = {label: i for i, label in enumerate(classes)}
+            y = np.array([class_index.get(label, -1) if label else -1 for label in head_labels])
+            weights, bias = self._fit_head(
+                indices, indptr, scale, y, len(classes), epochs, learning_rate, l2
+            )
+            self._heads[head] = (weights, bias, classes)
+            logger.info(f"Trained '{head}' head: {len(classes)} classes, {int((y >= 0).sum())} samples")
+
+        self.metadata = {
+            "trained_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "samples": len(texts),
+        }
+        return self
+
+    def _vectorize_many(
+        self,
+        texts: Sequence[str],
+        contexts: Sequence[Dict[str, str]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Build a CSR-style binary feature matrix: (column indices, row pointers, row scale)"""
+        rows = [hash_features(extract_features(text, context), self.dim)
+                for text, context in zip(texts, contexts)]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=indptr[1:])
+        indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        scale = 1.0 / np.sqrt(np.maximum(np.diff(indptr), 1))
+        return indices, indptr, scale.astype(np.float32)
+
+    def _fit_head(
+        self,
+        indices: np.ndarray,
+        indptr: np.ndarray,
+        scale: np.ndarray,
+        y: np.ndarray,
+        n_classes: int,
+        epochs: int,
+        learning_rate: float,
+        l2: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Full-batch Adam on the softmax cross-entropy of the labelled rows"""
+        labelled = np.flatnonzero(y >= 0)
+        starts, ends = indptr[labelled], indptr[labelled + 1]
+        lengths = ends - starts
+        row_of = np.repeat(np.arange(len(labelled)), lengths)
+        row_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        cols = np.concatenate([indices[s:e] for s, e in zip(starts, ends)])
+        values = scale[labelled][row_of]
+        targets = np.zeros((len(labelled), n_classes), dtype=np.float32)
+        targets[np.arange(len(labelled)), y[labelled]] = 1.0
+
+        # Only columns that occur in the data ever get a gradient
+        used, local_cols = np.unique(cols, return_inverse=True)
+        weights = np.zeros((len(used), n_classes), dtype=np.float32)
+        bias = np.log(targets.mean(axis=0) + 1e-6).astype(np.float32)
+
+        moments = [np.zeros_like(weights), np.zeros_like(weights), np.zeros_like(bias), np.zeros_like(bias)]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        n = float(len(labelled))
+
+        for step in range(1, epochs + 1):
+            # Every row has context features, so no row is empty and reduceat is safe
+            logits = np.add.reduceat(weights[local_cols] * values[:, None], row_starts, axis=0)
+            probs = _softmax(logits + bias)
+            error = (probs - targets) / n
+
+            contributions = error[row_of] * values[:, None]
+            grad_w = np.stack([
+                np.bincount(local_cols, weights=contributions[:, k], minlength=len(used))
+                for k in range(n_classes)
+            ], axis=1).astype(np.float32)
+            grad_w += l2 * weights
+            grad_b = error.sum(axis=0)
+
+            for param, grad, m, v in ((weights, grad_w, moments[0], moments[1]),
+                                      (bias, grad_b, moments[2], moments[3])):
+                m *= beta1
+                m += (1 - beta1) * grad
+                v *= beta2
+                v += (1 - beta2) * grad * grad
+                m_hat = m / (1 - beta1 ** step)
+                v_hat = v / (1 - beta2 ** step)
+                param -= learning_rate * m_hat / (np.sqrt(v_hat) + eps)
+
+        full = np.zeros((self.dim, n_classes), dtype=np.float32)
+        full[used] = weights
+        return full, bias
+
+    # ==================== PREDICTION ====================
+
+    def predict(
+        self,
+        text: str,
+        context: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, Tuple[str, float]]]:
+        """
+        Predict every head.
+
+        Returns:
+            Head name -> (label, probability), or None when no model is loaded
+        """
+        if not self.is_loaded:
+            return None
+
+        columns = hash_features(extract_features(text, context), self.dim)
+        scale = np.float32(1.0 / np.sqrt(max(len(columns), 1)))
+
+        predictions = {}
+        for head, (weights, bias, classes) in self._heads.items():
+            probs = _softmax(weights[columns].sum(axis=0) * scale + bias)
+            best = int(probs.argmax())
+            predictions[head] = (classes[best], float(probs[best]))
+        return predictions
+
+    def categorize(
+        self,
+        text: str,
+        context: Dict[str, str],
+        threshold: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Categorize a complaint locally if the model is confident enough.
+
+        The decision uses the category probability, and for "Department"
+        complaints also the target department probability (it picks the HOD).
+
+        Args:
+            text: Complaint text
+            context: Student context (gender, stay_type, department)
+            threshold: Minimum probability (default LOCAL_CLASSIFIER_THRESHOLD)
+
+        Returns:
+            Categorization result (same shape as LLMService.categorize_complaint)
+            or None when the classifier is unavailable or not confident
+        """
+        if not self.is_loaded:
+            return None
+
+        threshold = settings.LOCAL_CLASSIFIER_THRESHOLD if threshold is None else threshold
+        start = time.perf_counter()
+        predictions = self.predict(text, context)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self._predictions += 1
+        self._total_predict_ms += elapsed_ms
+
+        category, category_confidence = predictions["category"]
+        department, department_confidence = predictions["target_department"]
+        priority, priority_confidence = predictions["priority"]
+
+        confidence = category_confidence
+        if category == "Department":
+            confidence = min(confidence, department_confidence)
+
+        if confidence < threshold:
+            logger.debug(
+                f"Local classifier not confident: {category} ({confidence:.2f} < {threshold})"
+            )
+            return None
+
+        self._confident += 1
+        return {
+            "category": category,
+            "target_department": department,
+            "priority": priority,
+            "reasoning": (
+                f"Local classifier (category {category_confidence:.2f}, "
+                f"department {department_confidence:.2f}, priority {priority_confidence:.2f})"
+            ),
+            "confidence": round(confidence, 3),
+            "is_against_authority": match_keywords(text).has("authority_reference"),
+            "tokens_used": 0,
+            "processing_time_ms": int(elapsed_ms),
+            "model": "local-classifier",
+            "status": "Local",
+        }
+
+    # ==================== PERSISTENCE ====================
+
+    def save(self, path: str) -> None:
+        """Save every head as a compressed .npz (weights are mostly zero)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        arrays = {"dim": np.array(self.dim)}
+        for head, (weights, bias, classes) in self._heads.items():
+            arrays[f"{head}_weights"] = weights
+            arrays[f"{head}_bias"] = bias
+            arrays[f"{head}_classes"] = np.array(classes)
+        for key, value in self.metadata.items():
+            arrays[f"meta_{key}"] = np.array(value)
+
+        with open(path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        self.path = path
+
+    def load(self, path: str) -> bool:
+        """
+        Load a model saved by save().
+
+        Returns:
+            True if loaded, False if the file does not exist
+        """
+        if not os.path.exists(path):
+            return False
+
+        with np.load(path, allow_pickle=False) as data:
+            self.dim = int(data["dim"])
+            self._heads = {
+                head: (
+                    data[f"{head}_weights"].astype(np.float32),
+                    data[f"{head}_bias"].astype(np.float32),
+                    [str(label) for label in data[f"{head}_classes"]],
+                )
+                for head in self.HEADS
+            }
+            self.metadata = {
+                key[len("meta_"):]: data[key].item()
+                for key in data.files if key.startswith("meta_")
+            }
+        self.path = path
+        return True
+
+    # ==================== STATS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get model info and usage counters.
+
+        Returns:
+            Classifier statistics dictionary
+        """
+        return {
+            "enabled": settings.LOCAL_CLASSIFIER_ENABLED,
+            "loaded": self.is_loaded,
+            "path": self.path,
+            "threshold": settings.LOCAL_CLASSIFIER_THRESHOLD,
+            "classes": {head: classes for head, (_, _, classes) in self._heads.items()},
+            "metadata": dict(self.metadata),
+            "predictions": self._predictions,
+            "confident": self._confident,
+            "coverage": round(self._confident / self._predictions, 3) if self._predictions else 0.0,
+            "avg_predict_ms": round(self._total_predict_ms / self._predictions, 3) if self._predictions else 0.0,
+        }
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    """Row-wise softmax"""
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def load_local_classifier() -> bool:
+    """
+    Load the trained model from LOCAL_CLASSIFIER_PATH (startup).
+
+    A missing model file is not an error - categorization then goes straight
+    to the LLM as before.
+
+    Returns:
+        True if a model was loaded
+    """
+    if not settings.LOCAL_CLASSIFIER_ENABLED:
+        logger.info("Local classifier disabled")
+        return False
+
+    try:
+        loaded = local_classifier.load(settings.LOCAL_CLASSIFIER_PATH)
+    except Exception as e:
+        logger.error(f"Failed to load local classifier from {settings.LOCAL_CLASSIFIER_PATH}: {e}")
+        return False
+
+    if loaded:
+        logger.info(
+            f"Local classifier loaded from {settings.LOCAL_CLASSIFIER_PATH} "
+            f"(trained {local_classifier.metadata.get('trained_at', 'unknown')}, "
+            f"threshold {settings.LOCAL_CLASSIFIER_THRESHOLD})"
+        )
+    else:
+        logger.info(
+            f"No local classifier at {settings.LOCAL_CLASSIFIER_PATH}; "
+            f"run train_classifier.py to create one"
+        )
+    return loaded
+
+
+# Create global instance (empty until load_local_classifier() runs)
+local_classifier = LocalClassifier(hash_bits=settings.LOCAL_CLASSIFIER_HASH_BITS)
+
+__all__ = [
+    "LocalClassifier",
+    "extract_features",
+    "hash_features",
+    "load_local_classifier",
+    "local_classifier",
+]
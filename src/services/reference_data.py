@@ -0,0 +1,319 @@
+"""
+In-memory registry of reference data: categories, departments, authorities.
+
+These tables are small and almost never change (seeded at setup, authorities
+managed by admins), yet the feed, submission and routing paths looked them
+up in SQL on every request. The registry loads them once per process into a
+ReferenceSnapshot - name <-> id maps for categories and departments and the
+authority roster indexed by type and level - so those lookups are
+dictionary hits.
+
+Freshness:
+- Admin writes in this process call invalidate(); the next access reloads.
+- Other processes notice within refresh_seconds: one fingerprint query
+  (row counts, max ids and updated_at of the three tables) is compared with
+  the loaded one, and the snapshot is reloaded only if it differs.
+- If a reload fails the previous snapshot keeps being served.
+
+Snapshots are immutable; a reload swaps in a new one, so a request that
+holds a snapshot sees a consistent view.
+
+Usage:
+    refs = await reference_data.current()
+    general_id = refs.category_id("General")
+    hods = refs.authorities_of_type("HOD")
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AuthorityRef:
+    """Routing-relevant fields of an authority (not an ORM object)"""
+    id: int
+    name: str
+    authority_type: str
+    authority_level: int
+    department_id: Optional[int]
+    is_active: bool
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """Immutable view of the reference tables at one point in time"""
+    category_ids: Dict[str, int] = field(default_factory=dict)
+    category_names: Dict[int, str] = field(default_factory=dict)
+    department_ids: Dict[str, int] = field(default_factory=dict)
+    department_codes: Dict[int, str] = field(default_factory=dict)
+    authorities: Dict[int, AuthorityRef] = field(default_factory=dict)
+    by_type: Dict[str, Tuple[AuthorityRef, ...]] = field(default_factory=dict)
+    by_level: Tuple[AuthorityRef, ...] = ()
+
+    def category_id(self, name: str) -> Optional[int]:
+        """ID of a category by exact name"""
+        return self.category_ids.get(name)
+
+    def category_name(self, category_id: Optional[int]) -> Optional[str]:
+        """Name of a category by ID"""
+        return self.category_names.get(category_id)
+
+    def department_id(self, code: str) -> Optional[int]:
+        """ID of a department by code (e.g. "CSE")"""
+        return self.department_ids.get(code)
+
+    def department_code(self, department_id: Optional[int]) -> Optional[str]:
+        """Code of a department by ID"""
+        return self.department_codes.get(department_id)
+
+    def authority(self, authority_id: Optional[int]) -> Optional[AuthorityRef]:
+        """Authority by ID"""
+        return self.authorities.get(authority_id)
+
+    def authorities_of_type(self, authority_type: str) -> Tuple[AuthorityRef, ...]:
+        """Authorities of a type, in ID order"""
+        return self.by_type.get(authority_type, ())
+
+    def first_of_type(self, authority_type: str, department_id: Optional[int] = None) -> Optional[AuthorityRef]:
+        """
+        First authority of a type, optionally in a department.
+
+        Args:
+            authority_type: Authority type
+            department_id: Require this department (None: any)
+        """
+        for ref in self.authorities_of_type(authority_type):
+            if department_id is None or ref.department_id == department_id:
+                return ref
+        return None
+
+    def higher_authority(self, current_level: int, department_id: Optional[int] = None) -> Optional[AuthorityRef]:
+        """
+        Lowest-level authority above current_level.
+
+        Args:
+            current_level: Level to escalate from
+            department_id: Only authorities of this department or without one
+        """
+        for ref in self.by_level:
+            if ref.authority_level <= current_level:
+                continue
+            if department_id and ref.department_id not in (department_id, None):
+                continue
+            return ref
+        return None
+
+
+class ReferenceDataRegistry:
+    """Per-process cache of categories, departments and the authority roster"""
+
+    def __init__(self, refresh_seconds: float = 30.0):
+        """
+        Args:
+            refresh_seconds: Minimum gap between checks for changes made by
+                other processes (0 checks on every access)
+        """
+        self.refresh_seconds = refresh_seconds
+        self._snapshot: Optional[ReferenceSnapshot] = None
+        self._fingerprint: Optional[Tuple[Any, ...]] = None
+        self._stale = True
+        self._last_check = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+        # Counters
+        self._loads = 0
+        self._checks = 0
+        self._invalidations = 0
+        self._db_errors = 0
+
+    # ==================== ACCESS ====================
+
+    async def current(self) -> ReferenceSnapshot:
+        """
+        The current snapshot, reloading it first if invalidated or changed.
+
+        Returns:
+            ReferenceSnapshot
+
+        Raises:
+            Exception: Database error while nothing has been loaded yet
+        """
+        if (
+            self._snapshot is not None
+            and not self._stale
+            and time.monotonic() - self._last_check < self.refresh_seconds
+        ):
+            return self._snapshot
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if self._snapshot is None or self._stale:
+                await self._reload_or_keep()
+            elif time.monotonic() - self._last_check >= self.refresh_seconds:
+                await self._check()
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Reload on next access (call after writing a reference table)"""
+        self._stale = True
+        self._invalidations += 1
+
+    async def load(self) -> ReferenceSnapshot:
+        """
+        Load everything now (startup).
+
+        Returns:
+            The new snapshot
+        """
+        from src.database.connection import AsyncSessionLocal
+
+        invalidations = self._invalidations
+        async with AsyncSessionLocal() as session:
+            fingerprint = await self._read_fingerprint(session)
+            snapshot = await self._read_snapshot(session)
+
+        self._snapshot = snapshot
+        self._fingerprint = fingerprint
+        # An invalidate() during the load means the snapshot may predate a write
+        self._stale = self._invalidations != invalidations
+        self._last_check = time.monotonic()
+        self._loads += 1
+        logger.info(
+            f"Reference data loaded: {len(snapshot.category_ids)} categories, "
+            f"{len(snapshot.department_ids)} departments, {len(snapshot.authorities)} authorities"
+        )
+        return snapshot
+
+    async def _reload_or_keep(self) -> None:
+        """Reload; keep serving the old snapshot if the database fails"""
+        try:
+            await self.load()
+        except Exception as e:
+            self._db_errors += 1
+            self._last_check = time.monotonic()
+            if self._snapshot is None:
+                raise
+            logger.warning(f"Reference data reload failed, serving previous snapshot: {e}")
+
+    async def _check(self) -> None:
+        """Reload if another process changed a reference table"""
+        from src.database.connection import AsyncSessionLocal
+
+        self._checks += 1
+        self._last_check = time.monotonic()
+        try:
+            async with AsyncSessionLocal() as session:
+                fingerprint = await self._read_fingerprint(session)
+        except Exception as e:
+            self._db_errors += 1
+            logger.warning(f"Reference data check failed: {e}")
+            return
+        if fingerprint != self._fingerprint:
+            logger.info("Reference data changed in the database, reloading")
+            await self._reload_or_keep()
+
+    # ==================== DATABASE ====================
+
+    @staticmethod
+    async def _read_fingerprint(session) -> Tuple[Any, ...]:
+        """Row counts, max ids and max updated_at of the reference tables"""
+        from sqlalchemy import select, func
+        from src.database.models import ComplaintCategory, Department, Authority
+
+        row = (await session.execute(
+            select(
+                select(func.count(ComplaintCategory.id)).scalar_subquery(),
+                select(func.max(ComplaintCategory.id)).scalar_subquery(),
+                select(func.count(Department.id)).scalar_subquery(),
+                select(func.max(Department.id)).scalar_subquery(),
+                select(func.max(Department.updated_at)).scalar_subquery(),
+                select(func.count(Authority.id)).scalar_subquery(),
+                select(func.max(Authority.id)).scalar_subquery(),
+                select(func.max(Authority.updated_at)).scalar_subquery(),
+            )
+        )).one()
+        return tuple(row)
+
+    @staticmethod
+    async def _read_snapshot(session) -> ReferenceSnapshot:
+        """Read the three tables into a new snapshot"""
+        from sqlalchemy import select
+        from src.database.models import ComplaintCategory, Department, Authority
+
+        categories = (await session.execute(
+            select(ComplaintCategory.id, ComplaintCategory.name)
+        )).all()
+        departments = (await session.execute(
+            select(Department.id, Department.code)
+        )).all()
+        authorities = [
+            AuthorityRef(
+                id=row.id,
+                name=row.name,
+                authority_type=row.authority_type,
+                authority_level=row.authority_level,
+                department_id=row.department_id,
+                is_active=row.is_active,
+            )
+            for row in (await session.execute(
+                select(
+                    Authority.id,
+                    Authority.name,
+                    Authority.authority_type,
+                    Authority.authority_level,
+                    Authority.department_id,
+                    Authority.is_active,
+                ).order_by(Authority.id)
+            )).all()
+        ]
+
+        by_type: Dict[str, List[AuthorityRef]] = {}
+        for ref in authorities:
+            by_type.setdefault(ref.authority_type, []).append(ref)
+
+        return ReferenceSnapshot(
+            category_ids={row.name: row.id for row in categories},
+            category_names={row.id: row.name for row in categories},
+            department_ids={row.code: row.id for row in departments},
+            department_codes={row.id: row.code for row in departments},
+            authorities={ref.id: ref for ref in authorities},
+            by_type={t: tuple(refs) for t, refs in by_type.items()},
+            by_level=tuple(sorted(authorities, key=lambda r: (r.authority_level, r.id))),
+        )
+
+    # ==================== STATS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get registry counters.
+
+        Returns:
+            Reference data statistics dictionary
+        """
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "categories": len(snapshot.category_ids) if snapshot else 0,
+            "departments": len(snapshot.department_ids) if snapshot else 0,
+            "authorities": len(snapshot.authorities) if snapshot else 0,
+            "loads": self._loads,
+            "checks": self._checks,
+            "invalidations": self._invalidations,
+            "db_errors": self._db_errors,
+            "refresh_seconds": self.refresh_seconds,
+        }
+
+
+# Create global instance
+reference_data = ReferenceDataRegistry(refresh_seconds=settings.REFERENCE_DATA_REFRESH_SECONDS)
+
+__all__ = ["AuthorityRef", "ReferenceSnapshot", "ReferenceDataRegistry", "reference_data"]
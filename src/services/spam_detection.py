@@ -8,7 +8,9 @@ from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repositories.complaint_repo import ComplaintRepository
-from src.config.constants import SPAM_KEYWORDS, MIN_COMPLAINT_LENGTH
+from src.config.constants import MIN_COMPLAINT_LENGTH
+from src.utils.keyword_matcher import match_keywords
+from src.services.student_trust import student_trust
 
 logger = logging.getLogger(__name__)
 
@@ -63,7 +65,7 @@ class SpamDetectionService:
     
     def contains_spam_keywords(self, text: str) -> bool:
         """
-        Check if text contains spam keywords.
+        Check if text contains spam keywords (SPAM_KEYWORDS from constants and settings).
         
         Args:
             text: Text to check
@@ -71,8 +73,7 @@ class SpamDetectionService:
         Returns:
             True if contains spam keywords
         """
-        text_lower = text.lower()
-        has_spam = any(keyword in text_lower for keyword in SPAM_KEYWORDS)
+        has_spam = match_keywords(text).has("spam")
         
         if has_spam:
             logger.warning("Text contains spam keywords")
@@ -164,6 +165,7 @@ class SpamDetectionService:
             logger.warning(f"Added {student_roll_no} to blacklist: {reason}")
         
         await db.commit()
+        student_trust.invalidate(student_roll_no)
         
         return {
             "student_roll_no": student_roll_no,
@@ -200,6 +202,7 @@ class SpamDetectionService:
         if blacklist:
             await db.delete(blacklist)
             await db.commit()
+            student_trust.invalidate(student_roll_no)
             logger.info(f"Removed {student_roll_no} from blacklist")
             return True
         
@@ -0,0 +1,250 @@
+"""
+Per-student trust scores for the spam-detection fast path.
+
+Students with a long record of legitimate complaints almost never submit
+spam, yet every submission paid for an LLM spam check. The trust score
+turns a student's history into a number between 0 and 1:
+
+    score = legitimate / (legitimate + PRIOR + SPAM_PENALTY * spam)
+
+where legitimate counts Resolved/Closed complaints that were never flagged,
+and spam counts flagged complaints, 'Spam' statuses, the spam_blacklist
+spam_count and spam rejections seen by this process. With the defaults a
+student needs about ten resolved complaints and no spam to clear
+TRUST_SCORE_THRESHOLD. A single spam flag pushes them far below it.
+
+Scores are loaded from the database on first use and cached per process.
+Status changes made here update the cached counts incrementally. Entries
+expire after TRUST_CACHE_TTL_SECONDS so changes made by other workers are
+picked up. Trusted students still get a full LLM check on a random
+TRUST_AUDIT_SAMPLE_RATE share of submissions, so the fast path stays
+audited.
+"""
+
+import logging
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean an authority accepted the complaint as genuine
+LEGITIMATE_STATUSES = ("Resolved", "Closed")
+
+_PRIOR = 3.0
+_SPAM_PENALTY = 10.0
+
+
+@dataclass
+class _TrustRecord:
+    """Cached complaint history of one student"""
+    legitimate: int
+    spam: int
+    expires_at: float
+
+    @property
+    def score(self) -> float:
+        return self.legitimate / (self.legitimate + _PRIOR + _SPAM_PENALTY * self.spam)
+
+
+class StudentTrustCache:
+    """Computes, caches and incrementally updates student trust scores"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        threshold: float = 0.75,
+        audit_sample_rate: float = 0.05,
+        ttl_seconds: float = 600.0,
+        max_entries: int = 10000
+    ):
+        """
+        Args:
+            enabled: Master switch; when False nobody skips the LLM spam check
+            threshold: Minimum score for the fast path
+            audit_sample_rate: Share of trusted submissions still checked by the LLM
+            ttl_seconds: How long a cached score is used before reloading
+            max_entries: Cached students (least recently used are evicted)
+        """
+        self.enabled = enabled
+        self.threshold = threshold
+        self.audit_sample_rate = audit_sample_rate
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._records: "OrderedDict[str, _TrustRecord]" = OrderedDict()
+
+        # Counters
+        self._hits = 0
+        self._loads = 0
+        self._fast_path = 0
+        self._audits = 0
+        self._checked = 0
+
+    # ==================== SCORES ====================
+
+    async def get_score(self, db: AsyncSession, student_roll_no: str) -> float:
+        """
+        Trust score of a student (cached).
+
+        Args:
+            db: Database session
+            student_roll_no: Student roll number
+
+        Returns:
+            Score between 0.0 (no history or spam) and 1.0
+        """
+        record = self._records.get(student_roll_no)
+        if record is not None and record.expires_at > time.monotonic():
+            self._records.move_to_end(student_roll_no)
+            self._hits += 1
+            return record.score
+
+        record = await self._load(db, student_roll_no)
+        self._store(student_roll_no, record)
+        return record.score
+
+    async def skip_llm_spam_check(self, db: AsyncSession, student_roll_no: str) -> bool:
+        """
+        Decide whether a submission may skip LLM spam detection.
+
+        Never raises - on any error the full check runs.
+
+        Args:
+            db: Database session
+            student_roll_no: Student roll number
+
+        Returns:
+            True for trusted students outside the audit sample
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            score = await self.get_score(db, student_roll_no)
+        except Exception as e:
+            logger.warning(f"Trust score lookup failed for {student_roll_no}: {e}")
+            return False
+
+        if score < self.threshold:
+            self._checked += 1
+            return False
+
+        if random.random() < self.audit_sample_rate:
+            self._audits += 1
+            logger.info(f"Trusted student {student_roll_no} (score {score:.2f}) sampled for spam audit")
+            return False
+
+        self._fast_path += 1
+        return True
+
+    async def _load(self, db: AsyncSession, student_roll_no: str) -> _TrustRecord:
+        """Count a student's legitimate and spam history in the database"""
+        from sqlalchemy import select, func, case, or_
+        from src.database.models import Complaint, SpamBlacklist
+
+        is_spam = or_(Complaint.is_marked_as_spam.is_(True), Complaint.status == "Spam")
+        history = await db.execute(
+            select(
+                func.coalesce(func.sum(case(
+                    (Complaint.status.in_(LEGITIMATE_STATUSES) & ~is_spam, 1), else_=0
+                )), 0).label("legitimate"),
+                func.coalesce(func.sum(case((is_spam, 1), else_=0)), 0).label("spam"),
+            ).where(Complaint.student_roll_no == student_roll_no)
+        )
+        row = history.one()
+
+        blacklist = await db.execute(
+            select(func.coalesce(func.sum(SpamBlacklist.spam_count), 0))
+            .where(SpamBlacklist.student_roll_no == student_roll_no)
+        )
+
+        self._loads += 1
+        return _TrustRecord(
+            legitimate=int(row.legitimate),
+            spam=int(row.spam) + int(blacklist.scalar_one()),
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+
+    def _store(self, student_roll_no: str, record: _TrustRecord) -> None:
+        """Cache a record, evicting the least recently used beyond max_entries"""
+        self._records[student_roll_no] = record
+        self._records.move_to_end(student_roll_no)
+        while len(self._records) > self.max_entries:
+            self._records.popitem(last=False)
+
+    # ==================== INCREMENTAL UPDATES ====================
+
+    def record_status_change(self, student_roll_no: str, old_status: str, new_status: str) -> None:
+        """
+        Apply a complaint status change to the cached counts.
+
+        Args:
+            student_roll_no: Complaint owner
+            old_status: Status before the change
+            new_status: Status after the change
+        """
+        record = self._records.get(student_roll_no)
+        if record is None:
+            return  # Loaded with the change already applied on next use
+
+        # Enum members compare by value
+        old_status = getattr(old_status, "value", old_status)
+        new_status = getattr(new_status, "value", new_status)
+        record.legitimate += (
+            (new_status in LEGITIMATE_STATUSES) - (old_status in LEGITIMATE_STATUSES)
+        )
+        record.spam += (new_status == "Spam") - (old_status == "Spam")
+        record.legitimate = max(record.legitimate, 0)
+        record.spam = max(record.spam, 0)
+
+    def record_spam(self, student_roll_no: str) -> None:
+        """Count a spam submission that was rejected before it was stored"""
+        record = self._records.get(student_roll_no)
+        if record is not None:
+            record.spam += 1
+
+    def invalidate(self, student_roll_no: str) -> None:
+        """Drop a cached score (blacklist changes)"""
+        self._records.pop(student_roll_no, None)
+
+    # ==================== STATS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get trust cache counters.
+
+        Returns:
+            Trust cache statistics dictionary
+        """
+        decisions = self._fast_path + self._audits + self._checked
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "audit_sample_rate": self.audit_sample_rate,
+            "cached_students": len(self._records),
+            "cache_hits": self._hits,
+            "loads": self._loads,
+            "fast_path": self._fast_path,
+            "audited": self._audits,
+            "full_checks": self._checked,
+            "fast_path_rate": round(self._fast_path / decisions, 4) if decisions else 0.0,
+        }
+
+
+# Create global instance
+student_trust = StudentTrustCache(
+    enabled=settings.TRUST_FAST_PATH_ENABLED,
+    threshold=settings.TRUST_SCORE_THRESHOLD,
+    audit_sample_rate=settings.TRUST_AUDIT_SAMPLE_RATE,
+    ttl_seconds=settings.TRUST_CACHE_TTL_SECONDS,
+    max_entries=settings.TRUST_CACHE_MAX_ENTRIES,
+)
+
+__all__ = ["StudentTrustCache", "LEGITIMATE_STATUSES", "student_trust"]
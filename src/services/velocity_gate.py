@@ -0,0 +1,421 @@
+"""
+Submission velocity gate - rejects complaint floods before any DB or LLM work.
+
+Keeps a sliding one-hour window of accepted submissions per student and per
+client IP, each with a fingerprint of the complaint text. A submission is
+rejected when:
+- the student already submitted MAX_COMPLAINTS_PER_HOUR complaints in the
+  last hour (the IP limit is that times VELOCITY_IP_LIMIT_MULTIPLIER - many
+  students share the campus NAT)
+- its repetition score reaches SPAM_THRESHOLD_SCORE. The score is
+  1 - 0.5 ** repeats, counted over identical texts in the window, so with the
+  default 0.7 the third identical text within an hour is refused. IP repeats
+  are scaled down by the multiplier.
+
+A submission holds its place in the windows while it is processed, so
+parallel requests count against each other (admit()). It is recorded once
+the complaint is created or queued, and also when the pipeline rejects it
+(spam, validation, a refused upload) - rejected attempts must fill the
+windows, or a spam burst would keep reaching the LLM. Only a server-side
+failure gives the place back, so retrying after a server error does not use
+up the limit.
+
+Checks are pure in-memory. With VELOCITY_SYNC_ENABLED, a background task
+shares the windows between API processes through the submission_events
+table. It inserts this process's accepted submissions and reads everyone
+else's every VELOCITY_SYNC_INTERVAL seconds, so limits hold across workers
+within that delay. The last hour is loaded on startup, so a restart does not
+reset the counters either.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import logging
+import math
+import os
+import re
+import socket
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from src.config.settings import settings
+from src.utils.exceptions import RateLimitExceededError
+
+logger = logging.getLogger(__name__)
+
+_WINDOW_SECONDS = 3600.0
+# Re-read this much before the last sync so rows committed late are not missed
+_SYNC_OVERLAP_SECONDS = 10.0
+_PURGE_INTERVAL_SECONDS = 300.0
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# (timestamp, fingerprint), kept sorted by timestamp
+_Window = List[Tuple[float, str]]
+
+
+@dataclass(frozen=True)
+class Admission:
+    """A submission that passed check() and holds its place in the windows"""
+    student_roll_no: str
+    client_ip: Optional[str]
+    fingerprint: str
+    at: float
+
+
+def text_fingerprint(text: str) -> str:
+    """Short hash of a complaint text, insensitive to case, punctuation and spacing"""
+    normalized = _NON_WORD.sub(" ", text.lower()).strip()
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+
+class SubmissionVelocityGate:
+    """Sliding-window submission counters per student and per IP"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_per_hour: int = 5,
+        ip_multiplier: int = 10,
+        repeat_threshold: float = 0.7,
+        sync_enabled: bool = True,
+        sync_interval: float = 2.0,
+        source: Optional[str] = None
+    ):
+        """
+        Args:
+            enabled: Master switch; when False admit() accepts everything
+            max_per_hour: Submissions per student per hour
+            ip_multiplier: Per-IP limit as a multiple of max_per_hour
+            repeat_threshold: Repetition score that rejects a submission
+            sync_enabled: Share windows with other processes through the database
+            sync_interval: Seconds between syncs
+            source: Id of this process in submission_events (default: host:pid)
+        """
+        self.enabled = enabled
+        self.max_per_hour = max_per_hour
+        self.ip_multiplier = max(ip_multiplier, 1)
+        self.repeat_threshold = repeat_threshold
+        self.sync_enabled = sync_enabled
+        self.sync_interval = sync_interval
+        self.source = source or f"{socket.gethostname()}:{os.getpid()}"
+
+        self._windows: Dict[str, _Window] = {}
+        self._unsynced: List[Dict[str, Any]] = []
+        self._seen_ids: Dict[int, float] = {}
+        self._synced_until: Optional[datetime] = None
+        self._last_purge = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self._accepted = 0
+        self._rejected_later = 0
+        self._refunded = 0
+        self._rejected_velocity = 0
+        self._rejected_repeats = 0
+        self._remote_events = 0
+        self._sync_errors = 0
+
+    # ==================== GATE ====================
+
+    @contextmanager
+    def admit(
+        self,
+        student_roll_no: str,
+        client_ip: Optional[str],
+        text: str,
+        rejections: Tuple[Type[BaseException], ...] = ()
+    ) -> Iterator[None]:
+        """
+        Gate one submission: check() on entry, record() if the block
+        completes or raises one of rejections, refund() on any other
+        exception (server-side failure).
+
+        Args:
+            student_roll_no: Submitting student
+            client_ip: Client address (None when unknown)
+            text: Complaint text
+            rejections: Exceptions that reject the submission itself (spam,
+                validation); they still count against the limits
+
+        Raises:
+            RateLimitExceededError: Too many or too repetitive submissions
+        """
+        admission = self.check(student_roll_no, client_ip, text)
+        try:
+            yield
+        except rejections:
+            self.record(admission, rejected=True)
+            raise
+        except BaseException:
+            self.refund(admission)
+            raise
+        self.record(admission)
+
+    def check(self, student_roll_no: str, client_ip: Optional[str], text: str) -> Optional[Admission]:
+        """
+        Admit a submission or reject it as a flood.
+
+        The admitted submission holds its place in the windows until it is
+        passed to record() or refund().
+
+        Args:
+            student_roll_no: Submitting student
+            client_ip: Client address (None when unknown)
+            text: Complaint text
+
+        Returns:
+            Admission to record or refund (None when the gate is disabled)
+
+        Raises:
+            RateLimitExceededError: Too many or too repetitive submissions
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        fingerprint = text_fingerprint(text)
+        student_window = self._window(f"student:{student_roll_no}", now)
+        ip_window = self._window(f"ip:{client_ip}", now) if client_ip else []
+
+        if len(student_window) >= self.max_per_hour:
+            self._reject_velocity(student_window, now, f"{self.max_per_hour} complaints per hour")
+        ip_limit = self.max_per_hour * self.ip_multiplier
+        if len(ip_window) >= ip_limit:
+            self._reject_velocity(ip_window, now, f"{ip_limit} complaints per hour from one network")
+
+        student_repeats = sum(1 for _, seen in student_window if seen == fingerprint)
+        ip_repeats = sum(1 for _, seen in ip_window if seen == fingerprint)
+        score = max(
+            1 - 0.5 ** student_repeats,
+            1 - 0.5 ** (ip_repeats / self.ip_multiplier),
+        )
+        if score >= self.repeat_threshold:
+            self._rejected_repeats += 1
+            logger.warning(
+                f"Repeated complaint text rejected for {student_roll_no} "
+                f"(ip {client_ip}, score {score:.2f})"
+            )
+            raise RateLimitExceededError(
+                "The same complaint was already submitted several times in the last hour",
+                details={"reason": "repeated_text", "score": round(score, 2), "retry_after": int(_WINDOW_SECONDS)}
+            )
+
+        self._add(student_roll_no, client_ip, fingerprint, now)
+        return Admission(student_roll_no, client_ip, fingerprint, now)
+
+    def record(self, admission: Optional[Admission], rejected: bool = False) -> None:
+        """
+        Keep an admitted submission in the windows and share it with other processes.
+
+        Args:
+            admission: Result of check()
+            rejected: The pipeline rejected it (counted, but not as accepted)
+        """
+        if admission is None:
+            return
+        if rejected:
+            self._rejected_later += 1
+        else:
+            self._accepted += 1
+        if self.sync_enabled:
+            self._unsynced.append({
+                "source": self.source,
+                "student_roll_no": admission.student_roll_no,
+                "client_ip": admission.client_ip,
+                "fingerprint": admission.fingerprint,
+                "created_at": datetime.fromtimestamp(admission.at, timezone.utc),
+            })
+
+    def refund(self, admission: Optional[Admission]) -> None:
+        """Give back the place of an admitted submission that failed server-side"""
+        if admission is None:
+            return
+        entry = (admission.at, admission.fingerprint)
+        keys = [f"student:{admission.student_roll_no}"]
+        if admission.client_ip:
+            keys.append(f"ip:{admission.client_ip}")
+        for key in keys:
+            window = self._windows.get(key)
+            if not window:
+                continue
+            index = bisect.bisect_left(window, entry)
+            if index < len(window) and window[index] == entry:
+                del window[index]
+                if not window:
+                    del self._windows[key]
+        self._refunded += 1
+
+    def _reject_velocity(self, window: _Window, now: float, limit: str) -> None:
+        """Raise for a window that is full"""
+        self._rejected_velocity += 1
+        retry_after = max(int(window[0][0] + _WINDOW_SECONDS - now) + 1, 1)
+        logger.warning(f"Submission flood rejected (limit: {limit})")
+        raise RateLimitExceededError(
+            f"Too many complaints submitted (limit: {limit}). Try again in {math.ceil(retry_after / 60)} minutes",
+            details={"reason": "velocity", "limit": limit, "retry_after": retry_after}
+        )
+
+    def _window(self, key: str, now: float) -> _Window:
+        """Window of a key with entries older than an hour dropped"""
+        window = self._windows.get(key)
+        if window is None:
+            return []
+        cut = bisect.bisect_left(window, (now - _WINDOW_SECONDS, ""))
+        if cut:
+            del window[:cut]
+        if not window:
+            del self._windows[key]
+        return window
+
+    def _add(self, student_roll_no: str, client_ip: Optional[str], fingerprint: str, at: float) -> None:
+        """Insert one submission into the student and IP windows"""
+        bisect.insort(self._windows.setdefault(f"student:{student_roll_no}", []), (at, fingerprint))
+        if client_ip:
+            bisect.insort(self._windows.setdefault(f"ip:{client_ip}", []), (at, fingerprint))
+
+    # ==================== CROSS-PROCESS SYNC ====================
+
+    async def start(self) -> None:
+        """Load the last hour and start the sync loop (call from a running event loop)"""
+        if not self.enabled or not self.sync_enabled or self._task is not None:
+            return
+        await self.sync()
+        self._task = asyncio.create_task(self._run(), name="velocity-gate-sync")
+        logger.info(f"Velocity gate sync started (every {self.sync_interval}s, source {self.source})")
+
+    async def stop(self) -> None:
+        """Stop the sync loop and write unsynced submissions (shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._unsynced:
+            await self._flush()
+
+    async def _run(self) -> None:
+        """Sync on a timer"""
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self.sync()
+
+    async def sync(self) -> None:
+        """Write this process's new submissions and read everyone else's"""
+        await self._flush()
+        await self._pull()
+
+        now = time.monotonic()
+        if now - self._last_purge >= _PURGE_INTERVAL_SECONDS:
+            self._last_purge = now
+            await self._purge()
+
+    async def _flush(self) -> None:
+        """Insert unsynced submissions; kept for the next sync on failure"""
+        if not self._unsynced:
+            return
+
+        from src.database.connection import AsyncSessionLocal
+        from src.repositories.submission_event_repo import SubmissionEventRepository
+
+        batch, self._unsynced = self._unsynced, []
+        try:
+            async with AsyncSessionLocal() as session:
+                await SubmissionEventRepository(session).bulk_insert(batch)
+        except Exception as e:
+            self._sync_errors += 1
+            horizon = datetime.now(timezone.utc) - timedelta(seconds=_WINDOW_SECONDS)
+            self._unsynced = [row for row in batch if row["created_at"] > horizon] + self._unsynced
+            logger.warning(f"Velocity gate flush failed ({len(batch)} events kept): {e}")
+
+    async def _pull(self) -> None:
+        """Merge submissions other processes accepted since the last pull"""
+        from src.database.connection import AsyncSessionLocal
+        from src.repositories.submission_event_repo import SubmissionEventRepository
+
+        started = datetime.now(timezone.utc)
+        since = started - timedelta(seconds=_WINDOW_SECONDS)
+        if self._synced_until is not None:
+            since = max(since, self._synced_until - timedelta(seconds=_SYNC_OVERLAP_SECONDS))
+
+        try:
+            async with AsyncSessionLocal() as session:
+                events = await SubmissionEventRepository(session).get_since(since, self.source)
+        except Exception as e:
+            self._sync_errors += 1
+            logger.warning(f"Velocity gate pull failed: {e}")
+            return
+
+        for event in events:
+            if event.id in self._seen_ids:
+                continue
+            at = event.created_at.timestamp()
+            self._seen_ids[event.id] = at
+            self._add(event.student_roll_no, event.client_ip, event.fingerprint, at)
+            self._remote_events += 1
+        self._synced_until = started
+
+        horizon = time.time() - _WINDOW_SECONDS
+        self._seen_ids = {event_id: at for event_id, at in self._seen_ids.items() if at >= horizon}
+
+    async def _purge(self) -> None:
+        """Delete events older than the window and drop idle in-memory windows"""
+        from src.database.connection import AsyncSessionLocal
+        from src.repositories.submission_event_repo import SubmissionEventRepository
+
+        now = time.time()
+        for key in list(self._windows):
+            self._window(key, now)
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=_WINDOW_SECONDS)
+        try:
+            async with AsyncSessionLocal() as session:
+                await SubmissionEventRepository(session).purge_older_than(cutoff)
+        except Exception as e:
+            self._sync_errors += 1
+            logger.warning(f"Velocity gate purge failed: {e}")
+
+    # ==================== STATS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get gate counters.
+
+        Returns:
+            Velocity gate statistics dictionary
+        """
+        return {
+            "enabled": self.enabled,
+            "max_per_hour": self.max_per_hour,
+            "ip_limit_per_hour": self.max_per_hour * self.ip_multiplier,
+            "repeat_threshold": self.repeat_threshold,
+            "tracked_keys": len(self._windows),
+            "accepted": self._accepted,
+            "rejected_after_admit": self._rejected_later,
+            "refunded": self._refunded,
+            "rejected_velocity": self._rejected_velocity,
+            "rejected_repeats": self._rejected_repeats,
+            "sync_enabled": self.sync_enabled,
+            "syncing": self._task is not None and not self._task.done(),
+            "unsynced": len(self._unsynced),
+            "remote_events": self._remote_events,
+            "sync_errors": self._sync_errors,
+        }
+
+
+# Create global instance
+velocity_gate = SubmissionVelocityGate(
+    enabled=settings.VELOCITY_GATE_ENABLED,
+    max_per_hour=settings.MAX_COMPLAINTS_PER_HOUR,
+    ip_multiplier=settings.VELOCITY_IP_LIMIT_MULTIPLIER,
+    repeat_threshold=settings.SPAM_THRESHOLD_SCORE,
+    sync_enabled=settings.VELOCITY_SYNC_ENABLED,
+    sync_interval=settings.VELOCITY_SYNC_INTERVAL,
+)
+
+__all__ = ["Admission", "SubmissionVelocityGate", "text_fingerprint", "velocity_gate"]
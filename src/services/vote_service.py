@@ -226,12 +226,10 @@ class VoteService:
         Estimate how many students can actually see this complaint.
         Used to measure engagement rate (votes / audience).
         """
-        from src.database.models import Student, ComplaintCategory
+        from src.database.models import Student
+        from src.services.reference_data import reference_data
 
-        category_result = await self.db.execute(
-            select(ComplaintCategory.name).where(ComplaintCategory.id == complaint.category_id)
-        )
-        category_name = category_result.scalar()
+        category_name = (await reference_data.current()).category_name(complaint.category_id)
 
         if category_name == "Men's Hostel":
             q = select(func.count()).select_from(Student).where(
@@ -0,0 +1,17 @@
+"""
+Storage package initialization.
+Content-addressed blob storage for complaint images.
+"""
+
+from .backends import BlobBackend, DatabaseBlobBackend, FilesystemBlobBackend
+from .blob_store import BlobStore, blob_hash, blob_version, blob_store
+
+__all__ = [
+    "BlobBackend",
+    "DatabaseBlobBackend",
+    "FilesystemBlobBackend",
+    "BlobStore",
+    "blob_hash",
+    "blob_version",
+    "blob_store",
+]
@@ -0,0 +1,171 @@
+"""
+Blob storage backends.
+
+A backend stores immutable bytes under their SHA-256 hex digest. Writes are
+idempotent (content addressing: same key, same bytes), so a backend never
+needs locking. Reference counting lives in the blobs table and is handled
+by BlobStore, not here.
+
+Backends:
+- DatabaseBlobBackend: blob_contents table (default; survives ephemeral disks)
+- FilesystemBlobBackend: files under BLOB_STORAGE_DIR, servable with sendfile
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional
+
+
+class BlobBackend(ABC):
+    """Interface of a content-addressed byte store"""
+
+    name: str = ""
+
+    @abstractmethod
+    async def write(self, sha256: str, data: bytes) -> bool:
+        """
+        Store bytes under their digest.
+
+        Returns:
+            True if written, False if the blob was already stored
+        """
+
+    @abstractmethod
+    async def read(self, sha256: str) -> Optional[bytes]:
+        """Bytes of a blob, or None if this backend does not have it"""
+
+    @abstractmethod
+    async def delete(self, sha256: str) -> None:
+        """Remove a blob (missing blobs are ignored)"""
+
+    @abstractmethod
+    async def list_older_than(self, seconds: float) -> List[str]:
+        """Digests of blobs stored more than seconds ago (orphan sweep)"""
+
+    def local_path(self, sha256: str) -> Optional[Path]:
+        """File holding the blob, for zero-copy serving (None if not on local disk)"""
+        return None
+
+
+class DatabaseBlobBackend(BlobBackend):
+    """Blobs in the blob_contents table, written in their own transaction"""
+
+    name = "database"
+
+    async def write(self, sha256: str, data: bytes) -> bool:
+        from sqlalchemy.dialects.postgresql import insert
+        from src.database.connection import AsyncSessionLocal
+        from src.database.models import BlobContent
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                insert(BlobContent)
+                .values(sha256=sha256, data=data)
+                .on_conflict_do_nothing(index_elements=[BlobContent.sha256])
+            )
+            await session.commit()
+            return result.rowcount > 0
+
+    async def read(self, sha256: str) -> Optional[bytes]:
+        from sqlalchemy import select
+        from src.database.connection import AsyncSessionLocal
+        from src.database.models import BlobContent
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(BlobContent.data).where(BlobContent.sha256 == sha256)
+            )
+            return result.scalar_one_or_none()
+
+    async def delete(self, sha256: str) -> None:
+        from sqlalchemy import delete
+        from src.database.connection import AsyncSessionLocal
+        from src.database.models import BlobContent
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(BlobContent).where(BlobContent.sha256 == sha256))
+            await session.commit()
+
+    async def list_older_than(self, seconds: float) -> List[str]:
+        from datetime import datetime, timezone, timedelta
+        from sqlalchemy import select
+        from src.database.connection import AsyncSessionLocal
+        from src.database.models import BlobContent
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=seconds)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(BlobContent.sha256).where(BlobContent.created_at < cutoff)
+            )
+            return list(result.scalars().all())
+
+
+class FilesystemBlobBackend(BlobBackend):
+    """Blobs as files under root/ab/cd/<sha256>, written atomically"""
+
+    name = "filesystem"
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Directory holding the blob tree (created on first write)
+        """
+        self.root = Path(root)
+
+    def _path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    async def write(self, sha256: str, data: bytes) -> bool:
+        return await asyncio.to_thread(self._write_sync, sha256, data)
+
+    def _write_sync(self, sha256: str, data: bytes) -> bool:
+        path = self._path(sha256)
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename, so readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return True
+
+    async def read(self, sha256: str) -> Optional[bytes]:
+        path = self._path(sha256)
+        try:
+            return await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            return None
+
+    async def delete(self, sha256: str) -> None:
+        await asyncio.to_thread(self._path(sha256).unlink, missing_ok=True)
+
+    async def list_older_than(self, seconds: float) -> List[str]:
+        return await asyncio.to_thread(self._list_sync, seconds)
+
+    def _list_sync(self, seconds: float) -> List[str]:
+        if not self.root.exists():
+            return []
+        cutoff = time.time() - seconds
+        return [
+            path.name
+            for path in self.root.glob("??/??/*")
+            if not path.name.startswith(".") and path.stat().st_mtime < cutoff
+        ]
+
+    def local_path(self, sha256: str) -> Optional[Path]:
+        path = self._path(sha256)
+        return path if path.is_file() else None
+
+
+__all__ = ["BlobBackend", "DatabaseBlobBackend", "FilesystemBlobBackend"]
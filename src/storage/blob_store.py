@@ -0,0 +1,294 @@
+"""
+Content-addressed, reference-counted blob store for complaint images.
+
+Bytes are stored once per SHA-256 in the configured backend
+(IMAGE_STORAGE_MODE: database or filesystem) and described by a row in the
+blobs table. Complaints and image renditions reference blobs by hash, so the
+hot complaints table no longer carries image bytes and identical uploads
+share storage.
+
+Writing a reference:
+    sha = await blob_store.put(db, data, "image/jpeg")   # ref_count + 1
+    complaint.image_hash = sha
+    await db.commit()                                    # row commits with the reference
+
+Dropping one:
+    await blob_store.release(db, old_sha)                # ref_count - 1
+
+The bytes are written to the backend before the caller's transaction
+commits; a rolled-back upload leaves an orphan that the garbage collector
+removes after BLOB_GC_GRACE_SECONDS. The collector also recounts references
+from the referencing tables, so rows removed by ON DELETE CASCADE (deleted
+complaints) cannot leak blobs. Run it with `python migrate_blobs.py --gc`.
+"""
+
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text, update, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config.settings import settings
+from src.database.models import Blob
+from src.storage.backends import BlobBackend, DatabaseBlobBackend, FilesystemBlobBackend
+
+logger = logging.getLogger(__name__)
+
+# Hash larger blobs in a thread (hashlib releases the GIL)
+_THREAD_HASH_BYTES = 256 * 1024
+
+
+def blob_hash(data: bytes) -> str:
+    """SHA-256 hex digest used as the blob key"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def blob_version(sha256: Optional[str]) -> Optional[str]:
+    """Short version tag of a blob for cache-busting URLs (?v=...)"""
+    return sha256[:16] if sha256 else None
+
+
+class BlobStore:
+    """Reference-counted blobs over a pluggable backend"""
+
+    def __init__(self, mode: str = "database", root: str = "./uploads/blobs", gc_grace_seconds: int = 3600):
+        """
+        Args:
+            mode: Backend new blobs are written to (database, filesystem)
+            root: Directory of the filesystem backend
+            gc_grace_seconds: Minimum age of unreferenced blobs before deletion
+        """
+        self.backends: Dict[str, BlobBackend] = {
+            "database": DatabaseBlobBackend(),
+            "filesystem": FilesystemBlobBackend(root),
+        }
+        if mode not in self.backends:
+            logger.warning(f"Blob backend '{mode}' is not implemented, storing blobs in the database")
+            mode = "database"
+        self.backend = self.backends[mode]
+        self.gc_grace_seconds = gc_grace_seconds
+
+        # Counters
+        self._puts = 0
+        self._deduplicated = 0
+        self._bytes_written = 0
+        self._reads = 0
+        self._misses = 0
+
+    # ==================== REFERENCES ====================
+
+    async def put(self, db: AsyncSession, data: bytes, mimetype: Optional[str] = None) -> str:
+        """
+        Store bytes (if new) and add one reference. Does not commit.
+
+        Args:
+            db: Session of the transaction that stores the reference
+            data: Blob bytes
+            mimetype: MIME type recorded with the blob
+
+        Returns:
+            SHA-256 hex digest to store as the reference
+        """
+        if len(data) >= _THREAD_HASH_BYTES:
+            sha256 = await asyncio.to_thread(blob_hash, data)
+        else:
+            sha256 = blob_hash(data)
+
+        written = await self.backend.write(sha256, data)
+        self._puts += 1
+        if written:
+            self._bytes_written += len(data)
+        else:
+            self._deduplicated += 1
+
+        await db.execute(
+            insert(Blob)
+            .values(
+                sha256=sha256,
+                size_bytes=len(data),
+                mimetype=mimetype,
+                backend=self.backend.name,
+                ref_count=1,
+            )
+            .on_conflict_do_update(
+                index_elements=[Blob.sha256],
+                set_={
+                    "ref_count": Blob.ref_count + 1,
+                    "backend": self.backend.name,
+                    "updated_at": func.now(),
+                }
+            )
+        )
+        return sha256
+
+    async def release(self, db: AsyncSession, sha256: Optional[str]) -> None:
+        """
+        Drop one reference. Does not commit; bytes are removed by the garbage collector.
+
+        Args:
+            db: Session of the transaction that removes the reference
+            sha256: Blob digest (None is ignored)
+        """
+        if not sha256:
+            return
+        await db.execute(
+            update(Blob)
+            .where(Blob.sha256 == sha256, Blob.ref_count > 0)
+            .values(ref_count=Blob.ref_count - 1, updated_at=func.now())
+        )
+
+    # ==================== READS ====================
+
+    async def read(self, sha256: str) -> Optional[bytes]:
+        """
+        Bytes of a blob from whichever backend has it (active backend first).
+
+        Returns:
+            Blob bytes, or None if no backend has it
+        """
+        self._reads += 1
+        for backend in self._search_order():
+            data = await backend.read(sha256)
+            if data is not None:
+                return data
+        self._misses += 1
+        logger.error(f"Blob {sha256} not found in any backend")
+        return None
+
+    async def read_or_inline(self, sha256: Optional[str], inline: Optional[bytes]) -> Optional[bytes]:
+        """
+        Bytes of an image that is either a blob reference or a legacy inline column.
+
+        Args:
+            sha256: Blob reference (preferred when set)
+            inline: Legacy bytes column value
+
+        Returns:
+            Image bytes or None
+        """
+        if sha256:
+            return await self.read(sha256)
+        return inline
+
+    def local_path(self, sha256: str) -> Optional[Path]:
+        """
+        File holding a blob, for serving with sendfile.
+
+        Returns:
+            Path, or None if the blob is not on local disk
+        """
+        for backend in self._search_order():
+            path = backend.local_path(sha256)
+            if path is not None:
+                return path
+        return None
+
+    def _search_order(self):
+        return [self.backend] + [b for b in self.backends.values() if b is not self.backend]
+
+    # ==================== GARBAGE COLLECTION ====================
+
+    async def collect_garbage(self, grace_seconds: Optional[int] = None) -> Dict[str, int]:
+        """
+        Recount references, delete unreferenced blobs and orphaned bytes.
+
+        Args:
+            grace_seconds: Override of BLOB_GC_GRACE_SECONDS
+
+        Returns:
+            Counts of recounted, deleted and orphaned blobs
+        """
+        from src.database.connection import AsyncSessionLocal
+
+        grace = self.gc_grace_seconds if grace_seconds is None else grace_seconds
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace)
+
+        async with AsyncSessionLocal() as session:
+            recounted = await session.execute(text("""
+                WITH refs AS (
+                    SELECT b.sha256,
+                           (SELECT COUNT(*) FROM complaints c WHERE c.image_hash = b.sha256)
+                         + (SELECT COUNT(*) FROM image_renditions r WHERE r.blob_hash = b.sha256) AS n
+                    FROM blobs b
+                )
+                UPDATE blobs SET ref_count = refs.n
+                FROM refs
+                WHERE blobs.sha256 = refs.sha256 AND blobs.ref_count <> refs.n
+            """))
+            await session.commit()
+
+            # The NOT EXISTS checks re-read the references, so a count made
+            # stale by a concurrent upload never deletes a referenced blob
+            deleted = await session.execute(text("""
+                DELETE FROM blobs b
+                WHERE b.ref_count = 0 AND b.updated_at < :cutoff
+                  AND NOT EXISTS (SELECT 1 FROM complaints c WHERE c.image_hash = b.sha256)
+                  AND NOT EXISTS (SELECT 1 FROM image_renditions r WHERE r.blob_hash = b.sha256)
+                RETURNING b.sha256
+            """), {"cutoff": cutoff})
+            deleted_hashes = [row[0] for row in deleted.all()]
+            await session.commit()
+
+        for sha256 in deleted_hashes:
+            for backend in self.backends.values():
+                await backend.delete(sha256)
+
+        # Bytes without a blobs row: uploads whose transaction rolled back
+        orphans = 0
+        for backend in self.backends.values():
+            stored = await backend.list_older_than(grace)
+            if not stored:
+                continue
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    text("SELECT sha256 FROM blobs WHERE sha256 = ANY(:hashes)"),
+                    {"hashes": stored}
+                )
+                known = {row[0] for row in result.all()}
+            for sha256 in stored:
+                if sha256 not in known:
+                    await backend.delete(sha256)
+                    orphans += 1
+
+        logger.info(
+            f"Blob GC: {recounted.rowcount} ref counts corrected, "
+            f"{len(deleted_hashes)} blobs deleted, {orphans} orphans removed"
+        )
+        return {
+            "recounted": recounted.rowcount,
+            "deleted": len(deleted_hashes),
+            "orphans": orphans,
+        }
+
+    # ==================== STATS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get blob store counters.
+
+        Returns:
+            Blob store statistics dictionary
+        """
+        return {
+            "backend": self.backend.name,
+            "puts": self._puts,
+            "deduplicated": self._deduplicated,
+            "bytes_written": self._bytes_written,
+            "reads": self._reads,
+            "misses": self._misses,
+        }
+
+
+# Create global instance
+blob_store = BlobStore(
+    mode=settings.IMAGE_STORAGE_MODE,
+    root=settings.BLOB_STORAGE_DIR,
+    gc_grace_seconds=settings.BLOB_GC_GRACE_SECONDS,
+)
+
+__all__ = ["BlobStore", "blob_hash", "blob_version", "blob_store"]
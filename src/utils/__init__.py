@@ -61,7 +61,8 @@ from .validators import (
     sanitize_text,
     validate_status_transition,
 )
-from .file_upload import FileUploadHandler, file_upload_handler
+from .file_upload import FileUploadHandler, SpooledImage, file_upload_handler
+from .image_pool import ImageProcessPool, image_pool
 from .helpers import (
     generate_random_string,
     generate_verification_token,
@@ -72,6 +73,7 @@ from .helpers import (
     mask_email,
     is_valid_uuid,
 )
+from .keyword_matcher import KeywordMatcher, KeywordMatches, keyword_matcher, match_keywords
 
 __all__ = [
     # Logger
@@ -123,7 +125,10 @@ __all__ = [
     
     # File Upload
     "FileUploadHandler",
+    "SpooledImage",
     "file_upload_handler",
+    "ImageProcessPool",
+    "image_pool",
     
     # Helpers
     "generate_random_string",
@@ -134,4 +139,10 @@ __all__ = [
     "truncate_text",
     "mask_email",
     "is_valid_uuid",
+    
+    # Keyword Matcher
+    "KeywordMatcher",
+    "KeywordMatches",
+    "keyword_matcher",
+    "match_keywords",
 ]
@@ -0,0 +1,69 @@
+"""
+Request-scoped deadlines.
+
+A route opens a deadline scope around its work; everything awaited inside
+it (ComplaintService, LLMService, image verification and any asyncio tasks
+they start - tasks copy the current context) sees the same deadline through
+a context variable, so no method signature has to carry it.
+
+The Groq client manager reads it to shrink timeouts and retries to the
+remaining budget and to skip LLM calls (callers use their fallback logic)
+once too little time is left.
+
+Usage:
+    with request_deadline(settings.COMPLAINT_REQUEST_DEADLINE):
+        result = await service.create_complaint(...)
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# time.monotonic() value at which the current request's budget runs out
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Run the enclosed block under a deadline.
+
+    Nested scopes can only shorten the deadline, never extend it.
+
+    Args:
+        seconds: Time budget from now (None or <= 0: no deadline)
+
+    Yields:
+        The effective deadline (time.monotonic() value) or None
+    """
+    if not seconds or seconds <= 0:
+        yield _deadline.get()
+        return
+
+    expires_at = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        expires_at = min(expires_at, outer)
+
+    token = _deadline.set(expires_at)
+    try:
+        yield expires_at
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """
+    Seconds left before the current deadline.
+
+    Returns:
+        Remaining seconds (never negative), or None outside a deadline scope
+    """
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return max(expires_at - time.monotonic(), 0.0)
+
+
+__all__ = ["request_deadline", "remaining_time"]
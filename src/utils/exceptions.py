@@ -176,8 +176,12 @@ class BlacklistedError(BusinessLogicError):
 class RateLimitExceededError(BusinessLogicError):
     """Rate limit exceeded"""
     
-    def __init__(self, message: str = "Rate limit exceeded. Please try again later"):
-        super().__init__(message, error_code="RATE_LIMIT_EXCEEDED")
+    def __init__(
+        self,
+        message: str = "Rate limit exceeded. Please try again later",
+        details: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(message, error_code="RATE_LIMIT_EXCEEDED", details=details)
 
 
 class InvalidStatusTransitionError(BusinessLogicError):
@@ -247,6 +251,27 @@ class LLMServiceError(ExternalServiceError):
         super().__init__("LLM", message)
 
 
+class LLMCircuitOpenError(LLMServiceError):
+    """LLM calls for an operation/model are failing fast (circuit breaker open)"""
+    
+    def __init__(self, message: str = "Circuit breaker open"):
+        super().__init__(message)
+
+
+class LLMOverloadedError(LLMServiceError):
+    """No LLM concurrency slot became free in time"""
+    
+    def __init__(self, message: str = "Too many concurrent LLM calls"):
+        super().__init__(message)
+
+
+class LLMDeadlineExceededError(LLMServiceError):
+    """Not enough of the request's time budget left for an LLM call"""
+    
+    def __init__(self, message: str = "Request deadline exceeded"):
+        super().__init__(message)
+
+
 class DatabaseError(ExternalServiceError):
     """Database error"""
     
@@ -330,6 +355,9 @@ __all__ = [
     "FileTooLargeError",
     "ExternalServiceError",
     "LLMServiceError",
+    "LLMCircuitOpenError",
+    "LLMOverloadedError",
+    "LLMDeadlineExceededError",
     "DatabaseError",
     "to_http_exception",
 ]
@@ -4,8 +4,11 @@ File upload and storage utilities.
 ✅ BINARY STORAGE: Primary methods for database storage (no disk)
 ✅ FILESYSTEM STORAGE: Legacy methods for backward compatibility
 ✅ DATA URI CONVERSION: For Groq Vision API integration
-✅ IMAGE OPTIMIZATION: In-memory compression and resizing
+✅ IMAGE OPTIMIZATION: In-memory compression and resizing (in a process pool)
+✅ RENDITIONS: Thumbnail and medium copies (WebP + JPEG) from one decode
 ✅ VALIDATION: File type, size, and image format validation
+✅ STREAMING: Uploads read in chunks - size cap and magic-byte sniffing as
+   bytes arrive, spooled to a temp file above a threshold
 
 Architecture:
 - Binary storage methods (NEW): For production deployment on Render/Heroku
@@ -16,9 +19,11 @@ import os
 import uuid
 import shutil
 import base64
+import asyncio
+import tempfile
 from io import BytesIO
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 from fastapi import UploadFile
 from PIL import Image
@@ -27,6 +32,106 @@ from src.config.settings import settings
 from src.utils.exceptions import InvalidFileTypeError, FileTooLargeError, FileUploadError
 from src.utils.validators import validate_file_extension
 from src.utils.logger import app_logger
+from src.utils.image_pool import (
+    image_pool, ImageSource, verify_image, optimize_image, make_thumbnail, make_renditions
+)
+
+
+# Leading bytes of the accepted image formats -> MIME type
+_IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+)
+_SNIFF_BYTES = 12
+
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """
+    MIME type of an image from its first bytes.
+    
+    Args:
+        header: At least the first 12 bytes of the file
+    
+    Returns:
+        MIME type, or None if the bytes are not a supported image format
+    """
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, mimetype in _IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return mimetype
+    return None
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class SpooledImage:
+    """
+    Uploaded image read by FileUploadHandler.read_image_upload().
+    
+    Small images are held in memory; images larger than
+    UPLOAD_SPOOL_THRESHOLD live in a temp file whose path is handed to the
+    image pool instead of the bytes. close() (or a with block) removes it.
+    """
+    
+    def __init__(
+        self,
+        filename: str,
+        mimetype: str,
+        size: int,
+        data: Optional[bytes] = None,
+        path: Optional[str] = None
+    ):
+        """
+        Args:
+            filename: Original filename
+            mimetype: MIME type sniffed from the content
+            size: Size in bytes
+            data: Content, if held in memory
+            path: Temp file holding the content, if spooled
+        """
+        self.filename = filename
+        self.mimetype = mimetype
+        self.size = size
+        self.data = data
+        self.path = path
+    
+    @property
+    def spooled(self) -> bool:
+        """Whether the content is in a temp file"""
+        return self.path is not None
+    
+    @property
+    def source(self) -> ImageSource:
+        """Bytes or temp file path, for the image pool transforms"""
+        return self.path if self.path is not None else self.data
+    
+    async def read_bytes(self) -> bytes:
+        """Full content (read from the temp file if spooled)"""
+        if self.path is None:
+            return self.data
+        return await asyncio.to_thread(Path(self.path).read_bytes)
+    
+    def close(self) -> None:
+        """Remove the temp file"""
+        if self.path is not None:
+            _remove_file(self.path)
+            self.path = None
+        self.data = None
+    
+    def __enter__(self) -> "SpooledImage":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
 
 
 class FileUploadHandler:
@@ -40,7 +145,9 @@ class FileUploadHandler:
         self.allowed_extensions = settings.ALLOWED_IMAGE_EXTENSIONS
         
         # Binary storage settings (for new methods)
-        self.max_image_size_mb = 10  # 10 MB limit for binary storage
+        self.max_image_size = settings.MAX_FILE_SIZE
+        self.chunk_size = settings.UPLOAD_CHUNK_SIZE
+        self.spool_threshold = settings.UPLOAD_SPOOL_THRESHOLD
         self.allowed_mimetypes = {
             'image/jpeg', 'image/jpg', 'image/png', 
             'image/gif', 'image/webp', 'image/bmp'
@@ -50,14 +157,130 @@ class FileUploadHandler:
         self.max_width = 1920
         self.max_height = 1920
         self.jpeg_quality = 85
-        self.thumbnail_size = (200, 200)
+        self.thumbnail_size = (settings.THUMBNAIL_WIDTH, settings.THUMBNAIL_HEIGHT)
         self.thumbnail_quality = 70
         
+        # Renditions served by the image endpoint (variant -> bounding box)
+        self.rendition_sizes = {
+            "thumbnail": self.thumbnail_size,
+            "medium": (settings.MEDIUM_IMAGE_WIDTH, settings.MEDIUM_IMAGE_HEIGHT),
+        }
+        self.rendition_quality = settings.RENDITION_QUALITY
+        self.rendition_webp = settings.RENDITION_WEBP_ENABLED
+        
         # Create upload directory if it doesn't exist (for filesystem methods)
         self.upload_dir.mkdir(parents=True, exist_ok=True)
     
     # ==================== BINARY DATABASE STORAGE METHODS (NEW - PRIMARY) ====================
     
+    async def read_image_upload(
+        self,
+        file: UploadFile,
+        validate: bool = True,
+        max_size: Optional[int] = None
+    ) -> SpooledImage:
+        """
+        ✅ NEW: Stream an uploaded image in UPLOAD_CHUNK_SIZE chunks.
+        
+        The first bytes are sniffed (the declared content type is ignored)
+        and the size limit is enforced as chunks arrive. Content above
+        UPLOAD_SPOOL_THRESHOLD goes to a temp file, so memory per upload
+        stays bounded by the threshold. The upload is not hashed: it is
+        re-encoded before storage, and the blob store hashes what it stores.
+        
+        Args:
+            file: FastAPI UploadFile object
+            validate: Check that the content decodes as an image
+            max_size: Size limit in bytes (default MAX_FILE_SIZE)
+        
+        Returns:
+            SpooledImage - close it (or use it in a with block) when done
+        
+        Raises:
+            InvalidFileTypeError: If the content is not a supported image format
+            FileTooLargeError: If the file exceeds the size limit
+            FileUploadError: If the read fails or the image is corrupted
+        
+        Example:
+            >>> with await file_upload_handler.read_image_upload(file) as upload:
+            ...     image_bytes, renditions = await file_upload_handler.process_image_bytes(upload)
+        """
+        max_size = max_size or self.max_image_size
+        filename = file.filename or 'image.jpg'
+        
+        # Multipart parsing already knows the size - reject without reading
+        if file.size is not None and file.size > max_size:
+            raise FileTooLargeError(max_size)
+        
+        buffer = bytearray()
+        spool = None
+        mimetype = None
+        size = 0
+        try:
+            while True:
+                chunk = await file.read(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLargeError(max_size)
+                
+                if spool is None:
+                    buffer += chunk
+                    if mimetype is None and len(buffer) >= _SNIFF_BYTES:
+                        mimetype = self._sniff_or_reject(buffer)
+                    if len(buffer) > self.spool_threshold:
+                        spool = tempfile.NamedTemporaryFile(prefix="upload-", delete=False)
+                        await asyncio.to_thread(spool.write, buffer)
+                        buffer = bytearray()
+                else:
+                    await asyncio.to_thread(spool.write, chunk)
+            
+            if size == 0:
+                raise FileUploadError("Uploaded file is empty")
+            if mimetype is None:
+                mimetype = self._sniff_or_reject(buffer)
+            
+            if spool is not None:
+                spool.close()
+                upload = SpooledImage(filename, mimetype, size, path=spool.name)
+            else:
+                upload = SpooledImage(filename, mimetype, size, data=bytes(buffer))
+        except BaseException as e:
+            if spool is not None:
+                spool.close()
+                _remove_file(spool.name)
+            if isinstance(e, FileUploadError) or not isinstance(e, Exception):
+                raise
+            app_logger.error(f"Failed to read image upload: {e}")
+            raise FileUploadError(f"Failed to read image: {str(e)}")
+        
+        if validate:
+            try:
+                await image_pool.run(verify_image, upload.source)
+            except Exception as e:
+                upload.close()
+                app_logger.error(f"Invalid image data: {e}")
+                raise FileUploadError(f"Invalid or corrupted image: {str(e)}")
+        
+        app_logger.info(
+            "Image upload read",
+            extra={
+                "uploaded_filename": filename,
+                "size_bytes": size,
+                "mimetype": mimetype,
+                "spooled": upload.spooled
+            }
+        )
+        return upload
+    
+    def _sniff_or_reject(self, header: bytes) -> str:
+        """Sniffed MIME type of an upload, or InvalidFileTypeError"""
+        mimetype = sniff_image_type(bytes(header[:_SNIFF_BYTES]))
+        if mimetype is None or mimetype not in self.allowed_mimetypes:
+            raise InvalidFileTypeError(sorted(self.allowed_mimetypes))
+        return mimetype
+    
     async def read_image_bytes(
         self,
         file: UploadFile,
@@ -66,8 +289,9 @@ class FileUploadHandler:
         """
         Read uploaded image as bytes for database storage (NO DISK USAGE).
         
-        This is the PRIMARY method for production deployment.
-        Images are stored as BYTEA in PostgreSQL, not as files.
+        ✅ UPDATED: Streams through read_image_upload() - size limit and type
+        are checked before the whole file is read. Prefer read_image_upload()
+        plus process_image_bytes(upload), which never hold large uploads in memory.
         
         Args:
             file: FastAPI UploadFile object
@@ -87,37 +311,8 @@ class FileUploadHandler:
             >>> complaint.image_data = image_bytes
             >>> complaint.image_mimetype = mimetype
         """
-        try:
-            # Read file contents as bytes
-            image_bytes = await file.read()
-            file_size = len(image_bytes)
-            
-            # Get MIME type
-            mimetype = file.content_type or self._guess_mimetype(file.filename)
-            
-            # Get filename
-            filename = file.filename or 'image.jpg'
-            
-            # Validate if requested
-            if validate:
-                await self.validate_image_bytes(image_bytes, mimetype, file_size)
-            
-            app_logger.info(
-                "Image read as bytes",
-                extra={
-                    "uploaded_filename": filename,
-                    "size_bytes": file_size,
-                    "mimetype": mimetype
-                }
-            )
-            
-            return image_bytes, mimetype, file_size, filename
-            
-        except (InvalidFileTypeError, FileTooLargeError):
-            raise
-        except Exception as e:
-            app_logger.error(f"Failed to read image bytes: {e}")
-            raise FileUploadError(f"Failed to read image: {str(e)}")
+        with await self.read_image_upload(file, validate=validate) as upload:
+            return await upload.read_bytes(), upload.mimetype, upload.size, upload.filename
     
     async def validate_image_bytes(
         self,
@@ -156,14 +351,14 @@ class FileUploadHandler:
         if file_size is None:
             file_size = len(image_bytes)
         
-        max_size = (max_size_mb or self.max_image_size_mb) * 1024 * 1024
+        max_size = max_size_mb * 1024 * 1024 if max_size_mb else self.max_image_size
         if file_size > max_size:
             raise FileTooLargeError(max_size)
         
         # Validate image can be opened and is not corrupted
+        # (decoded in the image process pool, off the event loop)
         try:
-            img = Image.open(BytesIO(image_bytes))
-            img.verify()  # Verify it's a valid image
+            await image_pool.run(verify_image, image_bytes)
             
             app_logger.info(
                 "Image validation passed",
@@ -214,29 +409,13 @@ class FileUploadHandler:
             max_height = max_height or self.max_height
             quality = quality or self.jpeg_quality
             
-            # Open image from bytes
-            img = Image.open(BytesIO(image_bytes))
-            original_size = img.size
-            
-            # Convert RGBA to RGB (for JPEG compatibility)
-            if img.mode == "RGBA":
-                rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[3])
-                img = rgb_img
-            elif img.mode not in ("RGB", "L"):
-                img = img.convert("RGB")
-            
-            # Resize if too large
-            resized = False
-            if img.width > max_width or img.height > max_height:
-                img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-                resized = True
-            
-            # Save optimized to bytes (always JPEG for consistency)
-            output = BytesIO()
-            img.save(output, format="JPEG", optimize=True, quality=quality)
-            optimized_bytes = output.getvalue()
+            # Decode, resize if too large and re-encode as JPEG (always JPEG
+            # for consistency) in the image process pool
+            optimized_bytes, original_size, new_size = await image_pool.run(
+                optimize_image, image_bytes, max_width, max_height, quality
+            )
             optimized_size = len(optimized_bytes)
+            resized = tuple(new_size) != tuple(original_size)
             
             # Calculate compression ratio
             compression_ratio = (1 - optimized_size / len(image_bytes)) * 100
@@ -244,7 +423,7 @@ class FileUploadHandler:
             app_logger.info(
                 f"Image optimized: {len(image_bytes)} -> {optimized_size} bytes "
                 f"({compression_ratio:.1f}% reduction)"
-                + (f", resized from {original_size} to {img.size}" if resized else "")
+                + (f", resized from {original_size} to {new_size}" if resized else "")
             )
             
             return optimized_bytes, optimized_size
@@ -264,7 +443,7 @@ class FileUploadHandler:
         
         Args:
             image_bytes: Original image bytes
-            size: Thumbnail size (width, height), defaults to (200, 200)
+            size: Thumbnail size (width, height), defaults to THUMBNAIL_WIDTH x THUMBNAIL_HEIGHT
             quality: JPEG quality 1-100, defaults to 70
         
         Returns:
@@ -279,27 +458,13 @@ class FileUploadHandler:
             size = size or self.thumbnail_size
             quality = quality or self.thumbnail_quality
             
-            # Open image
-            img = Image.open(BytesIO(image_bytes))
-            
-            # Convert to RGB
-            if img.mode == "RGBA":
-                rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[3])
-                img = rgb_img
-            elif img.mode not in ("RGB", "L"):
-                img = img.convert("RGB")
-            
-            # Create thumbnail (maintains aspect ratio)
-            img.thumbnail(size, Image.Resampling.LANCZOS)
-            
-            # Save to bytes
-            output = BytesIO()
-            img.save(output, format="JPEG", optimize=True, quality=quality)
-            thumbnail_bytes = output.getvalue()
+            # Create thumbnail (maintains aspect ratio) in the image process pool
+            thumbnail_bytes, thumb_size = await image_pool.run(
+                make_thumbnail, image_bytes, tuple(size), quality
+            )
             
             app_logger.info(
-                f"Thumbnail created: {img.size} ({len(thumbnail_bytes)} bytes)"
+                f"Thumbnail created: {thumb_size} ({len(thumbnail_bytes)} bytes)"
             )
             
             return thumbnail_bytes, len(thumbnail_bytes)
@@ -308,6 +473,64 @@ class FileUploadHandler:
             app_logger.error(f"Thumbnail creation failed: {e}")
             raise FileUploadError(f"Failed to create thumbnail: {str(e)}")
     
+    async def process_image_bytes(
+        self,
+        image_bytes: Union[bytes, SpooledImage],
+        optimize: bool = True
+    ) -> Tuple[bytes, List[Dict[str, Any]]]:
+        """
+        Optimize an image and create its thumbnail and medium renditions.
+        
+        Everything comes from one decode in the image process pool. Renditions
+        are encoded as WebP (if enabled) and JPEG.
+        
+        Args:
+            image_bytes: Original image bytes, or a SpooledImage upload (the
+                pool reads spooled uploads from their temp file)
+            optimize: Resize/re-encode the image itself (False for images that
+                are already stored optimized, e.g. when backfilling)
+        
+        Returns:
+            Tuple of (image_bytes, renditions). Renditions are dicts with
+            variant, format, data, width, height. On failure the original
+            bytes and no renditions are returned.
+        
+        Example:
+            >>> image_bytes, renditions = await file_upload_handler.process_image_bytes(raw)
+            >>> [(r["variant"], r["format"]) for r in renditions]
+            [('medium', 'webp'), ('medium', 'jpeg'), ('thumbnail', 'webp'), ('thumbnail', 'jpeg')]
+        """
+        upload = image_bytes if isinstance(image_bytes, SpooledImage) else None
+        source = upload.source if upload else image_bytes
+        original_size = upload.size if upload else len(image_bytes)
+        try:
+            result = await image_pool.run(
+                make_renditions,
+                source,
+                (self.max_width, self.max_height) if optimize else None,
+                self.jpeg_quality,
+                tuple(self.rendition_sizes.items()),
+                self.rendition_quality,
+                self.rendition_webp
+            )
+            
+            if optimize:
+                processed = result["image"]
+            else:
+                processed = await upload.read_bytes() if upload else image_bytes
+            app_logger.info(
+                f"Image processed: {original_size} -> {len(processed)} bytes "
+                f"({result['original_size']} -> {result['size']}), "
+                f"{len(result['renditions'])} renditions "
+                f"({sum(len(r['data']) for r in result['renditions'])} bytes)"
+            )
+            
+            return processed, result["renditions"]
+            
+        except Exception as e:
+            app_logger.warning(f"Image processing failed: {e}, using original without renditions")
+            return (await upload.read_bytes() if upload else image_bytes), []
+    
     def bytes_to_data_uri(
         self,
         image_bytes: bytes,
@@ -564,4 +787,4 @@ class FileUploadHandler:
 file_upload_handler = FileUploadHandler()
 
 
-__all__ = ["FileUploadHandler", "file_upload_handler"]
+__all__ = ["FileUploadHandler", "SpooledImage", "sniff_image_type", "file_upload_handler"]
@@ -0,0 +1,442 @@
+"""
+Process pool for CPU-bound Pillow work.
+
+Decoding, LANCZOS resizing and JPEG encoding of a phone photo take tens to
+hundreds of milliseconds of pure CPU. Run inside an async handler they stall
+the event loop - every other request in the process waits. The transforms
+below are plain functions over bytes, so they run in a ProcessPoolExecutor:
+bytes go in, bytes come out, and the event loop only awaits a future.
+
+The pool is sized from the CPU count (IMAGE_POOL_WORKERS overrides) and
+bounded: at most IMAGE_POOL_MAX_PENDING images are queued or running at
+once, further callers wait on a semaphore instead of piling work onto the
+executor queue. The current depth is exposed through get_stats().
+
+If the pool cannot be created (platforms without working multiprocessing,
+IMAGE_POOL_ENABLED=False) or a worker dies, the image is processed inline
+in a thread of this process instead, so uploads keep working. A broken
+pool is replaced on the next call.
+
+Transforms that take an ImageSource also accept the path of a spooled
+upload, so large files are read by the pool process instead of being
+pickled across.
+
+Downscaling transforms decode JPEGs at a reduced scale (draft mode: libjpeg
+scales by 1/2, 1/4 or 1/8 during the DCT) to the smallest scale that still
+covers the target size, so a 48 MP photo never exists as a full-resolution
+bitmap. Images over IMAGE_MAX_PIXELS are refused before decoding.
+
+Usage:
+    optimized, original_size, new_size = await image_pool.run(
+        optimize_image, image_bytes, 1920, 1920, 85
+    )
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from PIL import Image, features
+
+from src.config.settings import settings
+from src.utils.logger import app_logger
+
+# Pool processes when IMAGE_POOL_WORKERS is 0: leave a core for the event
+# loop and do not oversubscribe hosts that run several API workers
+_MAX_AUTO_WORKERS = 4
+_PENDING_PER_WORKER = 4
+
+
+# Image bytes, or the path of a file holding them
+ImageSource = Union[bytes, str]
+
+
+# ==================== TRANSFORMS (run in pool processes) ====================
+
+def _open(source: ImageSource) -> Image.Image:
+    """
+    Open an image from bytes or a file path (header only, nothing decoded).
+
+    Raises:
+        Image.DecompressionBombError: More than IMAGE_MAX_PIXELS pixels
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        img = Image.open(BytesIO(source))
+    else:
+        img = Image.open(source)
+    width, height = img.size
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        img.close()
+        raise Image.DecompressionBombError(
+            f"Image has {width * height} pixels ({width}x{height}), "
+            f"limit is {settings.IMAGE_MAX_PIXELS}"
+        )
+    return img
+
+
+def _fit_size(size: Tuple[int, int], box: Tuple[int, int]) -> Tuple[int, int]:
+    """Size of an image after thumbnail(box): aspect kept, never enlarged"""
+    scale = min(box[0] / size[0], box[1] / size[1], 1.0)
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def _open_scaled(source: ImageSource, box: Optional[Tuple[int, int]]) -> Tuple[Image.Image, Tuple[int, int]]:
+    """
+    Open an image that will be downscaled to fit box.
+
+    JPEGs are set to decode at the largest 1/2, 1/4 or 1/8 reduction that
+    still covers the fitted size (aspect-correct, unlike a square box).
+    Other formats decode fully; Image.thumbnail() then shrinks them with
+    reduce() before resampling.
+
+    Returns:
+        Tuple of (image, original_size)
+    """
+    img = _open(source)
+    original_size = img.size
+    if box is not None and img.format == "JPEG":
+        target = _fit_size(original_size, box)
+        if target != original_size:
+            img.draft(None, target)
+    return img, original_size
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    """Flatten transparency onto white and convert to a JPEG-compatible mode"""
+    if img.mode == "RGBA":
+        rgb_img = Image.new("RGB", img.size, (255, 255, 255))
+        rgb_img.paste(img, mask=img.split()[3])
+        return rgb_img
+    if img.mode not in ("RGB", "L"):
+        return img.convert("RGB")
+    return img
+
+
+def verify_image(source: ImageSource) -> None:
+    """
+    Check that bytes (or a file) decode as an image.
+
+    Raises:
+        Exception: Pillow error for corrupted or unsupported data
+    """
+    with _open(source) as img:
+        img.verify()
+
+
+def optimize_image(
+    image_bytes: bytes,
+    max_width: int,
+    max_height: int,
+    quality: int
+) -> Tuple[bytes, Tuple[int, int], Tuple[int, int]]:
+    """
+    Downscale to fit max_width x max_height and re-encode as JPEG.
+
+    Returns:
+        Tuple of (jpeg_bytes, original_size, new_size)
+    """
+    img, original_size = _open_scaled(image_bytes, (max_width, max_height))
+    img = _to_rgb(img)
+
+    if img.width > max_width or img.height > max_height:
+        img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+
+    output = BytesIO()
+    img.save(output, format="JPEG", optimize=True, quality=quality)
+    return output.getvalue(), original_size, img.size
+
+
+def make_thumbnail(
+    image_bytes: bytes,
+    size: Tuple[int, int],
+    quality: int
+) -> Tuple[bytes, Tuple[int, int]]:
+    """
+    Create a JPEG thumbnail that fits size (aspect ratio kept).
+
+    Returns:
+        Tuple of (jpeg_bytes, thumbnail_size)
+    """
+    img, _ = _open_scaled(image_bytes, size)
+    img = _to_rgb(img)
+    img.thumbnail(size, Image.Resampling.LANCZOS)
+
+    output = BytesIO()
+    img.save(output, format="JPEG", optimize=True, quality=quality)
+    return output.getvalue(), img.size
+
+
+def make_renditions(
+    image_bytes: ImageSource,
+    max_size: Optional[Tuple[int, int]],
+    quality: int,
+    variants: Tuple[Tuple[str, Tuple[int, int]], ...],
+    rendition_quality: int,
+    webp: bool
+) -> Dict[str, Any]:
+    """
+    Optimize an image and create its renditions from a single decode.
+
+    Variants are produced largest first, each downscaled from the previous
+    one, so the thumbnail never resamples the full-size original.
+
+    Args:
+        image_bytes: Uploaded (or stored) image, or the path of a spooled upload
+        max_size: Bounding box of the stored JPEG (None: do not re-encode it)
+        quality: JPEG quality of the stored image
+        variants: (name, (width, height)) per rendition
+        rendition_quality: WebP/JPEG quality of the renditions
+        webp: Also encode renditions as WebP (skipped if Pillow lacks WebP)
+
+    Returns:
+        Dict with image (bytes or None), original_size, size and renditions -
+        a list of dicts with variant, format, data, width, height
+    """
+    # Decode at the smallest scale that covers the stored image (or, if it
+    # is not re-encoded, the largest rendition)
+    largest = max((box for _, box in variants), key=lambda b: b[0] * b[1], default=None)
+    img, original_size = _open_scaled(image_bytes, max_size or largest)
+    img = _to_rgb(img)
+
+    optimized = None
+    if max_size is not None:
+        if img.width > max_size[0] or img.height > max_size[1]:
+            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        output = BytesIO()
+        img.save(output, format="JPEG", optimize=True, quality=quality)
+        optimized = output.getvalue()
+
+    formats = ["jpeg"]
+    if webp and features.check("webp"):
+        formats.insert(0, "webp")
+
+    renditions = []
+    current = img
+    for name, box in sorted(variants, key=lambda v: v[1][0] * v[1][1], reverse=True):
+        current = current.copy()
+        current.thumbnail(box, Image.Resampling.LANCZOS)
+        for fmt in formats:
+            output = BytesIO()
+            if fmt == "webp":
+                current.save(output, format="WEBP", quality=rendition_quality, method=4)
+            else:
+                current.save(output, format="JPEG", optimize=True, quality=rendition_quality)
+            renditions.append({
+                "variant": name,
+                "format": fmt,
+                "data": output.getvalue(),
+                "width": current.width,
+                "height": current.height,
+            })
+
+    return {
+        "image": optimized,
+        "original_size": original_size,
+        "size": img.size,
+        "renditions": renditions,
+    }
+
+
+def difference_hash(img: Image.Image, hash_size: int = 8) -> str:
+    """
+    Perceptual difference hash (dHash) of an image.
+
+    Compares the brightness of horizontally adjacent pixels of a
+    (hash_size + 1) x hash_size grayscale thumbnail. Re-encoding, resizing
+    and small edits leave the hash (almost) unchanged.
+
+    Returns:
+        Hex string of hash_size * hash_size bits
+    """
+    small = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (pixels[offset + col] < pixels[offset + col + 1])
+    return f"{bits:0{hash_size * hash_size // 4}x}"
+
+
+def prepare_vision_image(
+    image_bytes: bytes,
+    max_side: int,
+    quality: int
+) -> Tuple[bytes, str]:
+    """
+    Downscale an image for a vision model call and compute its dHash.
+
+    JPEGs are decoded at a reduced scale (draft mode) when they are much
+    larger than max_side.
+
+    Returns:
+        Tuple of (jpeg_bytes, dhash_hex)
+    """
+    img, _ = _open_scaled(image_bytes, (max_side, max_side))
+    img = _to_rgb(img)
+    phash = difference_hash(img)
+
+    if img.width > max_side or img.height > max_side:
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    output = BytesIO()
+    img.convert("RGB").save(output, format="JPEG", quality=quality)
+    return output.getvalue(), phash
+
+
+# ==================== POOL ====================
+
+class ImageProcessPool:
+    """Bounded process pool with inline fallback for image transforms"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        workers: int = 0,
+        max_pending: int = 0
+    ):
+        """
+        Args:
+            enabled: Use a process pool; when False everything runs inline
+            workers: Pool processes (0 = derive from CPU count)
+            max_pending: Images queued or running at once (0 = 4 per worker)
+        """
+        self.enabled = enabled
+        self.workers = workers or max(1, min(_MAX_AUTO_WORKERS, (os.cpu_count() or 2) - 1))
+        self.max_pending = max_pending or self.workers * _PENDING_PER_WORKER
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._unavailable = False
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        # Queue depth
+        self._waiting = 0
+        self._running = 0
+        self._peak_depth = 0
+
+        # Counters
+        self._pool_runs = 0
+        self._inline_runs = 0
+        self._pool_failures = 0
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a transform off the event loop.
+
+        Args:
+            func: Module-level function of this module (must be picklable)
+            *args: Picklable arguments (bytes, ints, tuples)
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            Exception: Whatever func raises (e.g. Pillow errors on bad images)
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        self._waiting += 1
+        self._peak_depth = max(self._peak_depth, self._waiting + self._running)
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._running += 1
+        try:
+            executor = self._get_executor()
+            if executor is not None:
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+                    self._pool_runs += 1
+                    return result
+                except BrokenProcessPool as e:
+                    self._pool_failures += 1
+                    self._discard_executor(executor)
+                    app_logger.warning(f"Image process pool broke ({e}), processing inline")
+
+            self._inline_runs += 1
+            return await asyncio.to_thread(func, *args)
+        finally:
+            self._running -= 1
+            self._slots.release()
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Pool executor, created on first use; None when the pool is not available"""
+        if not self.enabled or self._unavailable:
+            return None
+        if self._executor is None:
+            try:
+                # spawn: forking a process with a running event loop and DB
+                # connections is unsafe, and the transforms need none of it
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                app_logger.info(f"Image process pool started ({self.workers} workers)")
+            except (OSError, NotImplementedError, ValueError) as e:
+                self._unavailable = True
+                self._pool_failures += 1
+                app_logger.warning(f"Image process pool unavailable, processing images inline: {e}")
+                return None
+        return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken executor so the next call starts a fresh one"""
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        """Stop the pool processes (application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ==================== STATS ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool counters.
+
+        Returns:
+            Image pool statistics dictionary
+        """
+        return {
+            "enabled": self.enabled,
+            "available": self.enabled and not self._unavailable,
+            "started": self._executor is not None,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "queue_depth": self._waiting + self._running,
+            "waiting": self._waiting,
+            "running": self._running,
+            "peak_queue_depth": self._peak_depth,
+            "pool_runs": self._pool_runs,
+            "inline_runs": self._inline_runs,
+            "pool_failures": self._pool_failures,
+        }
+
+
+# Create global instance
+image_pool = ImageProcessPool(
+    enabled=settings.IMAGE_POOL_ENABLED,
+    workers=settings.IMAGE_POOL_WORKERS,
+    max_pending=settings.IMAGE_POOL_MAX_PENDING,
+)
+
+__all__ = [
+    "ImageProcessPool",
+    "image_pool",
+    "ImageSource",
+    "verify_image",
+    "optimize_image",
+    "make_thumbnail",
+    "make_renditions",
+    "difference_hash",
+    "prepare_vision_image",
+]
@@ -0,0 +1,277 @@
+"""
+Multi-pattern keyword matching (Aho–Corasick).
+
+All keyword tables used by the LLM fallbacks and deterministic overrides are
+compiled into one automaton at import. A single pass over the lowercased text
+returns every keyword occurrence; each keyword carries one or more tags
+(e.g. "category:Hostel", "academic_override"), so callers ask questions per
+tag instead of re-scanning the text once per keyword. Matching costs
+O(len(text) + matches) no matter how many keywords are registered.
+
+Keywords match as plain substrings, exactly like ``keyword in text.lower()``.
+
+Usage:
+    matches = keyword_matcher.match(text)
+    if matches.has("academic_override"): ...
+    score = matches.count("category:Hostel")
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple, NamedTuple, Iterable
+
+
+class KeywordHit(NamedTuple):
+    """One keyword occurrence in the lowercased text"""
+    keyword: str
+    start: int
+    end: int
+
+
+class KeywordMatches:
+    """Result of matching one text: keyword hits grouped by tag"""
+
+    def __init__(self, matcher: "KeywordMatcher", hits: Tuple[KeywordHit, ...]):
+        self._matcher = matcher
+        self.hits = hits
+        self.keywords = frozenset(hit.keyword for hit in hits)
+
+        by_tag: Dict[str, List[KeywordHit]] = {}
+        for hit in hits:
+            for tag in matcher.tags_of(hit.keyword):
+                by_tag.setdefault(tag, []).append(hit)
+        self._by_tag = by_tag
+
+    @property
+    def tags(self) -> frozenset:
+        """Tags with at least one hit"""
+        return frozenset(self._by_tag)
+
+    def has(self, tag: str) -> bool:
+        """Whether any keyword with this tag occurs"""
+        return tag in self._by_tag
+
+    def count(self, tag: str) -> int:
+        """Number of distinct keywords with this tag that occur"""
+        return len({hit.keyword for hit in self._by_tag.get(tag, ())})
+
+    def found(self, tag: str) -> List[str]:
+        """Distinct matched keywords with this tag, in registration order"""
+        matched = {hit.keyword for hit in self._by_tag.get(tag, ())}
+        return [keyword for keyword in self._matcher.keywords_of(tag) if keyword in matched]
+
+    def first(self, tag: str) -> Optional[str]:
+        """First matched keyword of this tag in registration order"""
+        found = self.found(tag)
+        return found[0] if found else None
+
+    def has_outside(self, tag: str, mask_tag: str) -> bool:
+        """
+        Whether a keyword with ``tag`` occurs outside every ``mask_tag`` occurrence.
+
+        Used where a phrase must not count when it is part of a longer phrase
+        (e.g. "men's hostel" inside "women's hostel").
+        """
+        masks = self._by_tag.get(mask_tag, ())
+        return any(
+            not any(hit.start < mask.end and mask.start < hit.end for mask in masks)
+            for hit in self._by_tag.get(tag, ())
+        )
+
+
+class KeywordMatcher:
+    """Aho–Corasick automaton over tagged lowercase keywords"""
+
+    def __init__(self):
+        # Trie / automaton state, node 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminal: List[Optional[str]] = [None]
+        self._output: List[Tuple[str, ...]] = [()]
+        # Full DFA transitions (failure links folded in) as bound dict.get; missing char -> root
+        self._transitions: List[Callable[[str, int], int]] = []
+
+        self._keyword_tags: Dict[str, List[str]] = {}
+        self._tag_keywords: Dict[str, List[str]] = {}
+        self._built = False
+
+    def add(self, keyword: str, tag: str) -> None:
+        """
+        Register a keyword under a tag.
+
+        Args:
+            keyword: Substring to find (lowercased; surrounding spaces are kept)
+            tag: Tag reported for matches of this keyword
+        """
+        keyword = keyword.lower()
+        if not keyword:
+            return
+
+        tags = self._keyword_tags.setdefault(keyword, [])
+        if tag in tags:
+            return
+        tags.append(tag)
+        self._tag_keywords.setdefault(tag, []).append(keyword)
+
+        if len(tags) == 1:
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._terminal.append(None)
+                    self._output.append(())
+                node = next_node
+            self._terminal[node] = keyword
+        self._built = False
+
+    def add_many(self, keywords: Iterable[str], tag: str) -> None:
+        """Register several keywords under one tag"""
+        for keyword in keywords:
+            self.add(keyword, tag)
+
+    def build(self) -> "KeywordMatcher":
+        """
+        Compute failure links and fold them into DFA transitions (breadth-first).
+
+        Called automatically on the first match after keywords were added.
+        """
+        delta: List[Dict[str, int]] = [dict() for _ in self._goto]
+        delta[0] = dict(self._goto[0])
+
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._output[child] = self._own_output(child)
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            fail = self._fail[node]
+            # Transitions of the failure state, overridden by this node's own edges
+            delta[node] = {**delta[fail], **self._goto[node]}
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                self._fail[child] = delta[fail].get(char, 0)
+                self._output[child] = self._own_output(child) + self._output[self._fail[child]]
+
+        self._transitions = [edges.get for edges in delta]
+        self._built = True
+        return self
+
+    def _own_output(self, node: int) -> Tuple[str, ...]:
+        """Keyword ending exactly at a trie node"""
+        keyword = self._terminal[node]
+        return (keyword,) if keyword is not None else ()
+
+    def tags_of(self, keyword: str) -> List[str]:
+        """Tags registered for a keyword"""
+        return self._keyword_tags.get(keyword, [])
+
+    def keywords_of(self, tag: str) -> List[str]:
+        """Keywords registered for a tag, in registration order"""
+        return self._tag_keywords.get(tag, [])
+
+    def find_all(self, text: str) -> Tuple[KeywordHit, ...]:
+        """
+        Find every keyword occurrence (overlapping included) in one pass.
+
+        Args:
+            text: Text to scan (lowercased here)
+
+        Returns:
+            Hits ordered by end position
+        """
+        if not self._built:
+            self.build()
+
+        # Hot loop: one dict lookup per character; hits are expanded afterwards
+        transitions = self._transitions
+        output = self._output
+        ends: List[Tuple[int, int]] = []
+        node = 0
+        for index, char in enumerate(text.lower()):
+            node = transitions[node](char, 0)
+            if output[node]:
+                ends.append((index + 1, node))
+
+        return tuple(
+            KeywordHit(keyword, end - len(keyword), end)
+            for end, node in ends
+            for keyword in output[node]
+        )
+
+    def match(self, text: str) -> KeywordMatches:
+        """Scan text and group the hits by tag"""
+        return KeywordMatches(self, self.find_all(text or ""))
+
+
+def build_keyword_matcher() -> KeywordMatcher:
+    """
+    Compile every keyword table from constants and settings.
+
+    Tags:
+        category:<name>, department:<code>, urgency:<priority>  - fallback categorization
+        authority_reference, visible_damage                     - fallback categorization flags
+        academic_override                                       - hostel → Department override
+        image_evidence                                          - fallback image requirement
+        spam, test_content                                      - keyword spam checks
+        hostel_context                                          - hostel category correction
+        mens_hostel, womens_hostel                              - cross-gender hostel pre-check
+        mens_hostel_phrase, womens_hostel_phrase                - masks for the pre-check
+    """
+    from src.config import constants
+    from src.config.settings import settings
+
+    matcher = KeywordMatcher()
+
+    for category, keywords in constants.FALLBACK_CATEGORY_KEYWORDS.items():
+        matcher.add_many(keywords, f"category:{category}")
+    for department, keywords in constants.FALLBACK_DEPARTMENT_KEYWORDS.items():
+        matcher.add_many(keywords, f"department:{department}")
+    for priority, keywords in constants.FALLBACK_URGENCY_KEYWORDS.items():
+        matcher.add_many(keywords, f"urgency:{priority}")
+
+    matcher.add_many(constants.AUTHORITY_REFERENCE_KEYWORDS, "authority_reference")
+    matcher.add_many(constants.VISIBLE_DAMAGE_KEYWORDS, "visible_damage")
+    matcher.add_many(constants.ACADEMIC_OVERRIDE_KEYWORDS, "academic_override")
+    matcher.add_many(constants.IMAGE_EVIDENCE_KEYWORDS, "image_evidence")
+    matcher.add_many(constants.SPAM_KEYWORDS, "spam")
+    matcher.add_many(settings.SPAM_KEYWORDS, "spam")
+    matcher.add_many(constants.TEST_CONTENT_KEYWORDS, "test_content")
+    matcher.add_many(constants.HOSTEL_CONTEXT_KEYWORDS, "hostel_context")
+    matcher.add_many(constants.MENS_HOSTEL_KEYWORDS, "mens_hostel")
+    matcher.add_many(constants.WOMENS_HOSTEL_KEYWORDS, "womens_hostel")
+    matcher.add_many(constants.MENS_HOSTEL_PHRASES, "mens_hostel_phrase")
+    matcher.add_many(constants.WOMENS_HOSTEL_PHRASES, "womens_hostel_phrase")
+
+    return matcher.build()
+
+
+# Create global instance
+keyword_matcher = build_keyword_matcher()
+
+
+@lru_cache(maxsize=256)
+def match_keywords(text: str) -> KeywordMatches:
+    """
+    Match text against the global keyword matcher.
+
+    The submission path checks the same complaint text several times
+    (fallback categorization, overrides, image requirement, spam), so recent
+    results are memoized.
+    """
+    return keyword_matcher.match(text)
+
+
+__all__ = [
+    "KeywordHit",
+    "KeywordMatches",
+    "KeywordMatcher",
+    "build_keyword_matcher",
+    "keyword_matcher",
+    "match_keywords",
+]
@@ -0,0 +1,13 @@
+"""
+Background workers package.
+Processes queued work outside the HTTP request cycle.
+"""
+
+from .complaint_worker import ComplaintWorker
+from .image_verification_worker import ImageVerificationWorker
+
+
+__all__ = [
+    "ComplaintWorker",
+    "ImageVerificationWorker",
+]
@@ -0,0 +1,209 @@
+"""
+Complaint worker - processes asynchronously submitted complaints.
+
+Each worker runs ``concurrency`` loops; every loop claims one job at a time
+from the complaint_jobs table (FOR UPDATE SKIP LOCKED), runs the AI pipeline
+via ComplaintService.process_queued_complaint() and records the outcome.
+Any number of workers can run against the same database.
+
+Failure handling:
+- Rejections (spam, missing image, validation) are final: the complaint is
+  discarded and the job is marked Rejected.
+- Other errors are retried with exponential backoff until JOB_MAX_ATTEMPTS.
+- A heartbeat extends the job lease while it runs; if the process dies, the
+  lease (JOB_VISIBILITY_TIMEOUT) expires and another worker picks the job up.
+- stop() drains: loops finish their current job, and jobs still running when
+  the drain timeout hits are handed straight back to the queue.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from typing import Optional, Dict, Any, List
+
+from src.config.settings import settings
+from src.database.connection import AsyncSessionLocal
+from src.database.models import ComplaintJob
+from src.repositories.complaint_job_repo import ComplaintJobRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ComplaintWorker:
+    """Pool of job loops claiming complaint jobs from Postgres"""
+
+    def __init__(self, concurrency: int = 1, worker_id: Optional[str] = None):
+        """
+        Args:
+            concurrency: Number of jobs processed concurrently by this worker
+            worker_id: Identifier recorded on leased jobs (default: host:pid)
+        """
+        self.concurrency = concurrency
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = asyncio.Event()
+        self._loops: List[asyncio.Task] = []
+        self.stats: Dict[str, int] = {
+            "claimed": 0,
+            "succeeded": 0,
+            "rejected": 0,
+            "retried": 0,
+            "failed": 0,
+            "released": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Whether job loops are active"""
+        return any(not task.done() for task in self._loops)
+
+    async def start(self) -> None:
+        """Start the job loops"""
+        if self.running:
+            return
+
+        self._stopping.clear()
+        self._loops = [
+            asyncio.create_task(self._run_loop(f"{self.worker_id}/{slot}"))
+            for slot in range(self.concurrency)
+        ]
+        logger.info(f"Complaint worker {self.worker_id} started ({self.concurrency} loops)")
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Gracefully drain: stop claiming, let in-flight jobs finish.
+
+        Args:
+            timeout: Max seconds to wait before cancelling in-flight jobs
+                (they are released back to the queue)
+        """
+        if not self._loops:
+            return
+
+        self._stopping.set()
+        timeout = settings.JOB_DRAIN_TIMEOUT if timeout is None else timeout
+        _, pending = await asyncio.wait(self._loops, timeout=timeout)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Drain timeout hit, releasing {len(pending)} in-flight job(s)")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        self._loops = []
+        logger.info(f"Complaint worker {self.worker_id} stopped. Stats: {self.stats}")
+
+    async def run_once(self, slot_id: str) -> bool:
+        """
+        Claim and process a single job.
+
+        Args:
+            slot_id: Lease owner identifier for this loop
+
+        Returns:
+            True if a job was processed, False if the queue was empty
+        """
+        async with AsyncSessionLocal() as session:
+            repo = ComplaintJobRepository(session)
+            job = await repo.claim_next(slot_id, settings.JOB_VISIBILITY_TIMEOUT)
+
+            if job is None:
+                # Idle - a good moment to clean up jobs that died on their last attempt
+                expired = await repo.fail_expired_exhausted()
+                if expired:
+                    logger.warning(f"Marked {expired} expired job(s) as Failed")
+                return False
+
+        self.stats["claimed"] += 1
+        await self._process(job, slot_id)
+        return True
+
+    async def _run_loop(self, slot_id: str) -> None:
+        """Claim/process until stop() is called"""
+        while not self._stopping.is_set():
+            try:
+                processed = await self.run_once(slot_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Worker loop {slot_id} error: {e}", exc_info=True)
+                processed = False
+
+            if not processed:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=settings.JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _process(self, job: ComplaintJob, slot_id: str) -> None:
+        """Run the AI pipeline for a claimed job and record the outcome"""
+        from src.services.complaint_service import ComplaintService
+        from src.services.llm_telemetry import llm_telemetry
+
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, slot_id))
+        result: Optional[Dict[str, Any]] = None
+        rejection: Optional[str] = None
+        error: Optional[str] = None
+
+        try:
+            async with AsyncSessionLocal() as session:
+                service = ComplaintService(session)
+                try:
+                    # A rejected complaint is deleted - keep its telemetry unlinked
+                    with llm_telemetry.complaint_scope(job.complaint_id, unlink_on=(ValueError,)):
+                        result = await service.process_queued_complaint(job.complaint_id)
+                except ValueError as e:
+                    rejection = str(e)
+                    await session.rollback()
+                    await service.reject_queued_complaint(job.complaint_id, rejection)
+        except asyncio.CancelledError:
+            # Drain timeout - give the job back instead of waiting for the lease to expire
+            await asyncio.shield(self._release(job.id, slot_id))
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.id} (complaint {job.complaint_id}) failed: {e}", exc_info=True)
+            error = str(e) or e.__class__.__name__
+        finally:
+            heartbeat.cancel()
+
+        async with AsyncSessionLocal() as session:
+            repo = ComplaintJobRepository(session)
+            if rejection is not None:
+                await repo.mark_rejected(job.id, slot_id, rejection)
+                self.stats["rejected"] += 1
+            elif error is not None:
+                retry_delay = settings.JOB_RETRY_BACKOFF * (2 ** (job.attempts - 1))
+                new_status = await repo.mark_failed(job, slot_id, error, retry_delay)
+                self.stats["retried" if new_status == "Queued" else "failed"] += 1
+            else:
+                await repo.mark_succeeded(job.id, slot_id, result)
+                self.stats["succeeded"] += 1
+
+    async def _heartbeat(self, job_id: int, slot_id: str) -> None:
+        """Keep extending the job lease while it is being processed"""
+        interval = max(settings.JOB_VISIBILITY_TIMEOUT / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSessionLocal() as session:
+                    still_leased = await ComplaintJobRepository(session).extend_lease(
+                        job_id, slot_id, settings.JOB_VISIBILITY_TIMEOUT
+                    )
+                if not still_leased:
+                    logger.warning(f"Lost lease on job {job_id}")
+                    return
+            except Exception as e:
+                logger.warning(f"Heartbeat failed for job {job_id}: {e}")
+
+    async def _release(self, job_id: int, slot_id: str) -> None:
+        """Hand a job back to the queue"""
+        try:
+            async with AsyncSessionLocal() as session:
+                if await ComplaintJobRepository(session).release(job_id, slot_id):
+                    self.stats["released"] += 1
+                    logger.info(f"Released job {job_id} back to the queue")
+        except Exception as e:
+            logger.error(f"Failed to release job {job_id}: {e}")
+
+
+__all__ = ["ComplaintWorker"]
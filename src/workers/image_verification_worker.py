@@ -0,0 +1,239 @@
+"""
+Image verification worker - drains complaints whose image is still Pending.
+
+Submission only stores the image with image_verification_status='Pending';
+this worker claims pending images in batches (FOR UPDATE SKIP LOCKED plus a
+lease on image_verification_next_at), runs the vision calls with bounded
+concurrency and writes the verdicts back in one transaction per batch:
+image_verified / image_verification_status are set by a single
+UPDATE ... FROM (VALUES ...) RETURNING id, and ImageVerificationLog rows
+are inserted in bulk for the complaints it returned.
+
+Failure handling:
+- A verdict is only written if the complaint still has the verified image
+  and is still Pending (a re-upload during verification is not overwritten).
+- When the vision model is unavailable the image stays Pending and is
+  retried with exponential backoff; after IMAGE_VERIFICATION_MAX_ATTEMPTS
+  the keyword fallback verdict is stored (status Error if it has none).
+- A crashed worker's claims come back when the lease expires; stop() hands
+  in-flight claims back immediately.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+from src.config.settings import settings
+from src.database.connection import AsyncSessionLocal
+from src.repositories.complaint_repo import ComplaintRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ImageVerificationWorker:
+    """Batch loop verifying pending complaint images"""
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        worker_id: Optional[str] = None
+    ):
+        """
+        Args:
+            batch_size: Pending images claimed per batch (default IMAGE_VERIFICATION_BATCH_SIZE)
+            concurrency: Vision calls in flight (default IMAGE_VERIFICATION_CONCURRENCY)
+            worker_id: Identifier used in logs (default: host:pid)
+        """
+        self.batch_size = batch_size or settings.IMAGE_VERIFICATION_BATCH_SIZE
+        self.concurrency = concurrency or settings.IMAGE_VERIFICATION_CONCURRENCY
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._stopping = asyncio.Event()
+        self._loop: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {
+            "batches": 0,
+            "claimed": 0,
+            "verified": 0,
+            "rejected": 0,
+            "errors": 0,
+            "retried": 0,
+            "stale": 0,
+            "released": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Whether the batch loop is active"""
+        return self._loop is not None and not self._loop.done()
+
+    async def start(self) -> None:
+        """Start the batch loop"""
+        if self.running:
+            return
+
+        self._stopping.clear()
+        self._loop = asyncio.create_task(self._run_loop())
+        logger.info(
+            f"Image verification worker {self.worker_id} started "
+            f"(batch {self.batch_size}, concurrency {self.concurrency})"
+        )
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Gracefully drain: stop claiming, let the current batch finish.
+
+        Args:
+            timeout: Max seconds to wait before cancelling the batch
+                (its claims are released)
+        """
+        if self._loop is None:
+            return
+
+        self._stopping.set()
+        timeout = settings.JOB_DRAIN_TIMEOUT if timeout is None else timeout
+        _, pending = await asyncio.wait([self._loop], timeout=timeout)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning("Drain timeout hit, releasing in-flight image verifications")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        self._loop = None
+        logger.info(f"Image verification worker {self.worker_id} stopped. Stats: {self.stats}")
+
+    async def run_once(self) -> int:
+        """
+        Claim and verify one batch of pending images.
+
+        Returns:
+            Number of images claimed (0 if nothing was pending)
+        """
+        async with AsyncSessionLocal() as session:
+            rows = await ComplaintRepository(session).claim_pending_images(
+                self.batch_size, settings.IMAGE_VERIFICATION_LEASE_SECONDS
+            )
+        if not rows:
+            return 0
+
+        self.stats["batches"] += 1
+        self.stats["claimed"] += len(rows)
+
+        try:
+            outcomes = await asyncio.gather(*(self._evaluate(row) for row in rows))
+        except asyncio.CancelledError:
+            await asyncio.shield(self._release([row.id for row in rows]))
+            raise
+
+        verdicts: List[Dict[str, Any]] = []
+        retries: List[Dict[str, Any]] = []
+        now = datetime.now(timezone.utc)
+        for row, (result, from_model) in zip(rows, outcomes):
+            if result is None:
+                # Vision model unavailable - keep Pending, back off
+                delay = settings.IMAGE_VERIFICATION_RETRY_BACKOFF * (2 ** (row.image_verification_attempts - 1))
+                retries.append({"complaint_id": row.id, "next_at": now + timedelta(seconds=delay)})
+                continue
+
+            status = result["status"]
+            if not from_model and status == "Pending":
+                status = "Error"
+            verdicts.append({
+                "complaint_id": row.id,
+                "image_hash": row.image_hash,
+                "is_relevant": result["is_relevant"],
+                "confidence_score": result["confidence_score"],
+                "explanation": result["explanation"],
+                "status": status,
+            })
+
+        async with AsyncSessionLocal() as session:
+            updated = await ComplaintRepository(session).apply_image_verifications(verdicts, retries)
+
+        self.stats["retried"] += len(retries)
+        self.stats["stale"] += len(verdicts) - updated
+        for verdict in verdicts:
+            key = {"Verified": "verified", "Rejected": "rejected"}.get(verdict["status"], "errors")
+            self.stats[key] += 1
+
+        logger.info(
+            f"Image verification batch: {len(rows)} claimed, {updated} stored, "
+            f"{len(retries)} retrying"
+        )
+        return len(rows)
+
+    async def _run_loop(self) -> None:
+        """Claim/verify batches until stop() is called"""
+        while not self._stopping.is_set():
+            try:
+                claimed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Image verification loop error: {e}", exc_info=True)
+                claimed = 0
+
+            if claimed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=settings.JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _evaluate(self, row: Any) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Verdict for one claimed image.
+
+        Returns:
+            Tuple of (result, from_model) - result is None when the image
+            should be retried later
+        """
+        from src.services.image_verification import image_verification_service
+
+        result: Optional[Dict[str, Any]] = None
+        from_model = False
+        async with self._semaphore:
+            try:
+                async with AsyncSessionLocal() as session:
+                    image_bytes = await ComplaintRepository(session).get_image_bytes(row)
+                if not image_bytes:
+                    return {
+                        "is_relevant": False,
+                        "confidence_score": 0.0,
+                        "explanation": "Image bytes not found",
+                        "status": "Error",
+                    }, True
+                result, from_model = await image_verification_service.evaluate_image(
+                    row.text,
+                    image_bytes,
+                    row.image_mimetype or "image/jpeg",
+                    category_id=row.category_id
+                )
+            except Exception as e:
+                logger.error(f"Image verification of complaint {row.id} failed: {e}")
+
+        if from_model:
+            return result, True
+        if row.image_verification_attempts < settings.IMAGE_VERIFICATION_MAX_ATTEMPTS:
+            return None, False
+        return result or {
+            "is_relevant": False,
+            "confidence_score": 0.0,
+            "explanation": "Image verification failed",
+            "status": "Error",
+        }, False
+
+    async def _release(self, complaint_ids: List[Any]) -> None:
+        """Hand claimed images back"""
+        try:
+            async with AsyncSessionLocal() as session:
+                await ComplaintRepository(session).release_image_claims(complaint_ids)
+            self.stats["released"] += len(complaint_ids)
+        except Exception as e:
+            logger.error(f"Failed to release {len(complaint_ids)} image claim(s): {e}")
+
+
+__all__ = ["ImageVerificationWorker"]
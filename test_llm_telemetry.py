@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+test_llm_telemetry.py — Regression test for LLM telemetry of rejected complaints.
+
+A queued complaint whose AI pipeline rejects it (spam, validation) is deleted
+by the complaint worker. The LLM calls made while processing it must still be
+written to llm_processing_logs - unlinked (complaint_id NULL) - and must not
+take down the telemetry batch they are flushed with.
+
+Runs against the configured DATABASE_URL without calling Groq: the pipeline
+is replaced by one that records a simulated LLM call, flushes telemetry
+mid-job and raises ValueError like a spam rejection.
+
+Checks:
+  1. Rejected job: complaint deleted, its telemetry written with complaint_id NULL
+  2. Unrelated entries flushed in the same batch are written
+  3. A batch referencing a missing complaint is retried unlinked, not dropped
+
+Usage:
+    python test_llm_telemetry.py
+    python test_llm_telemetry.py --student-roll-no 22CSE001
+"""
+
+import argparse
+import asyncio
+import contextvars
+import sys
+import uuid
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy import select, update, delete, func
+
+from src.config.constants import LLMOperationType
+from src.database.connection import AsyncSessionLocal, engine
+from src.database.models import Complaint, ComplaintJob, LLMProcessingLog, Student
+from src.services.complaint_service import ComplaintService
+from src.services.llm_telemetry import llm_telemetry
+from src.workers.complaint_worker import ComplaintWorker
+
+MARKER = f"telemetry-test-{uuid.uuid4().hex[:8]}"
+TEXT = "The projector in lab 3 has not been working for over a week"
+
+failures: List[str] = []
+
+
+def check(name: str, ok: bool, detail: str = ""):
+    print(f"  [{'PASS' if ok else 'FAIL'}] {name}" + (f" — {detail}" if detail else ""))
+    if not ok:
+        failures.append(name)
+
+
+def record(tag: str):
+    """Record a simulated Groq call, identifiable by MARKER/tag"""
+    llm_telemetry.record(
+        operation=LLMOperationType.SPAM_DETECTION.value,
+        model=MARKER,
+        status="Success",
+        processing_time_ms=1,
+        error_message=tag,
+    )
+
+
+def record_outside_scope(tag: str):
+    """Record from a fresh context, like a concurrent API request"""
+    contextvars.Context().run(record, tag)
+
+
+async def logged(tag: str) -> List[Optional[uuid.UUID]]:
+    """complaint_id of every written entry with this tag"""
+    async with AsyncSessionLocal() as session:
+        return list((await session.scalars(
+            select(LLMProcessingLog.complaint_id).where(
+                LLMProcessingLog.model == MARKER,
+                LLMProcessingLog.error_message == tag,
+            )
+        )).all())
+
+
+async def pick_student(roll_no: Optional[str]) -> Optional[str]:
+    async with AsyncSessionLocal() as session:
+        query = select(Student.roll_no).where(Student.is_active == True)
+        if roll_no:
+            query = query.where(Student.roll_no == roll_no)
+        return await session.scalar(query.limit(1))
+
+
+# ── rejected job ───────────────────────────────────────────────────────────
+async def test_rejected_job(roll_no: str):
+    print("\n1. Rejected queued complaint")
+
+    async with AsyncSessionLocal() as session:
+        queued = await ComplaintService(session).submit_complaint_async(roll_no, TEXT, visibility="Private")
+    complaint_id = uuid.UUID(queued["id"])
+    slot_id = f"{MARKER}/0"
+
+    # Lease this job directly, so the test never picks up someone else's
+    async with AsyncSessionLocal() as session:
+        job = (await session.scalars(
+            update(ComplaintJob)
+            .where(ComplaintJob.id == queued["job_id"])
+            .values(status="Running", attempts=ComplaintJob.attempts + 1,
+                    locked_by=slot_id, locked_until=func.now() + timedelta(minutes=5))
+            .returning(ComplaintJob)
+        )).one()
+        await session.commit()
+
+    async def rejecting_pipeline(self, complaint_id):
+        record("rejected-job")
+        # Unrelated request telemetry, flushed while the job is still running
+        record_outside_scope("unrelated")
+        await llm_telemetry.flush()
+        raise ValueError("Complaint marked as spam")
+
+    dropped = llm_telemetry.get_stats()["dropped"]
+    original = ComplaintService.process_queued_complaint
+    ComplaintService.process_queued_complaint = rejecting_pipeline
+    try:
+        await ComplaintWorker(worker_id=MARKER)._process(job, slot_id)
+    finally:
+        ComplaintService.process_queued_complaint = original
+    await llm_telemetry.flush()
+
+    async with AsyncSessionLocal() as session:
+        exists = await session.scalar(select(func.count()).select_from(Complaint).where(Complaint.id == complaint_id))
+        job_status = await session.scalar(select(ComplaintJob.status).where(ComplaintJob.id == job.id))
+    check("complaint deleted", exists == 0)
+    check("job marked Rejected", job_status == "Rejected", f"status={job_status}")
+
+    rows = await logged("rejected-job")
+    check("rejected job telemetry written", len(rows) == 1, f"{len(rows)} row(s)")
+    check("rejected job telemetry unlinked", rows == [None], f"complaint_id={rows}")
+    unrelated = await logged("unrelated")
+    check("unrelated telemetry written", len(unrelated) == 1, f"{len(unrelated)} row(s)")
+    check("nothing dropped", llm_telemetry.get_stats()["dropped"] == dropped)
+
+
+# ── batch referencing a missing complaint ─────────────────────────────────────
+async def test_missing_complaint_batch():
+    print("\n2. Batch referencing a deleted complaint")
+
+    dropped = llm_telemetry.get_stats()["dropped"]
+    with llm_telemetry.complaint_scope(uuid.uuid4()):
+        record("missing-complaint")
+    record("same-batch")
+    written = await llm_telemetry.flush()
+
+    check("batch written", written == 2, f"{written} row(s)")
+    check("missing complaint entry unlinked", await logged("missing-complaint") == [None])
+    check("batch neighbour written", len(await logged("same-batch")) == 1)
+    check("nothing dropped", llm_telemetry.get_stats()["dropped"] == dropped)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="LLM telemetry regression test")
+    parser.add_argument("--student-roll-no", help="Active student to submit as (default: any)")
+    args = parser.parse_args()
+
+    llm_telemetry.enabled = True
+    roll_no = await pick_student(args.student_roll_no)
+    if not roll_no:
+        print("No active student found - run setup_database.py first")
+        return 2
+
+    print("=" * 70)
+    print(f"LLM TELEMETRY — rejected complaints (marker {MARKER})")
+    print("=" * 70)
+    try:
+        await test_rejected_job(roll_no)
+        await test_missing_complaint_batch()
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(LLMProcessingLog).where(LLMProcessingLog.model == MARKER))
+            await session.commit()
+        await engine.dispose()
+
+    print("\n" + "=" * 70)
+    print("FAILED: " + ", ".join(failures) if failures else "ALL PASSED")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+test_payload_bytes.py — Regression test for database bytes fetched per endpoint.
+
+Complaint image bytes (image_data, thumbnail_data, image_renditions.data) are
+deferred columns: listing and detail endpoints must never SELECT them, only
+the image-serving path may. This script runs the app in-process against the
+configured DATABASE_URL, calls each read endpoint and measures, per request,
+the size of every row the database returned and whether any statement
+selected a byte column.
+
+Fails when a non-image endpoint selects a byte column or fetches more than
+--budget-kb from the database.
+
+Usage:
+    python test_payload_bytes.py
+    python test_payload_bytes.py --student-email s@srec.ac.in --student-password Pass@1234
+    python test_payload_bytes.py --budget-kb 256 --page-size 20
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+from sqlalchemy import event, select
+
+from main import app
+from src.database.connection import AsyncSessionLocal, engine
+from src.database.models import Complaint
+
+ADMIN = ("admin@srec.ac.in", "Admin@123456")
+BYTE_COLUMNS = ("image_data", "thumbnail_data", "image_renditions.data", "blob_contents.data")
+
+
+# ── byte counter ─────────────────────────────────────────────────────────────
+class FetchCounter:
+    """Sums the size of rows returned by the database per request"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.statements = 0
+        self.rows = 0
+        self.bytes = 0
+        self.byte_column_statements: List[str] = []
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        if any(column in statement for column in BYTE_COLUMNS) and statement.lstrip().upper().startswith("SELECT"):
+            self.byte_column_statements.append(" ".join(statement.split())[:160])
+        # The asyncpg adapter buffers the whole result before fetch
+        for row in list(getattr(cursor, "_rows", None) or []):
+            self.rows += 1
+            self.bytes += sum(_value_size(value) for value in row)
+
+
+def _value_size(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(str(value))
+
+
+counter = FetchCounter()
+
+
+# ── counters ─────────────────────────────────────────────────────────────────
+passed = failed = 0
+failures_list = []
+
+
+def check(label: str, cond: bool, detail: str = ""):
+    global passed, failed
+    if cond:
+        passed += 1
+        print(f"  [+] {label}")
+    else:
+        failed += 1
+        failures_list.append(label)
+        print(f"  [!] FAIL: {label}")
+        if detail:
+            print(f"         {detail}")
+
+
+# ── http helpers ─────────────────────────────────────────────────────────────
+async def login(client: httpx.AsyncClient, path: str, body: Dict[str, str]) -> Optional[str]:
+    r = await client.post(path, json=body)
+    if r.status_code != 200:
+        print(f"  [INFO] Login {path} -> {r.status_code}")
+        return None
+    data = r.json()
+    return data.get("token") or data.get("access_token")
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    label: str,
+    path: str,
+    token: Optional[str],
+    budget: int,
+    image_endpoint: bool = False,
+    **params
+) -> Dict[str, Any]:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    counter.reset()
+    r = await client.get(path, headers=headers, params=params or None)
+    result = {
+        "label": label,
+        "status": r.status_code,
+        "statements": counter.statements,
+        "rows": counter.rows,
+        "bytes": counter.bytes,
+        "response": len(r.content),
+    }
+    print(
+        f"  {label:<34} {r.status_code:>3}  {counter.statements:>3} stmts  "
+        f"{counter.rows:>5} rows  {counter.bytes:>10,} B fetched  {len(r.content):>10,} B sent"
+    )
+    if not image_endpoint:
+        check(
+            f"{label}: no byte column selected",
+            not counter.byte_column_statements,
+            "; ".join(counter.byte_column_statements[:2])
+        )
+        check(
+            f"{label}: {counter.bytes:,} B fetched <= {budget:,} B",
+            counter.bytes <= budget
+        )
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Count database bytes fetched per endpoint")
+    parser.add_argument("--student-email", help="Student to call the student endpoints as")
+    parser.add_argument("--student-password", help="Password of --student-email")
+    parser.add_argument("--page-size", type=int, default=20, help="Page size for listing endpoints")
+    parser.add_argument("--budget-kb", type=int, default=256, help="Max KB fetched by a non-image request")
+    args = parser.parse_args()
+    budget = args.budget_kb * 1024
+
+    print("=" * 80)
+    print(f"DATABASE BYTES FETCHED PER ENDPOINT  ({datetime.now():%Y-%m-%d %H:%M:%S})")
+    print("=" * 80)
+
+    event.listen(engine.sync_engine, "after_cursor_execute", counter.after_cursor_execute)
+    try:
+        async with AsyncSessionLocal() as session:
+            image_complaint_id = await session.scalar(
+                select(Complaint.id)
+                .where(Complaint.has_image, Complaint.visibility == "Public")
+                .order_by(Complaint.submitted_at.desc())
+                .limit(1)
+            )
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api", timeout=60) as client:
+            admin_token = await login(client, "/authorities/login", {"email": ADMIN[0], "password": ADMIN[1]})
+            if not admin_token:
+                print("  [FAIL] Admin login failed (is the database seeded?)")
+                sys.exit(1)
+            student_token = None
+            if args.student_email and args.student_password:
+                student_token = await login(client, "/students/login", {
+                    "email_or_roll_no": args.student_email,
+                    "password": args.student_password
+                })
+
+            page = {"page": 1, "page_size": args.page_size}
+            print("\nAuthority / admin endpoints")
+            await measure(client, "GET /admin/complaints", "/admin/complaints", admin_token, budget, **page)
+            await measure(client, "GET /admin/stats/overview", "/admin/stats/overview", admin_token, budget)
+            await measure(client, "GET /admin/images/pending-verification",
+                          "/admin/images/pending-verification", admin_token, budget)
+            await measure(client, "GET /authorities/my-complaints", "/authorities/my-complaints",
+                          admin_token, budget, **page)
+            await measure(client, "GET /authorities/stats", "/authorities/stats", admin_token, budget)
+
+            if student_token:
+                print("\nStudent endpoints")
+                await measure(client, "GET /complaints/public-feed", "/complaints/public-feed",
+                              student_token, budget, **page)
+                await measure(client, "GET /students/my-complaints", "/students/my-complaints",
+                              student_token, budget, **page)
+                await measure(client, "GET /complaints/filter/advanced?has_image",
+                              "/complaints/filter/advanced", student_token, budget, has_image="true", **page)
+                await measure(client, "GET /students/stats", "/students/stats", student_token, budget)
+                if image_complaint_id:
+                    await measure(client, "GET /complaints/{id}", f"/complaints/{image_complaint_id}",
+                                  student_token, budget)
+                    print("\nImage endpoints (reported, not budgeted)")
+                    await measure(client, "GET /complaints/{id}/image?size=thumbnail",
+                                  f"/complaints/{image_complaint_id}/image", student_token, budget,
+                                  image_endpoint=True, size="thumbnail")
+                    await measure(client, "GET /complaints/{id}/image",
+                                  f"/complaints/{image_complaint_id}/image", student_token, budget,
+                                  image_endpoint=True)
+            else:
+                print("\n  [INFO] No --student-email/--student-password, student endpoints skipped")
+    finally:
+        event.remove(engine.sync_engine, "after_cursor_execute", counter.after_cursor_execute)
+        await engine.dispose()
+
+    print("\n" + "=" * 80)
+    print(f"PASSED: {passed}   FAILED: {failed}")
+    for label in failures_list:
+        print(f"  - {label}")
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,238 @@
+"""
+Train the local complaint classifier from historical complaints.
+
+Reads every non-spam complaint with its final category, target department
+and priority, trains the hashed n-gram classifier (src/services/local_classifier.py)
+and saves it to LOCAL_CLASSIFIER_PATH. The API and worker processes load it
+on startup; restart them after retraining.
+
+A hold-out split is scored before the final model is trained on all rows,
+and the labelled routing cases from test_llm_routing.py are always reported
+(accuracy, how many would skip the LLM at the threshold, latency).
+
+Usage:
+    python train_classifier.py                   # train + report
+    python train_classifier.py --evaluate        # report on the saved model only
+    python train_classifier.py --threshold 0.85 --epochs 200
+"""
+
+import argparse
+import ast
+import asyncio
+import random
+import statistics
+import time
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from src.config.settings import settings
+from src.database.connection import AsyncSessionLocal, engine
+from src.database.models import Complaint, ComplaintCategory, Department, Student
+from src.services.local_classifier import LocalClassifier
+
+import logging
+logger = logging.getLogger(__name__)
+
+ROUTING_TEST_FILE = Path(__file__).parent / "test_llm_routing.py"
+
+# Student profiles test_llm_routing.py submits each text list with, and the
+# expected (category, target department) - department only checked for "Department"
+ROUTING_CASES = [
+    ("MH_TEXTS", {"gender": "Male", "stay_type": "Hostel", "department": "CSE"}, "Men's Hostel", None),
+    ("WH_TEXTS", {"gender": "Female", "stay_type": "Hostel", "department": "ECE"}, "Women's Hostel", None),
+    ("GEN_TEXTS", {"gender": "Male", "stay_type": "Day Scholar", "department": "IT"}, "General", None),
+    ("CSE_DEPT_TEXTS", {"gender": "Male", "stay_type": "Hostel", "department": "CSE"}, "Department", "CSE"),
+    ("ECE_DEPT_TEXTS", {"gender": "Female", "stay_type": "Hostel", "department": "ECE"}, "Department", "ECE"),
+    ("DC_TEXTS", {"gender": "Male", "stay_type": "Day Scholar", "department": "MECH"}, "Disciplinary Committee", None),
+    ("UPDATE_TEST_TEXT", {"gender": "Male", "stay_type": "Hostel", "department": "CSE"}, "Department", "CSE"),
+    ("EDGE_CROSS_DEPT", {"gender": "Female", "stay_type": "Hostel", "department": "ECE"}, "Department", "CSE"),
+]
+
+
+async def load_training_rows():
+    """Fetch (text, context, category, target department, priority) for every usable complaint."""
+    student_department = aliased(Department)
+    target_department = aliased(Department)
+
+    query = (
+        select(
+            Complaint.original_text,
+            ComplaintCategory.name,
+            target_department.code,
+            Complaint.priority,
+            Student.gender,
+            Student.stay_type,
+            student_department.code,
+        )
+        .join(ComplaintCategory, Complaint.category_id == ComplaintCategory.id)
+        .join(Student, Complaint.student_roll_no == Student.roll_no)
+        .join(student_department, Student.department_id == student_department.id)
+        .outerjoin(target_department, Complaint.complaint_department_id == target_department.id)
+        .where(
+            Complaint.is_marked_as_spam == False,  # noqa: E712
+            Complaint.status.notin_(["Spam", "Processing"]),
+        )
+    )
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(query)
+        return [
+            {
+                "text": text,
+                "context": {"gender": gender, "stay_type": stay_type, "department": home_department},
+                "category": category,
+                "target_department": department,
+                "priority": priority,
+            }
+            for text, category, department, priority, gender, stay_type, home_department in result.all()
+        ]
+
+
+def fit(rows, args) -> LocalClassifier:
+    """Train a classifier on rows."""
+    classifier = LocalClassifier(hash_bits=args.hash_bits)
+    return classifier.fit(
+        [row["text"] for row in rows],
+        [row["context"] for row in rows],
+        {head: [row[head] for row in rows] for head in LocalClassifier.HEADS},
+        epochs=args.epochs,
+    )
+
+
+def score(classifier: LocalClassifier, rows, threshold: float):
+    """Print per-head accuracy, plus coverage/accuracy of the confident predictions."""
+    correct = {head: 0 for head in LocalClassifier.HEADS}
+    confident = confident_correct = 0
+
+    for row in rows:
+        predictions = classifier.predict(row["text"], row["context"])
+        for head in LocalClassifier.HEADS:
+            correct[head] += predictions[head][0] == row[head]
+        if classifier.categorize(row["text"], row["context"], threshold) is not None:
+            confident += 1
+            confident_correct += predictions["category"][0] == row["category"]
+
+    total = len(rows)
+    for head in LocalClassifier.HEADS:
+        print(f"  {head:18} accuracy: {correct[head] / total:.1%}")
+    print(f"  confident (>= {threshold}): {confident}/{total} ({confident / total:.1%}) "
+          f"- category accuracy {confident_correct / max(confident, 1):.1%}")
+
+
+def load_routing_cases():
+    """Read the complaint texts of test_llm_routing.py without running it (it calls the live API)."""
+    tree = ast.parse(ROUTING_TEST_FILE.read_text(encoding="utf-8"))
+    constants = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                constants[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                continue
+
+    cases = []
+    for name, context, category, department in ROUTING_CASES:
+        texts = constants.get(name)
+        if texts is None:
+            print(f"  {name} not found in {ROUTING_TEST_FILE.name}, skipped")
+            continue
+        for text in ([texts] if isinstance(texts, str) else texts):
+            cases.append((name, text, context, category, department))
+    return cases
+
+
+def evaluate_routing_cases(classifier: LocalClassifier, threshold: float):
+    """Report accuracy and latency on the labelled test_llm_routing.py cases."""
+    cases = load_routing_cases()
+    print(f"\nRouting cases from {ROUTING_TEST_FILE.name} ({len(cases)} complaints):")
+
+    correct = confident = confident_correct = 0
+    latencies = []
+    for name, text, context, category, department in cases:
+        # Warm up once, then time the prediction the submit path makes
+        classifier.predict(text, context)
+        runs = []
+        for _ in range(50):
+            start = time.perf_counter()
+            predictions = classifier.predict(text, context)
+            runs.append((time.perf_counter() - start) * 1000)
+        latencies.append(statistics.median(runs))
+
+        predicted, probability = predictions["category"]
+        predicted_department = predictions["target_department"][0]
+        ok = predicted == category and (department is None or predicted_department == department)
+        local = classifier.categorize(text, context, threshold)
+
+        correct += ok
+        if local is not None:
+            confident += 1
+            confident_correct += ok
+        status = "OK " if ok else "BAD"
+        route = "local" if local is not None else "LLM  "
+        print(f"  [{status}] [{route}] {name:16} {predicted:22} p={probability:.2f} "
+              f"dept={predicted_department:5} | {text[:50]}...")
+
+    total = len(cases)
+    latencies.sort()
+    print(f"\n  Accuracy:        {correct}/{total} ({correct / total:.1%})")
+    print(f"  Skip LLM:        {confident}/{total} at threshold {threshold} "
+          f"({confident_correct}/{max(confident, 1)} of those correct)")
+    print(f"  Latency median:  {statistics.median(latencies):.3f} ms")
+    print(f"  Latency max:     {latencies[-1]:.3f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Train the local complaint classifier")
+    parser.add_argument("--output", default=settings.LOCAL_CLASSIFIER_PATH, help="Model file to write/read")
+    parser.add_argument("--evaluate", action="store_true", help="Only evaluate the saved model")
+    parser.add_argument("--threshold", type=float, default=settings.LOCAL_CLASSIFIER_THRESHOLD)
+    parser.add_argument("--epochs", type=int, default=150)
+    parser.add_argument("--hash-bits", type=int, default=settings.LOCAL_CLASSIFIER_HASH_BITS)
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction scored before the final fit")
+    parser.add_argument("--min-samples", type=int, default=200, help="Refuse to train on fewer complaints")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("LOCAL COMPLAINT CLASSIFIER")
+    print("=" * 80)
+
+    if args.evaluate:
+        classifier = LocalClassifier()
+        if not classifier.load(args.output):
+            print(f"No model at {args.output}; train one first")
+            return
+        print(f"Loaded {args.output} ({classifier.metadata})")
+        evaluate_routing_cases(classifier, args.threshold)
+        return
+
+    try:
+        rows = await load_training_rows()
+    finally:
+        await engine.dispose()
+
+    print(f"Loaded {len(rows)} complaints")
+    if len(rows) < args.min_samples:
+        print(f"Need at least {args.min_samples} complaints to train (--min-samples)")
+        return
+
+    random.Random(42).shuffle(rows)
+    split = int(len(rows) * (1 - args.holdout))
+    if 0 < split < len(rows):
+        print(f"\nHold-out evaluation (train {split}, test {len(rows) - split}):")
+        started = time.perf_counter()
+        score(fit(rows[:split], args), rows[split:], args.threshold)
+        print(f"  training took {time.perf_counter() - started:.1f}s")
+
+    print(f"\nTraining on all {len(rows)} complaints...")
+    classifier = fit(rows, args)
+    classifier.save(args.output)
+    print(f"Saved {args.output}")
+
+    evaluate_routing_cases(classifier, args.threshold)
+    print("\nRestart the API / worker processes to load the new model.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())